@@ -3,6 +3,7 @@ Application configuration loaded from environment / .env file.
 """
 import os
 import sys
+import tempfile
 from pathlib import Path
 
 # Add project root for db_config import
@@ -60,3 +61,25 @@ else:
 # Rate limiting
 RATE_LIMIT_REQUESTS = int(os.environ.get("RATE_LIMIT_REQUESTS", "100"))
 RATE_LIMIT_WINDOW = int(os.environ.get("RATE_LIMIT_WINDOW", "60"))
+# "memory" (per worker) or "sqlite" (one counter file shared by all workers
+# on the host); see api/middleware/rate_limit.py.
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_SQLITE_PATH = os.environ.get(
+    "RATE_LIMIT_SQLITE_PATH",
+    os.path.join(tempfile.gettempdir(), "labor_api_rate_limit.sqlite"),
+)
+
+# Responses of at least this many bytes are gzip-compressed for clients
+# that accept it.
+GZIP_MINIMUM_SIZE = int(os.environ.get("GZIP_MINIMUM_SIZE", "1024"))
+
+# Slow-query plan capture (api/query_stats.py). Statements slower than
+# SLOW_QUERY_EXPLAIN_MS are re-run under EXPLAIN (ANALYZE, BUFFERS) for a
+# SLOW_QUERY_SAMPLE_RATE fraction of occurrences; 0 disables capture.
+SLOW_QUERY_EXPLAIN_MS = float(os.environ.get("SLOW_QUERY_EXPLAIN_MS", "0"))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get("SLOW_QUERY_SAMPLE_RATE", "0.1"))
+
+# /metrics (api/metrics.py) bypasses JWT auth so Prometheus can scrape it.
+# Scrapers send "Authorization: Bearer <METRICS_TOKEN>". With JWT auth enabled
+# and no METRICS_TOKEN, /metrics answers 503 rather than serving anyone.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
@@ -1,15 +1,22 @@
 """
 Database connection pool singleton.
+
+Pooled cursors are RealDictCursors that also record per-request SQL timing
+(api/query_stats.py).
 """
+import time
+import uuid
 from contextlib import contextmanager
 
 import psycopg2  # noqa: F401 -- needed by pool
-from psycopg2.extras import RealDictCursor
-from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 
+from . import metrics
 from .config import DB_CONFIG
+from .query_stats import InstrumentedCursor
 
 _pool = None
+POOL_MAXCONN = 20
 
 
 def _get_pool():
@@ -17,18 +24,38 @@ def _get_pool():
     if _pool is None:
         _pool = ThreadedConnectionPool(
             minconn=2,
-            maxconn=20,
-            cursor_factory=RealDictCursor,
+            maxconn=POOL_MAXCONN,
+            cursor_factory=InstrumentedCursor,
             **DB_CONFIG,
         )
+        metrics.POOL_MAX.set(POOL_MAXCONN)
     return _pool
 
 
+def _checkout(pool):
+    """pool.getconn() with checkout-wait and saturation metrics."""
+    t0 = time.perf_counter()
+    try:
+        conn = pool.getconn()
+    except PoolError:
+        metrics.POOL_EXHAUSTED.inc()
+        raise
+    finally:
+        metrics.POOL_CHECKOUT.observe(time.perf_counter() - t0)
+    metrics.POOL_IN_USE.inc()
+    return conn
+
+
+def _checkin(pool, conn):
+    metrics.POOL_IN_USE.dec()
+    pool.putconn(conn)
+
+
 @contextmanager
 def get_db():
     """Yield a connection from the pool; auto-commit on success, rollback on error."""
     pool = _get_pool()
-    conn = pool.getconn()
+    conn = _checkout(pool)
     try:
         yield conn
         conn.commit()
@@ -36,7 +63,38 @@ def get_db():
         conn.rollback()
         raise
     finally:
-        pool.putconn(conn)
+        _checkin(pool, conn)
+
+
+def stream_rows(sql, params=None, batch_size=5000):
+    """Yield lists of dict rows from a server-side (named) cursor.
+
+    Holds one pooled connection for as long as the generator is alive, so the
+    whole result never sits in API memory. Safe to abandon mid-stream (client
+    disconnect): the transaction is rolled back before the connection goes
+    back to the pool.
+    """
+    pool = _get_pool()
+    conn = _checkout(pool)
+    finished = False
+    try:
+        with conn.cursor(name=f"stream_{uuid.uuid4().hex[:12]}", cursor_factory=InstrumentedCursor) as cur:
+            cur.itersize = batch_size
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finished = True
+    finally:
+        try:
+            if finished:
+                conn.commit()
+            else:
+                conn.rollback()
+        finally:
+            _checkin(pool, conn)
 
 
 def release_db(conn):
@@ -1,38 +1,61 @@
 """
 Shared helper functions and constants used across routers.
 """
+import base64
+import hashlib
+import json
 import re
 import time
-from typing import Any, Callable
+from typing import Any, Callable, NamedTuple, Optional
+
+from fastapi import HTTPException
+
+from . import metrics
 
 
 class TTLCache:
     """Simple in-memory cache with time-to-live expiration.
 
     Usage:
-        _cache = TTLCache(ttl_seconds=300)
+        _cache = TTLCache(ttl_seconds=300, name="profile")
         result = _cache.get("key")
         if result is None:
             result = expensive_query()
             _cache.set("key", result)
+
+    Lookups are counted per ``name`` in cache_requests_total (api/metrics.py).
     """
 
-    def __init__(self, ttl_seconds: int = 300):
+    def __init__(self, ttl_seconds: int = 300, max_entries: Optional[int] = None,
+                 name: str = "unnamed"):
         self._store: dict[str, tuple[float, Any]] = {}
         self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._hits = metrics.CACHE_REQUESTS.labels(name, "hit")
+        self._misses = metrics.CACHE_REQUESTS.labels(name, "miss")
 
     def get(self, key: str) -> Any:
         entry = self._store.get(key)
         if entry is None:
+            self._misses.inc()
             return None
         expires_at, value = entry
         if time.time() > expires_at:
             del self._store[key]
+            self._misses.inc()
             return None
+        self._hits.inc()
         return value
 
     def set(self, key: str, value: Any) -> None:
-        self._store[key] = (time.time() + self._ttl, value)
+        now = time.time()
+        if self._max_entries is not None and len(self._store) >= self._max_entries:
+            # Drop expired entries first, then the oldest insertions.
+            for k in [k for k, (exp, _) in self._store.items() if exp < now]:
+                del self._store[k]
+            while len(self._store) >= self._max_entries:
+                del self._store[next(iter(self._store))]
+        self._store[key] = (now + self._ttl, value)
 
     def clear(self) -> None:
         self._store.clear()
@@ -51,6 +74,152 @@ def safe_order_dir(order: str) -> str:
     return "DESC" if order.lower() == "desc" else "ASC"
 
 
+# ---------------------------------------------------------------------------
+# Keyset pagination + optional/estimated totals
+# ---------------------------------------------------------------------------
+#
+# OFFSET pagination makes page N re-scan and discard every earlier row, and
+# each page also re-runs an exact COUNT(*). List endpoints accept an opaque
+# ``cursor`` (returned as ``next_cursor``) that encodes the sort-key values
+# of the last row served; the next page starts strictly after it. The sort
+# must end with a unique column so ties are broken deterministically.
+#
+# Usage:
+#     keys = [SortKey("organizing_score", desc=True, nullable=False),
+#             SortKey("total_penalties", desc=True),
+#             SortKey("establishment_id", nullable=False)]
+#     after_sql, after_params = keyset_where(keys, cursor)
+#     cur.execute(f"SELECT ...{keyset_select(keys)} FROM ... "
+#                 f"WHERE {where} AND {after_sql} "
+#                 f"ORDER BY {keyset_order_by(keys)} LIMIT %s", params + after_params + [limit])
+#     rows, next_cursor = keyset_page(cur.fetchall(), keys, limit)
+
+COUNT_MODES = ("exact", "estimate", "none")
+_count_cache = TTLCache(ttl_seconds=300, max_entries=2048, name="count")
+
+
+class SortKey(NamedTuple):
+    """One ORDER BY term. NULLs always sort last (matching NULLS LAST)."""
+    expr: str
+    desc: bool = False
+    nullable: bool = True
+
+
+def keyset_order_by(keys: list) -> str:
+    return ", ".join(
+        f"{k.expr} {'DESC' if k.desc else 'ASC'}" + (" NULLS LAST" if k.nullable else "")
+        for k in keys
+    )
+
+
+def keyset_select(keys: list) -> str:
+    """Extra select-list entries carrying the sort-key values (``_k0``...)."""
+    return "".join(f", {k.expr} AS _k{i}" for i, k in enumerate(keys))
+
+
+def _keys_signature(keys: list) -> str:
+    raw = "|".join(f"{k.expr}:{int(k.desc)}" for k in keys)
+    return hashlib.sha1(raw.encode()).hexdigest()[:10]
+
+
+def encode_cursor(keys: list, values: list) -> str:
+    payload = json.dumps({"s": _keys_signature(keys), "v": values}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(keys: list, cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["v"]
+        ok = payload["s"] == _keys_signature(keys) and len(values) == len(keys)
+    except (ValueError, KeyError, TypeError):
+        ok = False
+    if not ok:
+        raise HTTPException(status_code=400, detail="Invalid or stale pagination cursor")
+    return values
+
+
+def keyset_where(keys: list, cursor: Optional[str]) -> tuple[str, list]:
+    """SQL predicate selecting rows strictly after ``cursor`` in key order."""
+    if not cursor:
+        return "TRUE", []
+    values = decode_cursor(keys, cursor)
+
+    # Uniform direction with no NULLs: a row comparison, which a matching
+    # composite index can satisfy directly.
+    if all(not k.nullable for k in keys) and len({k.desc for k in keys}) == 1 \
+            and all(v is not None for v in values):
+        op = "<" if keys[0].desc else ">"
+        cols = ", ".join(k.expr for k in keys)
+        marks = ", ".join(["%s"] * len(keys))
+        return f"(({cols}) {op} ({marks}))", list(values)
+
+    clauses, params = [], []
+    for i, (k, v) in enumerate(zip(keys, values)):
+        terms, term_params = [], []
+        for pk, pv in zip(keys[:i], values[:i]):
+            if pv is None:
+                terms.append(f"{pk.expr} IS NULL")
+            else:
+                terms.append(f"{pk.expr} = %s")
+                term_params.append(pv)
+        if v is None:
+            continue  # nothing sorts after NULL on this key
+        after = f"{k.expr} {'<' if k.desc else '>'} %s"
+        if k.nullable:
+            after = f"({after} OR {k.expr} IS NULL)"
+        terms.append(after)
+        term_params.append(v)
+        clauses.append("(" + " AND ".join(terms) + ")")
+        params.extend(term_params)
+    if not clauses:
+        return "FALSE", []
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def keyset_page(rows: list, keys: list, limit: int) -> tuple[list, Optional[str]]:
+    """Strip the ``_k`` columns and build ``next_cursor`` (None on the last page)."""
+    aliases = [f"_k{i}" for i in range(len(keys))]
+    next_cursor = None
+    if rows and len(rows) >= limit:
+        next_cursor = encode_cursor(keys, [rows[-1][a] for a in aliases])
+    for r in rows:
+        for a in aliases:
+            r.pop(a, None)
+    return rows, next_cursor
+
+
+def count_total(cur, from_where: str, params: list, mode: str = "exact") -> tuple[Optional[int], bool]:
+    """Total rows for ``SELECT ... {from_where}`` -> (total, is_estimate).
+
+    exact:    COUNT(*), cached per SQL + params for 5 minutes.
+    estimate: the planner's row estimate (EXPLAIN), no scan.
+    none:     (None, False).
+    """
+    if mode not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"count must be one of {', '.join(COUNT_MODES)}")
+    if mode == "none":
+        return None, False
+    if mode == "estimate":
+        cur.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_where}", params)
+        row = cur.fetchone()
+        plan = next(iter(row.values())) if isinstance(row, dict) else row[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), True
+
+    key = hashlib.sha1((from_where + "\x00" + json.dumps(params, default=str)).encode()).hexdigest()
+    cached = _count_cache.get(key)
+    if cached is not None:
+        return cached, False
+    cur.execute(f"SELECT COUNT(*) AS cnt {from_where}", params)
+    row = cur.fetchone()
+    total = int(row["cnt"] if isinstance(row, dict) else row[0])
+    _count_cache.set(key, total)
+    return total, False
+
+
 # Law firm detection patterns for NLRB data quality
 LAW_FIRM_PATTERNS = [
     r'\bLLP\b', r'\bLLC\b.*LAW', r'\bATTORNEY',
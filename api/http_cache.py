@@ -0,0 +1,132 @@
+"""
+ETags and conditional GET for large read-only payloads.
+
+A route opts in with a dependency naming the tables its response is built
+from:
+
+    @router.get("/api/nlrb/elections/map",
+                dependencies=[Depends(etag_for("nlrb_elections", "nlrb_participants"))])
+
+The ETag is a digest of those tables' data version plus the running code's
+version. The data version uses the signal that scripts/scoring/refresh_all.py
+uses for change detection:
+- pg_class.relfilenode, which changes on REFRESH MATERIALIZED VIEW,
+  TRUNCATE and shadow-table swaps
+- pg_stat_user_tables insert/update/delete counters, which move on any
+  other write
+
+The ETag is weak (W/"..."): the same tag covers the identity and gzip
+encodings of a response, which are semantically equal but not byte-equal.
+
+Versions are cached per table set for VERSION_TTL seconds. A request whose
+If-None-Match matches gets 304 from the dependency, before the endpoint
+runs, so it does not touch the database. At most one small catalog query
+per table set per worker runs every VERSION_TTL seconds.
+
+A change becomes visible within VERSION_TTL seconds, plus Postgres's
+statistics flush delay for writes that do not replace the relation.
+Responses carry Cache-Control: no-cache, so browsers revalidate on every
+navigation instead of reusing a copy blindly.
+"""
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+
+from .database import get_db
+from .helpers import TTLCache
+
+_log = logging.getLogger("labor_api.http_cache")
+
+VERSION_TTL = 15
+
+_version_cache = TTLCache(ttl_seconds=VERSION_TTL, max_entries=256, name="data_version")
+
+
+def _code_version() -> str:
+    """API_BUILD_ID, else a digest of the api package's file stamps.
+
+    Folded into every ETag so a deploy that changes a payload's shape never
+    answers 304 for a body built by the old code.
+    """
+    build_id = os.environ.get("API_BUILD_ID")
+    if build_id:
+        return build_id
+    root = Path(__file__).resolve().parent
+    stamps = sorted(
+        (str(p.relative_to(root)), p.stat().st_mtime_ns, p.stat().st_size)
+        for p in root.rglob("*.py")
+    )
+    return hashlib.sha1(repr(stamps).encode()).hexdigest()[:12]
+
+
+CODE_VERSION = _code_version()
+
+
+def data_version(tables: tuple[str, ...]) -> Optional[str]:
+    """Digest of relfilenode + write counters for `tables` (None if unavailable)."""
+    key = ",".join(tables)
+    cached = _version_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT c.relname, c.relfilenode,
+                           COALESCE(s.n_tup_ins, 0) AS ins, COALESCE(s.n_tup_upd, 0) AS upd,
+                           COALESCE(s.n_tup_del, 0) AS del
+                    FROM pg_class c
+                    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+                    WHERE c.relname = ANY(%s) AND c.relkind IN ('r', 'm', 'p')
+                      AND c.relnamespace = 'public'::regnamespace
+                    ORDER BY c.relname
+                    """,
+                    [list(tables)],
+                )
+                rows = [(r["relname"], r["relfilenode"], r["ins"], r["upd"], r["del"])
+                        for r in cur.fetchall()]
+    except Exception:
+        _log.warning("data version lookup failed for %s", key, exc_info=True)
+        return None
+    version = hashlib.sha1(repr(rows).encode()).hexdigest()[:16]
+    _version_cache.set(key, version)
+    return version
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    # Weak comparison (RFC 9110 13.1.2), as If-None-Match requires
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def etag_for(*tables: str):
+    """Dependency: ETag from `tables`' data version; 304 on a matching If-None-Match.
+
+    Returns the data version (None if unknown). Endpoints that also keep an
+    in-process cache should key it by this value. Otherwise a body cached
+    before a refresh could go out under the post-refresh ETag, and clients
+    would keep it until the next refresh.
+    """
+    tables = tuple(sorted(tables))
+
+    def conditional_get(request: Request, response: Response) -> Optional[str]:
+        version = data_version(tables)
+        if version is None:
+            return None
+        # Weak: the gzip and identity encodings share the tag
+        etag = 'W/"%s"' % hashlib.sha1(f"{CODE_VERSION}:{version}".encode()).hexdigest()[:20]
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return version
+
+    return conditional_get
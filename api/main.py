@@ -19,12 +19,14 @@ from .config import (
     JWT_SECRET,
     AUTH_DISABLED,
     ALLOW_INSECURE_ADMIN,
+    GZIP_MINIMUM_SIZE,
+    METRICS_TOKEN,
 )
-from .middleware.auth import AuthMiddleware
+from .middleware.compression import CompressionMiddleware
+from .middleware.pipeline import RequestPipelineMiddleware
+from .responses import FastJSONResponse
 
 _log = logging.getLogger("labor_api")
-from .middleware.rate_limit import RateLimitMiddleware
-from .middleware.logging import LoggingMiddleware
 from .routers import (
     auth,
     cba,
@@ -67,6 +69,7 @@ app = FastAPI(
     title="Labor Relations Research API",
     version="7.0",
     description="Integrated platform: OLMS union data, F-7 employers, BLS density & projections, NLRB elections, OSHA safety",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -75,9 +78,8 @@ app.add_middleware(
     allow_methods=["GET", "POST", "DELETE"],
     allow_headers=["Authorization", "Content-Type"],
 )
-app.add_middleware(AuthMiddleware)
-app.add_middleware(RateLimitMiddleware)
-app.add_middleware(LoggingMiddleware)
+app.add_middleware(RequestPipelineMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
 
 
 # ---------- Frontend ----------
@@ -179,6 +181,8 @@ elif not JWT_SECRET:
     )
     import sys
     sys.exit(1)
+elif not METRICS_TOKEN:
+    _log.warning("METRICS_TOKEN is not set; /metrics answers 503 until it is.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+"""
+Prometheus metrics for the API process(es), served at /metrics.
+
+Instruments:
+  api_request_duration_seconds{method,route,status}  histogram, route template
+  api_request_db_seconds{route}                      SQL time per request (query_stats)
+  api_requests_in_flight                             gauge
+  db_pool_checkout_seconds                           getconn() wait, histogram
+  db_pool_connections_in_use / db_pool_max_connections
+  db_pool_exhausted_total                            getconn() refused (PoolError)
+  cache_requests_total{cache,result}                 TTLCache hits / misses
+  rate_limit_rejections_total                        429s from the rate limiter
+  research_runs_active / research_runs_total{outcome}
+
+Pool saturation (in_use / max) and exhausted_total show capacity trouble
+before clients start getting 503s.
+
+Multiple uvicorn workers: set PROMETHEUS_MULTIPROC_DIR to an empty, writable
+directory before the workers start. prometheus_client then keeps each
+worker's values in files there and /metrics aggregates all workers (gauges
+summed over live processes). Without it, /metrics reports the worker that
+served the scrape.
+
+"Live" needs help: a worker's gauge file stays until mark_process_dead(pid)
+is called for it, which has to happen from the process manager's child-exit
+hook (e.g. gunicorn's child_exit in gunicorn.conf.py). Plain
+`uvicorn --workers N` has no such hook, so after a worker dies or is
+restarted the livesum gauges (in-flight requests, pool in use, active
+research runs) keep counting its last values. Run under gunicorn with
+uvicorn workers and the hook if those gauges matter.
+
+/metrics is not behind JWT auth. With auth enabled it requires
+METRICS_TOKEN (api/config.py) and answers 503 while that is unset.
+
+prometheus_client is optional: without it every instrument is a no-op and
+/metrics answers 503.
+"""
+import os
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+    HAS_PROMETHEUS = True
+except ImportError:
+    HAS_PROMETHEUS = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+
+class _Noop:
+    """Stand-in for an instrument when prometheus_client is missing."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+if HAS_PROMETHEUS:
+    REQUEST_DURATION = Histogram(
+        "api_request_duration_seconds", "Request latency by route template",
+        ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+    REQUEST_DB_TIME = Histogram(
+        "api_request_db_seconds", "SQL time per request by route template",
+        ["route"], buckets=LATENCY_BUCKETS)
+    IN_FLIGHT = Gauge(
+        "api_requests_in_flight", "Requests being handled", multiprocess_mode="livesum")
+    POOL_CHECKOUT = Histogram(
+        "db_pool_checkout_seconds", "Time to get a connection from the pool",
+        buckets=CHECKOUT_BUCKETS)
+    POOL_IN_USE = Gauge(
+        "db_pool_connections_in_use", "Pooled connections checked out",
+        multiprocess_mode="livesum")
+    POOL_MAX = Gauge(
+        "db_pool_max_connections", "Pool capacity (maxconn)", multiprocess_mode="livesum")
+    POOL_EXHAUSTED = Counter(
+        "db_pool_exhausted_total", "Checkouts refused because the pool was exhausted")
+    CACHE_REQUESTS = Counter(
+        "cache_requests_total", "TTLCache lookups", ["cache", "result"])
+    RATE_LIMITED = Counter(
+        "rate_limit_rejections_total", "Requests rejected with 429 by the rate limiter")
+    RESEARCH_ACTIVE = Gauge(
+        "research_runs_active", "Research runs executing in background tasks",
+        multiprocess_mode="livesum")
+    RESEARCH_RUNS = Counter(
+        "research_runs_total", "Finished background research runs", ["outcome"])
+else:
+    REQUEST_DURATION = REQUEST_DB_TIME = IN_FLIGHT = _Noop()
+    POOL_CHECKOUT = POOL_IN_USE = POOL_MAX = POOL_EXHAUSTED = _Noop()
+    CACHE_REQUESTS = RATE_LIMITED = RESEARCH_ACTIVE = RESEARCH_RUNS = _Noop()
+
+
+def route_label(scope) -> str:
+    """Route template for a request scope ("/api/employers/{employer_id}").
+
+    Unmatched paths share one label so scanners cannot create series.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+def render() -> tuple[bytes, str]:
+    """(body, content type) of the current metrics in text exposition format."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a dead worker's live gauges (call from the server's child-exit hook)."""
+    if HAS_PROMETHEUS and MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
@@ -1,16 +1,19 @@
 """
-JWT authentication middleware.
+JWT authentication (run per request by api/middleware/pipeline.py).
 
 Enabled by default. Set DISABLE_AUTH=true in .env to bypass for development.
 Token format: {"sub": "username", "role": "admin|read", "iat": ..., "exp": ...}
 
+Verified tokens are cached until their exp claim, so a client reusing its
+token pays for one signature check, not one per request.
+
 CLI token generator:
     py -m api.middleware.auth --user admin --role admin
 """
 import time
+from itertools import islice
+from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from ..config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRY_HOURS
@@ -19,6 +22,7 @@ from ..config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRY_HOURS
 PUBLIC_PATHS = frozenset({
     "/",
     "/api/health",
+    "/metrics",
     "/api/auth/login",
     "/api/auth/register",
     "/docs",
@@ -28,6 +32,11 @@ PUBLIC_PATHS = frozenset({
 
 PUBLIC_PREFIXES = ("/files/",)
 
+TOKEN_CACHE_SIZE = 4096
+
+# token -> (secret it was verified with, sub, role, exp)
+_token_cache: dict[str, tuple[str, str, str, float]] = {}
+
 
 def _is_public(path: str) -> bool:
     if path in PUBLIC_PATHS:
@@ -38,36 +47,60 @@ def _is_public(path: str) -> bool:
     return False
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """JWT auth middleware. No-op when JWT_SECRET is empty."""
-
-    async def dispatch(self, request: Request, call_next):
-        if not JWT_SECRET:
-            return await call_next(request)
-
-        is_public = _is_public(request.url.path)
-
-        auth_header = request.headers.get("Authorization", "")
-        if auth_header.startswith("Bearer "):
-            token = auth_header[7:]
-            try:
-                import jwt
-                payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-                request.state.user = payload.get("sub", "anonymous")
-                request.state.role = payload.get("role", "read")
-            except Exception:
-                if not is_public:
-                    return JSONResponse(
-                        status_code=401,
-                        content={"detail": "Invalid or expired token"},
-                    )
+def _evict_tokens(now: float) -> None:
+    for token in [t for t, entry in _token_cache.items() if entry[3] <= now]:
+        del _token_cache[token]
+    if len(_token_cache) >= TOKEN_CACHE_SIZE:
+        for token in list(islice(_token_cache, TOKEN_CACHE_SIZE // 2)):
+            del _token_cache[token]
+
+
+def verify_token(token: str) -> Optional[tuple[str, str]]:
+    """(user, role) for a valid token, else None."""
+    now = time.time()
+    hit = _token_cache.get(token)
+    if hit and hit[0] == JWT_SECRET and hit[3] > now:
+        return hit[1], hit[2]
+    try:
+        import jwt
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except Exception:
+        _token_cache.pop(token, None)
+        return None
+    user, role = payload.get("sub", "anonymous"), payload.get("role", "read")
+    if payload.get("exp") is not None:
+        if len(_token_cache) >= TOKEN_CACHE_SIZE:
+            _evict_tokens(now)
+        _token_cache[token] = (JWT_SECRET, user, role, float(payload["exp"]))
+    return user, role
+
+
+def authenticate(scope, authorization: str) -> Optional[JSONResponse]:
+    """Put the bearer token's user/role on request.state; a 401 if the path needs one.
+
+    No-op when JWT_SECRET is empty.
+    """
+    if not JWT_SECRET:
+        return None
+
+    is_public = _is_public(scope["path"])
+
+    if authorization.startswith("Bearer "):
+        identity = verify_token(authorization[7:])
+        if identity:
+            state = scope.setdefault("state", {})
+            state["user"], state["role"] = identity
         elif not is_public:
             return JSONResponse(
                 status_code=401,
-                content={"detail": "Missing or invalid Authorization header"},
+                content={"detail": "Invalid or expired token"},
             )
-
-        return await call_next(request)
+    elif not is_public:
+        return JSONResponse(
+            status_code=401,
+            content={"detail": "Missing or invalid Authorization header"},
+        )
+    return None
 
 
 def generate_token(user: str, role: str = "read") -> str:
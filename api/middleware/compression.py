@@ -0,0 +1,33 @@
+"""
+Response gzip that leaves already-compressed bodies alone.
+
+Starlette's GZipMiddleware compresses any body over minimum_size unless it
+already has a Content-Encoding. The csv.gz export is a gzip file sent as
+application/gzip (not Content-Encoding: gzip, so it downloads as a .gz), and
+Parquet pages are compressed per column, so gzipping either again only
+burns CPU. Those media types pass through untouched.
+"""
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+PRECOMPRESSED_CONTENT_TYPES = ("application/gzip", "application/vnd.apache.parquet")
+
+
+class _GZipResponder(GZipResponder):
+    async def send_with_compression(self, message: Message) -> None:
+        await super().send_with_compression(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith(PRECOMPRESSED_CONTENT_TYPES):
+                # The flag Starlette sets for text/event-stream: pass the body through
+                self.content_type_is_excluded = True
+
+
+class CompressionMiddleware(GZipMiddleware):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -1,14 +1,12 @@
 """
-Structured request logging middleware.
+Structured request logging (called once per request by api/middleware/pipeline.py).
 
-Logs JSON: {method, path, status, duration_ms, client}.
+Logs {method, path, status, duration_ms, client} plus the request's SQL
+counters (db_queries, db_ms, db_slowest_ms, db_slowest_sql; see
+api/query_stats.py), which are also passed as record extras.
 Warns on slow requests (>3s) and 4xx, errors on 5xx.
 """
 import logging
-import time
-
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 
 logger = logging.getLogger("labor_api")
 
@@ -19,31 +17,25 @@ if not logger.handlers:
     logger.setLevel(logging.INFO)
 
 
-def _client_ip(request: Request) -> str:
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start = time.time()
-        response = await call_next(request)
-        duration_ms = round((time.time() - start) * 1000, 1)
-
-        msg = (
-            f"{request.method} {request.url.path} "
-            f"status={response.status_code} "
-            f"duration={duration_ms}ms "
-            f"client={_client_ip(request)}"
-        )
-
-        if response.status_code >= 500:
-            logger.error(msg)
-        elif response.status_code >= 400 or duration_ms > 3000:
-            logger.warning(msg)
-        else:
-            logger.info(msg)
-
-        return response
+def log_request(method: str, path: str, status: int, duration_ms: float,
+                db: dict, client: str) -> None:
+    msg = (
+        f"{method} {path} "
+        f"status={status} "
+        f"duration={duration_ms}ms "
+        f"db_queries={db['db_queries']} "
+        f"db_ms={db['db_ms']} "
+        f"db_slowest_ms={db['db_slowest_ms']} "
+        f"client={client}"
+    )
+    extra = {"method": method, "path": path,
+             "status": status, "duration_ms": duration_ms, **db}
+
+    if status >= 500:
+        logger.error(msg, extra=extra)
+    elif status >= 400 or duration_ms > 3000:
+        if "db_slowest_sql" in db:
+            msg += f' db_slowest_sql="{db["db_slowest_sql"]}"'
+        logger.warning(msg, extra=extra)
+    else:
+        logger.info(msg, extra=extra)
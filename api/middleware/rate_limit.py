@@ -1,50 +1,224 @@
 """
-In-memory sliding window rate limiter.
+Sliding-window-counter rate limiter (run per request by api/middleware/pipeline.py).
 
-Default: 100 requests per 60 seconds per client IP.
+Default: 100 request units per 60 seconds per client IP.
 Configure via RATE_LIMIT_REQUESTS and RATE_LIMIT_WINDOW env vars.
+
+Each client keeps two counters: units used in the current fixed window and
+in the previous one. The sliding estimate is
+
+    previous * (fraction of the previous window still inside the last W secs)
+    + current
+
+so a check is O(1) and a client costs one small record regardless of its
+request rate. Keys idle for two windows are evicted every EVICT_EVERY seconds.
+
+Expensive routes consume more than one unit (ROUTE_COSTS), e.g. starting a
+research run or streaming a CSV export.
+
+Backends (RATE_LIMIT_BACKEND):
+  memory  per-process dict (default). Each uvicorn worker enforces its own
+          limit, so the effective limit is workers x RATE_LIMIT_REQUESTS.
+  sqlite  counters in a SQLite file (RATE_LIMIT_SQLITE_PATH) shared by all
+          workers on the host, updated under BEGIN IMMEDIATE. A check can
+          wait on another worker's write lock, so check_async() runs it in
+          a worker thread instead of on the event loop.
 """
+import logging
+import math
+import os
+import sqlite3
+import threading
 import time
-from collections import defaultdict
+from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+import anyio.to_thread
 from starlette.responses import JSONResponse
 
-from ..config import RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW
+from .. import metrics
+from ..config import (
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_REQUESTS,
+    RATE_LIMIT_SQLITE_PATH,
+    RATE_LIMIT_WINDOW,
+)
+
+logger = logging.getLogger("labor_api.rate_limit")
+
+EVICT_EVERY = 60.0
+
+# (method, path prefix) -> units charged; first match wins, default 1.
+ROUTE_COSTS = [
+    ("POST", "/api/research/run", 20),
+    ("GET", "/api/organizing/scorecard/export", 10),
+    ("GET", "/api/scorecard/unified/export", 10),
+    ("GET", "/api/targets/scorecard/export", 10),
+    ("GET", "/api/cba/semantic-search", 3),
+]
+
+
+def request_cost(method: str, path: str) -> int:
+    for route_method, prefix, cost in ROUTE_COSTS:
+        if method == route_method and path.startswith(prefix):
+            return cost
+    return 1
+
+
+def _advance(window_idx: int, current: float, previous: float, now_idx: int):
+    """Roll a (window_idx, current, previous) record forward to now_idx."""
+    if window_idx == now_idx:
+        return current, previous
+    if window_idx == now_idx - 1:
+        return 0.0, current
+    return 0.0, 0.0
+
+
+def _room_fraction(room: float, units: float) -> float:
+    return min(1.0, max(0.0, room / units)) if units > 0 else 1.0
+
+
+def _decide(current: float, previous: float, cost: float, limit: int,
+            window: int, now: float) -> float:
+    """0 if `cost` more units fit, else seconds until they would."""
+    elapsed = (now % window) / window
+    if previous * (1 - elapsed) + current + cost <= limit:
+        return 0.0
+    room = limit - cost
+    if current <= room and previous > 0:
+        # Fits later in this window, once enough of `previous` has slid out
+        wait = (1 - _room_fraction(room - current, previous) - elapsed) * window
+    else:
+        # Only after this window's units start sliding out in the next one
+        wait = (1 - elapsed) * window + (1 - _room_fraction(room, current)) * window
+    return max(wait, 0.001)
+
+
+class MemoryCounters:
+    """Per-process counters: {key: [window_idx, current, previous]}."""
+
+    BLOCKING = False
+
+    def __init__(self):
+        self._counters: dict[str, list] = {}
+        self._next_evict = 0.0
+
+    def hit(self, key: str, cost: float, limit: int, window: int, now: float) -> float:
+        now_idx = int(now // window)
+        if now >= self._next_evict:
+            self.evict(now_idx)
+            self._next_evict = now + EVICT_EVERY
+        entry = self._counters.get(key)
+        current, previous = _advance(*entry, now_idx) if entry else (0.0, 0.0)
+        wait = _decide(current, previous, cost, limit, window, now)
+        if not wait:
+            current += cost
+        self._counters[key] = [now_idx, current, previous]
+        return wait
+
+    def evict(self, now_idx: int) -> None:
+        stale = [k for k, (idx, _, _) in self._counters.items() if idx < now_idx - 1]
+        for k in stale:
+            del self._counters[k]
+
+    def __len__(self):
+        return len(self._counters)
+
+
+class SQLiteCounters:
+    """Counters in a SQLite file shared by every worker on the host."""
+
+    BLOCKING = True
+
+    DDL = """
+        CREATE TABLE IF NOT EXISTS rate_limit_counters (
+            key         TEXT PRIMARY KEY,
+            window_idx  INTEGER NOT NULL,
+            current     REAL NOT NULL,
+            previous    REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, timeout=1.0, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self.DDL)
+        self._next_evict = 0.0
+        # One connection, used from check_async()'s worker threads
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, cost: float, limit: int, window: int, now: float) -> float:
+        with self._lock:
+            return self._hit(key, cost, limit, window, now)
+
+    def _hit(self, key: str, cost: float, limit: int, window: int, now: float) -> float:
+        now_idx = int(now // window)
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if now >= self._next_evict:
+                conn.execute("DELETE FROM rate_limit_counters WHERE window_idx < ?", (now_idx - 1,))
+                self._next_evict = now + EVICT_EVERY
+            row = conn.execute(
+                "SELECT window_idx, current, previous FROM rate_limit_counters WHERE key = ?",
+                (key,)).fetchone()
+            current, previous = _advance(*row, now_idx) if row else (0.0, 0.0)
+            wait = _decide(current, previous, cost, limit, window, now)
+            if not wait:
+                current += cost
+            conn.execute(
+                "INSERT INTO rate_limit_counters (key, window_idx, current, previous)"
+                " VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET window_idx = excluded.window_idx,"
+                " current = excluded.current, previous = excluded.previous",
+                (key, now_idx, current, previous))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
 
-# {client_ip: [timestamp, ...]}
-_requests: dict[str, list[float]] = defaultdict(list)
 
+def _make_counters():
+    if RATE_LIMIT_BACKEND == "sqlite":
+        try:
+            os.makedirs(os.path.dirname(RATE_LIMIT_SQLITE_PATH) or ".", exist_ok=True)
+            return SQLiteCounters(RATE_LIMIT_SQLITE_PATH)
+        except sqlite3.Error:
+            logger.exception("Rate limit store %s unavailable; using per-process counters",
+                             RATE_LIMIT_SQLITE_PATH)
+    return MemoryCounters()
 
-def _client_ip(request: Request) -> str:
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
 
+_counters = _make_counters()
 
-def _cleanup(timestamps: list[float], now: float, window: int) -> list[float]:
-    cutoff = now - window
-    return [t for t in timestamps if t > cutoff]
 
+def check(method: str, path: str, client: str) -> Optional[JSONResponse]:
+    """Charge the request to `client`; a 429 response if it is over the limit."""
+    if RATE_LIMIT_REQUESTS <= 0:
+        return None
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if RATE_LIMIT_REQUESTS <= 0:
-            return await call_next(request)
+    cost = min(request_cost(method, path), RATE_LIMIT_REQUESTS)
+    try:
+        wait = _counters.hit(client, cost, RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW, time.time())
+    except sqlite3.Error:
+        # A locked or broken shared store must not take the API down
+        logger.warning("Rate limit store error; request allowed", exc_info=True)
+        return None
 
-        now = time.time()
-        ip = _client_ip(request)
-        _requests[ip] = _cleanup(_requests[ip], now, RATE_LIMIT_WINDOW)
+    if not wait:
+        return None
+    metrics.RATE_LIMITED.inc()
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Rate limit exceeded"},
+        headers={"Retry-After": str(max(1, math.ceil(wait)))},
+    )
 
-        if len(_requests[ip]) >= RATE_LIMIT_REQUESTS:
-            retry_after = int(RATE_LIMIT_WINDOW - (now - _requests[ip][0])) + 1
-            return JSONResponse(
-                status_code=429,
-                content={"detail": "Rate limit exceeded"},
-                headers={"Retry-After": str(max(1, retry_after))},
-            )
 
-        _requests[ip].append(now)
-        return await call_next(request)
+async def check_async(method: str, path: str, client: str) -> Optional[JSONResponse]:
+    """check() for async callers; a blocking store is queried off the event loop."""
+    if RATE_LIMIT_REQUESTS > 0 and _counters.BLOCKING:
+        return await anyio.to_thread.run_sync(check, method, path, client)
+    return check(method, path, client)
@@ -0,0 +1,262 @@
+"""
+Per-request SQL instrumentation.
+
+Every pooled connection (api/database.py) hands out InstrumentedCursor, which
+times each execute() into the RequestQueryStats of the current request --
+query count, total DB time and the slowest statement. The request middleware
+(api/middleware/pipeline.py) opens the per-request scope and reports the
+numbers as a Server-Timing header and as log fields. Cursors used outside a
+request (scripts, background threads) are not recorded.
+
+Slow-query plan capture: when SLOW_QUERY_EXPLAIN_MS > 0, a
+SLOW_QUERY_SAMPLE_RATE fraction of read-only statements slower than that is
+handed to a background thread, which re-runs it under
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) in a READ ONLY transaction on its
+own connection and stores the plan in api_slow_query_samples
+(/api/admin/slow-queries). Each distinct statement is captured at most once
+per SAMPLE_COOLDOWN_SECONDS; the sampler remembers at most
+MAX_TRACKED_FINGERPRINTS statements for that, dropping expired ones first.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from .config import DB_CONFIG, SLOW_QUERY_EXPLAIN_MS, SLOW_QUERY_SAMPLE_RATE
+
+logger = logging.getLogger("labor_api")
+
+SAMPLES_TABLE = "api_slow_query_samples"
+SAMPLES_DDL = """
+    CREATE TABLE IF NOT EXISTS api_slow_query_samples (
+        id BIGSERIAL PRIMARY KEY,
+        captured_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        path TEXT,
+        fingerprint TEXT NOT NULL,
+        statement TEXT NOT NULL,
+        duration_ms REAL NOT NULL,
+        explain_ms REAL,
+        plan JSONB,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_api_slow_query_samples_captured
+        ON api_slow_query_samples (captured_at DESC);
+"""
+SAMPLE_COOLDOWN_SECONDS = 600
+EXPLAIN_TIMEOUT_MS = 30000
+QUEUE_SIZE = 20
+MAX_TRACKED_FINGERPRINTS = 10000
+STATEMENT_PREVIEW_CHARS = 200
+
+_READ_ONLY_RE = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+_WRITE_RE = re.compile(r"\b(insert|update|delete|merge|truncate|nextval|setval)\b", re.IGNORECASE)
+
+
+class RequestQueryStats:
+    """SQL counters for one request."""
+
+    __slots__ = ("path", "count", "total_ms", "slowest_ms", "slowest_sql")
+
+    def __init__(self, path=""):
+        self.path = path
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+
+    def record(self, sql, ms):
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.slowest_ms:
+            self.slowest_ms = ms
+            self.slowest_sql = sql
+
+    def server_timing(self, total_ms=None):
+        """Server-Timing header value (app = whole request, db = all SQL)."""
+        parts = []
+        if total_ms is not None:
+            parts.append(f"app;dur={total_ms:.1f}")
+        parts.append(f'db;dur={self.total_ms:.1f};desc="{self.count} queries"')
+        if self.count:
+            parts.append(f"db-slowest;dur={self.slowest_ms:.1f}")
+        return ", ".join(parts)
+
+    def log_fields(self):
+        fields = {
+            "db_queries": self.count,
+            "db_ms": round(self.total_ms, 1),
+            "db_slowest_ms": round(self.slowest_ms, 1),
+        }
+        if self.slowest_sql:
+            fields["db_slowest_sql"] = statement_preview(self.slowest_sql)
+        return fields
+
+
+_current = contextvars.ContextVar("request_query_stats", default=None)
+
+
+def start_request(path=""):
+    """Begin recording for the current request; returns (stats, token)."""
+    stats = RequestQueryStats(path)
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_stats():
+    return _current.get()
+
+
+def statement_preview(sql):
+    return " ".join(sql.split())[:STATEMENT_PREVIEW_CHARS]
+
+
+def fingerprint(sql):
+    return hashlib.sha1(" ".join(sql.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def _query_text(cursor, query):
+    if isinstance(query, str):
+        return query
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    return query.as_string(cursor)  # psycopg2.sql.Composable
+
+
+class InstrumentedCursor(RealDictCursor):
+    """RealDictCursor that times execute()/executemany() into the request stats."""
+
+    def execute(self, query, vars=None):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._record(query, vars, (time.perf_counter() - t0) * 1000)
+
+    def executemany(self, query, vars_list):
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._record(query, None, (time.perf_counter() - t0) * 1000)
+
+    def _record(self, query, vars, ms):
+        stats = _current.get()
+        if stats is None:
+            return
+        sql = _query_text(self, query)
+        stats.record(sql, ms)
+        if SLOW_QUERY_EXPLAIN_MS > 0 and ms >= SLOW_QUERY_EXPLAIN_MS:
+            sampler.offer(self, sql, vars, ms, stats.path)
+
+
+# ---------------------------------------------------------------------------
+# Slow-query plan capture
+# ---------------------------------------------------------------------------
+
+class ExplainSampler:
+    """Queues slow read-only statements and EXPLAINs them on a worker thread."""
+
+    def __init__(self, sample_rate=SLOW_QUERY_SAMPLE_RATE, cooldown=SAMPLE_COOLDOWN_SECONDS,
+                 connect=None):
+        self.sample_rate = sample_rate
+        self.cooldown = cooldown
+        self._connect = connect or (lambda: psycopg2.connect(**DB_CONFIG))
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._last_sampled = {}    # fingerprint -> monotonic time, oldest first
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def offer(self, cursor, sql, vars, ms, path):
+        """Queue ``sql`` for capture if it is eligible; never raises."""
+        if not _READ_ONLY_RE.match(sql) or _WRITE_RE.search(sql):
+            return False
+        if random.random() >= self.sample_rate:
+            return False
+        fp = fingerprint(sql)
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_sampled.get(fp)
+            if last is not None and now - last < self.cooldown:
+                return False
+            self._last_sampled.pop(fp, None)
+            self._last_sampled[fp] = now
+            self._prune(now)
+        try:
+            statement = cursor.mogrify(sql, vars).decode("utf-8", "replace") if vars else sql
+            self._queue.put_nowait({"path": path, "fingerprint": fp, "statement": statement,
+                                    "duration_ms": round(ms, 1)})
+        except queue.Full:
+            return False
+        except Exception as e:
+            logger.warning("slow-query sample skipped: %s" % e)
+            return False
+        self._ensure_worker()
+        return True
+
+    def _prune(self, now):
+        """Forget fingerprints past their cooldown, then the oldest over the cap."""
+        entries = self._last_sampled
+        while entries:
+            fp, last = next(iter(entries.items()))
+            if now - last < self.cooldown and len(entries) <= MAX_TRACKED_FINGERPRINTS:
+                break
+            del entries[fp]
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="explain-sampler",
+                                                daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self.capture(job)
+            except Exception as e:
+                logger.warning("slow-query capture failed: %s" % e)
+
+    def capture(self, job):
+        """EXPLAIN ANALYZE one queued statement and store the plan."""
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            plan = error = explain_ms = None
+            try:
+                cur.execute("SET TRANSACTION READ ONLY")
+                cur.execute(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                t0 = time.perf_counter()
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + job["statement"])
+                explain_ms = round((time.perf_counter() - t0) * 1000, 1)
+                plan = cur.fetchone()[0]
+            except Exception as e:
+                error = str(e)[:500]
+            conn.rollback()
+            cur.execute(SAMPLES_DDL)
+            cur.execute(
+                """
+                INSERT INTO api_slow_query_samples
+                    (path, fingerprint, statement, duration_ms, explain_ms, plan, error)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                [job["path"], job["fingerprint"], job["statement"], job["duration_ms"],
+                 explain_ms, json.dumps(plan) if plan is not None else None, error],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+sampler = ExplainSampler()
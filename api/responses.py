@@ -0,0 +1,27 @@
+"""
+Default JSON response class for the API.
+
+FastAPI first turns an endpoint's return value into plain JSON types
+(jsonable_encoder). The final dumps then goes through orjson when it is
+installed. orjson is several times faster than json.dumps on 5k-row
+payloads, and it writes NaN as null where json.dumps would raise.
+If orjson is missing or rejects a value, the stdlib encoder is used.
+"""
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        if HAS_ORJSON:
+            try:
+                return orjson.dumps(
+                    content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+            except TypeError:
+                pass
+        return super().render(content)
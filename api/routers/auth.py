@@ -145,7 +145,7 @@ def _create_token(username: str, role: str) -> tuple[str, int]:
 
 
 def _get_current_user(request: Request) -> Optional[dict]:
-    """Extract user info from request (set by AuthMiddleware)."""
+    """Extract user info from request (set by the request pipeline middleware)."""
     user = getattr(request.state, "user", None)
     role = getattr(request.state, "role", None)
     if user and user != "anonymous":
@@ -11,6 +11,7 @@ from pydantic import BaseModel, Field
 
 from ..database import get_db
 from ..helpers import safe_order_dir, safe_sort_col
+from ..services.query_embedding_cache import get_query_embedding
 
 router = APIRouter()
 
@@ -90,6 +91,43 @@ def _check_extracted_values() -> bool:
     return _has_extracted_values
 
 
+_has_fts_cols: bool | None = None
+
+
+def _check_fts_cols() -> bool:
+    """Check if the stored tsvector columns (sql/schema/cba_fts_migration.sql) exist."""
+    global _has_fts_cols
+    if _has_fts_cols is not None:
+        return _has_fts_cols
+    try:
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT COUNT(*) AS cnt FROM pg_attribute "
+                    "WHERE ((attrelid = 'cba_provisions'::regclass AND attname = 'provision_tsv') "
+                    "    OR (attrelid = 'cba_sections'::regclass AND attname = 'section_tsv')) "
+                    "AND NOT attisdropped"
+                )
+                _has_fts_cols = int(cur.fetchone()["cnt"]) == 2
+    except Exception:
+        _has_fts_cols = False
+    return _has_fts_cols
+
+
+def _provision_tsv() -> str:
+    """tsvector of p.provision_text: the stored column, else computed per row."""
+    if _check_fts_cols():
+        return "p.provision_tsv"
+    return "to_tsvector('english', p.provision_text)"
+
+
+def _section_tsv() -> str:
+    """tsvector of s.section_text: the stored column, else computed per row."""
+    if _check_fts_cols():
+        return "s.section_tsv"
+    return "to_tsvector('english', COALESCE(s.section_text, ''))"
+
+
 def _base_query_filters(
     *,
     q: str | None,
@@ -106,7 +144,7 @@ def _base_query_filters(
     params: list[Any] = []
 
     if q:
-        conditions.append("to_tsvector('english', v.provision_text) @@ plainto_tsquery('english', %s)")
+        conditions.append(f"{_provision_tsv()} @@ plainto_tsquery('english', %s)")
         params.append(q)
     if provision_class:
         conditions.append("v.provision_class = %s")
@@ -184,7 +222,7 @@ def search_cba_provisions(
     # Build ORDER BY clause -- relevance uses ts_rank and needs an extra param
     order_params: list[Any] = []
     if effective_sort == "relevance" and q:
-        order_clause = "ts_rank(to_tsvector('english', v.provision_text), plainto_tsquery('english', %s)) DESC"
+        order_clause = f"ts_rank({_provision_tsv()}, plainto_tsquery('english', %s)) DESC"
         order_params.append(q)
     else:
         sort_col = safe_sort_col(effective_sort, sort_map, "page_start")
@@ -740,7 +778,11 @@ def search_cba_sections(
     params: list[Any] = []
 
     if q:
-        conditions.append("(to_tsvector('english', COALESCE(s.section_title, '') || ' ' || COALESCE(s.section_text, '')) @@ plainto_tsquery('english', %s))")
+        # Title tsvector is computed (titles are short); the body's is stored
+        conditions.append(
+            f"((to_tsvector('english', COALESCE(s.section_title, '')) || {_section_tsv()})"
+            " @@ plainto_tsquery('english', %s))"
+        )
         params.append(q)
     if category:
         conditions.append("s.attributes->'categories_detected' ? %s")
@@ -823,9 +865,7 @@ def search_cba_articles(
     params: list[Any] = []
 
     if q:
-        conditions.append(
-            "to_tsvector('english', COALESCE(s.section_text, '')) @@ plainto_tsquery('english', %s)"
-        )
+        conditions.append(f"{_section_tsv()} @@ plainto_tsquery('english', %s)")
         params.append(q)
     if category:
         conditions.append("s.attributes->>'category' = %s")
@@ -851,7 +891,7 @@ def search_cba_articles(
         effective_sort = "relevance"
 
     if effective_sort == "relevance" and q:
-        order_clause = "ts_rank(to_tsvector('english', COALESCE(s.section_text, '')), plainto_tsquery('english', %s)) DESC"
+        order_clause = f"ts_rank({_section_tsv()}, plainto_tsquery('english', %s)) DESC"
         order_params.append(q)
     elif effective_sort == "category":
         order_clause = "s.attributes->>'category', d.employer_name_raw, s.sort_order"
@@ -917,6 +957,7 @@ def search_cba_articles(
 _gemini_client = None
 _GEMINI_EMBED_MODEL = "gemini-embedding-001"
 _GEMINI_EMBED_DIMS = 3072
+_QUERY_TASK_TYPE = "RETRIEVAL_QUERY"
 
 
 def _get_gemini_embed_client():
@@ -954,7 +995,7 @@ def _get_gemini_embed_client():
     return _gemini_client
 
 
-def _embed_query(query: str) -> list[float]:
+def _call_embed_api(query: str) -> list[float]:
     """Embed a user query via Gemini (RETRIEVAL_QUERY task type)."""
     from google.genai import types as genai_types
     client = _get_gemini_embed_client()
@@ -962,7 +1003,7 @@ def _embed_query(query: str) -> list[float]:
         result = client.models.embed_content(
             model=_GEMINI_EMBED_MODEL,
             contents=[query],
-            config=genai_types.EmbedContentConfig(task_type="RETRIEVAL_QUERY"),
+            config=genai_types.EmbedContentConfig(task_type=_QUERY_TASK_TYPE),
         )
     except Exception as exc:
         raise HTTPException(
@@ -972,11 +1013,404 @@ def _embed_query(query: str) -> list[float]:
     return list(result.embeddings[0].values)
 
 
+def _embed_query(query: str) -> tuple[list[float], str]:
+    """Query embedding from the query cache, calling Gemini only on a miss.
+
+    Returns (embedding, source); source is 'memory', 'table' or 'api'.
+    """
+    return get_query_embedding(query, _GEMINI_EMBED_MODEL, _QUERY_TASK_TYPE, _call_embed_api)
+
+
 def _to_halfvec_literal(values: list[float]) -> str:
     """Format a Python list as a pgvector halfvec literal string."""
     return "[" + ",".join(f"{v:.6f}" for v in values) + "]"
 
 
+# ---------------------------------------------------------------------------
+# Filtered ANN over cba_embeddings
+#
+# ORDER BY distance LIMIT k on the per-type partial HNSW index only returns
+# the ef_search nearest rows; filters applied after that can leave fewer
+# than k (or zero) results, and a distance predicate in the WHERE clause
+# pushes the planner to an exact scan of every embedding. Three strategies:
+#
+#   exact      cba_id given: that contract's rows via the denormalized
+#              e.cba_id btree, distance computed for each (a few hundred)
+#   index      index-ordered scan with filters inline; on pgvector >= 0.8
+#              hnsw.iterative_scan keeps the scan going until k rows pass
+#   overfetch  older pgvector with filters: take the ANN_OVERFETCH * k
+#              nearest neighbours, then join and filter
+#
+# The max-distance cut is applied after the per-type LIMIT, which returns
+# the same rows as filtering first (neighbours come out in distance order).
+# sql/schema/cba_embeddings_filter_migration.sql adds the partial indexes
+# and the denormalized e.cba_id / e.category columns; until then filters go
+# through the joined tables.
+# ---------------------------------------------------------------------------
+
+ANN_OVERFETCH = 10
+HNSW_MAX_EF_SEARCH = 1000
+
+_ANN_SOURCES = {
+    "article": {
+        "id": "section_id",
+        "joins": "JOIN cba_sections  s ON s.section_id = e.section_id "
+                 "JOIN cba_documents d ON d.cba_id = s.cba_id",
+        "where": ["s.detection_method = 'article_heading'"],
+        "category": "s.attributes->>'category'",
+    },
+    "provision": {
+        "id": "provision_id",
+        "joins": "JOIN cba_provisions p ON p.provision_id = e.provision_id "
+                 "JOIN cba_documents  d ON d.cba_id = p.cba_id",
+        "where": [],
+        "category": "p.category",
+    },
+}
+
+_DETAIL_COLUMNS = {
+    "article": """
+                'article'::text AS object_type,
+                e.section_id    AS object_id,
+                s.section_title AS title,
+                s.section_text  AS text,
+                s.cba_id,
+                s.attributes->>'category' AS category,
+                s.page_start,
+                s.page_end,
+                d.employer_name_raw AS employer_name,
+                d.union_name_raw    AS union_name,
+                d.effective_date,
+                d.expiration_date""",
+    "provision": """
+                'provision'::text AS object_type,
+                e.provision_id    AS object_id,
+                (COALESCE(NULLIF(p.article_reference, ''), '')
+                 || CASE WHEN p.provision_class IS NOT NULL AND p.provision_class <> ''
+                         THEN ' / ' || p.provision_class ELSE '' END) AS title,
+                p.provision_text AS text,
+                p.cba_id,
+                p.category,
+                p.page_start,
+                p.page_end,
+                d.employer_name_raw AS employer_name,
+                d.union_name_raw    AS union_name,
+                d.effective_date,
+                d.expiration_date""",
+}
+
+_has_embedding_filter_cols: bool | None = None
+_pgvector_version: tuple[int, ...] | None = None
+
+
+def _check_embedding_filter_cols() -> bool:
+    """Check if cba_embeddings has the denormalized cba_id / category columns."""
+    global _has_embedding_filter_cols
+    if _has_embedding_filter_cols is not None:
+        return _has_embedding_filter_cols
+    try:
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT COUNT(*) AS cnt FROM pg_attribute "
+                    "WHERE attrelid = 'cba_embeddings'::regclass "
+                    "AND attname IN ('cba_id', 'category') AND NOT attisdropped"
+                )
+                _has_embedding_filter_cols = int(cur.fetchone()["cnt"]) == 2
+    except Exception:
+        _has_embedding_filter_cols = False
+    return _has_embedding_filter_cols
+
+
+def _check_pgvector_version() -> tuple[int, ...]:
+    """Installed pgvector version as a tuple, (0,) if unknown."""
+    global _pgvector_version
+    if _pgvector_version is not None:
+        return _pgvector_version
+    try:
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+                row = cur.fetchone()
+        _pgvector_version = tuple(int(x) for x in row["extversion"].split(".")) if row else (0,)
+    except Exception:
+        _pgvector_version = (0,)
+    return _pgvector_version
+
+
+def _iterative_scan_supported() -> bool:
+    return _check_pgvector_version() >= (0, 8, 0)
+
+
+def _search_filters(
+    doc_filters: list[str],
+    doc_params: list[Any],
+    cba_id: int | None,
+    category_sets: list[list[str]],
+    cba_col: str,
+    category_col: str,
+) -> tuple[list[str], list[Any]]:
+    """Document, contract and category filters rendered for one source."""
+    filters = list(doc_filters)
+    params = list(doc_params)
+    if cba_id is not None:
+        filters.append(f"{cba_col} = %s")
+        params.append(cba_id)
+    for cats in category_sets:
+        if len(cats) == 1:
+            filters.append(f"{category_col} = %s")
+        else:
+            filters.append(f"{category_col} IN ({','.join(['%s'] * len(cats))})")
+        params.extend(cats)
+    return filters, params
+
+
+def _ann_strategy(doc_filters: list[str], cba_id: int | None,
+                  category_sets: list[list[str]]) -> str:
+    """exact, index or overfetch (see the section comment above)."""
+    if cba_id is not None and _check_embedding_filter_cols():
+        return "exact"
+    if not (doc_filters or category_sets or cba_id is not None) or _iterative_scan_supported():
+        return "index"
+    return "overfetch"
+
+
+def _ann_session_sql(strategy: str, k: int) -> list[str]:
+    """SET LOCAL statements for the chosen strategy and candidate count."""
+    ef_search = max(100, k)
+    if strategy == "overfetch":
+        ef_search = max(ef_search, k * ANN_OVERFETCH)
+    stmts = [f"SET LOCAL hnsw.ef_search = {min(int(ef_search), HNSW_MAX_EF_SEARCH)}"]
+    if strategy == "index" and _iterative_scan_supported():
+        stmts.append("SET LOCAL hnsw.iterative_scan = relaxed_order")
+    return stmts
+
+
+def _ann_subquery(
+    object_type: str,
+    columns: str,
+    vec_literal: str,
+    k: int,
+    strategy: str,
+    doc_filters: list[str],
+    doc_params: list[Any],
+    cba_id: int | None,
+    category_sets: list[list[str]],
+) -> tuple[str, list[Any]]:
+    """k nearest embeddings of one object type that pass the filters.
+
+    Selects `columns` (over e and the joined source/document tables) plus
+    a real `distance`, ordered nearest first.
+    """
+    src = _ANN_SOURCES[object_type]
+    denorm = _check_embedding_filter_cols()
+    cba_col, category_col = ("e.cba_id", "e.category") if denorm else ("d.cba_id", src["category"])
+    filters, filter_params = _search_filters(
+        doc_filters, doc_params, cba_id, category_sets, cba_col, category_col)
+    where = src["where"] + filters
+    distance = "(e.embedding_halfvec <=> %s::halfvec)"
+
+    if strategy == "index":
+        conditions = [f"e.object_type = '{object_type}'", "e.embedding_halfvec IS NOT NULL", *where]
+        sql = f"""
+            SELECT {columns},
+                {distance}::real AS distance
+            FROM cba_embeddings e
+            {src["joins"]}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY e.embedding_halfvec <=> %s::halfvec
+            LIMIT %s
+        """
+        return sql, [vec_literal, *filter_params, vec_literal, k]
+
+    inner_cols = f"e.{src['id']}" + (", e.cba_id, e.category" if denorm else "")
+    if strategy == "exact":
+        # OFFSET 0 keeps the planner from turning this back into an index scan
+        inner = f"""
+                SELECT {inner_cols}, {distance}::real AS distance
+                FROM cba_embeddings e
+                WHERE e.object_type = '{object_type}' AND e.cba_id = %s
+                  AND e.embedding_halfvec IS NOT NULL
+                OFFSET 0"""
+        inner_params: list[Any] = [vec_literal, cba_id]
+    else:
+        n = min(k * ANN_OVERFETCH, HNSW_MAX_EF_SEARCH)
+        inner = f"""
+                SELECT {inner_cols}, {distance}::real AS distance
+                FROM cba_embeddings e
+                WHERE e.object_type = '{object_type}' AND e.embedding_halfvec IS NOT NULL
+                ORDER BY e.embedding_halfvec <=> %s::halfvec
+                LIMIT %s"""
+        inner_params = [vec_literal, vec_literal, n]
+    sql = f"""
+            SELECT {columns},
+                e.distance
+            FROM ({inner}
+            ) e
+            {src["joins"]}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY e.distance
+            LIMIT %s
+        """
+    return sql, inner_params + filter_params + [k]
+
+
+def _vector_search_sql(
+    requested_types: set[str],
+    vec_literal: str,
+    max_distance: float,
+    top_k: int,
+    strategy: str,
+    **filters: Any,
+) -> tuple[str, list[Any]]:
+    """Nearest-neighbour subqueries per object type, merged by distance."""
+    subqueries: list[str] = []
+    params: list[Any] = []
+    for object_type in ("article", "provision"):
+        if object_type in requested_types:
+            sql, sub_params = _ann_subquery(
+                object_type, _DETAIL_COLUMNS[object_type], vec_literal, top_k, strategy, **filters)
+            subqueries.append(sql)
+            params.extend(sub_params)
+
+    full_query = f"""
+        SELECT * FROM ({" UNION ALL ".join(f"({sq})" for sq in subqueries)}) r
+        WHERE r.distance <= %s
+        ORDER BY r.distance ASC
+        LIMIT %s
+    """
+    return full_query, params + [max_distance, top_k]
+
+
+RRF_K = 60                 # reciprocal-rank fusion constant (Cormack et al.)
+HYBRID_CANDIDATES = 4      # candidates per signal = top_k * this (min 50)
+
+
+def _hybrid_candidates(top_k: int) -> int:
+    return max(top_k * HYBRID_CANDIDATES, 50)
+
+
+def _hybrid_search_sql(
+    requested_types: set[str],
+    vec_literal: str,
+    q: str,
+    max_distance: float,
+    top_k: int,
+    strategy: str,
+    **filters: Any,
+) -> tuple[str, list[Any]]:
+    """Vector and lexical candidates fused by reciprocal rank, in one query.
+
+    Each signal contributes its best candidates across the requested types:
+    nearest neighbours by cosine distance (min_similarity applies here) and
+    full-text matches by ts_rank with length normalization (BM25-like
+    damping of long sections). An object scores sum(1 / (RRF_K + rank)) over
+    the signals that found it.
+    """
+    n_cand = _hybrid_candidates(top_k)
+    vector_parts: list[str] = []
+    lexical_parts: list[str] = []
+    vector_params: list[Any] = []
+    lexical_params: list[Any] = []
+    lexical_sources = {
+        "article": ("s.section_id", _section_tsv(),
+                    "FROM cba_sections s JOIN cba_documents d ON d.cba_id = s.cba_id",
+                    ["s.detection_method = 'article_heading'"]),
+        "provision": ("p.provision_id", _provision_tsv(),
+                      "FROM cba_provisions p JOIN cba_documents d ON d.cba_id = p.cba_id", []),
+    }
+
+    for object_type in ("article", "provision"):
+        if object_type not in requested_types:
+            continue
+        columns = f"'{object_type}'::text AS object_type, e.{_ANN_SOURCES[object_type]['id']} AS object_id"
+        sql, sub_params = _ann_subquery(object_type, columns, vec_literal, n_cand, strategy, **filters)
+        vector_parts.append(sql)
+        vector_params.extend(sub_params)
+
+        id_col, tsv, from_sql, base_where = lexical_sources[object_type]
+        lex_filters, lex_params = _search_filters(
+            filters["doc_filters"], filters["doc_params"], filters["cba_id"],
+            filters["category_sets"], "d.cba_id", _ANN_SOURCES[object_type]["category"])
+        lexical_parts.append(f"""
+            SELECT '{object_type}'::text AS object_type, {id_col} AS object_id,
+                   ts_rank({tsv}, tsq.query, 1) AS score
+            {from_sql}
+            CROSS JOIN tsq
+            WHERE {" AND ".join([*base_where, f"{tsv} @@ tsq.query", *lex_filters])}
+            ORDER BY score DESC, {id_col}
+            LIMIT %s
+        """)
+        lexical_params.extend([*lex_params, n_cand])
+
+    vector_union = " UNION ALL ".join(f"({sq})" for sq in vector_parts)
+    lexical_union = " UNION ALL ".join(f"({sq})" for sq in lexical_parts)
+    params = [q, *vector_params, max_distance, *lexical_params,
+              RRF_K, top_k, vec_literal, vec_literal]
+
+    sql = f"""
+        WITH tsq AS (SELECT plainto_tsquery('english', %s) AS query),
+        vec AS (
+            SELECT object_type, object_id, distance AS score
+            FROM ({vector_union}) v
+            WHERE v.distance <= %s
+        ),
+        lex AS ({lexical_union}),
+        ranked AS (
+            SELECT object_type, object_id, 'vector' AS signal,
+                   row_number() OVER (ORDER BY score ASC, object_type, object_id) AS rnk
+            FROM vec
+            UNION ALL
+            SELECT object_type, object_id, 'lexical' AS signal,
+                   row_number() OVER (ORDER BY score DESC, object_type, object_id) AS rnk
+            FROM lex
+        ),
+        fused AS (
+            SELECT object_type, object_id,
+                   SUM(1.0 / (%s + rnk)) AS rrf_score,
+                   MIN(rnk) FILTER (WHERE signal = 'vector')  AS vector_rank,
+                   MIN(rnk) FILTER (WHERE signal = 'lexical') AS lexical_rank
+            FROM ranked
+            GROUP BY object_type, object_id
+            ORDER BY rrf_score DESC, object_type, object_id
+            LIMIT %s
+        )
+        SELECT
+            f.object_type,
+            f.object_id,
+            CASE WHEN f.object_type = 'article' THEN s.section_title
+                 ELSE (COALESCE(NULLIF(p.article_reference, ''), '')
+                       || CASE WHEN p.provision_class IS NOT NULL AND p.provision_class <> ''
+                               THEN ' / ' || p.provision_class ELSE '' END)
+            END AS title,
+            COALESCE(s.section_text, p.provision_text) AS text,
+            d.cba_id,
+            COALESCE(s.attributes->>'category', p.category) AS category,
+            COALESCE(s.page_start, p.page_start) AS page_start,
+            COALESCE(s.page_end, p.page_end) AS page_end,
+            d.employer_name_raw AS employer_name,
+            d.union_name_raw    AS union_name,
+            d.effective_date,
+            d.expiration_date,
+            (CASE WHEN f.object_type = 'article' THEN
+                 (SELECT MIN(e.embedding_halfvec <=> %s::halfvec) FROM cba_embeddings e
+                  WHERE e.object_type = 'article' AND e.section_id = f.object_id)
+             ELSE
+                 (SELECT MIN(e.embedding_halfvec <=> %s::halfvec) FROM cba_embeddings e
+                  WHERE e.object_type = 'provision' AND e.provision_id = f.object_id)
+             END)::real AS distance,
+            f.rrf_score::real AS rrf_score,
+            f.vector_rank,
+            f.lexical_rank
+        FROM fused f
+        LEFT JOIN cba_sections   s ON f.object_type = 'article'   AND s.section_id   = f.object_id
+        LEFT JOIN cba_provisions p ON f.object_type = 'provision' AND p.provision_id = f.object_id
+        JOIN cba_documents d ON d.cba_id = COALESCE(s.cba_id, p.cba_id)
+        ORDER BY f.rrf_score DESC, f.object_type, f.object_id
+    """
+    return sql, params
+
+
 @router.get("/api/cba/semantic-search")
 def semantic_search_cba(
     q: str = Query(..., min_length=2, description="Natural-language query"),
@@ -996,11 +1430,22 @@ def semantic_search_cba(
     category: str | None = None,
     category_group: str | None = None,
     cba_id: int | None = None,
+    mode: str = Query(
+        default="vector",
+        pattern="^(vector|hybrid)$",
+        description="vector: cosine similarity only; hybrid: fuse with full-text rank (RRF)",
+    ),
 ):
     """Semantic search across CBA articles and provisions via pgvector.
 
     Returns top-K matches ordered by cosine similarity (1 - distance).
     Similarity = 1.0 is identical, 0.0 is orthogonal, negative is opposed.
+
+    mode=hybrid also runs the query as full text and orders by reciprocal-rank
+    fusion of the two rankings, so exact terms ("FMLA", "Juneteenth") the
+    embedding underweights still surface. Results then carry rrf_score,
+    vector_rank and lexical_rank; similarity is null for matches that have
+    no embedding.
     """
     requested_types = {t.strip() for t in types.split(",") if t.strip()}
     if not requested_types or not requested_types.issubset({"article", "provision"}):
@@ -1009,11 +1454,11 @@ def semantic_search_cba(
             detail="types must be a comma list containing 'article' and/or 'provision'",
         )
 
-    # 1) Embed the query string
+    # 1) Embed the query string (cache hits make no network call: embed_ms=0)
     import time as _time
     t0 = _time.time()
-    query_vec = _embed_query(q)
-    embed_ms = int((t0 and (_time.time() - t0) * 1000) or 0)
+    query_vec, embed_source = _embed_query(q)
+    embed_ms = int((_time.time() - t0) * 1000) if embed_source == "api" else 0
     if len(query_vec) != _GEMINI_EMBED_DIMS:
         raise HTTPException(
             status_code=500,
@@ -1024,140 +1469,45 @@ def semantic_search_cba(
     # 2) Build filter clauses (applied per-subquery)
     max_distance = 1.0 - min_similarity  # cosine distance upper bound
 
-    # Shared filter for BOTH sides of the UNION (joined via cba_documents)
-    shared_filters: list[str] = []
-    shared_params: list[Any] = []
+    # Document filters (joined via cba_documents); contract and category
+    # filters are rendered per source, on the denormalized embedding columns
+    # when they exist
+    doc_filters: list[str] = []
+    doc_params: list[Any] = []
     if employer_name:
-        shared_filters.append("d.employer_name_raw ILIKE %s")
-        shared_params.append(f"%{employer_name}%")
+        doc_filters.append("d.employer_name_raw ILIKE %s")
+        doc_params.append(f"%{employer_name}%")
     if union_name:
-        shared_filters.append("d.union_name_raw ILIKE %s")
-        shared_params.append(f"%{union_name}%")
-    if cba_id is not None:
-        shared_filters.append("d.cba_id = %s")
-        shared_params.append(cba_id)
-
-    # Category filter — articles use attributes->>'category', provisions use p.category
-    article_cat_filters: list[str] = []
-    article_cat_params: list[Any] = []
-    provision_cat_filters: list[str] = []
-    provision_cat_params: list[Any] = []
+        doc_filters.append("d.union_name_raw ILIKE %s")
+        doc_params.append(f"%{union_name}%")
 
+    category_sets: list[list[str]] = []
     if category:
-        article_cat_filters.append("s.attributes->>'category' = %s")
-        article_cat_params.append(category)
-        provision_cat_filters.append("p.category = %s")
-        provision_cat_params.append(category)
+        category_sets.append([category])
     if category_group and category_group in CATEGORY_GROUPS:
-        cats = CATEGORY_GROUPS[category_group]
-        a_placeholders = ",".join(["%s"] * len(cats))
-        p_placeholders = ",".join(["%s"] * len(cats))
-        article_cat_filters.append(f"s.attributes->>'category' IN ({a_placeholders})")
-        article_cat_params.extend(cats)
-        provision_cat_filters.append(f"p.category IN ({p_placeholders})")
-        provision_cat_params.extend(cats)
-
-    # 3) Build per-type subqueries only for requested types
-    subqueries: list[str] = []
-    subquery_params: list[Any] = []
-
-    if "article" in requested_types:
-        article_filters = [
-            "e.object_type = 'article'",
-            "e.embedding_halfvec IS NOT NULL",
-            "s.detection_method = 'article_heading'",
-            "(e.embedding_halfvec <=> %s::halfvec) <= %s",
-            *shared_filters,
-            *article_cat_filters,
-        ]
-        article_where = " AND ".join(article_filters)
-        subqueries.append(f"""
-            SELECT
-                'article'::text AS object_type,
-                e.section_id    AS object_id,
-                s.section_title AS title,
-                s.section_text  AS text,
-                s.cba_id,
-                s.attributes->>'category' AS category,
-                s.page_start,
-                s.page_end,
-                d.employer_name_raw AS employer_name,
-                d.union_name_raw    AS union_name,
-                d.effective_date,
-                d.expiration_date,
-                (e.embedding_halfvec <=> %s::halfvec)::real AS distance
-            FROM cba_embeddings e
-            JOIN cba_sections  s ON s.section_id = e.section_id
-            JOIN cba_documents d ON d.cba_id = s.cba_id
-            WHERE {article_where}
-            ORDER BY e.embedding_halfvec <=> %s::halfvec
-            LIMIT %s
-        """)
-        # Params: SELECT distance, WHERE distance filter (vec + max_distance),
-        #         shared, article_cat, ORDER BY distance, LIMIT
-        subquery_params.extend([
-            vec_literal,            # SELECT distance
-            vec_literal,            # WHERE distance <= max
-            max_distance,
-            *shared_params,
-            *article_cat_params,
-            vec_literal,            # ORDER BY distance
-            top_k,
-        ])
-
-    if "provision" in requested_types:
-        provision_filters = [
-            "e.object_type = 'provision'",
-            "e.embedding_halfvec IS NOT NULL",
-            "(e.embedding_halfvec <=> %s::halfvec) <= %s",
-            *shared_filters,
-            *provision_cat_filters,
-        ]
-        provision_where = " AND ".join(provision_filters)
-        subqueries.append(f"""
-            SELECT
-                'provision'::text AS object_type,
-                e.provision_id    AS object_id,
-                (COALESCE(NULLIF(p.article_reference, ''), '')
-                 || CASE WHEN p.provision_class IS NOT NULL AND p.provision_class <> ''
-                         THEN ' / ' || p.provision_class ELSE '' END) AS title,
-                p.provision_text AS text,
-                p.cba_id,
-                p.category,
-                p.page_start,
-                p.page_end,
-                d.employer_name_raw AS employer_name,
-                d.union_name_raw    AS union_name,
-                d.effective_date,
-                d.expiration_date,
-                (e.embedding_halfvec <=> %s::halfvec)::real AS distance
-            FROM cba_embeddings e
-            JOIN cba_provisions p ON p.provision_id = e.provision_id
-            JOIN cba_documents  d ON d.cba_id = p.cba_id
-            WHERE {provision_where}
-            ORDER BY e.embedding_halfvec <=> %s::halfvec
-            LIMIT %s
-        """)
-        subquery_params.extend([
-            vec_literal,
-            vec_literal,
-            max_distance,
-            *shared_params,
-            *provision_cat_params,
-            vec_literal,
-            top_k,
-        ])
-
-    full_query = " UNION ALL ".join(f"({sq})" for sq in subqueries)
-    full_query += "\nORDER BY distance ASC\nLIMIT %s"
-    subquery_params.append(top_k)
+        category_sets.append(CATEGORY_GROUPS[category_group])
+
+    # 3) Build the query: nearest neighbours per requested type, or (hybrid)
+    #    vector and lexical candidates fused by reciprocal rank
+    filters = dict(doc_filters=doc_filters, doc_params=doc_params,
+                   cba_id=cba_id, category_sets=category_sets)
+    strategy = _ann_strategy(doc_filters, cba_id, category_sets)
+    if mode == "hybrid":
+        full_query, subquery_params = _hybrid_search_sql(
+            requested_types, vec_literal, q, max_distance, top_k, strategy, **filters)
+        session_sql = _ann_session_sql(strategy, _hybrid_candidates(top_k))
+    else:
+        full_query, subquery_params = _vector_search_sql(
+            requested_types, vec_literal, max_distance, top_k, strategy, **filters)
+        session_sql = _ann_session_sql(strategy, top_k)
 
     # 4) Execute
     t1 = _time.time()
     with get_db() as conn:
         with conn.cursor() as cur:
-            # Increase HNSW ef_search for better recall on this session
-            cur.execute("SET LOCAL hnsw.ef_search = 100")
+            # HNSW recall settings for this transaction only
+            for stmt in session_sql:
+                cur.execute(stmt)
             cur.execute(full_query, subquery_params)
             rows = cur.fetchall()
     search_ms = int((_time.time() - t1) * 1000)
@@ -1167,10 +1517,14 @@ def semantic_search_cba(
     results = []
     for row in rows:
         text = row.get("text") or ""
-        distance = float(row.get("distance") or 0.0)
-        similarity = max(0.0, min(1.0, 1.0 - distance))
+        distance = row.get("distance")
+        if distance is None and mode == "hybrid":
+            similarity = None
+        else:
+            distance = float(distance or 0.0)
+            similarity = max(0.0, min(1.0, 1.0 - distance))
         cat = row.get("category")
-        results.append({
+        result = {
             "object_type": row.get("object_type"),
             "object_id": row.get("object_id"),
             "title": row.get("title"),
@@ -1185,16 +1539,24 @@ def semantic_search_cba(
             "union_name": row.get("union_name"),
             "effective_date": row.get("effective_date"),
             "expiration_date": row.get("expiration_date"),
-            "similarity": round(similarity, 4),
-            "distance": round(distance, 4),
-        })
+            "similarity": round(similarity, 4) if similarity is not None else None,
+            "distance": round(distance, 4) if distance is not None else None,
+        }
+        if mode == "hybrid":
+            result["rrf_score"] = round(float(row.get("rrf_score") or 0.0), 6)
+            result["vector_rank"] = row.get("vector_rank")
+            result["lexical_rank"] = row.get("lexical_rank")
+        results.append(result)
 
     return {
         "query": q,
         "types": sorted(requested_types),
         "top_k": top_k,
         "min_similarity": min_similarity,
+        "mode": mode,
+        "ann_strategy": strategy,
         "embedding_time_ms": embed_ms,
+        "embedding_source": embed_source,
         "search_time_ms": search_ms,
         "result_count": len(results),
         "results": results,
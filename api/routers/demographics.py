@@ -190,11 +190,23 @@ async def get_employer_demographics(master_id: int):
     try:
         cur = conn.cursor()
 
-        # Look up employer
+        # Employer, state FIPS and ZIP -> county in one round trip. Strip the
+        # ZIP+4 suffix -- master_employers.zip stores values like
+        # '60064-3500' but the zip_county_crosswalk table is keyed on 5-digit
+        # ZIPs only. Without this strip, V12 falls back to ACS for every
+        # employer that has a hyphenated ZIP+4 (most SEC filers, including
+        # Abbott which carries '60064-3500'). Found while testing 2026-05-05.
         cur.execute("""
-            SELECT canonical_name, naics, state, zip, city
-            FROM master_employers
-            WHERE master_id = %s
+            SELECT m.canonical_name, m.naics, m.state, m.zip, m.city,
+                   sf.state_fips, zc.county_fips
+            FROM master_employers m
+            LEFT JOIN state_fips_map sf ON sf.state_abbr = UPPER(m.state)
+            LEFT JOIN LATERAL (
+                SELECT county_fips FROM zip_county_crosswalk
+                WHERE zip_code = LEFT(SPLIT_PART(TRIM(m.zip), '-', 1), 5)
+                LIMIT 1
+            ) zc ON TRUE
+            WHERE m.master_id = %s
         """, (master_id,))
         emp = cur.fetchone()
         if not emp:
@@ -209,34 +221,22 @@ async def get_employer_demographics(master_id: int):
                 status_code=422,
                 detail=f"Employer {master_id} has no state -- cannot estimate demographics")
 
-        # Get state FIPS
-        state_fips = _get_state_fips(cur, state_abbr)
+        state_fips = emp.get("state_fips")
+        if not state_fips:
+            raise HTTPException(status_code=404, detail=f"Unknown state: {state_abbr}")
 
-        # Get county FIPS from ZIP if available. Strip the ZIP+4 suffix —
-        # master_employers.zip stores values like '60064-3500' but the
-        # zip_county_crosswalk table is keyed on 5-digit ZIPs only. Without
-        # this strip, V12 falls back to ACS for every employer that has
-        # a hyphenated ZIP+4 (most SEC filers, including Abbott which
-        # carries '60064-3500'). Found while testing 2026-05-05.
         zipcode_5 = (zipcode or "").strip().split("-", 1)[0][:5]
-        county_fips = None
-        if zipcode_5:
-            cur.execute(
-                "SELECT county_fips FROM zip_county_crosswalk WHERE zip_code = %s LIMIT 1",
-                (zipcode_5,))
-            row = cur.fetchone()
-            if row:
-                county_fips = row["county_fips"]
-
-        # Try V12 QWI model first.
+        county_fips = emp.get("county_fips") if zipcode_5 else None
+
+        # Try V12 QWI model first, served from the precomputed cell cache
+        # (build_v12_cell_cache.py) when the cell is there.
         # Pass zipcode_5 (5-digit) instead of the raw `zipcode` (which can
-        # carry a -1234 suffix). V12 itself only uses zipcode for trace
-        # logging, but consistency keeps things clean.
+        # carry a -1234 suffix); it is part of the cell key.
         v12_result = None
         method = "acs_fallback"
         try:
-            from api.services.demographics_v12 import estimate_demographics_v12
-            v12_result = estimate_demographics_v12(
+            from api.services.demographics_v12 import estimate_demographics_v12_cached
+            v12_result = estimate_demographics_v12_cached(
                 cur, naics_code or "00", state_fips,
                 zipcode_5 or "00000", county_fips or "00000",
                 state_abbr=state_abbr, total_employees=100)
@@ -3,10 +3,12 @@ Density router -- BLS union density by industry/state, county estimates,
 industry-weighted analysis, and NY sub-county density.
 """
 
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import Optional
 
 from ..database import get_db
+from ..http_cache import etag_for
+from ..helpers import SortKey, count_total, keyset_order_by, keyset_page, keyset_select, keyset_where
 
 router = APIRouter()
 
@@ -1111,13 +1113,23 @@ def get_ny_zip_density_detail(zip_code: str):
             }
 
 
-@router.get("/api/density/ny/tracts")
+# estimated_total_density is filtered to > 0 (never NULL); tract_fips breaks ties.
+_TRACT_KEYS = [
+    SortKey("estimated_total_density", desc=True, nullable=False),
+    SortKey("tract_fips", desc=True, nullable=False),
+]
+
+
+@router.get("/api/density/ny/tracts",
+            dependencies=[Depends(etag_for("ny_tract_density_estimates"))])
 def get_ny_tract_density(
     county_fips: Optional[str] = None,
     min_density: Optional[float] = None,
     max_density: Optional[float] = None,
     limit: int = Query(100, le=5500),
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    count: str = "exact",
 ):
     """Get union density estimates for NY census tracts
 
@@ -1126,7 +1138,9 @@ def get_ny_tract_density(
         min_density: Minimum total density filter
         max_density: Maximum total density filter
         limit: Max results (default 100, max 5500)
-        offset: Pagination offset
+        offset: Pagination offset (ignored when cursor is given)
+        cursor: next_cursor from the previous page (keyset pagination)
+        count: exact (cached) | estimate (planner rows) | none
     """
     with get_db() as conn:
         with conn.cursor() as cur:
@@ -1145,31 +1159,34 @@ def get_ny_tract_density(
 
             where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
+            after_sql, after_params = keyset_where(_TRACT_KEYS, cursor)
+            if cursor:
+                offset = 0
             cur.execute(f"""
                 SELECT tract_fips, county_fips, tract_name,
                        estimated_total_density, estimated_private_density, estimated_public_density,
                        estimated_federal_density, estimated_state_density, estimated_local_density,
-                       private_class_total, govt_class_total
+                       private_class_total, govt_class_total{keyset_select(_TRACT_KEYS)}
                 FROM ny_tract_density_estimates
-                {where_clause}
-                ORDER BY estimated_total_density DESC
+                {where_clause} AND {after_sql}
+                ORDER BY {keyset_order_by(_TRACT_KEYS)}
                 LIMIT %s OFFSET %s
-            """, params + [limit, offset])
+            """, params + after_params + [limit, offset])
 
-            tracts = cur.fetchall()
+            tracts, next_cursor = keyset_page(cur.fetchall(), _TRACT_KEYS, limit)
 
             # Total count
-            cur.execute(f"""
-                SELECT COUNT(*) FROM ny_tract_density_estimates {where_clause}
-            """, params)
-            total = cur.fetchone()["count"]
+            total, total_is_estimate = count_total(
+                cur, f"FROM ny_tract_density_estimates {where_clause}", params, count)
 
             return {
                 "tracts": tracts,
                 "count": len(tracts),
                 "total": total,
+                "total_is_estimate": total_is_estimate,
                 "offset": offset,
-                "limit": limit
+                "limit": limit,
+                "next_cursor": next_cursor,
             }
 
 
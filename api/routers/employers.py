@@ -13,6 +13,7 @@ from typing import Optional
 from ..database import get_db
 from ..dependencies import require_admin, require_auth
 from ..models.schemas import FlagCreate
+from ..services import stats_snapshot
 from ..services.entity_context import (
     build_entity_context_for_f7,
     build_entity_context_for_master,
@@ -307,40 +308,15 @@ def normalized_search_employers(
 # ============================================================================
 
 @router.get("/api/employers/data-coverage")
-def get_data_coverage():
-    """Aggregate stats: how many employers have 0/1/2/3+ external data sources."""
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) AS cnt FROM mv_employer_data_sources")
-            total = cur.fetchone()['cnt']
+def get_data_coverage(request: Request, live: bool = False):
+    """Aggregate stats: how many employers have 0/1/2/3+ external data sources.
 
-            cur.execute("""
-                SELECT source_count, COUNT(*) AS cnt
-                FROM mv_employer_data_sources
-                GROUP BY source_count
-                ORDER BY source_count
-            """)
-            distribution = cur.fetchall()
-
-            cur.execute("""
-                SELECT
-                    SUM(has_osha::int) AS osha,
-                    SUM(has_nlrb::int) AS nlrb,
-                    SUM(has_whd::int) AS whd,
-                    SUM(has_990::int) AS n990,
-                    SUM(has_sam::int) AS sam,
-                    SUM(has_sec::int) AS sec,
-                    SUM(has_gleif::int) AS gleif,
-                    SUM(has_mergent::int) AS mergent
-                FROM mv_employer_data_sources
-            """)
-            by_source = cur.fetchone()
-
-            return {
-                "total_employers": total,
-                "source_count_distribution": distribution,
-                "by_source": by_source,
-            }
+    Served from the stats snapshot; ?live=true recomputes it (admin only).
+    """
+    if live:
+        require_admin(request)
+    coverage, computed_at = stats_snapshot.get_metric("data_coverage", live=live)
+    return {**coverage, "computed_at": computed_at}
 
 
 # ============================================================================
@@ -16,7 +16,7 @@ router = APIRouter()
 _MASTER_PK_COL: Optional[str] = None
 _HAS_LABOR_COL: Optional[bool] = None
 _INDEXES_READY = False
-_stats_cache = TTLCache(ttl_seconds=300)  # 5-minute cache for expensive stats
+_stats_cache = TTLCache(ttl_seconds=300, name="master_stats")  # 5-minute cache for expensive stats
 
 
 def _normalize_q(q: str) -> str:
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import Optional
 from ..database import get_db
+from ..http_cache import etag_for
 from ..helpers import is_likely_law_firm
 
 router = APIRouter()
@@ -120,7 +121,9 @@ def search_nlrb_elections(
             return {"total": total, "limit": limit, "offset": offset, "elections": elections}
 
 
-@router.get("/api/nlrb/elections/map")
+@router.get("/api/nlrb/elections/map", dependencies=[Depends(etag_for(
+    "nlrb_elections", "nlrb_participants", "nlrb_tallies", "unions_master",
+    "f7_employers_deduped"))])
 def get_nlrb_elections_map(
     state: Optional[str] = None,
     aff_abbr: Optional[str] = None,
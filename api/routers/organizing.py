@@ -1,13 +1,16 @@
 import os
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from typing import Literal, Optional
 from pydantic import BaseModel
 from ..database import get_db
 from ..dependencies import require_admin
-from ..helpers import TTLCache
+from ..helpers import (
+    SortKey, TTLCache, count_total, keyset_order_by, keyset_page, keyset_select, keyset_where,
+)
+from ..services.export_stream import EXPORT_FORMAT_PATTERN, export_response, export_row_cap
 
 router = APIRouter()
-_match_quality_cache = TTLCache(ttl_seconds=600)  # 10-minute cache
+_match_quality_cache = TTLCache(ttl_seconds=600, name="match_quality")  # 10-minute cache
 
 
 # Canonical scoring parameters — fallbacks if score_versions table is empty or missing
@@ -343,6 +346,46 @@ def get_organizing_by_state():
             return {"states": cur.fetchall()}
 
 
+# Sort keys for the scorecard list; establishment_id breaks ties for keyset paging.
+_SCORECARD_KEYS = [
+    SortKey("v.organizing_score", desc=True, nullable=False),
+    SortKey("v.total_penalties", desc=True),
+    SortKey("v.establishment_id", nullable=False),
+]
+
+
+def _scorecard_filters(state, naics_2digit, min_employees, max_employees, min_score, has_contracts):
+    """WHERE clause + params shared by the scorecard list and export endpoints."""
+    conditions = ["employee_count >= %s", "employee_count <= %s"]
+    params: list = [min_employees, max_employees]
+
+    if state:
+        conditions.append("site_state = %s")
+        params.append(state.upper())
+    if naics_2digit:
+        conditions.append("naics_code LIKE %s")
+        params.append(f"{naics_2digit}%")
+    if min_score > 0:
+        conditions.append("organizing_score >= %s")
+        params.append(min_score)
+    if has_contracts and has_contracts.lower() in ('true', '1', 'yes'):
+        conditions.append("has_federal_contracts = TRUE")
+
+    return " AND ".join(conditions), params
+
+
+SCORECARD_EXPORT_COLUMNS = [
+    'establishment_id', 'estab_name', 'site_address', 'site_city', 'site_state', 'site_zip',
+    'naics_code', 'employee_count', 'total_inspections', 'last_inspection_date',
+    'willful_count', 'repeat_count', 'serious_count', 'total_violations', 'total_penalties',
+    'accident_count', 'fatality_count', 'risk_level', 'has_f7_match',
+    'has_federal_contracts', 'federal_obligations', 'federal_contract_count',
+    'organizing_score', 'score_company_unions', 'score_industry_density', 'score_geographic',
+    'score_size', 'score_osha', 'score_nlrb', 'score_contracts', 'score_projections',
+    'score_similarity', 'nlrb_predicted_win_pct',
+]
+
+
 @router.get("/api/organizing/scorecard")
 def get_organizing_scorecard(
     state: Optional[str] = None,
@@ -352,7 +395,9 @@ def get_organizing_scorecard(
     min_score: int = Query(default=0),
     has_contracts: Optional[str] = None,
     limit: int = Query(default=100, le=500),
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    count: str = "exact",
 ):
     """
     Get scored organizing targets from pre-computed materialized view (0-90 points):
@@ -365,47 +410,37 @@ def get_organizing_scorecard(
     - Contracts (10): Federal contract funding
     - Projections (10): BLS industry growth outlook
     - Similarity (10): Gower distance to union employers
-    """
-    conditions = ["employee_count >= %s", "employee_count <= %s"]
-    params: list = [min_employees, max_employees]
 
-    if state:
-        conditions.append("site_state = %s")
-        params.append(state.upper())
-    if naics_2digit:
-        conditions.append("naics_code LIKE %s")
-        params.append(f"{naics_2digit}%")
-    if min_score > 0:
-        conditions.append("organizing_score >= %s")
-        params.append(min_score)
-    if has_contracts and has_contracts.lower() in ('true', '1', 'yes'):
-        conditions.append("has_federal_contracts = TRUE")
-
-    where_clause = " AND ".join(conditions)
+    Pagination: pass the returned ``next_cursor`` as ``cursor`` to fetch the
+    next page without OFFSET (offset is ignored when a cursor is given).
+    ``count`` is exact (cached), estimate (planner rows) or none.
+    """
+    where_clause, params = _scorecard_filters(
+        state, naics_2digit, min_employees, max_employees, min_score, has_contracts)
 
     with get_db() as conn:
         with conn.cursor() as cur:
             # Count matching rows (before pagination)
-            cur.execute(f"""
-                SELECT COUNT(*) as cnt FROM v_organizing_scorecard
-                WHERE {where_clause}
-            """, params)
-            total = cur.fetchone()['cnt']
+            total, total_is_estimate = count_total(
+                cur, f"FROM v_organizing_scorecard WHERE {where_clause}", params, count)
 
-            # Fetch paginated results sorted by score
+            # Fetch one page sorted by score (keyset after cursor, else OFFSET)
+            after_sql, after_params = keyset_where(_SCORECARD_KEYS, cursor)
+            if cursor:
+                offset = 0
             cur.execute(f"""
-                SELECT v.*, nc.naics_title AS naics_description
+                SELECT v.*, nc.naics_title AS naics_description{keyset_select(_SCORECARD_KEYS)}
                 FROM v_organizing_scorecard v
                 LEFT JOIN LATERAL (
                     SELECT naics_title FROM naics_codes_reference
                     WHERE naics_code = v.naics_code
                     ORDER BY naics_version DESC LIMIT 1
                 ) nc ON true
-                WHERE {where_clause}
-                ORDER BY organizing_score DESC, total_penalties DESC NULLS LAST
+                WHERE {where_clause} AND {after_sql}
+                ORDER BY {keyset_order_by(_SCORECARD_KEYS)}
                 LIMIT %s OFFSET %s
-            """, params + [limit, offset])
-            rows = cur.fetchall()
+            """, params + after_params + [limit, offset])
+            rows, next_cursor = keyset_page(cur.fetchall(), _SCORECARD_KEYS, limit)
 
             # Batch ULP count: two fast queries instead of one complex CTE
             ulp_counts = {}
@@ -490,12 +525,44 @@ def get_organizing_scorecard(
             return {
                 "results": results,
                 "total": total,
+                "total_is_estimate": total_is_estimate,
                 "scored_count": total,
                 "limit": limit,
-                "offset": offset
+                "offset": offset,
+                "next_cursor": next_cursor,
             }
 
 
+@router.get("/api/organizing/scorecard/export")
+def export_organizing_scorecard(
+    request: Request,
+    state: Optional[str] = None,
+    naics_2digit: Optional[str] = None,
+    min_employees: int = Query(default=25),
+    max_employees: int = Query(default=5000),
+    min_score: int = Query(default=0),
+    has_contracts: Optional[str] = None,
+    format: str = Query(default="csv", pattern=EXPORT_FORMAT_PATTERN),
+):
+    """Stream the organizing scorecard (csv, csv.gz or parquet) with the list filters.
+
+    Uncapped for researchers/admins; other callers get at most EXPORT_ROW_CAP rows.
+    """
+    where_clause, params = _scorecard_filters(
+        state, naics_2digit, min_employees, max_employees, min_score, has_contracts)
+    sql = f"""
+        SELECT {", ".join(SCORECARD_EXPORT_COLUMNS)}
+        FROM v_organizing_scorecard v
+        WHERE {where_clause}
+        ORDER BY {keyset_order_by(_SCORECARD_KEYS)}
+        LIMIT %s
+    """
+    return export_response(
+        sql, params + [export_row_cap(request)], SCORECARD_EXPORT_COLUMNS,
+        fmt=format, filename="organizing_scorecard",
+    )
+
+
 @router.get("/api/organizing/scorecard/{estab_id}")
 def get_scorecard_detail(estab_id: str):
     """Get detailed scorecard for a specific establishment.
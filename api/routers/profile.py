@@ -1,17 +1,19 @@
 import logging
 import re
 from datetime import date as _date
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
 from ..database import get_db
 from ..helpers import TTLCache
+from ..http_cache import etag_for
 from ..services.entity_context import build_entity_context_for_f7
 
 _logger = logging.getLogger(__name__)
 
 router = APIRouter()
-_profile_cache = TTLCache(ttl_seconds=300)  # 5-minute cache per employer
+_profile_cache = TTLCache(ttl_seconds=300, name="profile")  # 5-minute cache per employer
 
 # Data vintage for the materialized inputs feeding workforce-profile.
 # Mirrors the constants in api/routers/demographics.py; keep in sync.
@@ -147,10 +149,29 @@ def _get_nlrb_docket_summary(cur, member_ids: list) -> dict:
     }
 
 
+# Every table get_employer_profile and its helpers read, including
+# employer_review_flags so a new flag changes the ETag, and the corporate
+# family / canonical group tables behind entity_context.
+# tests/test_http_cache.py checks this against the SQL the route reaches.
+_PROFILE_TABLES = (
+    "f7_employers_deduped", "mv_employer_search", "unions_master",
+    "mv_employer_data_sources", "mv_unified_scorecard", "employer_review_flags",
+    "nlrb_cases", "nlrb_case_types", "nlrb_docket", "nlrb_elections",
+    "nlrb_participants", "nlrb_tallies", "nlrb_voluntary_recognition",
+    "osha_f7_matches", "osha_establishments", "osha_violation_summary",
+    "nyc_debarment_list", "nyc_local_labor_laws", "nyc_wage_theft_nys",
+    "sec_xbrl_financials", "mergent_employers", "corporate_ultimate_parents",
+    "corporate_identifier_crosswalk", "master_employer_source_ids",
+    "employer_canonical_groups",
+)
+
+
 @router.get("/api/profile/employers/{employer_id}")
-def get_employer_profile(employer_id: str):
+def get_employer_profile(employer_id: str,
+                         data_version: Optional[str] = Depends(etag_for(*_PROFILE_TABLES))):
     """Canonical employer profile payload for frontend detail rendering."""
-    cached = _profile_cache.get(f"profile:v2:{employer_id}")
+    cache_key = f"profile:v2:{employer_id}:{data_version}"
+    cached = _profile_cache.get(cache_key)
     if cached is not None:
         return cached
     with get_db() as conn:
@@ -413,7 +434,7 @@ def get_employer_profile(employer_id: str):
                 "nyc_enforcement": _get_nyc_enforcement(cur, employer),
                 "nlrb_docket": _get_nlrb_docket_summary(cur, member_ids),
             }
-            _profile_cache.set(f"profile:v2:{employer_id}", result)
+            _profile_cache.set(cache_key, result)
             return result
 
 
@@ -18,6 +18,7 @@ from typing import Literal, Optional
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
 from pydantic import BaseModel
 
+from .. import metrics
 from ..database import get_db
 
 router = APIRouter(prefix="/api/research", tags=["research"])
@@ -212,23 +213,29 @@ async def start_research_run(request: ResearchRequest, background_tasks: Backgro
 
 def _run_research_background(run_id: int):
     """Wrapper that imports and calls the research agent."""
+    metrics.RESEARCH_ACTIVE.inc()
     try:
-        from scripts.research.agent import run_research
-        run_research(run_id)
-    except Exception as e:
-        _log.exception("Research run %d failed", run_id)
-        # Mark the run as failed so the frontend knows
-        err_msg = f"FAILED: {str(e)[:500]}"
-        with get_db() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE research_runs
-                    SET status = 'failed',
-                        current_step = %s,
-                        completed_at = NOW(),
-                        updated_at = NOW()
-                    WHERE id = %s
-                """, (err_msg, run_id))
+        try:
+            from scripts.research.agent import run_research
+            run_research(run_id)
+            metrics.RESEARCH_RUNS.labels("completed").inc()
+        except Exception as e:
+            metrics.RESEARCH_RUNS.labels("failed").inc()
+            _log.exception("Research run %d failed", run_id)
+            # Mark the run as failed so the frontend knows
+            err_msg = f"FAILED: {str(e)[:500]}"
+            with get_db() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        UPDATE research_runs
+                        SET status = 'failed',
+                            current_step = %s,
+                            completed_at = NOW(),
+                            updated_at = NOW()
+                        WHERE id = %s
+                    """, (err_msg, run_id))
+    finally:
+        metrics.RESEARCH_ACTIVE.dec()
 
 
 
@@ -1,11 +1,10 @@
 from typing import Optional
-import csv
-import io
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Query, Request
 
 from ..database import get_db
+from ..helpers import SortKey, count_total, keyset_order_by, keyset_page, keyset_select, keyset_where
+from ..services.export_stream import EXPORT_FORMAT_PATTERN, export_response, export_row_cap
 from .organizing import get_organizing_scorecard, get_scorecard_detail
 
 router = APIRouter()
@@ -115,6 +114,55 @@ def get_current_score_version():
 # UNIFIED SCORECARD (Phase E3 — signal-strength scoring, all F7 employers)
 # ============================================================================
 
+def _unified_filters(min_factors, min_score, state, naics, score_tier,
+                     has_osha, has_nlrb, has_research, has_compound_enforcement):
+    """WHERE clause + params shared by the unified list and export endpoints."""
+    conditions = ["factors_available >= %s"]
+    params = [min_factors]
+
+    if min_score > 0:
+        conditions.append("unified_score >= %s")
+        params.append(min_score)
+    if state:
+        conditions.append("state = %s")
+        params.append(state.upper())
+    if naics:
+        conditions.append("naics LIKE %s")
+        params.append(f"{naics}%")
+    if score_tier:
+        st = score_tier.strip()
+        if st.upper() in {"TOP", "HIGH", "MEDIUM", "LOW"}:
+            conditions.append("score_tier_legacy = %s")
+            params.append(st.upper())
+        else:
+            conditions.append("score_tier = %s")
+            params.append(st.title())
+    for flag, value in (
+        ("has_osha", has_osha),
+        ("has_nlrb", has_nlrb),
+        ("has_research", has_research),
+        ("has_compound_enforcement", has_compound_enforcement),
+    ):
+        if value is True:
+            conditions.append(flag)
+        elif value is False:
+            conditions.append(f"NOT {flag}")
+
+    return " AND ".join(conditions), params
+
+
+# ORDER BY per ``sort``; employer_id is appended as the keyset tie-breaker.
+_UNIFIED_SORT_KEYS = {
+    "score": [SortKey("weighted_score", desc=True)],
+    "size": [SortKey("latest_unit_size", desc=True)],
+    "factors": [SortKey("factors_available", desc=True, nullable=False),
+                SortKey("weighted_score", desc=True)],
+    "name": [SortKey("employer_name")],
+    "strategic_delta": [SortKey("strategic_delta", desc=True)],
+    "score_delta": [SortKey("strategic_delta", desc=True)],
+}
+
+
 @router.get("/api/scorecard/unified")
 def get_unified_scorecard(
     state: Optional[str] = None,
@@ -129,65 +177,33 @@ def get_unified_scorecard(
     sort: str = Query(default="score", pattern="^(score|size|factors|name|strategic_delta|score_delta)$"),
     offset: int = Query(default=0, ge=0),
     page_size: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    count: str = "exact",
 ):
-    """Unified scorecard: weighted 8-factor scoring for all F7 employers."""
+    """Unified scorecard: weighted 8-factor scoring for all F7 employers.
+
+    Pass the returned ``next_cursor`` as ``cursor`` for keyset pagination
+    (offset is then ignored). ``count`` is exact (cached) | estimate | none.
+    """
+    where, params = _unified_filters(
+        min_factors, min_score, state, naics, score_tier,
+        has_osha, has_nlrb, has_research, has_compound_enforcement,
+    )
+
     with get_db() as conn:
         with conn.cursor() as cur:
-            conditions = ["factors_available >= %s"]
-            params = [min_factors]
-
-            if min_score > 0:
-                conditions.append("unified_score >= %s")
-                params.append(min_score)
-            if state:
-                conditions.append("state = %s")
-                params.append(state.upper())
-            if naics:
-                conditions.append("naics LIKE %s")
-                params.append(f"{naics}%")
-            if score_tier:
-                st = score_tier.strip()
-                if st.upper() in {"TOP", "HIGH", "MEDIUM", "LOW"}:
-                    conditions.append("score_tier_legacy = %s")
-                    params.append(st.upper())
-                else:
-                    conditions.append("score_tier = %s")
-                    params.append(st.title())
-            if has_osha is True:
-                conditions.append("has_osha")
-            if has_osha is False:
-                conditions.append("NOT has_osha")
-            if has_nlrb is True:
-                conditions.append("has_nlrb")
-            if has_nlrb is False:
-                conditions.append("NOT has_nlrb")
-            if has_research is True:
-                conditions.append("has_research")
-            if has_research is False:
-                conditions.append("NOT has_research")
-            if has_compound_enforcement is True:
-                conditions.append("has_compound_enforcement")
-            if has_compound_enforcement is False:
-                conditions.append("NOT has_compound_enforcement")
-
-            where = " AND ".join(conditions)
-
-            sort_map = {
-                "score": "weighted_score DESC NULLS LAST",
-                "size": "latest_unit_size DESC NULLS LAST",
-                "factors": "factors_available DESC, weighted_score DESC NULLS LAST",
-                "name": "employer_name",
-                "strategic_delta": "strategic_delta DESC NULLS LAST",
-                "score_delta": "strategic_delta DESC NULLS LAST",
-            }
-            order = sort_map.get(sort, sort_map["score"])
+            keys = _UNIFIED_SORT_KEYS.get(sort, _UNIFIED_SORT_KEYS["score"]) + [
+                SortKey("employer_id", nullable=False),
+            ]
 
             # Count
-            cur.execute(f"SELECT COUNT(*) AS cnt FROM mv_unified_scorecard WHERE {where}", params)
-            total = cur.fetchone()['cnt']
+            total, total_is_estimate = count_total(
+                cur, f"FROM mv_unified_scorecard WHERE {where}", params, count)
 
             # Results
-            params.extend([page_size, offset])
+            after_sql, after_params = keyset_where(keys, cursor)
+            if cursor:
+                offset = 0
             cur.execute(f"""
                 SELECT employer_id, employer_name, state, city, naics,
                        latest_unit_size, latest_union_name, is_historical,
@@ -204,13 +220,17 @@ def get_unified_scorecard(
                        strategic_delta, research_approach,
                        has_compound_enforcement, has_child_labor,
                        is_whd_repeat_violator, has_close_election,
-                       company_workers, size_source
+                       company_workers, size_source{keyset_select(keys)}
                 FROM mv_unified_scorecard
-                WHERE {where}
-                ORDER BY {order}
+                WHERE {where} AND {after_sql}
+                ORDER BY {keyset_order_by(keys)}
                 LIMIT %s OFFSET %s
-            """, params)
-            data = cur.fetchall()
+            """, params + after_params + [page_size, offset])
+            data, next_cursor = keyset_page(cur.fetchall(), keys, page_size)
+            if cursor or total is None:
+                has_more = next_cursor is not None
+            else:
+                has_more = (offset + page_size) < total
 
             for row in data:
                 row["weighted_score"] = row.get("weighted_score", row.get("unified_score"))
@@ -224,9 +244,11 @@ def get_unified_scorecard(
             return {
                 "data": data,
                 "total": total,
+                "total_is_estimate": total_is_estimate,
                 "offset": offset,
                 "page_size": page_size,
-                "has_more": (offset + page_size) < total,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
             }
 
 
@@ -333,6 +355,7 @@ EXPORT_COLUMNS = [
 
 @router.get("/api/scorecard/unified/export")
 def export_unified_csv(
+    request: Request,
     state: Optional[str] = None,
     naics: Optional[str] = None,
     min_score: float = Query(default=0, ge=0, le=10),
@@ -342,72 +365,40 @@ def export_unified_csv(
     has_nlrb: Optional[bool] = None,
     has_research: Optional[bool] = None,
     has_compound_enforcement: Optional[bool] = None,
+    format: str = Query(default="csv", pattern=EXPORT_FORMAT_PATTERN),
 ):
-    """Export unified scorecard as CSV with same filters as /unified endpoint."""
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            conditions = ["factors_available >= %s"]
-            params = [min_factors]
-
-            if min_score > 0:
-                conditions.append("unified_score >= %s")
-                params.append(min_score)
-            if state:
-                conditions.append("state = %s")
-                params.append(state.upper())
-            if naics:
-                conditions.append("naics LIKE %s")
-                params.append(f"{naics}%")
-            if score_tier:
-                st = score_tier.strip()
-                if st.upper() in {"TOP", "HIGH", "MEDIUM", "LOW"}:
-                    conditions.append("score_tier_legacy = %s")
-                    params.append(st.upper())
-                else:
-                    conditions.append("score_tier = %s")
-                    params.append(st.title())
-            if has_osha is True:
-                conditions.append("has_osha")
-            if has_nlrb is True:
-                conditions.append("has_nlrb")
-            if has_research is True:
-                conditions.append("has_research")
-            if has_compound_enforcement is True:
-                conditions.append("has_compound_enforcement")
-
-            where = " AND ".join(conditions)
-            params.append(10000)  # safety cap
+    """Stream the unified scorecard (csv, csv.gz or parquet) with the /unified filters.
 
-            cur.execute(f"""
-                SELECT employer_id, employer_name, city, state, naics,
-                       latest_unit_size, company_workers, size_source,
-                       score_tier, weighted_score, unified_score,
-                       score_osha, score_nlrb, score_whd, score_contracts,
-                       score_union_proximity, score_financial, score_size, score_similarity,
-                       score_anger, score_leverage,
-                       factors_available, factors_total, coverage_pct,
-                       has_osha, has_nlrb, has_whd, has_research,
-                       has_compound_enforcement, has_child_labor,
-                       is_whd_repeat_violator, has_close_election
-                FROM mv_unified_scorecard
-                WHERE {where}
-                ORDER BY weighted_score DESC NULLS LAST
-                LIMIT %s
-            """, params)
-            rows = cur.fetchall()
+    Researchers and admins get every matching row; other callers are capped
+    at EXPORT_ROW_CAP rows.
+    """
+    where, params = _unified_filters(
+        min_factors, min_score, state, naics, score_tier,
+        has_osha, has_nlrb, has_research, has_compound_enforcement,
+    )
+    sql = f"""
+        SELECT employer_id, employer_name, city, state, naics,
+               latest_unit_size, company_workers, size_source,
+               score_tier, weighted_score, unified_score,
+               score_osha, score_nlrb, score_whd, score_contracts,
+               score_union_proximity, score_financial, score_size, score_similarity,
+               score_anger, score_leverage,
+               factors_available, factors_total, coverage_pct,
+               has_osha, has_nlrb, has_whd, has_research,
+               has_compound_enforcement, has_child_labor,
+               is_whd_repeat_violator, has_close_election
+        FROM mv_unified_scorecard
+        WHERE {where}
+        ORDER BY weighted_score DESC NULLS LAST, employer_id
+        LIMIT %s
+    """
 
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(EXPORT_COLUMNS)
-    for row in rows:
+    def add_action(row):
         row['recommended_action'] = _compute_recommended_action(row)
-        writer.writerow([row.get(c, '') for c in EXPORT_COLUMNS])
-    buf.seek(0)
 
-    return StreamingResponse(
-        iter([buf.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=scorecard_export.csv"}
+    return export_response(
+        sql, params + [export_row_cap(request)], EXPORT_COLUMNS, fmt=format,
+        filename="scorecard_export", row_hook=add_action,
     )
 
 
@@ -1,6 +1,10 @@
+import hmac
 from datetime import datetime, timezone
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from .. import metrics
+from ..config import JWT_SECRET, METRICS_TOKEN
 
 from ..data_source_catalog import (
     DATA_SOURCE_ENTRIES,
@@ -8,6 +12,9 @@ from ..data_source_catalog import (
     DATA_SOURCE_INVENTORY_LAST_UPDATED,
 )
 from ..database import get_db
+from ..query_stats import SAMPLES_TABLE
+from ..dependencies import require_admin
+from ..services import stats_snapshot
 
 router = APIRouter()
 
@@ -31,44 +38,32 @@ def system_health_check():
     }
 
 
-@router.get("/api/stats")
-def system_stats():
-    """Read-only platform stats summary."""
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) AS total FROM f7_employers_deduped")
-            total_employers = cur.fetchone()["total"]
-
-            cur.execute("SELECT COUNT(*) AS total FROM mv_organizing_scorecard")
-            total_scorecard_rows = cur.fetchone()["total"]
-
-            cur.execute("""
-                SELECT source_system, COUNT(*) AS match_count
-                FROM unified_match_log
-                WHERE status = 'active'
-                GROUP BY source_system
-                ORDER BY source_system
-            """)
-            matches_by_source = cur.fetchall()
-
-            cur.execute("""
-                SELECT started_at
-                FROM match_runs
-                ORDER BY started_at DESC NULLS LAST
-                LIMIT 1
-            """)
-            last_run = cur.fetchone()
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics(request: Request):
+    """Prometheus scrape endpoint (request, pool, cache and research metrics).
+
+    Not behind JWT auth, so with auth enabled it is served only to scrapers
+    presenting METRICS_TOKEN; it is open only when auth is disabled.
+    """
+    if METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "")
+        if not hmac.compare_digest(supplied, f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    elif JWT_SECRET:
+        raise HTTPException(status_code=503, detail="METRICS_TOKEN is not configured")
+    if not metrics.HAS_PROMETHEUS:
+        raise HTTPException(status_code=503, detail="prometheus_client is not installed")
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
 
-    return {
-        "total_employers": total_employers,
-        "total_scorecard_rows": total_scorecard_rows,
-        "match_counts_by_source": matches_by_source,
-        "last_match_run_timestamp": (
-            last_run["started_at"].isoformat()
-            if last_run and last_run.get("started_at")
-            else None
-        ),
-    }
+
+@router.get("/api/stats")
+def system_stats(request: Request, live: bool = False):
+    """Read-only platform stats summary (snapshot; ?live=true recomputes, admin only)."""
+    if live:
+        require_admin(request)
+    stats, computed_at = stats_snapshot.get_metric("system_stats", live=live)
+    return {**stats, "computed_at": computed_at}
 
 
 @router.get("/api/system/data-freshness")
@@ -199,3 +194,49 @@ def system_data_source_inventory():
         "source_count": len(DATA_SOURCE_ENTRIES),
         "groups": groups,
     }
+
+
+@router.get("/api/admin/slow-queries")
+def list_slow_query_samples(
+    path: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    user=Depends(require_admin),
+):
+    """Captured slow-statement plans, newest first (plans via /{sample_id}).
+
+    Capture is enabled with SLOW_QUERY_EXPLAIN_MS; see api/query_stats.py.
+    """
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s) AS rel", [SAMPLES_TABLE])
+            if cur.fetchone()["rel"] is None:
+                return {"samples": [], "count": 0}
+            cur.execute(
+                """
+                SELECT id, captured_at, path, fingerprint, duration_ms, explain_ms,
+                       (plan->0->>'Execution Time')::real AS plan_execution_ms,
+                       LEFT(statement, 300) AS statement_preview, error
+                FROM api_slow_query_samples
+                WHERE (%s::text IS NULL OR path = %s)
+                ORDER BY captured_at DESC
+                LIMIT %s
+                """,
+                [path, path, limit],
+            )
+            samples = cur.fetchall()
+    return {"samples": samples, "count": len(samples)}
+
+
+@router.get("/api/admin/slow-queries/{sample_id}")
+def get_slow_query_sample(sample_id: int, user=Depends(require_admin)):
+    """One captured statement with its full EXPLAIN (ANALYZE, BUFFERS) plan."""
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s) AS rel", [SAMPLES_TABLE])
+            row = None
+            if cur.fetchone()["rel"] is not None:
+                cur.execute("SELECT * FROM api_slow_query_samples WHERE id = %s", [sample_id])
+                row = cur.fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Sample not found")
+    return row
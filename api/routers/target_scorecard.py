@@ -6,19 +6,26 @@ enforcement flags. Default sort is by signal count, then alphabetically.
 
 mv_target_scorecard MV-existence cache: cache only on True; re-query on
 False to recover from the 2026-04-30 missing-MV incident without restart.
+A True result is re-validated every _MV_RECHECK_SECONDS against the MV's
+OID, so a build-then-swap rebuild (new relation) reloads the column set.
 """
 from __future__ import annotations
 
 import math
+import time
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 
 from ..database import get_db
-from ..helpers import safe_order_dir, safe_sort_col, TTLCache
+from ..helpers import (
+    SortKey, TTLCache, count_total, keyset_order_by, keyset_page, keyset_select, keyset_where,
+    safe_order_dir, safe_sort_col,
+)
+from ..services.export_stream import EXPORT_FORMAT_PATTERN, export_response, export_row_cap
 
 router = APIRouter()
-_stats_cache = TTLCache(ttl_seconds=300)
+_stats_cache = TTLCache(ttl_seconds=300, name="target_stats")
 
 # Column allowlists for safety
 _SORT_MAP = {
@@ -33,6 +40,9 @@ _SORT_MAP = {
 
 _MV_EXISTS: Optional[bool] = None
 _MV_COLUMNS: Optional[set] = None
+_MV_OID: Optional[int] = None
+_MV_CHECKED_AT = 0.0
+_MV_RECHECK_SECONDS = 60
 
 
 def _check_mv(cur) -> bool:
@@ -41,24 +51,28 @@ def _check_mv(cur) -> bool:
     Caching only on True is intentional: if the MV is missing at API startup
     and gets rebuilt later (see Open Problems/mv_target_scorecard MV Missing.md
     for the 2026-04-30 incident), a negative cache would force a process
-    restart to recover. Re-querying pg_matviews on each False result is cheap.
+    restart to recover. Re-querying the catalog on each False result is cheap.
     """
-    global _MV_EXISTS, _MV_COLUMNS
-    if _MV_EXISTS is True:
+    global _MV_EXISTS, _MV_COLUMNS, _MV_OID, _MV_CHECKED_AT
+    now = time.monotonic()
+    if _MV_EXISTS is True and now - _MV_CHECKED_AT < _MV_RECHECK_SECONDS:
         return True
-    cur.execute(
-        "SELECT EXISTS (SELECT 1 FROM pg_matviews WHERE matviewname = 'mv_target_scorecard') AS e"
-    )
-    exists = bool(cur.fetchone()["e"])
-    if exists:
-        _MV_EXISTS = True
+    cur.execute("SELECT to_regclass('mv_target_scorecard')::oid AS oid")
+    oid = cur.fetchone()["oid"]
+    if oid is None:
+        _MV_EXISTS = None
+        return False
+    if oid != _MV_OID:
         cur.execute("""
             SELECT attname FROM pg_attribute
-            WHERE attrelid = 'mv_target_scorecard'::regclass
+            WHERE attrelid = %s
               AND attnum > 0 AND NOT attisdropped
-        """)
+        """, [oid])
         _MV_COLUMNS = {r["attname"] for r in cur.fetchall()}
-    return exists
+        _MV_OID = oid
+    _MV_EXISTS = True
+    _MV_CHECKED_AT = now
+    return True
 
 
 def _has_col(name: str) -> bool:
@@ -80,6 +94,77 @@ def _extra_cols_sql() -> str:
     return ", " + ", ".join(f"ts.{c}" for c in present)
 
 
+def _target_filters(q, state, naics, min_signals, has_enforcement, has_recent_violations,
+                   min_employees, max_employees, is_federal_contractor, is_nonprofit,
+                   source_origin, has_research, gold_standard_tier):
+    """WHERE clause + params shared by the target list and export endpoints."""
+    conditions = ["1=1"]
+    params = []
+
+    if q:
+        conditions.append("ts.display_name ILIKE %s")
+        params.append(f"%{q}%")
+    if state:
+        conditions.append("ts.state = %s")
+        params.append(state.upper())
+    if naics:
+        conditions.append("ts.naics LIKE %s")
+        params.append(f"{naics}%")
+    if min_signals is not None:
+        conditions.append("ts.signals_present >= %s")
+        params.append(min_signals)
+    if has_enforcement is not None:
+        conditions.append("ts.has_enforcement = %s")
+        params.append(has_enforcement)
+    if has_recent_violations is not None:
+        conditions.append("ts.has_recent_violations = %s")
+        params.append(has_recent_violations)
+    if min_employees is not None:
+        conditions.append("ts.employee_count >= %s")
+        params.append(min_employees)
+    if max_employees is not None:
+        conditions.append("ts.employee_count <= %s")
+        params.append(max_employees)
+    if is_federal_contractor is not None:
+        conditions.append("ts.is_federal_contractor = %s")
+        params.append(is_federal_contractor)
+    if is_nonprofit is not None:
+        conditions.append("ts.is_nonprofit = %s")
+        params.append(is_nonprofit)
+    if source_origin:
+        conditions.append("ts.source_origin = %s")
+        params.append(source_origin.lower())
+    if has_research is not None:
+        conditions.append("ts.has_research = %s")
+        params.append(has_research)
+    if gold_standard_tier:
+        conditions.append("ts.gold_standard_tier = %s")
+        params.append(gold_standard_tier)
+
+    return " AND ".join(conditions), params
+
+
+def _sort_keys(sort: str, order: str) -> list:
+    """ORDER BY keys; display_name then master_id break ties deterministically."""
+    sort_col = safe_sort_col(sort, _SORT_MAP, "signals")
+    return [
+        SortKey(sort_col, desc=safe_order_dir(order) == "DESC"),
+        SortKey("ts.display_name"),
+        SortKey("ts.master_id", nullable=False),
+    ]
+
+
+_EXPORT_COLUMNS = [
+    "master_id", "display_name", "city", "state", "naics", "employee_count",
+    "is_federal_contractor", "is_nonprofit", "source_origin", "source_count",
+    "signal_osha", "signal_whd", "signal_nlrb", "signal_contracts", "signal_financial",
+    "signal_industry_growth", "signal_union_density", "signal_size", "signals_present",
+    "has_enforcement", "enforcement_count", "has_recent_violations",
+    "pillar_anger", "pillar_leverage", "pillar_stability",
+    "has_research", "research_quality", "gold_standard_tier",
+]
+
+
 @router.get("/api/targets/scorecard")
 def target_scorecard_list(
     q: Optional[str] = None,
@@ -99,64 +184,30 @@ def target_scorecard_list(
     order: str = Query(default="desc", pattern="^(asc|desc)$"),
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    count: str = "exact",
 ):
-    """Paginated signal inventory list for non-union target employers."""
+    """Paginated signal inventory list for non-union target employers.
+
+    ``page`` uses OFFSET; passing the returned ``next_cursor`` as ``cursor``
+    instead seeks straight to the next page (keyset pagination).
+    """
     with get_db() as conn:
         with conn.cursor() as cur:
             if not _check_mv(cur):
                 raise HTTPException(status_code=503, detail="Target scorecard not yet built. Run build_target_scorecard.py first.")
 
-            conditions = ["1=1"]
-            params = []
-
-            if q:
-                conditions.append("ts.display_name ILIKE %s")
-                params.append(f"%{q}%")
-            if state:
-                conditions.append("ts.state = %s")
-                params.append(state.upper())
-            if naics:
-                conditions.append("ts.naics LIKE %s")
-                params.append(f"{naics}%")
-            if min_signals is not None:
-                conditions.append("ts.signals_present >= %s")
-                params.append(min_signals)
-            if has_enforcement is not None:
-                conditions.append("ts.has_enforcement = %s")
-                params.append(has_enforcement)
-            if has_recent_violations is not None:
-                conditions.append("ts.has_recent_violations = %s")
-                params.append(has_recent_violations)
-            if min_employees is not None:
-                conditions.append("ts.employee_count >= %s")
-                params.append(min_employees)
-            if max_employees is not None:
-                conditions.append("ts.employee_count <= %s")
-                params.append(max_employees)
-            if is_federal_contractor is not None:
-                conditions.append("ts.is_federal_contractor = %s")
-                params.append(is_federal_contractor)
-            if is_nonprofit is not None:
-                conditions.append("ts.is_nonprofit = %s")
-                params.append(is_nonprofit)
-            if source_origin:
-                conditions.append("ts.source_origin = %s")
-                params.append(source_origin.lower())
-            if has_research is not None:
-                conditions.append("ts.has_research = %s")
-                params.append(has_research)
-            if gold_standard_tier:
-                conditions.append("ts.gold_standard_tier = %s")
-                params.append(gold_standard_tier)
-
-            where = " AND ".join(conditions)
-            sort_col = safe_sort_col(sort, _SORT_MAP, "signals")
-            order_dir = safe_order_dir(order)
-
-            cur.execute(f"SELECT COUNT(*) AS cnt FROM mv_target_scorecard ts WHERE {where}", params)
-            total = int(cur.fetchone()["cnt"])
-
-            offset = (page - 1) * limit
+            where, params = _target_filters(
+                q, state, naics, min_signals, has_enforcement, has_recent_violations,
+                min_employees, max_employees, is_federal_contractor, is_nonprofit,
+                source_origin, has_research, gold_standard_tier,
+            )
+            keys = _sort_keys(sort, order)
+            total, total_is_estimate = count_total(
+                cur, f"FROM mv_target_scorecard ts WHERE {where}", params, count)
+
+            after_sql, after_params = keyset_where(keys, cursor)
+            offset = 0 if cursor else (page - 1) * limit
             cur.execute(
                 f"""
                 SELECT
@@ -194,22 +245,24 @@ def target_scorecard_list(
                     ts.enh_signal_contracts,
                     ts.enh_signal_financial,
                     ts.enh_signal_size
-                    {_extra_cols_sql()}
+                    {_extra_cols_sql()}{keyset_select(keys)}
                 FROM mv_target_scorecard ts
-                WHERE {where}
-                ORDER BY {sort_col} {order_dir} NULLS LAST, ts.display_name ASC
+                WHERE {where} AND {after_sql}
+                ORDER BY {keyset_order_by(keys)}
                 LIMIT %s OFFSET %s
                 """,
-                params + [limit, offset],
+                params + after_params + [limit, offset],
             )
-            results = cur.fetchall()
-            pages = int(math.ceil(total / limit)) if limit else 1
+            results, next_cursor = keyset_page(cur.fetchall(), keys, limit)
+            pages = int(math.ceil(total / limit)) if limit and total is not None else None
 
             return {
                 "total": total,
+                "total_is_estimate": total_is_estimate,
                 "page": page,
                 "pages": pages,
                 "results": results,
+                "next_cursor": next_cursor,
             }
 
 
@@ -329,6 +382,53 @@ def target_scorecard_stats():
             return result
 
 
+@router.get("/api/targets/scorecard/export")
+def target_scorecard_export(
+    request: Request,
+    q: Optional[str] = None,
+    state: Optional[str] = None,
+    naics: Optional[str] = None,
+    min_signals: Optional[int] = Query(default=None, ge=0, le=8),
+    has_enforcement: Optional[bool] = None,
+    has_recent_violations: Optional[bool] = None,
+    min_employees: Optional[int] = Query(default=None, ge=0),
+    max_employees: Optional[int] = Query(default=None, ge=0),
+    is_federal_contractor: Optional[bool] = None,
+    is_nonprofit: Optional[bool] = None,
+    source_origin: Optional[str] = None,
+    has_research: Optional[bool] = None,
+    gold_standard_tier: Optional[str] = Query(default=None, pattern="^(stub|bronze|silver|gold|platinum)$"),
+    sort: str = Query(default="signals", pattern="^(signals|name|employees|enforcement|source_count|research_quality|gold_tier)$"),
+    order: str = Query(default="desc", pattern="^(asc|desc)$"),
+    format: str = Query(default="csv", pattern=EXPORT_FORMAT_PATTERN),
+):
+    """Stream the target scorecard (csv, csv.gz or parquet) with the list filters.
+
+    Uncapped for researchers/admins; other callers get at most EXPORT_ROW_CAP rows.
+    """
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            if not _check_mv(cur):
+                raise HTTPException(status_code=503, detail="Target scorecard not yet built.")
+
+    where, params = _target_filters(
+        q, state, naics, min_signals, has_enforcement, has_recent_violations,
+        min_employees, max_employees, is_federal_contractor, is_nonprofit,
+        source_origin, has_research, gold_standard_tier,
+    )
+    sql = f"""
+        SELECT {", ".join("ts." + c for c in _EXPORT_COLUMNS)}
+        FROM mv_target_scorecard ts
+        WHERE {where}
+        ORDER BY {keyset_order_by(_sort_keys(sort, order))}
+        LIMIT %s
+    """
+    return export_response(
+        sql, params + [export_row_cap(request)], _EXPORT_COLUMNS,
+        fmt=format, filename="target_scorecard",
+    )
+
+
 @router.get("/api/targets/scorecard/{master_id:int}")
 def target_scorecard_detail(master_id: int):
     """Detailed signal inventory for a single non-union employer."""
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional, List
 from ..database import get_db
+from ..helpers import SortKey, count_total, keyset_order_by, keyset_page, keyset_select, keyset_where
 
 router = APIRouter()
 
@@ -87,6 +88,13 @@ def get_union_cities(
             return {"state": state.upper(), "cities": cur.fetchall()}
 
 
+# Sort keys for union search; f_num breaks ties for keyset paging.
+_SEARCH_KEYS = [
+    SortKey("um.members", desc=True),
+    SortKey("um.f_num", nullable=False),
+]
+
+
 @router.get("/api/unions/search")
 def search_unions(
     name: Optional[str] = None,
@@ -101,13 +109,16 @@ def search_unions(
     include_historical: bool = False,
     include_inactive: bool = False,
     limit: int = Query(50, le=500),
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    count: str = "exact",
 ):
     """Search unions with filters including display names and hierarchy type.
 
     By default, only shows current unions (yr_covered >= 2022) and excludes
     inactive unions. Set include_historical/include_inactive to override.
-    Accepts both 'name' and 'q' as search parameters.
+    Accepts both 'name' and 'q' as search parameters. Pass ``next_cursor``
+    back as ``cursor`` for the next page; ``count`` is exact|estimate|none.
     """
     # Accept both 'q' and 'name' for search term
     search_term = name or q
@@ -164,28 +175,35 @@ def search_unions(
             where_clause = " AND ".join(conditions)
 
             # Count query
-            cur.execute(f"""
-                SELECT COUNT(*) FROM unions_master um
+            total, total_is_estimate = count_total(cur, f"""
+                FROM unions_master um
                 LEFT JOIN v_union_display_names v ON um.f_num = v.f_num
                 WHERE {where_clause}
-            """, params)
-            total = cur.fetchone()['count']
+            """, params, count)
 
-            params.extend([limit, offset])
+            after_sql, after_params = keyset_where(_SEARCH_KEYS, cursor)
+            if cursor:
+                offset = 0
             cur.execute(f"""
                 SELECT um.f_num, um.union_name, v.display_name, um.local_number,
                     um.aff_abbr, um.desig_name, um.members, um.city, um.state,
                     um.sector, um.f7_employer_count, um.f7_total_workers, um.has_f7_employers,
-                    lm.ttl_assets, lm.ttl_receipts, um.is_likely_inactive
+                    lm.ttl_assets, lm.ttl_receipts, um.is_likely_inactive{keyset_select(_SEARCH_KEYS)}
                 FROM unions_master um
                 LEFT JOIN v_union_display_names v ON um.f_num = v.f_num
                 LEFT JOIN lm_data lm ON um.f_num = lm.f_num AND lm.yr_covered = 2024
-                WHERE {where_clause}
-                ORDER BY um.members DESC NULLS LAST
+                WHERE {where_clause} AND {after_sql}
+                ORDER BY {keyset_order_by(_SEARCH_KEYS)}
                 LIMIT %s OFFSET %s
-            """, params)
+            """, params + after_params + [limit, offset])
+            unions, next_cursor = keyset_page(cur.fetchall(), _SEARCH_KEYS, limit)
 
-            return {"total": total, "unions": cur.fetchall()}
+            return {
+                "total": total,
+                "total_is_estimate": total_is_estimate,
+                "unions": unions,
+                "next_cursor": next_cursor,
+            }
 
 
 @router.get("/api/unions/types")
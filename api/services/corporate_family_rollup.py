@@ -15,6 +15,10 @@ elections + ULPs + allegations + locations for a corporate family, given
 either the canonical master_id or a child entity. The caller gets the full
 national picture.
 
+Family members are read from the corporate_family_members stem index
+(scripts/scoring/build_corporate_family_index.py, part of the refresh_all
+chain); before it has been built the rollup falls back to ILIKE scans.
+
 Usage:
     from api.services.corporate_family_rollup import get_family_rollup
     rollup = get_family_rollup(conn, master_id=4598237)
@@ -161,7 +165,64 @@ def get_family_rollup_for_f7(
                        limit_recent_elections=limit_recent_elections, resolved_from_f7=f7_id)
 
 
-def _find_secondary_stem_via_parent(cur, stem: str, display_name: str) -> str | None:
+# ---------------------------------------------------------------------------
+# Member matching
+#
+# scripts/scoring/build_corporate_family_index.py copies every source row's
+# name(s) into corporate_family_members (source, member_key, member_name)
+# under a pg_trgm GIN index, so a rollup is the same `ILIKE ANY('%stem%')`
+# run against that one narrow, indexed table and joined back to each source
+# by key. Until the table exists the rollup falls back to scanning the
+# source tables directly. Both paths use the same patterns, so they find the
+# same members ("THE KROGER COMPANY" and "TARGET STORES INC #1234" contain
+# their family stem without sharing it as their own stem).
+# ---------------------------------------------------------------------------
+
+FAMILY_INDEX_TABLE = "corporate_family_members"
+
+# source -> (key column, cast of member_key to that column, name columns for ILIKE)
+_FAMILY_SOURCES = {
+    "master": ("master_id", "::bigint", ("display_name",)),
+    "nlrb": ("participant_name", "", ("participant_name",)),
+    "osha": ("establishment_id", "", ("estab_name",)),
+    "whd": ("id", "::integer", ("legal_name", "trade_name")),
+    "f7": ("employer_id", "", ("name_standard",)),
+}
+
+_has_family_index: bool | None = None
+
+
+def _check_family_index(cur) -> bool:
+    """Check (once per process) whether corporate_family_members has been built."""
+    global _has_family_index
+    if _has_family_index is None:
+        try:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL AS ok", (FAMILY_INDEX_TABLE,))
+            row = cur.fetchone()
+            _has_family_index = bool(row["ok"] if isinstance(row, dict) else row[0])
+        except Exception:
+            cur.connection.rollback()
+            _has_family_index = False
+    return _has_family_index
+
+
+def _family_match(source: str, alias: str, stems: list[str], use_index: bool) -> tuple[str, list]:
+    """WHERE-clause fragment selecting ``source`` rows in the family, plus its params."""
+    key, cast, name_cols = _FAMILY_SOURCES[source]
+    prefix = f"{alias}." if alias else ""
+    patterns = [f"%{s}%" for s in stems]
+    if use_index:
+        return (
+            f"{prefix}{key} IN (SELECT member_key{cast} FROM {FAMILY_INDEX_TABLE} "
+            f"WHERE source = '{source}' AND member_name ILIKE ANY(%s))",
+            [patterns],
+        )
+    clause = " OR ".join(f"{prefix}{col} ILIKE ANY(%s)" for col in name_cols)
+    return (f"({clause})" if len(name_cols) > 1 else clause), [patterns] * len(name_cols)
+
+
+def _find_secondary_stem_via_parent(cur, stem: str, display_name: str,
+                                    use_index: bool = False) -> str | None:
     """Look up `corporate_ultimate_parents` for an ultimate_parent whose name
     diverges from the primary stem (different root token). Returns the
     secondary stem, or None if no meaningful parent link exists.
@@ -171,22 +232,35 @@ def _find_secondary_stem_via_parent(cur, stem: str, display_name: str) -> str |
     INC" yields secondary stem `lowes companies`. Including both stems in
     the aggregation unifies the operating-sub + SEC-filer-parent view that
     a single-stem match would miss.
+
+    With the family index, the parent links are read from its 'parent' rows
+    (member_key = ultimate_parent_name, member_name = entity_name).
     """
     if not stem:
         return None
-    stem_pattern = f"%{stem}%"
     try:
-        cur.execute(
-            """
-            SELECT DISTINCT ultimate_parent_name
-            FROM corporate_ultimate_parents
-            WHERE entity_name ILIKE %s
-              AND ultimate_parent_name IS NOT NULL
-              AND ultimate_parent_name != entity_name
-            LIMIT 5
-            """,
-            (stem_pattern,),
-        )
+        if use_index:
+            cur.execute(
+                f"""
+                SELECT DISTINCT member_key AS ultimate_parent_name
+                FROM {FAMILY_INDEX_TABLE}
+                WHERE source = 'parent' AND member_name ILIKE %s
+                LIMIT 5
+                """,
+                (f"%{stem}%",),
+            )
+        else:
+            cur.execute(
+                """
+                SELECT DISTINCT ultimate_parent_name
+                FROM corporate_ultimate_parents
+                WHERE entity_name ILIKE %s
+                  AND ultimate_parent_name IS NOT NULL
+                  AND ultimate_parent_name != entity_name
+                LIMIT 5
+                """,
+                (f"%{stem}%",),
+            )
         rows = cur.fetchall()
     except Exception:
         return None
@@ -217,12 +291,13 @@ def _run_rollup(
     expand the match pattern to include both stems so the parent-side
     masters also flow into the counts.
     """
-    secondary_stem = _find_secondary_stem_via_parent(cur, stem, display_name)
+    use_index = _check_family_index(cur)
+    secondary_stem = _find_secondary_stem_via_parent(cur, stem, display_name, use_index)
     stems = [stem]
     if secondary_stem:
         stems.append(secondary_stem)
-    # List of ILIKE patterns, one per stem. All aggregation queries use
-    # `ILIKE ANY(%s)` so the primary AND secondary stems both flow in.
+    # List of ILIKE patterns, one per stem. Reported for both match methods;
+    # the ILIKE fallback aggregates with `ILIKE ANY(%s)` over these.
     stem_patterns = [f"%{s}%" for s in stems]
     # Keep stem_pattern for backward-compat -- it's what clients use when
     # they only want the primary.
@@ -236,32 +311,41 @@ def _run_rollup(
         "secondary_stem_via_parent": secondary_stem,
         "match_pattern": stem_pattern,
         "match_patterns": stem_patterns,       # list used by aggregation queries
+        "match_method": "family_index" if use_index else "ilike",
     }
     if resolved_from_f7:
         rollup["resolved_from_f7"] = resolved_from_f7
 
+    def match(source: str, alias: str = "") -> tuple[str, list]:
+        return _family_match(source, alias, stems, use_index)
+
     # Masters with any of the stem(s)
+    master_sql, master_params = match("master")
     cur.execute(
-        """
+        f"""
         SELECT source_origin, COUNT(*) AS n,
                COUNT(*) FILTER (WHERE employee_count > 0) AS with_emp,
                SUM(employee_count) AS total_reported_emp
         FROM master_employers
-        WHERE display_name ILIKE ANY(%s)
+        WHERE {master_sql}
         GROUP BY source_origin
         ORDER BY n DESC
         """,
-        (stem_patterns,),
+        master_params,
     )
     rollup["masters_by_source"] = [dict(r) for r in cur.fetchall()]
     rollup["master_count"] = sum(r["n"] for r in rollup["masters_by_source"])
 
     # --- NLRB ---
     nlrb: dict[str, Any] = {}
+    p_sql, p_params = match("nlrb", "p")
+    # Cases with a family participant, for the election / allegation queries
+    cases_sql, cases_params = match("nlrb")
+    family_cases = f"SELECT case_number FROM nlrb_participants WHERE {cases_sql}"
 
     # Totals by case type
     cur.execute(
-        """
+        f"""
         SELECT COUNT(DISTINCT p.case_number) AS total,
                COUNT(DISTINCT CASE WHEN c.case_type LIKE 'RC%%' THEN p.case_number END) AS rc,
                COUNT(DISTINCT CASE WHEN c.case_type LIKE 'CA%%' THEN p.case_number END) AS ca,
@@ -272,26 +356,24 @@ def _run_rollup(
                MAX(c.latest_date) AS latest
         FROM nlrb_participants p
         JOIN nlrb_cases c ON c.case_number = p.case_number
-        WHERE p.participant_name ILIKE ANY(%s)
+        WHERE {p_sql}
         """,
-        (stem_patterns,),
+        p_params,
     )
     nlrb["totals"] = dict(cur.fetchone())
 
     # Elections summary
     cur.execute(
-        """
+        f"""
         SELECT COUNT(DISTINCT e.case_number) AS total_elections,
                COUNT(DISTINCT CASE WHEN e.union_won THEN e.case_number END) AS union_won,
                COUNT(DISTINCT CASE WHEN NOT e.union_won THEN e.case_number END) AS union_lost,
                SUM(e.total_votes) AS total_votes,
                SUM(e.eligible_voters) AS total_eligible
         FROM nlrb_elections e
-        WHERE e.case_number IN (
-            SELECT case_number FROM nlrb_participants WHERE participant_name ILIKE ANY(%s)
-        )
+        WHERE e.case_number IN ({family_cases})
         """,
-        (stem_patterns,),
+        cases_params,
     )
     row = cur.fetchone()
     row = dict(row)
@@ -302,17 +384,17 @@ def _run_rollup(
 
     # Elections by year
     cur.execute(
-        """
+        f"""
         SELECT EXTRACT(YEAR FROM e.election_date)::int AS year,
                COUNT(*) AS total,
                COUNT(*) FILTER (WHERE e.union_won) AS won,
                COUNT(*) FILTER (WHERE NOT e.union_won) AS lost
         FROM nlrb_elections e
-        WHERE e.case_number IN (SELECT case_number FROM nlrb_participants WHERE participant_name ILIKE ANY(%s))
+        WHERE e.case_number IN ({family_cases})
           AND e.election_date IS NOT NULL
         GROUP BY 1 ORDER BY 1
         """,
-        (stem_patterns,),
+        cases_params,
     )
     nlrb["elections_by_year"] = [dict(r) for r in cur.fetchall()]
 
@@ -321,67 +403,69 @@ def _run_rollup(
     # source record, even when city/state are NULL in the bulk participant
     # data (~43% of Starbucks rows). The URL is backfilled by the
     # `nlrb_participants_case_docket_url_migration.sql` trigger.
+    p2_sql, p2_params = match("nlrb", "p2")
+    p3_sql, p3_params = match("nlrb", "p3")
     cur.execute(
-        """
+        f"""
         SELECT e.case_number, e.election_date, e.union_won, e.total_votes,
                e.eligible_voters, e.vote_margin, e.election_type,
                'https://www.nlrb.gov/case/' || e.case_number AS case_docket_url,
                (SELECT STRING_AGG(DISTINCT pu.participant_name, '; ') FROM nlrb_participants pu
                 WHERE pu.case_number = e.case_number AND pu.participant_type = 'Union') AS unions,
                (SELECT STRING_AGG(DISTINCT CONCAT_WS(', ', p2.city, p2.state), '; ') FROM nlrb_participants p2
-                WHERE p2.case_number = e.case_number AND p2.participant_name ILIKE ANY(%s)) AS store_locations,
+                WHERE p2.case_number = e.case_number AND {p2_sql}) AS store_locations,
                (SELECT STRING_AGG(DISTINCT p3.participant_name, '; ') FROM nlrb_participants p3
-                WHERE p3.case_number = e.case_number AND p3.participant_name ILIKE ANY(%s)) AS respondent_names
+                WHERE p3.case_number = e.case_number AND {p3_sql}) AS respondent_names
         FROM nlrb_elections e
-        WHERE e.case_number IN (SELECT case_number FROM nlrb_participants WHERE participant_name ILIKE ANY(%s))
+        WHERE e.case_number IN ({family_cases})
         ORDER BY e.election_date DESC NULLS LAST
         LIMIT %s
         """,
-        (stem_patterns, stem_patterns, stem_patterns, limit_recent_elections),
+        [*p2_params, *p3_params, *cases_params, limit_recent_elections],
     )
     nlrb["recent_elections"] = [dict(r) for r in cur.fetchall()]
 
     # ULP allegations by NLRA section
     cur.execute(
-        """
+        f"""
         SELECT a.section, COUNT(*) AS n, COUNT(DISTINCT a.case_number) AS distinct_cases
         FROM nlrb_allegations a
-        WHERE a.case_number IN (SELECT case_number FROM nlrb_participants WHERE participant_name ILIKE ANY(%s))
+        WHERE a.case_number IN ({family_cases})
         GROUP BY a.section
         ORDER BY n DESC
         LIMIT 30
         """,
-        (stem_patterns,),
+        cases_params,
     )
     nlrb["allegations_by_section"] = [dict(r) for r in cur.fetchall()]
 
     # Respondent name variants
     cur.execute(
-        """
+        f"""
         SELECT p.participant_name, COUNT(DISTINCT p.case_number) AS cases
         FROM nlrb_participants p
-        WHERE p.participant_name ILIKE ANY(%s)
+        WHERE {p_sql}
         GROUP BY p.participant_name
         ORDER BY cases DESC
         LIMIT 50
         """,
-        (stem_patterns,),
+        p_params,
     )
     nlrb["respondent_variants"] = [dict(r) for r in cur.fetchall()]
 
     # States with elections
     cur.execute(
-        """
+        f"""
         SELECT p.state, COUNT(DISTINCT e.case_number) AS elections,
                COUNT(DISTINCT CASE WHEN e.union_won THEN e.case_number END) AS won,
                COUNT(DISTINCT CASE WHEN NOT e.union_won THEN e.case_number END) AS lost
         FROM nlrb_elections e
         JOIN nlrb_participants p ON p.case_number = e.case_number
-        WHERE p.participant_name ILIKE ANY(%s) AND p.state IS NOT NULL
+        WHERE {p_sql} AND p.state IS NOT NULL
         GROUP BY p.state
         ORDER BY elections DESC
         """,
-        (stem_patterns,),
+        p_params,
     )
     nlrb["elections_by_state"] = [dict(r) for r in cur.fetchall()]
 
@@ -389,8 +473,9 @@ def _run_rollup(
 
     # --- OSHA ---
     try:
+        osha_sql, osha_params = match("osha")
         cur.execute(
-            """
+            f"""
             SELECT COUNT(*) AS establishments,
                    COUNT(DISTINCT site_state) AS states_covered,
                    SUM(employee_count) AS total_reported_emp,
@@ -398,14 +483,15 @@ def _run_rollup(
                    MIN(first_inspection_date) AS earliest_inspection,
                    MAX(last_inspection_date) AS latest_inspection
             FROM osha_establishments
-            WHERE estab_name ILIKE ANY(%s)
+            WHERE {osha_sql}
             """,
-            (stem_patterns,),
+            osha_params,
         )
         osha = {"totals": dict(cur.fetchone())}
 
+        e_sql, e_params = match("osha", "e")
         cur.execute(
-            """
+            f"""
             SELECT v.violation_type,
                    SUM(v.violation_count) AS n,
                    SUM(v.total_penalties) AS total_penalties,
@@ -413,11 +499,11 @@ def _run_rollup(
                    MAX(v.last_violation_date) AS latest
             FROM osha_violation_summary v
             JOIN osha_establishments e ON e.establishment_id = v.establishment_id
-            WHERE e.estab_name ILIKE ANY(%s)
+            WHERE {e_sql}
             GROUP BY v.violation_type
             ORDER BY n DESC
             """,
-            (stem_patterns,),
+            e_params,
         )
         osha["violations_by_type"] = [dict(r) for r in cur.fetchall()]
         rollup["osha"] = osha
@@ -426,8 +512,9 @@ def _run_rollup(
 
     # --- WHD ---
     try:
+        whd_sql, whd_params = match("whd")
         cur.execute(
-            """
+            f"""
             SELECT COUNT(*) AS cases,
                    SUM(backwages_amount::numeric) AS total_back_wages,
                    SUM(civil_penalties::numeric) AS total_civil_penalties,
@@ -439,9 +526,9 @@ def _run_rollup(
                    MIN(findings_start_date) AS earliest,
                    MAX(findings_end_date) AS latest
             FROM whd_cases
-            WHERE legal_name ILIKE ANY(%s) OR trade_name ILIKE ANY(%s)
+            WHERE {whd_sql}
             """,
-            (stem_patterns, stem_patterns),
+            whd_params,
         )
         rollup["whd"] = {"totals": dict(cur.fetchone())}
     except Exception as e:
@@ -449,15 +536,16 @@ def _run_rollup(
 
     # --- F-7 union locals ---
     try:
+        f7_sql, f7_params = match("f7")
         cur.execute(
-            """
+            f"""
             SELECT COUNT(*) AS locals_count,
                    COUNT(DISTINCT state) AS states_covered,
                    STRING_AGG(DISTINCT state, ',' ORDER BY state) AS state_list
             FROM f7_employers_deduped
-            WHERE name_standard ILIKE ANY(%s)
+            WHERE {f7_sql}
             """,
-            (stem_patterns,),
+            f7_params,
         )
         rollup["f7"] = dict(cur.fetchone())
     except Exception as e:
@@ -9,17 +9,29 @@ Sealed holdout results:
   V12:  Race=4.083  Hispanic=6.438  Gender=9.726
 
 Loads three artifacts at startup:
-  1. QWI cache   (~77 MB JSON, 255,672 primary county x NAICS4 cells)
+  1. QWI cache   (255,672 primary county x NAICS4 cells; the mmap'd binary
+                  from qwi_binary.py when built, else the ~77 MB JSON)
   2. Calibration offsets (from export_v12.py)
   3. Hispanic weights    (industry + tier overrides, from export_v12.py)
 
 All three are lazy-loaded on first request so the API starts up fast.
+
+The estimate depends only on the (naics4, state_fips, county_fips, zip5)
+cell and those artifacts, so estimate_demographics_v12_cached() serves it
+from an in-process cache, then from the demographics_v12_cells table
+(filled by build_v12_cell_cache.py), and only computes live on a miss.
+Cached cells are tagged with model_fingerprint(); replacing any artifact
+changes the fingerprint, which reloads the models and orphans old cells.
 """
 import os
 import sys
 import json
+import time
+import hashlib
 import logging
 
+from ..helpers import TTLCache
+
 logger = logging.getLogger(__name__)
 
 # Add demographics scripts dir to sys.path so we can import the pipeline
@@ -43,6 +55,127 @@ D_RACE = 0.85
 D_HISP = 0.50
 D_GENDER = 0.95
 
+# Precomputed cell cache
+CELL_TABLE = 'demographics_v12_cells'
+CELL_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS demographics_v12_cells (
+        naics4 TEXT NOT NULL,
+        state_fips TEXT NOT NULL,
+        county_fips TEXT NOT NULL,
+        zip5 TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        result JSONB,              -- NULL: model has no estimate for this cell
+        computed_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (naics4, state_fips, county_fips, zip5)
+    )
+"""
+FINGERPRINT_RECHECK_SECONDS = 30
+_TABLE_RECHECK_SECONDS = 60
+
+_cell_cache = TTLCache(ttl_seconds=6 * 3600, max_entries=50000, name="demographics_cell")
+_fingerprint = None          # (checked_at, file_stats, sha256 hex)
+_cell_table_state = None     # (checked_at, exists)
+_MISS = object()
+
+
+def _fingerprint_files():
+    from qwi_binary import cache_files  # the QWI file(s) QWICache() will load
+    return [
+        os.path.join(API_DATA_DIR, 'v12_calibration.json'),
+        os.path.join(API_DATA_DIR, 'v12_hispanic_weights.json'),
+    ] + cache_files()
+
+
+def _file_stats(paths):
+    stats = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stats.append((path, st.st_size, st.st_mtime_ns))
+        except OSError:
+            stats.append((path, None, None))
+    return tuple(stats)
+
+
+def _hash_files(stats):
+    h = hashlib.sha256()
+    for path, size, _mtime in stats:
+        h.update(os.path.basename(path).encode('utf-8'))
+        if size is None:
+            h.update(b'<missing>')
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()
+
+
+def model_fingerprint():
+    """sha256 over the calibration, Hispanic weights and QWI cache files.
+
+    Files are only re-hashed when their size/mtime changes (checked at most
+    every FINGERPRINT_RECHECK_SECONDS). A new fingerprint drops the in-process
+    cell cache and forces the models to reload on the next estimate.
+    """
+    global _fingerprint, _models_loaded
+    now = time.time()
+    if _fingerprint and now - _fingerprint[0] < FINGERPRINT_RECHECK_SECONDS:
+        return _fingerprint[2]
+    stats = _file_stats(_fingerprint_files())
+    if _fingerprint and _fingerprint[1] == stats:
+        _fingerprint = (now, stats, _fingerprint[2])
+        return _fingerprint[2]
+    digest = _hash_files(stats)
+    if _fingerprint and _fingerprint[2] != digest:
+        logger.info('V12 artifacts changed (fingerprint %s -> %s); reloading' % (
+            _fingerprint[2][:12], digest[:12]))
+        _cell_cache.clear()
+        _models_loaded = False
+    _fingerprint = (now, stats, digest)
+    return digest
+
+
+def cell_key(naics, state_fips, county_fips, zipcode):
+    """Normalize estimator inputs to the cell the V12 result depends on."""
+    return (
+        (naics or '').strip()[:4],
+        (state_fips or '').strip(),
+        (county_fips or '').strip(),
+        (zipcode or '').strip()[:5],
+    )
+
+
+def _first_value(row):
+    if row is None:
+        return None
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+
+def _cell_table_exists(cur):
+    global _cell_table_state
+    now = time.time()
+    if _cell_table_state and now - _cell_table_state[0] < _TABLE_RECHECK_SECONDS:
+        return _cell_table_state[1]
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL AS ok", [CELL_TABLE])
+    exists = bool(_first_value(cur.fetchone()))
+    _cell_table_state = (now, exists)
+    return exists
+
+
+def _lookup_cell(cur, key, fingerprint):
+    """Stored result for a cell, None for a stored no-estimate, else _MISS."""
+    if not _cell_table_exists(cur):
+        return _MISS
+    cur.execute(
+        "SELECT result FROM " + CELL_TABLE + " "
+        "WHERE naics4 = %s AND state_fips = %s AND county_fips = %s AND zip5 = %s "
+        "AND fingerprint = %s",
+        list(key) + [fingerprint])
+    row = cur.fetchone()
+    if row is None:
+        return _MISS
+    return _first_value(row)
+
 
 def _deserialize_offsets(serialized_offsets):
     """Turn pipe-delimited string keys back into tuples.
@@ -244,3 +377,32 @@ def _detect_qwi_level(county_fips, naics4):
         if cell and 'race' in cell:
             return level
     return 'none'
+
+
+def estimate_demographics_v12_cached(cur, naics, state_fips, zipcode, county_fips,
+                                     state_abbr=None, total_employees=100):
+    """estimate_demographics_v12 served from the cell cache when possible.
+
+    Same arguments and return value. Lookup order: in-process cache,
+    demographics_v12_cells (current fingerprint only), live compute. Live
+    results are kept in-process; only the batch job writes the table.
+    total_employees does not affect the V12 estimate and is not part of
+    the key.
+    """
+    fingerprint = model_fingerprint()
+    key = cell_key(naics, state_fips, county_fips, zipcode)
+    mem_key = '|'.join(key + (fingerprint,))
+    hit = _cell_cache.get(mem_key)
+    if hit is not None:
+        return hit[0]
+
+    result = _lookup_cell(cur, key, fingerprint)
+    if result is _MISS:
+        result = estimate_demographics_v12(
+            cur, naics, state_fips, zipcode, county_fips,
+            state_abbr=state_abbr, total_employees=total_employees)
+        if result is None:
+            # Could be a transient failure; don't pin it in memory.
+            return None
+    _cell_cache.set(mem_key, (result,))
+    return result
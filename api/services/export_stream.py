@@ -0,0 +1,206 @@
+"""
+Streaming table exports (CSV, gzip-CSV, Parquet) for the scorecard endpoints.
+
+Rows come from a server-side cursor (database.stream_rows) and are encoded
+batch by batch, so memory stays flat no matter how many rows an export
+covers. The first batch is fetched before the response starts: connection
+and SQL errors still surface as normal HTTP errors instead of a truncated
+200.
+
+Parquet needs pyarrow (optional); without it format=parquet returns 400.
+
+Usage:
+    from api.services.export_stream import export_response, export_row_cap
+
+    return export_response(
+        sql, params, columns=EXPORT_COLUMNS, fmt=format,
+        filename="scorecard_export", row_hook=add_recommended_action,
+    )
+"""
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from ..config import ALLOW_INSECURE_ADMIN, JWT_SECRET
+from ..database import stream_rows
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+EXPORT_FORMATS = ("csv", "csv.gz", "parquet")
+EXPORT_FORMAT_PATTERN = r"^(csv|csv\.gz|parquet)$"
+
+# Row cap for anonymous/read-role exports. Researchers and admins (the spec's
+# CSV-export tier) get uncapped exports.
+EXPORT_ROW_CAP = 10000
+BATCH_SIZE = 5000
+
+_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def export_row_cap(request: Request) -> Optional[int]:
+    """LIMIT for this caller's export, or None for uncapped."""
+    if not JWT_SECRET:
+        return None if ALLOW_INSECURE_ADMIN else EXPORT_ROW_CAP
+    role = getattr(request.state, "role", None)
+    return None if role in ("admin", "researcher") else EXPORT_ROW_CAP
+
+
+def _iter_csv(batches: Iterable[list], columns: list) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for rows in batches:
+        for row in rows:
+            writer.writerow([row.get(c) for c in columns])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def _iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    comp = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        out = comp.compress(chunk)
+        if out:
+            yield out
+    yield comp.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back out in pieces."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_type(values):
+    """Arrow type for a column, from its first non-null Python value."""
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, bool):
+            return pa.bool_()
+        if isinstance(v, int):
+            return pa.int64()
+        if isinstance(v, (float, Decimal)):
+            return pa.float64()
+        if isinstance(v, datetime):
+            return pa.timestamp("us")
+        if isinstance(v, date):
+            return pa.date32()
+        return pa.string()
+    return pa.string()
+
+
+def _arrow_value(v, typ):
+    if v is None:
+        return None
+    if pa.types.is_floating(typ):
+        return float(v)
+    if pa.types.is_string(typ) and not isinstance(v, str):
+        return str(v)
+    return v
+
+
+def _iter_parquet(batches: Iterable[list], columns: list) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    writer = None
+    schema = None
+    for rows in batches:
+        if schema is None:
+            schema = pa.schema([(c, _arrow_type(r.get(c) for r in rows)) for c in columns])
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        arrays = [
+            pa.array([_arrow_value(r.get(f.name), f.type) for r in rows], type=f.type)
+            for f in schema
+        ]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        data = sink.drain()
+        if data:
+            yield data
+    if writer is None:
+        schema = pa.schema([(c, pa.string()) for c in columns])
+        writer = pq.ParquetWriter(sink, schema)
+    writer.close()
+    yield sink.drain()
+
+
+def export_response(
+    sql: str,
+    params: list,
+    columns: list,
+    fmt: str = "csv",
+    filename: str = "export",
+    row_hook: Optional[Callable[[dict], None]] = None,
+) -> StreamingResponse:
+    """Stream ``sql`` as csv / csv.gz / parquet with the given column order."""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if fmt == "parquet" and not HAS_PYARROW:
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow on the server")
+
+    source = stream_rows(sql, params, batch_size=BATCH_SIZE)
+    first = next(source, None)  # surface DB errors before headers go out
+
+    def batches():
+        try:
+            if first is None:
+                return
+            for rows in itertools.chain([first], source):
+                if row_hook:
+                    for r in rows:
+                        row_hook(r)
+                yield rows
+        finally:
+            source.close()
+
+    if fmt == "parquet":
+        body = _iter_parquet(batches(), columns)
+    else:
+        body = _iter_csv(batches(), columns)
+        if fmt == "csv.gz":
+            body = _iter_gzip(body)
+
+    return StreamingResponse(
+        body,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}.{fmt}"},
+    )
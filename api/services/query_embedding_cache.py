@@ -0,0 +1,228 @@
+"""Embedding cache for CBA semantic search queries.
+
+Every /api/cba/semantic-search request used to embed its query with a
+synchronous Gemini call, including repeats of the same query and every page
+of the same result set. Query embeddings only depend on (model, task type,
+query text), so they are served from:
+
+  1. an in-process LRU (QUERY_LRU_SIZE entries),
+  2. the cba_query_embeddings table, shared by all workers and restarts,
+  3. Gemini, only on a miss in both; the result is written to both layers.
+
+Query text is normalized (NFKC, case-folded, whitespace collapsed) before
+it is keyed and embedded, so "Sick Leave " and "sick leave" share a row.
+The table keeps hit counts, which doubles as the log of common queries: the
+first lookup in a process prewarms the LRU with the PREWARM_SIZE most-hit
+rows, and scripts/cba/prewarm_query_embeddings.py seeds the table ahead of
+time.
+
+Table errors are logged and treated as misses; the cache never fails a
+search that the embedding API could still answer.
+"""
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from ..database import get_db
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'cba_query_embeddings'
+TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS cba_query_embeddings (
+        model TEXT NOT NULL,
+        task_type TEXT NOT NULL,
+        query_norm TEXT NOT NULL,
+        embedding REAL[] NOT NULL,
+        hit_count INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT NOW(),
+        last_used_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (model, task_type, query_norm)
+    )
+"""
+QUERY_LRU_SIZE = 2000
+PREWARM_SIZE = 500
+HIT_FLUSH_EVERY = 50      # buffered LRU hits before their counts are written
+_TABLE_RECHECK_SECONDS = 60
+
+
+class LRUCache:
+    """Thread-safe least-recently-used map with a fixed number of entries."""
+
+    def __init__(self, max_entries):
+        self._data = OrderedDict()
+        self._max = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._max:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_lru = LRUCache(QUERY_LRU_SIZE)
+_table_state = None          # (checked_at, usable)
+_prewarmed = False
+_pending_hits = {}           # key -> LRU hits not yet added to hit_count
+_state_lock = threading.Lock()
+
+
+def normalize_query(query):
+    """Canonical form of a search query: NFKC, case-folded, single spaces."""
+    return ' '.join(unicodedata.normalize('NFKC', query or '').casefold().split())
+
+
+def _table_usable(cur):
+    """Create the table on first use; remember failures for a minute."""
+    global _table_state
+    now = time.time()
+    if _table_state and now - _table_state[0] < _TABLE_RECHECK_SECONDS:
+        return _table_state[1]
+    try:
+        cur.execute(TABLE_DDL)
+        usable = True
+    except Exception as e:
+        logger.warning('Query embedding table unavailable: %s' % e)
+        cur.connection.rollback()
+        usable = False
+    _table_state = (now, usable)
+    return usable
+
+
+def _flush_hits(cur):
+    with _state_lock:
+        pending = list(_pending_hits.items())
+        _pending_hits.clear()
+    if not pending:
+        return
+    cur.executemany("""
+        UPDATE cba_query_embeddings
+        SET hit_count = hit_count + %s, last_used_at = NOW()
+        WHERE model = %s AND task_type = %s AND query_norm = %s
+    """, [(n,) + key for key, n in pending])
+
+
+def prewarm(cur, limit=PREWARM_SIZE):
+    """Load the most-hit stored query embeddings into the LRU."""
+    cur.execute("""
+        SELECT model, task_type, query_norm, embedding
+        FROM cba_query_embeddings
+        ORDER BY hit_count DESC, last_used_at DESC
+        LIMIT %s
+    """, [limit])
+    rows = cur.fetchall()
+    # Least-hit first, so the most common queries end up most recently used.
+    for row in reversed(rows):
+        _lru.set((row['model'], row['task_type'], row['query_norm']), list(row['embedding']))
+    return len(rows)
+
+
+def _lookup_table(key):
+    """(embedding or None) from the table, counting the hit; None on any error."""
+    global _prewarmed
+    try:
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                if not _table_usable(cur):
+                    return None
+                if not _prewarmed:
+                    _prewarmed = True
+                    n = prewarm(cur)
+                    if n:
+                        logger.info('Prewarmed %d query embeddings' % n)
+                cur.execute("""
+                    UPDATE cba_query_embeddings
+                    SET hit_count = hit_count + 1, last_used_at = NOW()
+                    WHERE model = %s AND task_type = %s AND query_norm = %s
+                    RETURNING embedding
+                """, list(key))
+                row = cur.fetchone()
+                _flush_hits(cur)
+                return list(row['embedding']) if row else None
+    except Exception as e:
+        logger.warning('Query embedding lookup failed: %s' % e)
+        return None
+
+
+def store(key, embedding):
+    """Write a fresh embedding to the table (and flush buffered hit counts)."""
+    try:
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                if not _table_usable(cur):
+                    return
+                cur.execute("""
+                    INSERT INTO cba_query_embeddings (model, task_type, query_norm, embedding, hit_count)
+                    VALUES (%s, %s, %s, %s, 1)
+                    ON CONFLICT (model, task_type, query_norm) DO UPDATE
+                    SET embedding = EXCLUDED.embedding, last_used_at = NOW()
+                """, list(key) + [embedding])
+                _flush_hits(cur)
+    except Exception as e:
+        logger.warning('Query embedding store failed: %s' % e)
+
+
+def _count_lru_hit(key):
+    with _state_lock:
+        _pending_hits[key] = _pending_hits.get(key, 0) + 1
+        due = sum(_pending_hits.values()) >= HIT_FLUSH_EVERY
+    if due:
+        try:
+            with get_db() as conn:
+                with conn.cursor() as cur:
+                    _flush_hits(cur)
+        except Exception as e:
+            logger.warning('Query embedding hit flush failed: %s' % e)
+
+
+def get_query_embedding(query, model, task_type, embed_fn):
+    """Embedding for a search query, plus where it came from.
+
+    embed_fn(normalized_text) -> list[float] is only called on a miss.
+    Returns (embedding, source) with source 'memory', 'table' or 'api'.
+    """
+    text = normalize_query(query)
+    key = (model, task_type, text)
+
+    value = _lru.get(key)
+    if value is not None:
+        _count_lru_hit(key)
+        return value, 'memory'
+
+    value = _lookup_table(key)
+    if value is not None:
+        _lru.set(key, value)
+        return value, 'table'
+
+    value = embed_fn(text)
+    _lru.set(key, value)
+    store(key, value)
+    return value, 'api'
+
+
+def clear_cache():
+    """Drop the in-process layer (the table is left alone)."""
+    global _prewarmed, _table_state
+    _lru.clear()
+    with _state_lock:
+        _pending_hits.clear()
+    _prewarmed = False
+    _table_state = None
@@ -0,0 +1,404 @@
+"""Precomputed platform statistics for the dashboard endpoints.
+
+/api/summary, /api/stats, /api/stats/breakdown (unfiltered),
+/api/health/details and /api/employers/data-coverage used to aggregate over
+f7_employers_deduped, unions_master, nlrb_elections, nlrb_cases,
+unified_match_log and the employer MVs on every page load. Their payloads
+only change when the data does, so each one is stored as a metric in
+platform_stats_snapshot (one JSONB value and a computed_at per metric):
+
+  * scripts/scoring/refresh_all.py recomputes every metric after the chain,
+  * etl_log.log_etl_run() recomputes the metrics that read the loaded table,
+  * scripts/maintenance/refresh_stats_snapshot.py does either by hand,
+  * a metric read before it was ever computed is computed and stored then.
+
+Endpoints read a metric by primary key; ?live=true (admins) recomputes it.
+"""
+import json
+import logging
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from psycopg2.extras import RealDictCursor
+
+from ..database import get_db
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'platform_stats_snapshot'
+TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS platform_stats_snapshot (
+        metric TEXT PRIMARY KEY,
+        value JSONB NOT NULL,
+        computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        compute_ms INTEGER
+    )
+"""
+UPSERT_SQL = """
+    INSERT INTO platform_stats_snapshot (metric, value, computed_at, compute_ms)
+    VALUES (%s, %s::jsonb, NOW(), %s)
+    ON CONFLICT (metric) DO UPDATE
+    SET value = EXCLUDED.value, computed_at = EXCLUDED.computed_at,
+        compute_ms = EXCLUDED.compute_ms
+    RETURNING computed_at
+"""
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+def compute_summary(cur):
+    """Payload of /api/summary."""
+    # Unions
+    cur.execute("""
+        SELECT COUNT(*) as total_unions, SUM(um.members) as total_members,
+            SUM(CASE WHEN uh.count_members THEN um.members ELSE 0 END) as deduplicated_members,
+            COUNT(DISTINCT um.aff_abbr) as affiliations
+        FROM unions_master um
+        LEFT JOIN union_hierarchy uh ON um.f_num = uh.f_num
+    """)
+    unions = cur.fetchone()
+
+    # Employers (with deduplication stats)
+    cur.execute("""
+        SELECT COUNT(*) as total_employers,
+            SUM(latest_unit_size) as total_workers_raw,
+            SUM(CASE WHEN exclude_from_counts = FALSE THEN latest_unit_size ELSE 0 END) as covered_workers,
+            COUNT(DISTINCT state) as states,
+            COUNT(CASE WHEN exclude_from_counts = TRUE THEN 1 END) as excluded_records,
+            ROUND(100.0 * SUM(CASE WHEN exclude_from_counts = FALSE THEN latest_unit_size ELSE 0 END) / 7200000, 1) as bls_coverage_pct
+        FROM f7_employers_deduped
+    """)
+    employers = cur.fetchone()
+
+    # NLRB
+    cur.execute("""
+        SELECT COUNT(*) as total_elections,
+            SUM(CASE WHEN union_won THEN 1 ELSE 0 END) as union_wins,
+            ROUND(100.0 * SUM(CASE WHEN union_won THEN 1 ELSE 0 END) /
+                NULLIF(COUNT(*), 0), 1) as win_rate
+        FROM nlrb_elections WHERE union_won IS NOT NULL
+    """)
+    elections = cur.fetchone()
+
+    cur.execute("""
+        SELECT COUNT(*) as total_cases
+        FROM nlrb_cases c
+        JOIN nlrb_case_types ct ON c.case_type = ct.case_type
+        WHERE ct.case_category = 'unfair_labor_practice'
+    """)
+    ulp = cur.fetchone()
+
+    # Voluntary Recognition
+    cur.execute("""
+        SELECT COUNT(*) as total_cases,
+               COUNT(matched_employer_id) as employers_matched,
+               COUNT(matched_union_fnum) as unions_matched,
+               SUM(COALESCE(num_employees, 0)) as total_employees
+        FROM nlrb_voluntary_recognition
+    """)
+    vr = cur.fetchone()
+
+    return {
+        "unions": unions,
+        "employers": employers,
+        "nlrb": {
+            "elections": elections,
+            "ulp_cases": ulp['total_cases']
+        },
+        "voluntary_recognition": vr
+    }
+
+
+def compute_system_stats(cur):
+    """Payload of /api/stats."""
+    cur.execute("SELECT COUNT(*) AS total FROM f7_employers_deduped")
+    total_employers = cur.fetchone()["total"]
+
+    cur.execute("SELECT COUNT(*) AS total FROM mv_organizing_scorecard")
+    total_scorecard_rows = cur.fetchone()["total"]
+
+    cur.execute("""
+        SELECT source_system, COUNT(*) AS match_count
+        FROM unified_match_log
+        WHERE status = 'active'
+        GROUP BY source_system
+        ORDER BY source_system
+    """)
+    matches_by_source = cur.fetchall()
+
+    cur.execute("""
+        SELECT started_at
+        FROM match_runs
+        ORDER BY started_at DESC NULLS LAST
+        LIMIT 1
+    """)
+    last_run = cur.fetchone()
+
+    return {
+        "total_employers": total_employers,
+        "total_scorecard_rows": total_scorecard_rows,
+        "match_counts_by_source": matches_by_source,
+        "last_match_run_timestamp": (
+            last_run["started_at"].isoformat()
+            if last_run and last_run.get("started_at")
+            else None
+        ),
+    }
+
+
+def compute_stats_breakdown(cur, state=None, naics_code=None, cbsa_code=None, name=None):
+    """Payload of /api/stats/breakdown; only the unfiltered one is snapshotted."""
+    # Build WHERE clause (use f. prefix for joined queries)
+    conditions = ["f.exclude_from_counts = FALSE"]
+    params = []
+
+    if state:
+        conditions.append("f.state = %s")
+        params.append(state)
+    if naics_code:
+        conditions.append("f.naics LIKE %s")
+        params.append(f"{naics_code}%")
+    if cbsa_code:
+        conditions.append("f.cbsa_code = %s")
+        params.append(cbsa_code)
+    if name:
+        conditions.append("f.employer_name ILIKE %s")
+        params.append(f"%{name}%")
+
+    where_clause = " AND ".join(conditions)
+
+    # Totals
+    cur.execute(f"""
+        SELECT COUNT(*) as total_employers,
+               COALESCE(SUM(f.latest_unit_size), 0) as total_workers,
+               COUNT(DISTINCT f.latest_union_fnum) as total_locals
+        FROM f7_employers_deduped f
+        WHERE {where_clause}
+    """, params)
+    totals = cur.fetchone()
+
+    # By Industry (top 5 NAICS 2-digit)
+    cur.execute(f"""
+        SELECT LEFT(f.naics, 2) as naics_code,
+               COALESCE(ns.sector_name, LEFT(f.naics, 2)) as industry_name,
+               COUNT(*) as employer_count, COALESCE(SUM(f.latest_unit_size), 0) as worker_count
+        FROM f7_employers_deduped f
+        LEFT JOIN naics_sectors ns ON LEFT(f.naics, 2) = ns.naics_2digit
+        WHERE {where_clause} AND f.naics IS NOT NULL AND LENGTH(f.naics) >= 2
+        GROUP BY LEFT(f.naics, 2), ns.sector_name
+        ORDER BY worker_count DESC NULLS LAST
+        LIMIT 5
+    """, params)
+    by_industry = cur.fetchall()
+
+    # By Metro (top 5)
+    cur.execute(f"""
+        SELECT f.cbsa_code, COALESCE(c.cbsa_title, f.cbsa_code) as metro_name,
+               COUNT(*) as employer_count, COALESCE(SUM(latest_unit_size), 0) as worker_count
+        FROM f7_employers_deduped f
+        LEFT JOIN cbsa_definitions c ON f.cbsa_code = c.cbsa_code
+        WHERE {where_clause} AND f.cbsa_code IS NOT NULL
+        GROUP BY f.cbsa_code, c.cbsa_title
+        ORDER BY worker_count DESC NULLS LAST
+        LIMIT 5
+    """, params)
+    by_metro = cur.fetchall()
+
+    # By Sector (union sector - Private, Public, Federal, RLA)
+    cur.execute(f"""
+        SELECT COALESCE(um.sector, 'Unknown') as sector_name,
+               COUNT(*) as employer_count, COALESCE(SUM(f.latest_unit_size), 0) as worker_count
+        FROM f7_employers_deduped f
+        LEFT JOIN unions_master um ON f.latest_union_fnum::text = um.f_num
+        WHERE {where_clause}
+        GROUP BY um.sector
+        ORDER BY worker_count DESC NULLS LAST
+    """, params)
+    by_sector = cur.fetchall()
+
+    return {
+        "totals": totals,
+        "by_sector": by_sector,
+        "by_industry": by_industry,
+        "by_metro": by_metro
+    }
+
+
+def compute_health_counts(cur):
+    """Record counts reported by /api/health/details."""
+    cur.execute("SELECT COUNT(*) as vr FROM nlrb_voluntary_recognition")
+    vr_count = cur.fetchone()['vr']
+    cur.execute("SELECT COUNT(*) as osha FROM osha_establishments")
+    osha_count = cur.fetchone()['osha']
+    cur.execute("SELECT COUNT(*) as ind FROM bls_industry_projections")
+    ind_count = cur.fetchone()['ind']
+    cur.execute("SELECT COUNT(*) as occ FROM bls_industry_occupation_matrix")
+    occ_count = cur.fetchone()['occ']
+    # NAICS granularity stats
+    cur.execute("""
+        SELECT COUNT(*) FILTER (WHERE naics_source = 'OSHA') as osha_enriched,
+               COUNT(*) FILTER (WHERE LENGTH(naics_detailed) = 6) as six_digit_naics
+        FROM f7_employers_deduped
+    """)
+    naics_stats = cur.fetchone()
+    return {
+        "vr_records": vr_count,
+        "osha_establishments": osha_count,
+        "bls_industries": ind_count,
+        "bls_occupation_records": occ_count,
+        "naics_osha_enriched": naics_stats['osha_enriched'],
+        "naics_6digit_employers": naics_stats['six_digit_naics']
+    }
+
+
+def compute_data_coverage(cur):
+    """Payload of /api/employers/data-coverage."""
+    cur.execute("SELECT COUNT(*) AS cnt FROM mv_employer_data_sources")
+    total = cur.fetchone()['cnt']
+
+    cur.execute("""
+        SELECT source_count, COUNT(*) AS cnt
+        FROM mv_employer_data_sources
+        GROUP BY source_count
+        ORDER BY source_count
+    """)
+    distribution = cur.fetchall()
+
+    cur.execute("""
+        SELECT
+            SUM(has_osha::int) AS osha,
+            SUM(has_nlrb::int) AS nlrb,
+            SUM(has_whd::int) AS whd,
+            SUM(has_990::int) AS n990,
+            SUM(has_sam::int) AS sam,
+            SUM(has_sec::int) AS sec,
+            SUM(has_gleif::int) AS gleif,
+            SUM(has_mergent::int) AS mergent
+        FROM mv_employer_data_sources
+    """)
+    by_source = cur.fetchone()
+
+    return {
+        "total_employers": total,
+        "source_count_distribution": distribution,
+        "by_source": by_source,
+    }
+
+
+# metric -> (compute function, tables it reads)
+METRICS = {
+    'summary': (compute_summary, (
+        'f7_employers_deduped', 'nlrb_case_types', 'nlrb_cases', 'nlrb_elections',
+        'nlrb_voluntary_recognition', 'union_hierarchy', 'unions_master',
+    )),
+    'system_stats': (compute_system_stats, (
+        'f7_employers_deduped', 'match_runs', 'mv_organizing_scorecard', 'unified_match_log',
+    )),
+    'stats_breakdown': (compute_stats_breakdown, (
+        'cbsa_definitions', 'f7_employers_deduped', 'naics_sectors', 'unions_master',
+    )),
+    'health_counts': (compute_health_counts, (
+        'bls_industry_occupation_matrix', 'bls_industry_projections', 'f7_employers_deduped',
+        'nlrb_voluntary_recognition', 'osha_establishments',
+    )),
+    'data_coverage': (compute_data_coverage, ('mv_employer_data_sources',)),
+}
+
+
+# ---------------------------------------------------------------------------
+# Snapshot table
+# ---------------------------------------------------------------------------
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def to_json(value):
+    """Metric value as stored: Decimals become numbers, dates ISO strings."""
+    return json.dumps(value, default=_json_default)
+
+
+def metrics_for_tables(tables):
+    """Metrics that read any of ``tables`` (all of them when unknown)."""
+    tables = {t for t in (tables or ()) if t and t != 'multiple'}
+    if not tables:
+        return list(METRICS)
+    return [name for name, (_, inputs) in METRICS.items() if tables & set(inputs)]
+
+
+def store_metric(cur, name):
+    """Compute ``name`` and upsert it. Returns (value, computed_at).
+
+    Compute errors propagate; a failed write (e.g. a read-only role) is
+    logged and the fresh value is still returned.
+    """
+    t0 = time.time()
+    value = json.loads(to_json(METRICS[name][0](cur)))
+    compute_ms = int((time.time() - t0) * 1000)
+    try:
+        cur.execute("SAVEPOINT stats_snapshot")
+        cur.execute(TABLE_DDL)
+        cur.execute(UPSERT_SQL, [name, json.dumps(value), compute_ms])
+        computed_at = cur.fetchone()['computed_at']
+        cur.execute("RELEASE SAVEPOINT stats_snapshot")
+    except Exception as e:
+        cur.execute("ROLLBACK TO SAVEPOINT stats_snapshot")
+        logger.warning('Stats snapshot write failed for %s: %s' % (name, e))
+        computed_at = datetime.now(timezone.utc)
+    return value, computed_at
+
+
+def read_metrics(cur, names):
+    """{metric: (value, computed_at)} for the stored metrics among ``names``."""
+    try:
+        cur.execute("SAVEPOINT stats_snapshot")
+        cur.execute(
+            "SELECT metric, value, computed_at FROM platform_stats_snapshot WHERE metric = ANY(%s)",
+            [list(names)],
+        )
+        rows = cur.fetchall()
+        cur.execute("RELEASE SAVEPOINT stats_snapshot")
+    except Exception:
+        # Table not created yet
+        cur.execute("ROLLBACK TO SAVEPOINT stats_snapshot")
+        return {}
+    return {r['metric']: (r['value'], r['computed_at']) for r in rows}
+
+
+def get_metric(name, live=False):
+    """(value, computed_at) from the snapshot, computing it when live or missing."""
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            if not live:
+                stored = read_metrics(cur, [name]).get(name)
+                if stored is not None:
+                    return stored
+            return store_metric(cur, name)
+
+
+def refresh_snapshot(conn, metrics=None):
+    """Recompute ``metrics`` (default all) on a script connection.
+
+    Each metric is committed on its own; one that fails (e.g. its MV is
+    being rebuilt) is logged and keeps its previous value. Returns
+    {metric: compute_ms} for the ones refreshed.
+    """
+    done = {}
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        for name in metrics or METRICS:
+            t0 = time.time()
+            try:
+                store_metric(cur, name)
+                conn.commit()
+                done[name] = int((time.time() - t0) * 1000)
+            except Exception as e:
+                conn.rollback()
+                logger.warning('Stats snapshot refresh failed for %s: %s' % (name, e))
+    return done
@@ -1,4 +1,5 @@
-"""Shared ETL logging utility. Writes run metadata to data_refresh_log."""
+"""Shared ETL logging utility. Writes run metadata to data_refresh_log and
+refreshes the dashboard stats snapshot after successful loads."""
 
 from db_config import get_connection
 
@@ -16,3 +17,24 @@ def log_etl_run(source_name, table_name, row_count, status, script_path,
     """, (source_name, table_name, row_count, status, script_path, error_message, duration_seconds))
     cur.close()
     conn.close()
+    if status == 'success':
+        refresh_stats_for_table(table_name)
+
+
+def refresh_stats_for_table(table_name):
+    """Recompute the dashboard stats that read ``table_name`` (all if unknown).
+
+    Never raises: a snapshot problem must not fail the load that logged it.
+    """
+    try:
+        from api.services.stats_snapshot import metrics_for_tables, refresh_snapshot
+        metrics = metrics_for_tables([table_name])
+        if not metrics:
+            return
+        conn = get_connection()
+        try:
+            refresh_snapshot(conn, metrics)
+        finally:
+            conn.close()
+    except Exception as e:
+        print("WARNING: stats snapshot refresh failed: %s" % e)
@@ -0,0 +1,167 @@
+"""Shared local store of paid LLM / embedding API responses.
+
+Responses are keyed on (model, prompt_version, payload_hash), where
+payload_hash is the SHA-256 of the canonical JSON of whatever the prompt
+renders (pair fields, user message, text to embed). A re-run over an
+overlapping pair set only pays for pairs the store has not seen under the
+same model and prompt version; bumping PROMPT_VERSION invalidates every
+entry for that prompt.
+
+Backed by one SQLite file (WAL mode, so concurrent readers are fine):
+data/llm_response_store.sqlite, or LLM_RESPONSE_STORE to override.
+
+Usage:
+    from llm_response_store import ResponseStore, payload_hash
+
+    with ResponseStore() as store:
+        digest = payload_hash(messages)
+        text = store.get(JUDGE_MODEL, PROMPT_VERSION, digest)
+        if text is None:
+            text = call_api(messages)
+            store.put(JUDGE_MODEL, PROMPT_VERSION, digest, text)
+        print(store.summary('judge calls', cost_per_call=0.0003))
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+DEFAULT_PATH = os.environ.get('LLM_RESPONSE_STORE') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data', 'llm_response_store.sqlite')
+
+# SQLite's default limit on bound parameters is 999 on older builds.
+_LOOKUP_CHUNK = 500
+
+DDL = """
+CREATE TABLE IF NOT EXISTS responses (
+    model          TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    payload_hash   TEXT NOT NULL,
+    response       TEXT NOT NULL,
+    created_at     TEXT NOT NULL,
+    PRIMARY KEY (model, prompt_version, payload_hash)
+)
+"""
+
+
+def canonical_json(payload):
+    """Key-sorted, whitespace-free JSON: equal payloads give equal text."""
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'),
+                      ensure_ascii=False, default=str)
+
+
+def payload_hash(payload):
+    return hashlib.sha256(canonical_json(payload).encode('utf-8')).hexdigest()
+
+
+def batch_result_entry(custom_id, text, model=None):
+    """A stored response shaped like a succeeded Message Batches result line.
+
+    Fetchers write these next to the API's own results so readers of the
+    results JSONL see pairs answered from the store too.
+    """
+    return {
+        'custom_id': custom_id,
+        'result': {
+            'type': 'succeeded',
+            'message': {
+                'type': 'message',
+                'role': 'assistant',
+                'model': model,
+                'content': [{'type': 'text', 'text': text}],
+            },
+        },
+        'from_response_store': True,
+    }
+
+
+class ResponseStore:
+    """Response lookup/insert with hit and miss counters for savings reports.
+
+    Responses are any JSON-serializable value (raw model text, parsed
+    verdicts, embedding vectors).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(DDL)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, model, prompt_version, digest):
+        """Stored response or None; counts a hit or a miss."""
+        row = self.conn.execute(
+            'SELECT response FROM responses '
+            'WHERE model = ? AND prompt_version = ? AND payload_hash = ?',
+            (model, prompt_version, digest)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def get_many(self, model, prompt_version, digests):
+        """{digest: response} for the digests that are stored."""
+        digests = list(dict.fromkeys(digests))
+        found = {}
+        for i in range(0, len(digests), _LOOKUP_CHUNK):
+            chunk = digests[i:i + _LOOKUP_CHUNK]
+            rows = self.conn.execute(
+                'SELECT payload_hash, response FROM responses '
+                'WHERE model = ? AND prompt_version = ? AND payload_hash IN (%s)'
+                % ','.join('?' * len(chunk)),
+                [model, prompt_version] + chunk).fetchall()
+            found.update((h, json.loads(r)) for h, r in rows)
+        self.hits += len(found)
+        self.misses += len(digests) - len(found)
+        return found
+
+    def put(self, model, prompt_version, digest, response):
+        self.put_many(model, prompt_version, [(digest, response)])
+
+    def put_many(self, model, prompt_version, items):
+        """Insert or replace [(digest, response)] in one transaction."""
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = [(model, prompt_version, digest, canonical_json(response), now)
+                for digest, response in items]
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO responses '
+                '(model, prompt_version, payload_hash, response, created_at) '
+                'VALUES (?, ?, ?, ?, ?)', rows)
+        self.stored += len(rows)
+
+    def count(self, model=None, prompt_version=None):
+        sql, params = 'SELECT COUNT(*) FROM responses WHERE 1=1', []
+        if model is not None:
+            sql += ' AND model = ?'
+            params.append(model)
+        if prompt_version is not None:
+            sql += ' AND prompt_version = ?'
+            params.append(prompt_version)
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def summary(self, label='requests', cost_per_call=None):
+        """One-line savings report for this session's lookups."""
+        total = self.hits + self.misses
+        pct = 100.0 * self.hits / total if total else 0.0
+        line = (f'Response store: {self.hits:,} of {total:,} {label} already answered '
+                f'({pct:.1f}%), {self.misses:,} to call')
+        if cost_per_call is not None:
+            line += f', ~${self.hits * cost_per_call:,.2f} saved'
+        return line
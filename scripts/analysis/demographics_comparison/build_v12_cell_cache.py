@@ -0,0 +1,154 @@
+"""
+Materialize V12 demographics estimates for every populated cell.
+
+A V12 estimate depends only on (naics4, state_fips, county_fips, zip5) and
+the model artifacts (calibration, Hispanic weights, QWI cache). This job
+enumerates the cells master_employers actually occupies -- derived exactly
+the way /api/demographics/employer/{master_id} derives them -- runs the
+estimator once per cell and stores the result in demographics_v12_cells,
+tagged with the artifact fingerprint. The API then answers with one
+primary-key lookup instead of the ACS/LODES/tract/QCEW queries and the
+blend.
+
+Re-running is incremental: cells already stored under the current
+fingerprint are skipped. After the artifacts change, every cell is stale
+and gets recomputed; rows from older fingerprints are deleted at the end.
+
+Output: demographics_v12_cells table in PostgreSQL
+  Columns: naics4, state_fips, county_fips, zip5, fingerprint, result,
+           computed_at
+
+Usage:
+    py scripts/analysis/demographics_comparison/build_v12_cell_cache.py
+    py scripts/analysis/demographics_comparison/build_v12_cell_cache.py --limit 1000
+    py scripts/analysis/demographics_comparison/build_v12_cell_cache.py --rebuild
+"""
+import argparse
+import os
+import sys
+import time
+
+import psycopg2.extensions
+import psycopg2.extras
+from psycopg2.extras import Json, RealDictCursor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from db_config import get_connection
+from api.services import demographics_v12 as v12
+
+BATCH_SIZE = 500
+
+# Same normalization as the employer endpoint: missing NAICS -> '00',
+# ZIP+4 stripped to 5 digits, unmatched ZIP/county -> '00000'.
+CELLS_SQL = """
+    SELECT DISTINCT
+        COALESCE(NULLIF(m.naics, ''), '00') AS naics,
+        sf.state_fips,
+        sf.state_abbr,
+        COALESCE(NULLIF(LEFT(SPLIT_PART(TRIM(m.zip), '-', 1), 5), ''), '00000') AS zip5,
+        COALESCE(zc.county_fips, '00000') AS county_fips
+    FROM master_employers m
+    JOIN state_fips_map sf ON sf.state_abbr = UPPER(m.state)
+    LEFT JOIN LATERAL (
+        SELECT county_fips FROM zip_county_crosswalk
+        WHERE zip_code = LEFT(SPLIT_PART(TRIM(m.zip), '-', 1), 5)
+        LIMIT 1
+    ) zc ON TRUE
+    WHERE m.state IS NOT NULL AND m.state <> ''
+"""
+
+UPSERT_SQL = """
+    INSERT INTO demographics_v12_cells
+        (naics4, state_fips, county_fips, zip5, fingerprint, result)
+    VALUES %s
+    ON CONFLICT (naics4, state_fips, county_fips, zip5) DO UPDATE
+    SET fingerprint = EXCLUDED.fingerprint,
+        result = EXCLUDED.result,
+        computed_at = NOW()
+"""
+
+
+def populated_cells(cur):
+    """Distinct cells, keyed by v12.cell_key -> (naics, state_abbr) for the estimator."""
+    cur.execute(CELLS_SQL)
+    cells = {}
+    for r in cur.fetchall():
+        key = v12.cell_key(r['naics'], r['state_fips'], r['county_fips'], r['zip5'])
+        cells.setdefault(key, (r['naics'], r['state_abbr']))
+    return cells
+
+
+def current_cells(cur, fingerprint):
+    cur.execute(
+        "SELECT naics4, state_fips, county_fips, zip5 FROM demographics_v12_cells "
+        "WHERE fingerprint = %s", [fingerprint])
+    return {(r['naics4'], r['state_fips'], r['county_fips'], r['zip5'])
+            for r in cur.fetchall()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute V12 demographics per cell')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Compute at most N missing cells (for testing)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Recompute every cell, even ones already current')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(v12.CELL_TABLE_DDL)
+    conn.commit()
+
+    fingerprint = v12.model_fingerprint()
+    print('Model fingerprint: %s' % fingerprint[:16])
+
+    cells = populated_cells(cur)
+    done = set() if args.rebuild else current_cells(cur, fingerprint)
+    todo = [k for k in sorted(cells) if k not in done]
+    if args.limit:
+        todo = todo[:args.limit]
+    print('%d populated cells, %d current, %d to compute' % (
+        len(cells), len(done), len(todo)))
+
+    t0 = time.time()
+    batch = []
+    n_est = n_failed = 0
+    for i, key in enumerate(todo, 1):
+        naics, state_abbr = cells[key]
+        naics4, state_fips, county_fips, zip5 = key
+        result = v12.estimate_demographics_v12(
+            cur, naics, state_fips, zip5, county_fips, state_abbr=state_abbr)
+        if result is None and (conn.get_transaction_status()
+                               == psycopg2.extensions.TRANSACTION_STATUS_INERROR):
+            # The estimator logged a query failure; don't store it as "no estimate".
+            conn.rollback()
+            n_failed += 1
+            continue
+        if result is not None:
+            n_est += 1
+        batch.append((naics4, state_fips, county_fips, zip5, fingerprint,
+                      Json(result) if result is not None else None))
+        if len(batch) >= BATCH_SIZE:
+            psycopg2.extras.execute_values(cur, UPSERT_SQL, batch)
+            conn.commit()
+            batch = []
+            rate = i / max(time.time() - t0, 1e-9)
+            print('  %d/%d cells (%.0f/s, %d with estimates)' % (i, len(todo), rate, n_est))
+    if batch:
+        psycopg2.extras.execute_values(cur, UPSERT_SQL, batch)
+        conn.commit()
+
+    if args.limit is None:
+        cur.execute("DELETE FROM demographics_v12_cells WHERE fingerprint <> %s", [fingerprint])
+        print('Deleted %d stale cells' % cur.rowcount)
+        conn.commit()
+    cur.execute("ANALYZE demographics_v12_cells")
+    conn.commit()
+
+    print('Computed %d cells (%d with estimates, %d failed) in %.1fs' % (
+        len(todo), n_est, n_failed, time.time() - t0))
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""Vectorized dampening grid search for the calibrated demographics models.
+
+The scalar search re-ran the scenario, the calibration and evaluate() on
+every validation record for each of the 5 x 5 x 4 (d_race, d_hisp,
+d_gender) combinations, per tier and per fold. Neither the base prediction
+nor the calibration offsets depend on the dampening factors, and each factor
+only touches its own dimension. So this module:
+
+  1. computes every record's base prediction and offsets once (GridInputs),
+  2. evaluates all values of one factor at once on (grid, records, cats)
+     NumPy arrays -- 5 + 5 + 4 array passes instead of 100 record loops,
+  3. walks the 100 combinations in the original order with the original
+     guard rails and objective.
+
+Selections match the scalar search exactly: rounding reproduces Python's
+round(), per-record sums add categories in the same order, and per-record
+errors are averaged with the built-in sum() in record order.
+
+Usage:
+    from dampening_grid import build_grid_inputs, search_grid
+
+    inputs = build_grid_inputs(val_recs, scenario_v92_full, offsets_fn)
+    best = search_grid(inputs, tier="High")
+"""
+import numpy as np
+
+from methodologies_v5 import RACE_CATS
+
+HISP_CATS = ["Hispanic", "Not Hispanic"]
+GENDER_CATS = ["Male", "Female"]
+
+D_RACE_GRID = (0.70, 0.80, 0.85, 0.90, 0.95)
+D_HISP_GRID = (0.20, 0.30, 0.40, 0.50, 0.60)
+D_GENDER_GRID = (0.85, 0.90, 0.95, 1.00)
+DEFAULT_PARAMS = {"d_race": 0.85, "d_hisp": 0.50, "d_gender": 0.95}
+MIN_RECORDS = 20
+
+# Guard rails: don't accept params that blow up race
+MAX_RACE_MAE = 4.70
+MAX_P30 = 8.0
+
+
+def _round4(x):
+    """Elementwise round(v, 4) with Python's result, bit for bit.
+
+    rint(x * 1e4) / 1e4 agrees with Python except when x * 1e4 lands within
+    rounding error of a half; those few values go through round() itself.
+    """
+    y = x * 1e4
+    out = np.rint(y) / 1e4
+    near = np.abs(np.abs(y - np.trunc(y)) - 0.5) < 1e-6
+    if near.any():
+        out[near] = [round(v, 4) for v in x[near].tolist()]
+    return out
+
+
+def _ordered_sum(a):
+    """Sum over the last axis left to right (what sum() over a dict does)."""
+    total = a[..., 0]
+    for i in range(1, a.shape[-1]):
+        total = total + a[..., i]
+    return total
+
+
+def _per_record_errors(pred, truth):
+    """mae_dict / max_cat_error per record; NaN in truth = category missing."""
+    err = np.abs(pred - truth)
+    missing = np.broadcast_to(np.isnan(truth), err.shape)
+    count = (~missing).sum(axis=-1)
+    mae = _ordered_sum(np.where(missing, 0.0, err)) / np.maximum(count, 1)
+    max_err = np.where(missing, -np.inf, err).max(axis=-1)
+    return mae, max_err, count > 0
+
+
+class GridInputs:
+    """Base predictions, offsets and truth for a set of records, as arrays.
+
+    *_ok marks records where evaluate() scores that dimension (prediction
+    and truth both present). Missing truth categories are NaN; missing
+    offsets are 0.0, which leaves the prediction unchanged like None did.
+    """
+
+    FIELDS = (
+        "tiers", "race_ok", "race_pred", "race_off", "race_truth",
+        "hisp_ok", "hisp_pred", "hisp_off", "hisp_truth",
+        "gender_ok", "gender_pred", "gender_off", "gender_truth",
+    )
+
+    def __init__(self, **arrays):
+        for name in self.FIELDS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self):
+        return len(self.tiers)
+
+    def subset(self, mask):
+        return GridInputs(**{name: getattr(self, name)[mask] for name in self.FIELDS})
+
+
+def _truth_row(truth, cats):
+    if not truth:
+        return [np.nan] * len(cats)
+    return [float(truth[c]) if c in truth else np.nan for c in cats]
+
+
+def build_grid_inputs(recs, scenario_fn, offsets_fn):
+    """Evaluate scenario_fn and offsets_fn once per record.
+
+    offsets_fn(rec) -> (race_offsets: {cat: offset or None},
+                        hisp_offset or None, gender_offset or None)
+    """
+    n = len(recs)
+    a = {
+        "tiers": np.array([r["diversity_tier"] for r in recs], dtype=object),
+        "race_ok": np.zeros(n, dtype=bool),
+        "race_pred": np.zeros((n, len(RACE_CATS))),
+        "race_off": np.zeros((n, len(RACE_CATS))),
+        "race_truth": np.full((n, len(RACE_CATS)), np.nan),
+        "hisp_ok": np.zeros(n, dtype=bool),
+        "hisp_pred": np.zeros(n),
+        "hisp_off": np.zeros(n),
+        "hisp_truth": np.full((n, len(HISP_CATS)), np.nan),
+        "gender_ok": np.zeros(n, dtype=bool),
+        "gender_pred": np.zeros(n),
+        "gender_off": np.zeros(n),
+        "gender_truth": np.full((n, len(GENDER_CATS)), np.nan),
+    }
+    for i, rec in enumerate(recs):
+        pred = scenario_fn(rec)
+        if not pred:
+            continue
+        truth = rec["truth"]
+        race_offs, hisp_off, gender_off = offsets_fn(rec)
+
+        rp, ra = pred.get("race"), truth["race"]
+        if rp and ra:
+            a["race_ok"][i] = True
+            a["race_pred"][i] = [rp.get(c, 0.0) for c in RACE_CATS]
+            a["race_off"][i] = [race_offs.get(c) or 0.0 for c in RACE_CATS]
+            a["race_truth"][i] = _truth_row(ra, RACE_CATS)
+
+        hp, ha = pred.get("hispanic"), truth["hispanic"]
+        if hp and ha:
+            a["hisp_ok"][i] = True
+            a["hisp_pred"][i] = hp.get("Hispanic", 0.0)
+            a["hisp_off"][i] = hisp_off or 0.0
+            a["hisp_truth"][i] = _truth_row(ha, HISP_CATS)
+
+        gp, ga = pred.get("gender"), truth["gender"]
+        if gp and ga:
+            a["gender_ok"][i] = True
+            a["gender_pred"][i] = gp.get("Female", 50.0)
+            a["gender_off"][i] = gender_off or 0.0
+            a["gender_truth"][i] = _truth_row(ga, GENDER_CATS)
+    return GridInputs(**a)
+
+
+def _mean(values):
+    return sum(values) / len(values)
+
+
+def race_metrics(inputs, grid=D_RACE_GRID):
+    """[(race MAE, P>30 %) or None] per d_race value."""
+    ok = inputs.race_ok
+    d = np.asarray(grid)[:, None, None]
+    cal = np.maximum(inputs.race_pred[ok][None] - inputs.race_off[ok][None] * d, 0.0)
+    total = _ordered_sum(cal)
+    pos = total > 0
+    norm = _round4(cal * 100 / np.where(pos, total, 1.0)[..., None])
+    cal = np.where(pos[..., None], norm, cal)
+    mae, max_err, scored = _per_record_errors(cal, inputs.race_truth[ok][None])
+
+    out = []
+    for g in range(len(grid)):
+        keep = scored[g]
+        rm = mae[g][keep].tolist()
+        if not rm:
+            out.append(None)
+            continue
+        me = max_err[g][keep]
+        p30 = int(np.count_nonzero(me > 30)) / len(me) * 100
+        out.append((_mean(rm), p30))
+    return out
+
+
+def _binary_metrics(pred, off, truth, grid, lower_first):
+    """MAE per grid value for a clamped two-category dimension.
+
+    lower_first: category order is (100 - v, v) (gender) instead of
+    (v, 100 - v) (Hispanic).
+    """
+    d = np.asarray(grid)[:, None]
+    v = np.maximum(np.minimum(pred[None] - off[None] * d, 100.0), 0.0)
+    first, second = _round4(v), _round4(100 - v)
+    if lower_first:
+        first, second = second, first
+    cal = np.stack([first, second], axis=-1)
+    mae, _max_err, scored = _per_record_errors(cal, truth[None])
+    out = []
+    for g in range(len(grid)):
+        vals = mae[g][scored[g]].tolist()
+        out.append(_mean(vals) if vals else 0)
+    return out
+
+
+def hisp_metrics(inputs, grid=D_HISP_GRID):
+    ok = inputs.hisp_ok
+    return _binary_metrics(inputs.hisp_pred[ok], inputs.hisp_off[ok],
+                           inputs.hisp_truth[ok], grid, lower_first=False)
+
+
+def gender_metrics(inputs, grid=D_GENDER_GRID):
+    ok = inputs.gender_ok
+    return _binary_metrics(inputs.gender_pred[ok], inputs.gender_off[ok],
+                           inputs.gender_truth[ok], grid, lower_first=True)
+
+
+def search_grid(inputs, tier=None):
+    """Best {d_race, d_hisp, d_gender} on inputs (optionally one tier)."""
+    if tier:
+        inputs = inputs.subset(inputs.tiers == tier)
+    if len(inputs) < MIN_RECORDS:
+        return dict(DEFAULT_PARAMS)
+
+    race = race_metrics(inputs)
+    hisp = hisp_metrics(inputs)
+    gender = gender_metrics(inputs)
+
+    best_score = 999
+    best = dict(DEFAULT_PARAMS)
+    for i, dr in enumerate(D_RACE_GRID):
+        if race[i] is None:
+            continue
+        race_mae, p30 = race[i]
+        if race_mae > MAX_RACE_MAE or p30 > MAX_P30:
+            continue
+        for j, dh in enumerate(D_HISP_GRID):
+            for k, dg in enumerate(D_GENDER_GRID):
+                # Combined objective: race-weighted composite
+                score = race_mae * 3 + hisp[j] + gender[k]
+                if score < best_score:
+                    best_score = score
+                    best = {"d_race": dr, "d_hisp": dh, "d_gender": dg}
+    return best
@@ -0,0 +1,378 @@
+"""Columnar feature store for the demographics comparison harness.
+
+Every run_v*.py script rebuilds the same per-company inputs: it re-parses
+v9_best_of_ipf_prediction_checkpoint.json, re-derives the company lists, and
+issues the ACS / LODES / tract / QCEW / PUMS / occupation queries behind
+CachedLoadersV6 one company at a time (run_v11_kfold additionally geocodes
+and re-runs experts A/D/F for every extra EEO-1 company). This module does
+that once and writes the results to Parquet:
+
+  feature_store/loader_cache.parquet  every CachedLoaders cache entry
+                                      (namespace, key, value)
+  feature_store/records.parquet       checkpoint records by company_code,
+                                      plus the ones load_all_companies()
+                                      generated for extra EEO-1 companies
+  feature_store/companies.parquet     company lists (v11_pool, v11_all)
+  feature_store/manifest.json         build time, counts, source file stats
+
+Loader values are nested dicts/lists of mixed shape, so keys and values are
+stored as JSON text columns (tuples tagged so keys round-trip exactly); one
+Parquet read replaces tens of thousands of queries. QWI inputs are not
+copied: QWICache already memory-maps qwi_county_naics4_cache.npy
+(qwi_binary.py) without touching the database.
+
+Build (needs the database and pyarrow):
+    py scripts/analysis/demographics_comparison/feature_store.py
+    py scripts/analysis/demographics_comparison/feature_store.py --pool-only
+
+Use from an experiment (no database connection):
+    from feature_store import open_store
+    store = open_store()
+    cl = store.loaders()                  # CachedLoadersV6, preloaded
+    rec_lookup = store.rec_lookup()
+    companies = store.companies('v11_all')
+
+run_v9_2.py, run_v10.py, run_v11_kfold.py and run_v12.py take
+--feature-store to do this themselves. The loader cache covers the V9.2
+and V10 splits and the V11 companies.
+
+A lookup the store does not hold raises FeatureStoreMiss instead of silently
+querying; pass a cursor to store.loaders(cur) to fall back to the database.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cached_loaders_v6 import CachedLoadersV6
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(SCRIPT_DIR, 'feature_store')
+
+FORMAT_VERSION = 1
+LOADER_FILE = 'loader_cache.parquet'
+RECORDS_FILE = 'records.parquet'
+COMPANIES_FILE = 'companies.parquet'
+MANIFEST_FILE = 'manifest.json'
+
+# Inputs the stored company lists and records were derived from.
+SOURCE_FILES = [
+    'v9_best_of_ipf_prediction_checkpoint.json',
+    'expanded_training_v6.json',
+    'expanded_training_v10.json',
+    'selected_permanent_holdout_1000.json',
+    'selected_v10_sealed_holdout_1000.json',
+]
+
+
+class FeatureStoreMiss(KeyError):
+    """A loader lookup that is not in the feature store (and no cursor to fall back on)."""
+
+
+# ------------------------------------------------------------
+# JSON encoding that keeps tuples (cache keys) distinct from lists
+# ------------------------------------------------------------
+
+def _encode(obj):
+    if isinstance(obj, tuple):
+        return {'__tuple__': [_encode(v) for v in obj]}
+    if isinstance(obj, list):
+        return [_encode(v) for v in obj]
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj):
+            return {k: _encode(v) for k, v in obj.items()}
+        return {'__items__': [[_encode(k), _encode(v)] for k, v in obj.items()]}
+    if obj is None or isinstance(obj, (str, bool, int, float)):
+        return obj
+    # Decimal from psycopg2, numpy scalars
+    return float(obj)
+
+
+def _decode(obj):
+    if isinstance(obj, list):
+        return [_decode(v) for v in obj]
+    if isinstance(obj, dict):
+        if len(obj) == 1 and '__tuple__' in obj:
+            return tuple(_decode(v) for v in obj['__tuple__'])
+        if len(obj) == 1 and '__items__' in obj:
+            return {_decode(k): _decode(v) for k, v in obj['__items__']}
+        return {k: _decode(v) for k, v in obj.items()}
+    return obj
+
+
+def dumps(obj):
+    return json.dumps(_encode(obj), separators=(',', ':'))
+
+
+def loads(text):
+    return _decode(json.loads(text))
+
+
+# ------------------------------------------------------------
+# Writing
+# ------------------------------------------------------------
+
+def _require_pyarrow():
+    if not HAS_PYARROW:
+        raise RuntimeError('The feature store needs pyarrow (pip install pyarrow)')
+
+
+def _source_stats():
+    stats = {}
+    for name in SOURCE_FILES:
+        path = os.path.join(SCRIPT_DIR, name)
+        if os.path.exists(path):
+            st = os.stat(path)
+            stats[name] = {'size': st.st_size, 'mtime': st.st_mtime}
+    return stats
+
+
+def write_store(out_dir, cache, rec_lookup, collections):
+    """Write a store from a loader cache, a record lookup and company lists.
+
+    cache:       CachedLoaders._cache ({tuple key: value})
+    rec_lookup:  {company_code: checkpoint-style record}
+    collections: {name: [company dict, ...]}
+    Returns the manifest dict.
+    """
+    _require_pyarrow()
+    os.makedirs(out_dir, exist_ok=True)
+
+    keys = list(cache)
+    loader_table = pa.table({
+        'namespace': pa.array([str(k[0]) for k in keys]).dictionary_encode(),
+        'key': [dumps(k) for k in keys],
+        'value': [dumps(cache[k]) for k in keys],
+    })
+    pq.write_table(loader_table, os.path.join(out_dir, LOADER_FILE))
+
+    codes = list(rec_lookup)
+    pq.write_table(pa.table({
+        'company_code': codes,
+        'payload': [dumps(rec_lookup[c]) for c in codes],
+    }), os.path.join(out_dir, RECORDS_FILE))
+
+    names, positions, company_codes, payloads = [], [], [], []
+    for name, companies in collections.items():
+        for i, company in enumerate(companies):
+            names.append(name)
+            positions.append(i)
+            company_codes.append(company['company_code'])
+            payloads.append(dumps(company))
+    pq.write_table(pa.table({
+        'collection': pa.array(names, pa.string()).dictionary_encode(),
+        'position': pa.array(positions, pa.int32()),
+        'company_code': pa.array(company_codes, pa.string()),
+        'payload': pa.array(payloads, pa.string()),
+    }), os.path.join(out_dir, COMPANIES_FILE))
+
+    namespaces = {}
+    for k in keys:
+        namespaces[str(k[0])] = namespaces.get(str(k[0]), 0) + 1
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'loader_entries': len(keys),
+        'namespaces': dict(sorted(namespaces.items())),
+        'records': len(codes),
+        'collections': {name: len(c) for name, c in collections.items()},
+        'sources': _source_stats(),
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# ------------------------------------------------------------
+# Reading
+# ------------------------------------------------------------
+
+class FeatureStoreLoaders(CachedLoadersV6):
+    """CachedLoadersV6 served from a preloaded cache.
+
+    With cur=None every lookup must be in the store; misses raise
+    FeatureStoreMiss. With a cursor, misses query the database as usual.
+    """
+
+    def __init__(self, cache, cur=None):
+        super().__init__(cur)
+        self._cache = cache
+
+    def _check_offline(self, key):
+        if self.cur is None and key not in self._cache:
+            raise FeatureStoreMiss(key)
+
+    def _cached(self, key, fn, *args):
+        self._check_offline(key)
+        return super()._cached(key, fn, *args)
+
+    def get_transit_score(self, zipcode):
+        # Queries the cursor directly instead of going through _cached().
+        self._check_offline(('transit_score', zipcode))
+        return super().get_transit_score(zipcode)
+
+
+class FeatureStore:
+    """Read side of a built store directory."""
+
+    def __init__(self, store_dir=STORE_DIR):
+        _require_pyarrow()
+        self.store_dir = store_dir
+        path = os.path.join(store_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                'No feature store at %s; build it with feature_store.py' % store_dir)
+        with open(path, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError('Unsupported feature store format %r in %s' % (
+                self.manifest.get('format_version'), path))
+        self._cache = None
+
+    def stale_sources(self):
+        """Source files that changed (or appeared/disappeared) since the build."""
+        built, now = self.manifest.get('sources', {}), _source_stats()
+        return sorted(name for name in set(built) | set(now) if built.get(name) != now.get(name))
+
+    def _read(self, name, columns=None, filters=None):
+        return pq.read_table(os.path.join(self.store_dir, name),
+                             columns=columns, filters=filters).to_pydict()
+
+    def loader_cache(self):
+        """{tuple key: value} for every stored loader lookup (read once)."""
+        if self._cache is None:
+            t = self._read(LOADER_FILE, columns=['key', 'value'])
+            self._cache = {loads(k): loads(v) for k, v in zip(t['key'], t['value'])}
+        return self._cache
+
+    def loaders(self, cur=None):
+        """A FeatureStoreLoaders over a private copy of the stored cache."""
+        return FeatureStoreLoaders(dict(self.loader_cache()), cur)
+
+    def rec_lookup(self):
+        """{company_code: record}, as the scripts build from the checkpoint."""
+        t = self._read(RECORDS_FILE)
+        return {code: loads(p) for code, p in zip(t['company_code'], t['payload'])}
+
+    def companies(self, collection):
+        """Company dicts of one stored collection, in their original order."""
+        if collection not in self.manifest.get('collections', {}):
+            raise FeatureStoreMiss('collection %r not in store (has: %s)' % (
+                collection, ', '.join(self.manifest.get('collections', {})) or 'none'))
+        t = self._read(COMPANIES_FILE, columns=['position', 'payload'],
+                       filters=[('collection', '=', collection)])
+        rows = sorted(zip(t['position'], t['payload']))
+        return [loads(p) for _, p in rows]
+
+
+def open_store(store_dir=STORE_DIR):
+    """Open a store, warning if its source JSON files changed since the build."""
+    store = FeatureStore(store_dir)
+    stale = store.stale_sources()
+    if stale:
+        print('Feature store is older than %s; rebuild it with feature_store.py'
+              % ', '.join(stale))
+    return store
+
+
+# ------------------------------------------------------------
+# Build
+# ------------------------------------------------------------
+
+def warm_company(cl, company):
+    """Run the V6 methods for one company so their loader inputs get cached."""
+    from cached_loaders_v6 import cached_method_v6_full, cached_expert_f
+
+    naics4 = company.get('naics', '')[:4]
+    county_fips = company.get('county_fips', '')
+    state_fips = company.get('state_fips', '')
+    zipcode = company.get('zipcode', '')
+    if not (naics4 and county_fips and state_fips):
+        return
+    cbsa_code = cl.get_county_cbsa(county_fips) or ''
+    cached_method_v6_full(cl, naics4, state_fips, county_fips,
+                          cbsa_code=cbsa_code, zipcode=zipcode)
+    cached_expert_f(cl, naics4, state_fips, county_fips, cbsa_code=cbsa_code)
+    cl.get_transit_score(zipcode)
+    cl.get_occupation_weighted_gender(naics4, cbsa_code)
+
+
+def build(out_dir=STORE_DIR, pool_only=False):
+    from psycopg2.extras import RealDictCursor
+    from db_config import get_connection
+    from run_v9_2 import build_splits as build_v92_splits
+    from run_v10 import build_v10_splits, build_records
+    from run_v11_kfold import load_all_companies
+
+    conn = get_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cl = CachedLoadersV6(cur)
+
+    print('--- Company lists ---')
+    collections = {}
+    pool, rec_lookup = load_all_companies(cl, cur, pool_only=True)
+    collections['v11_pool'] = pool
+    if not pool_only:
+        collections['v11_all'], rec_lookup = load_all_companies(cl, cur)
+    splits = build_v10_splits()
+    v92_splits = build_v92_splits()
+
+    seen = set()
+    companies = []
+    for company in (splits['train_companies'] + splits['perm_companies']
+                    + splits['v10_companies'] + v92_splits['train_companies']
+                    + v92_splits['dev_companies'] + collections.get('v11_all', pool)):
+        if company['company_code'] not in seen:
+            seen.add(company['company_code'])
+            companies.append(company)
+
+    print('\n--- Loader inputs for %d companies ---' % len(companies))
+    t0 = time.time()
+    n_failed = 0
+    for i, company in enumerate(companies, 1):
+        try:
+            build_records([company], rec_lookup, cl)
+            warm_company(cl, company)
+        except Exception as e:
+            n_failed += 1
+            print('  %s failed: %s' % (company['company_code'], e))
+            conn.rollback()
+        if i % 2000 == 0:
+            print('  %d/%d companies (%d cached lookups, %.0fs)' % (
+                i, len(companies), len(cl._cache), time.time() - t0))
+    cl.print_stats()
+    cur.close()
+    conn.close()
+
+    manifest = write_store(out_dir, cl._cache, rec_lookup, collections)
+    print('\nSaved %s: %d loader entries, %d records, collections %s (%d failed)' % (
+        out_dir, manifest['loader_entries'], manifest['records'],
+        manifest['collections'], n_failed))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the demographics feature store')
+    parser.add_argument('--out', default=STORE_DIR, help='Store directory')
+    parser.add_argument('--pool-only', action='store_true',
+                        help='Skip the extra EEO-1 companies (no v11_all collection)')
+    args = parser.parse_args()
+    _require_pyarrow()
+    t0 = time.time()
+    build(args.out, pool_only=args.pool_only)
+    print('Done in %.1fs' % (time.time() - t0))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
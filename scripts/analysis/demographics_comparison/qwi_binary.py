@@ -0,0 +1,236 @@
+"""Compact, memory-mapped QWI cache (replaces the JSON load in QWICache).
+
+qwi_county_naics4_cache.json parses into ~500k nested Python dicts; every
+API worker pays the parse time on its first V12 request and holds its own
+copy. This module stores the same cells as one NumPy structured array
+(qwi_county_naics4_cache.npy) sorted by (level, key), plus a small JSON
+sidecar with the metadata, level offsets and category orders. np.load with
+mmap_mode='r' makes opening it near-instant, and the pages are shared
+through the OS page cache by every process that maps the file.
+
+Cells are rebuilt as the same dicts the JSON gave (same keys, same values,
+same category order), so QWICache.get_race/get_hispanic/get_gender keep
+their fallback cascade unchanged. Missing categories are stored as NaN.
+
+Build it from the JSON cache (verifies every cell round-trips):
+    py scripts/analysis/demographics_comparison/qwi_binary.py
+    py scripts/analysis/demographics_comparison/qwi_binary.py --json other.json --out other.npy
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+JSON_PATH = os.path.join(SCRIPT_DIR, 'qwi_county_naics4_cache.json')
+BIN_PATH = os.path.join(SCRIPT_DIR, 'qwi_county_naics4_cache.npy')
+
+FORMAT_VERSION = 1
+# Cascade order; index = the 'level' column.
+LEVELS = ['primary', 'county_n2', 'county_all', 'state_n4', 'state_n2']
+DIMENSIONS = ['race', 'hispanic', 'gender']
+MAX_CATS = {'race': 6, 'hispanic': 2, 'gender': 2}
+
+
+def meta_path(bin_path):
+    return os.path.splitext(bin_path)[0] + '.meta.json'
+
+
+def resolve_cache_path(cache_path=None):
+    """The file QWICache should load.
+
+    An explicit path wins. Otherwise the binary cache is used when it
+    exists and is not older than the JSON it was built from.
+    """
+    if cache_path is not None:
+        return cache_path
+    if os.path.exists(BIN_PATH) and os.path.exists(meta_path(BIN_PATH)):
+        if not os.path.exists(JSON_PATH) or os.path.getmtime(BIN_PATH) >= os.path.getmtime(JSON_PATH):
+            return BIN_PATH
+        print('QWI binary cache is older than %s; rebuild it with qwi_binary.py'
+              % os.path.basename(JSON_PATH))
+    return JSON_PATH
+
+
+def cache_files(cache_path=None):
+    """Every file a QWICache built from cache_path reads (for fingerprinting)."""
+    path = resolve_cache_path(cache_path)
+    if path.endswith('.npy'):
+        return [path, meta_path(path)]
+    return [path]
+
+
+def _dtype(key_width):
+    return np.dtype([
+        ('level', 'u1'),
+        ('key', 'S%d' % key_width),
+        ('emp', 'f8'),
+        ('race', 'f8', (MAX_CATS['race'],)),
+        ('hispanic', 'f8', (MAX_CATS['hispanic'],)),
+        ('gender', 'f8', (MAX_CATS['gender'],)),
+    ])
+
+
+def _category_orders(cells):
+    """Column order per dimension: categories in first-seen order."""
+    orders = {d: [] for d in DIMENSIONS}
+    for cell in cells:
+        for d in DIMENSIONS:
+            for cat in cell.get(d, ()):
+                if cat not in orders[d]:
+                    orders[d].append(cat)
+    for d, cats in orders.items():
+        if len(cats) > MAX_CATS[d]:
+            raise ValueError('%s has %d categories (max %d): %s' % (d, len(cats), MAX_CATS[d], cats))
+    return orders
+
+
+def convert(json_path=JSON_PATH, out_path=BIN_PATH, verify=True):
+    """Write the binary cache + sidecar for a JSON cache. Returns row count."""
+    print('Loading %s...' % json_path)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    sources = [data['primary']] + [data['fallbacks'][lvl] for lvl in LEVELS[1:]]
+    key_width = max(len(k) for src in sources for k in src)
+    n = sum(len(src) for src in sources)
+    arr = np.zeros(n, dtype=_dtype(key_width))
+    for d in DIMENSIONS:
+        arr[d] = np.nan
+    arr['emp'] = np.nan
+
+    orders = {}
+    offsets = []
+    i = 0
+    for level, src in enumerate(sources):
+        level_orders = _category_orders(src.values())
+        orders[LEVELS[level]] = level_orders
+        offsets.append(i)
+        for key in sorted(src):
+            cell = src[key]
+            row = arr[i]
+            row['level'] = level
+            row['key'] = key.encode('ascii')
+            if 'emp' in cell:
+                row['emp'] = cell['emp']
+            for d in DIMENSIONS:
+                if d in cell:
+                    cats = level_orders[d]
+                    for cat, val in cell[d].items():
+                        row[d][cats.index(cat)] = val
+            i += 1
+    offsets.append(i)
+
+    np.save(out_path, arr)
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'source': os.path.basename(json_path),
+        'metadata': data['metadata'],
+        'levels': LEVELS,
+        'offsets': offsets,
+        'category_orders': orders,
+    }
+    with open(meta_path(out_path), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    if verify:
+        levels = load(out_path)[1]
+        for name, src in zip(LEVELS, sources):
+            lvl = levels[name]
+            for key, cell in src.items():
+                got = lvl.get(key)
+                if got != cell or any(list(got[d]) != list(cell[d]) for d in DIMENSIONS if d in cell):
+                    raise ValueError('Round-trip mismatch at %s %s: %r != %r' % (name, key, got, cell))
+        print('  Verified %d cells' % n)
+    return n
+
+
+class QWILevel:
+    """Read-only mapping view of one cascade level of the binary cache."""
+
+    def __init__(self, rows, orders, with_location=False):
+        self._rows = rows
+        self._keys = rows['key']
+        self._orders = orders
+        self._with_location = with_location
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _find(self, key):
+        try:
+            k = key.encode('ascii')
+        except (AttributeError, UnicodeEncodeError):
+            return None
+        i = int(np.searchsorted(self._keys, k))
+        if i < len(self._keys) and self._keys[i] == k:
+            return i
+        return None
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def get(self, key, default=None):
+        i = self._find(key)
+        if i is None:
+            return default
+        row = self._rows[i]
+        cell = {}
+        if self._with_location:
+            county, _, naics4 = key.partition(':')
+            cell['county'] = county
+            cell['naics4'] = naics4
+        emp = float(row['emp'])
+        if not math.isnan(emp):
+            cell['emp'] = emp
+        for d in DIMENSIONS:
+            vals = {cat: float(v) for cat, v in zip(self._orders[d], row[d].tolist())
+                    if not math.isnan(v)}
+            if vals:
+                cell[d] = vals
+        return cell
+
+    def __getitem__(self, key):
+        cell = self.get(key)
+        if cell is None:
+            raise KeyError(key)
+        return cell
+
+
+def load(bin_path=BIN_PATH):
+    """Memory-map a binary cache. Returns (metadata, {level_name: QWILevel})."""
+    with open(meta_path(bin_path), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError('Unsupported QWI binary format %r in %s' % (
+            meta.get('format_version'), meta_path(bin_path)))
+    arr = np.load(bin_path, mmap_mode='r')
+    offsets = meta['offsets']
+    levels = {}
+    for idx, name in enumerate(meta['levels']):
+        rows = arr[offsets[idx]:offsets[idx + 1]]
+        levels[name] = QWILevel(rows, meta['category_orders'][name],
+                                with_location=(name == 'primary'))
+    return meta['metadata'], levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert the QWI JSON cache to the mmap format')
+    parser.add_argument('--json', default=JSON_PATH, help='Source JSON cache')
+    parser.add_argument('--out', default=BIN_PATH, help='Output .npy path (sidecar .meta.json alongside)')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the round-trip check')
+    args = parser.parse_args()
+
+    t0 = time.time()
+    n = convert(args.json, args.out, verify=not args.no_verify)
+    size_mb = os.path.getsize(args.out) / (1024 * 1024)
+    print('Saved: %s (%d cells, %.1f MB) in %.1fs' % (args.out, n, size_mb, time.time() - t0))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,6 +14,7 @@ Usage:
     py scripts/analysis/demographics_comparison/run_v10.py --phase 0c
     py scripts/analysis/demographics_comparison/run_v10.py --phase 1a
     py scripts/analysis/demographics_comparison/run_v10.py --phase 2a
+    py scripts/analysis/demographics_comparison/run_v10.py --phase 5 --feature-store   # no DB
     ...
 """
 import json
@@ -23,11 +24,7 @@ import time
 from collections import defaultdict
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
-from db_config import get_connection
-from psycopg2.extras import RealDictCursor
-
 sys.path.insert(0, os.path.dirname(__file__))
-from cached_loaders_v6 import CachedLoadersV6
 from classifiers import classify_naics_group
 from config import get_census_region
 from methodologies_v5 import RACE_CATS, smoothed_ipf
@@ -42,6 +39,7 @@ from run_v9_2 import (
     evaluate, check_7_criteria, print_acceptance,
     print_diversity_breakdown, print_sector_breakdown, print_region_breakdown,
     blend_hispanic, train_tier_weights,
+    load_inputs,
 )
 
 SCRIPT_DIR = os.path.dirname(__file__)
@@ -232,18 +230,13 @@ def print_comparison_table(label_a, m_a, label_b, m_b):
 # ================================================================
 # PHASE 0C: Baseline reproduction
 # ================================================================
-def phase_0c():
+def phase_0c(feature_store=False):
     t0 = time.time()
     print("PHASE 0C: Reproduce V9.2 baseline with V10 training set")
     print("=" * 80)
 
     splits = build_v10_splits()
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
-
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+    rec_lookup, cl, conn = load_inputs(feature_store)
 
     print("\nBuilding records...")
     all_companies = (splits["train_companies"]
@@ -300,8 +293,8 @@ def phase_0c():
     print_sector_breakdown("V9.2 baseline", perm_records, final_fn)
     print_region_breakdown("V9.2 baseline", perm_records, final_fn)
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        conn.close()
     print("\nRuntime: %.0fs" % (time.time() - t0))
 
     return {
@@ -313,18 +306,13 @@ def phase_0c():
 # ================================================================
 # PHASE 1A: Hispanic calibration grid search
 # ================================================================
-def phase_1a():
+def phase_1a(feature_store=False):
     t0 = time.time()
     print("PHASE 1A: Hispanic calibration grid search (d_hisp)")
     print("=" * 80)
 
     splits = build_v10_splits()
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
-
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+    rec_lookup, cl, conn = load_inputs(feature_store)
 
     print("\nBuilding records...")
     all_companies = splits["train_companies"] + splits["perm_companies"]
@@ -407,8 +395,8 @@ def phase_1a():
         print("  The problem is in the calibration corrections themselves, not dampening.")
         print("  Proceeding to Phase 1B to try Hispanic-specific hierarchy.")
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        conn.close()
     print("\nRuntime: %.0fs" % (time.time() - t0))
     return {"best_d_hisp": best_d_hisp, "best_hisp_mae": best_hisp_mae, "results": results}
 
@@ -522,18 +510,13 @@ def apply_hispanic_calibration(pred, rec, hisp_offsets, d_hisp):
     return result
 
 
-def phase_1b(best_d_hisp_from_1a=None):
+def phase_1b(best_d_hisp_from_1a=None, feature_store=False):
     t0 = time.time()
     print("PHASE 1B: Hispanic-specific calibration hierarchy")
     print("=" * 80)
 
     splits = build_v10_splits()
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
-
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+    rec_lookup, cl, conn = load_inputs(feature_store)
 
     print("\nBuilding records...")
     all_companies = splits["train_companies"] + splits["perm_companies"]
@@ -619,8 +602,8 @@ def phase_1b(best_d_hisp_from_1a=None):
     print("\n  Best: d_hisp=%.2f, hierarchy=%s, Hispanic MAE=%.3f" % (
         best_d_hisp, best_hierarchy, best_hisp_mae))
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        conn.close()
     print("\nRuntime: %.0fs" % (time.time() - t0))
     return {"best_d_hisp": best_d_hisp, "best_hierarchy": best_hierarchy,
             "best_hisp_mae": best_hisp_mae}
@@ -629,7 +612,7 @@ def phase_1b(best_d_hisp_from_1a=None):
 # ================================================================
 # PHASE 1C: Hispanic breakdown analysis
 # ================================================================
-def phase_1c(best_d_hisp=0.05, use_hispanic_hierarchy=False):
+def phase_1c(best_d_hisp=0.05, use_hispanic_hierarchy=False, feature_store=False):
     t0 = time.time()
     print("PHASE 1C: Hispanic breakdown analysis")
     print("=" * 80)
@@ -637,12 +620,7 @@ def phase_1c(best_d_hisp=0.05, use_hispanic_hierarchy=False):
         best_d_hisp, "hispanic-specific" if use_hispanic_hierarchy else "standard"))
 
     splits = build_v10_splits()
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
-
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+    rec_lookup, cl, conn = load_inputs(feature_store)
 
     all_companies = splits["train_companies"] + splits["perm_companies"]
     all_records = build_records(all_companies, rec_lookup, cl)
@@ -748,26 +726,21 @@ def phase_1c(best_d_hisp=0.05, use_hispanic_hierarchy=False):
             "%.3f" % v10 if v10 else "--",
             "%+.3f" % change if change is not None else "--"))
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        conn.close()
     print("\nRuntime: %.0fs" % (time.time() - t0))
 
 
 # ================================================================
 # PHASE 2A: Gender expert comparison
 # ================================================================
-def phase_2a():
+def phase_2a(feature_store=False):
     t0 = time.time()
     print("PHASE 2A: Gender expert comparison")
     print("=" * 80)
 
     splits = build_v10_splits()
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
-
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+    rec_lookup, cl, conn = load_inputs(feature_store)
 
     all_companies = splits["train_companies"] + splits["perm_companies"]
     all_records = build_records(all_companies, rec_lookup, cl)
@@ -824,8 +797,8 @@ def phase_2a():
     for expert in experts:
         print("    %-10s %4d wins" % (expert, win_counts.get(expert, 0)))
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        conn.close()
     print("\nRuntime: %.0fs" % (time.time() - t0))
     return {"expert_errors": {e: len(v) for e, v in expert_errors.items()},
             "win_counts": dict(win_counts)}
@@ -834,18 +807,13 @@ def phase_2a():
 # ================================================================
 # PHASE 2B: Gender blending grid search
 # ================================================================
-def phase_2b(blend_candidate="D"):
+def phase_2b(blend_candidate="D", feature_store=False):
     t0 = time.time()
     print("PHASE 2B: Gender blending grid search (F + %s)" % blend_candidate)
     print("=" * 80)
 
     splits = build_v10_splits()
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
-
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+    rec_lookup, cl, conn = load_inputs(feature_store)
 
     all_companies = splits["train_companies"] + splits["perm_companies"]
     all_records = build_records(all_companies, rec_lookup, cl)
@@ -927,8 +895,8 @@ def phase_2b(blend_candidate="D"):
         best_config["f_weight"], blend_candidate, 1 - best_config["f_weight"],
         best_config["d_gender"], best_gender_mae))
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        conn.close()
     print("\nRuntime: %.0fs" % (time.time() - t0))
     return best_config
 
@@ -976,18 +944,13 @@ def estimate_confidence(naics_group, diversity_tier, region):
         return "GREEN"
 
 
-def phase_3(point_configs=None):
+def phase_3(point_configs=None, feature_store=False):
     t0 = time.time()
     print("PHASE 3: Confidence / Reliability Indicator")
     print("=" * 80)
 
     splits = build_v10_splits()
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
-
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+    rec_lookup, cl, conn = load_inputs(feature_store)
 
     all_companies = splits["train_companies"] + splits["perm_companies"]
     all_records = build_records(all_companies, rec_lookup, cl)
@@ -1125,15 +1088,15 @@ def phase_3(point_configs=None):
 
     print("\n  Best config: %s (ratio: %.1f:1)" % (best_config_name, best_ratio))
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        conn.close()
     print("\nRuntime: %.0fs" % (time.time() - t0))
 
 
 # ================================================================
 # PHASE 5: Final Validation
 # ================================================================
-def phase_5():
+def phase_5(feature_store=False):
     t0 = time.time()
     print("PHASE 5: FINAL V10 VALIDATION")
     print("=" * 80)
@@ -1145,12 +1108,7 @@ def phase_5():
     print("  Confidence: GREEN/YELLOW/RED tiers")
 
     splits = build_v10_splits()
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
-
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+    rec_lookup, cl, conn = load_inputs(feature_store)
 
     print("\nBuilding records...")
     all_companies = (splits["train_companies"]
@@ -1371,8 +1329,8 @@ def phase_5():
     save_json(os.path.join(SCRIPT_DIR, "v10_results.json"), results)
     print("\nResults saved: v10_results.json")
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        conn.close()
     print("\nRuntime: %.0fs" % (time.time() - t0))
 
 
@@ -1390,25 +1348,28 @@ def main():
                         help="Use Hispanic-specific hierarchy (for 1c)")
     parser.add_argument("--blend-candidate", default="D",
                         help="Expert to blend with F for gender (for 2b)")
+    parser.add_argument("--feature-store", action="store_true",
+                        help="Read checkpoint records and loader inputs from feature_store/ (no DB)")
     args = parser.parse_args()
 
     if args.phase == "0c":
-        phase_0c()
+        phase_0c(feature_store=args.feature_store)
     elif args.phase == "1a":
-        phase_1a()
+        phase_1a(feature_store=args.feature_store)
     elif args.phase == "1b":
-        phase_1b()
+        phase_1b(feature_store=args.feature_store)
     elif args.phase == "1c":
         phase_1c(best_d_hisp=args.d_hisp,
-                 use_hispanic_hierarchy=args.use_hisp_hierarchy)
+                 use_hispanic_hierarchy=args.use_hisp_hierarchy,
+                 feature_store=args.feature_store)
     elif args.phase == "2a":
-        phase_2a()
+        phase_2a(feature_store=args.feature_store)
     elif args.phase == "2b":
-        phase_2b(blend_candidate=args.blend_candidate)
+        phase_2b(blend_candidate=args.blend_candidate, feature_store=args.feature_store)
     elif args.phase == "3":
-        phase_3()
+        phase_3(feature_store=args.feature_store)
     elif args.phase == "5":
-        phase_5()
+        phase_5(feature_store=args.feature_store)
     else:
         print("Unknown phase: %s" % args.phase)
         print("Available: 0c, 1a, 1b, 1c, 2a, 2b, 3, 5")
@@ -17,6 +17,8 @@ Usage:
     py scripts/analysis/demographics_comparison/run_v11_kfold.py
     py scripts/analysis/demographics_comparison/run_v11_kfold.py --kappa 15
     py scripts/analysis/demographics_comparison/run_v11_kfold.py --folds 10
+    py scripts/analysis/demographics_comparison/run_v11_kfold.py --jobs 1   # sequential folds
+    py scripts/analysis/demographics_comparison/run_v11_kfold.py --feature-store   # no DB
 """
 import contextlib
 import io
@@ -26,6 +28,7 @@ import random
 import sys
 import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
 from db_config import get_connection
@@ -49,6 +52,11 @@ from run_v9_2 import (
     evaluate, check_7_criteria, print_acceptance,
     train_calibration_v92, apply_calibration_v92,
 )
+from dampening_grid import (
+    build_grid_inputs, search_grid,
+    D_RACE_GRID, D_HISP_GRID, D_GENDER_GRID, DEFAULT_PARAMS, MIN_RECORDS,
+    MAX_RACE_MAE, MAX_P30,
+)
 from run_v10 import (
     build_records,
     scenario_v92_race, scenario_v92_full,
@@ -243,15 +251,21 @@ def train_shrunk_hispanic_cal(train_records, scenario_fn,
     return _compute_shrunk(raw, _parent_ht_key, kappa, max_offset)
 
 
-def apply_shrunk_calibration(pred, rec, offsets, hisp_offsets,
-                              d_race=0.85, d_hisp=0.50, d_gender=0.95):
-    """Apply shrunk calibration offsets.
+def _best_offset(dim, cat, hier, offs):
+    for key in hier:
+        full_key = (dim, cat) + key
+        if full_key in offs:
+            return offs[full_key][0]
+    return None
 
-    Race/gender: diversity-tier hierarchy from offsets.
-    Hispanic: hispanic-tier hierarchy from hisp_offsets.
-    Always uses the most specific available bucket (already shrunk toward parent).
+
+def shrunk_offsets(rec, offsets, hisp_offsets):
+    """Most specific (already shrunk) offsets for a record.
+
+    Returns ({race_cat: offset or None}, hispanic offset or None,
+    female offset or None). Race/gender use the diversity-tier hierarchy,
+    Hispanic the Hispanic-tier hierarchy.
     """
-    result = {}
     dt = rec["diversity_tier"]
     region = rec["region"]
     ng = rec["naics_group"]
@@ -263,20 +277,38 @@ def apply_shrunk_calibration(pred, rec, offsets, hisp_offsets,
         ("ind", ng),
         ("global",),
     ]
+    county_hisp = rec["signals"].get("county_hisp_pct")
+    ht = get_hispanic_county_tier(county_hisp)
+    hierarchy_ht = [
+        ("ht_reg_ind", ht, region, ng),
+        ("ht_ind", ht, ng),
+        ("reg_ind", region, ng),
+        ("ind", ng),
+        ("global",),
+    ]
+    race = {c: _best_offset("race", c, hierarchy_dt, offsets) for c in RACE_CATS}
+    hisp = _best_offset("hisp", "Hispanic", hierarchy_ht, hisp_offsets)
+    gender = _best_offset("gender", "Female", hierarchy_dt, offsets)
+    return race, hisp, gender
 
-    def get_best(dim, cat, hier, offs):
-        for key in hier:
-            full_key = (dim, cat) + key
-            if full_key in offs:
-                return offs[full_key][0]
-        return None
+
+def apply_shrunk_calibration(pred, rec, offsets, hisp_offsets,
+                              d_race=0.85, d_hisp=0.50, d_gender=0.95):
+    """Apply shrunk calibration offsets.
+
+    Race/gender: diversity-tier hierarchy from offsets.
+    Hispanic: hispanic-tier hierarchy from hisp_offsets.
+    Always uses the most specific available bucket (already shrunk toward parent).
+    """
+    result = {}
+    race_offs, hisp_off, gender_off = shrunk_offsets(rec, offsets, hisp_offsets)
 
     # Race
     if pred.get("race"):
         cal = {}
         for c in RACE_CATS:
             v = pred["race"].get(c, 0.0)
-            off = get_best("race", c, hierarchy_dt, offsets)
+            off = race_offs[c]
             if off is not None:
                 v -= off * d_race
             cal[c] = max(0.0, v)
@@ -289,19 +321,9 @@ def apply_shrunk_calibration(pred, rec, offsets, hisp_offsets,
 
     # Hispanic (hispanic-tier hierarchy)
     if pred.get("hispanic"):
-        county_hisp = rec["signals"].get("county_hisp_pct")
-        ht = get_hispanic_county_tier(county_hisp)
-        hierarchy_ht = [
-            ("ht_reg_ind", ht, region, ng),
-            ("ht_ind", ht, ng),
-            ("reg_ind", region, ng),
-            ("ind", ng),
-            ("global",),
-        ]
         hv = pred["hispanic"].get("Hispanic", 0.0)
-        off = get_best("hisp", "Hispanic", hierarchy_ht, hisp_offsets)
-        if off is not None:
-            hv -= off * d_hisp
+        if hisp_off is not None:
+            hv -= hisp_off * d_hisp
         hv = max(0.0, min(100.0, hv))
         result["hispanic"] = {"Hispanic": round(hv, 4), "Not Hispanic": round(100 - hv, 4)}
     else:
@@ -310,9 +332,8 @@ def apply_shrunk_calibration(pred, rec, offsets, hisp_offsets,
     # Gender
     if pred.get("gender"):
         fv = pred["gender"].get("Female", 50.0)
-        off = get_best("gender", "Female", hierarchy_dt, offsets)
-        if off is not None:
-            fv -= off * d_gender
+        if gender_off is not None:
+            fv -= gender_off * d_gender
         fv = max(0.0, min(100.0, fv))
         result["gender"] = {"Male": round(100 - fv, 4), "Female": round(fv, 4)}
     else:
@@ -325,27 +346,39 @@ def apply_shrunk_calibration(pred, rec, offsets, hisp_offsets,
 # IMPROVEMENT 2+4: PER-TIER DAMPENING VIA INNER CV
 # ================================================================
 
-def search_dampening(val_recs, cal, hisp_cal, tier=None):
+def dampening_inputs(val_recs, cal, hisp_cal):
+    """Base predictions + offsets for val_recs, computed once for the grid."""
+    return build_grid_inputs(
+        val_recs, scenario_v92_full,
+        lambda rec: shrunk_offsets(rec, cal, hisp_cal))
+
+
+def search_dampening(val_recs, cal, hisp_cal, tier=None, inputs=None):
     """Grid search for (d_race, d_hisp, d_gender) on validation records.
 
     If tier is specified, only evaluates on that diversity tier.
-    Returns best params dict.
+    Pass inputs (from dampening_inputs) to reuse the per-record work across
+    calls. Returns best params dict; same selection as
+    search_dampening_scalar, vectorized (see dampening_grid.py).
     """
+    if inputs is None:
+        inputs = dampening_inputs(val_recs, cal, hisp_cal)
+    return search_grid(inputs, tier=tier)
+
+
+def search_dampening_scalar(val_recs, cal, hisp_cal, tier=None):
+    """Reference implementation: re-evaluates every record per combination."""
     if tier:
         val_recs = [r for r in val_recs if r["diversity_tier"] == tier]
-    if len(val_recs) < 20:
-        return {"d_race": 0.85, "d_hisp": 0.50, "d_gender": 0.95}
-
-    d_race_grid = [0.70, 0.80, 0.85, 0.90, 0.95]
-    d_hisp_grid = [0.20, 0.30, 0.40, 0.50, 0.60]
-    d_gender_grid = [0.85, 0.90, 0.95, 1.00]
+    if len(val_recs) < MIN_RECORDS:
+        return dict(DEFAULT_PARAMS)
 
     best_score = 999
-    best = {"d_race": 0.85, "d_hisp": 0.50, "d_gender": 0.95}
+    best = dict(DEFAULT_PARAMS)
 
-    for dr in d_race_grid:
-        for dh in d_hisp_grid:
-            for dg in d_gender_grid:
+    for dr in D_RACE_GRID:
+        for dh in D_HISP_GRID:
+            for dg in D_GENDER_GRID:
                 def fn(rec, _dr=dr, _dh=dh, _dg=dg):
                     pred = scenario_v92_full(rec)
                     if not pred:
@@ -357,7 +390,7 @@ def search_dampening(val_recs, cal, hisp_cal, tier=None):
                 if not m:
                     continue
                 # Guard rails: don't accept params that blow up race
-                if m["race"] > 4.70 or m["p30"] > 8.0:
+                if m["race"] > MAX_RACE_MAE or m["p30"] > MAX_P30:
                     continue
                 # Combined objective: race-weighted composite
                 score = m["race"] * 3 + m["hisp"] + m["gender"]
@@ -373,13 +406,15 @@ def find_per_tier_dampening(val_recs, cal, hisp_cal):
 
     Falls back to global params for tiers with too few validation records.
     """
-    global_params = search_dampening(val_recs, cal, hisp_cal)
+    inputs = dampening_inputs(val_recs, cal, hisp_cal)
+    global_params = search_dampening(val_recs, cal, hisp_cal, inputs=inputs)
 
     tier_params = {}
     for tier in ["Low", "Med-Low", "Med-High", "High", "unknown"]:
         tier_val = [r for r in val_recs if r["diversity_tier"] == tier]
         if len(tier_val) >= 30:
-            tier_params[tier] = search_dampening(val_recs, cal, hisp_cal, tier=tier)
+            tier_params[tier] = search_dampening(
+                val_recs, cal, hisp_cal, tier=tier, inputs=inputs)
         else:
             tier_params[tier] = global_params
 
@@ -677,9 +712,85 @@ def train_fold_pipeline(train_recs, all_recs, kappa=DEFAULT_KAPPA):
 # K-FOLD RUNNER
 # ================================================================
 
-def run_kfold(records, k=5, kappa=DEFAULT_KAPPA, seed=2026):
+def run_fold(records, fold_map, fold_idx, kappa=DEFAULT_KAPPA):
+    """Train on every fold but fold_idx, evaluate on fold_idx.
+
+    Returns (predictions, metrics or None, tier_params).
+    """
+    t0 = time.time()
+    train_recs = [r for r in records
+                  if fold_map.get(r["company_code"]) != fold_idx]
+    test_recs = [r for r in records
+                 if fold_map.get(r["company_code"]) == fold_idx]
+
+    print("\n  --- Fold %d: train=%d test=%d ---" % (
+        fold_idx, len(train_recs), len(test_recs)))
+
+    predict_fn, tier_params, global_params = train_fold_pipeline(
+        train_recs, records, kappa=kappa)
+
+    # Print tier dampening for this fold
+    print("    Dampening: global d_race=%.2f d_hisp=%.2f d_gender=%.2f" % (
+        global_params["d_race"], global_params["d_hisp"],
+        global_params["d_gender"]))
+    for tier in ["Low", "Med-Low", "Med-High", "High"]:
+        p = tier_params.get(tier, global_params)
+        if p != global_params:
+            print("    %-12s d_race=%.2f d_hisp=%.2f d_gender=%.2f" % (
+                tier, p["d_race"], p["d_hisp"], p["d_gender"]))
+
+    # Evaluate on test
+    m = evaluate(test_recs, predict_fn)
+    if m:
+        print("    Race=%.3f Hisp=%.3f Gender=%.3f | "
+              "P>20=%.1f%% P>30=%.1f%% AbsBias=%.3f" % (
+                  m["race"], m["hisp"], m["gender"],
+                  m["p20"], m["p30"], m["abs_bias"]))
+
+    # Collect predictions
+    predictions = []
+    for rec in test_recs:
+        pred = predict_fn(rec)
+        predictions.append({
+            "company_code": rec["company_code"],
+            "name": rec.get("name", ""),
+            "naics_group": rec["naics_group"],
+            "region": rec["region"],
+            "diversity_tier": rec["diversity_tier"],
+            "total_employees": rec.get("total_employees", 0),
+            "prediction": pred,
+            "truth": rec["truth"],
+            "fold": fold_idx,
+        })
+
+    print("    Fold %d complete in %.0fs" % (fold_idx, time.time() - t0))
+    return predictions, m, tier_params
+
+
+# Worker-process state: records are shipped once per worker, not per fold.
+_WORKER_RECORDS = None
+
+
+def _init_fold_worker(records):
+    global _WORKER_RECORDS
+    _WORKER_RECORDS = records
+
+
+def _fold_worker(fold_map, fold_idx, kappa):
+    # Each fold rewrites rec["hispanic_pred"] on every record; that stays
+    # inside this process's copy, so folds don't interfere.
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        result = run_fold(_WORKER_RECORDS, fold_map, fold_idx, kappa=kappa)
+    return buf.getvalue(), result
+
+
+def run_kfold(records, k=5, kappa=DEFAULT_KAPPA, seed=2026, jobs=1):
     """Run K-fold cross-validation with V11 pipeline.
 
+    jobs > 1 runs folds in parallel processes; output and results are
+    reported in fold order, identical to a sequential run.
+
     Returns (predictions_list, fold_metrics_list, tier_params_list).
     """
     fold_map = stratified_kfold(records, k=k, seed=seed)
@@ -690,60 +801,28 @@ def run_kfold(records, k=5, kappa=DEFAULT_KAPPA, seed=2026):
     for i in range(k):
         print("  Fold %d: %d companies" % (i, fold_counts[i]))
 
+    if jobs > 1:
+        print("  Running %d folds on %d processes..." % (k, min(jobs, k)))
+        with ProcessPoolExecutor(max_workers=min(jobs, k),
+                                 initializer=_init_fold_worker,
+                                 initargs=(records,)) as pool:
+            futures = [pool.submit(_fold_worker, fold_map, i, kappa) for i in range(k)]
+            results = []
+            for fut in futures:
+                output, result = fut.result()
+                sys.stdout.write(output)
+                results.append(result)
+    else:
+        results = [run_fold(records, fold_map, i, kappa=kappa) for i in range(k)]
+
     all_predictions = []
     fold_metrics = []
     all_tier_params = []
-
-    for fold_idx in range(k):
-        t0 = time.time()
-        train_recs = [r for r in records
-                      if fold_map.get(r["company_code"]) != fold_idx]
-        test_recs = [r for r in records
-                     if fold_map.get(r["company_code"]) == fold_idx]
-
-        print("\n  --- Fold %d: train=%d test=%d ---" % (
-            fold_idx, len(train_recs), len(test_recs)))
-
-        predict_fn, tier_params, global_params = train_fold_pipeline(
-            train_recs, records, kappa=kappa)
-
-        all_tier_params.append(tier_params)
-
-        # Print tier dampening for this fold
-        print("    Dampening: global d_race=%.2f d_hisp=%.2f d_gender=%.2f" % (
-            global_params["d_race"], global_params["d_hisp"],
-            global_params["d_gender"]))
-        for tier in ["Low", "Med-Low", "Med-High", "High"]:
-            p = tier_params.get(tier, global_params)
-            if p != global_params:
-                print("    %-12s d_race=%.2f d_hisp=%.2f d_gender=%.2f" % (
-                    tier, p["d_race"], p["d_hisp"], p["d_gender"]))
-
-        # Evaluate on test
-        m = evaluate(test_recs, predict_fn)
+    for predictions, m, tier_params in results:
+        all_predictions.extend(predictions)
         if m:
-            print("    Race=%.3f Hisp=%.3f Gender=%.3f | "
-                  "P>20=%.1f%% P>30=%.1f%% AbsBias=%.3f" % (
-                      m["race"], m["hisp"], m["gender"],
-                      m["p20"], m["p30"], m["abs_bias"]))
             fold_metrics.append(m)
-
-        # Collect predictions
-        for rec in test_recs:
-            pred = predict_fn(rec)
-            all_predictions.append({
-                "company_code": rec["company_code"],
-                "name": rec.get("name", ""),
-                "naics_group": rec["naics_group"],
-                "region": rec["region"],
-                "diversity_tier": rec["diversity_tier"],
-                "total_employees": rec.get("total_employees", 0),
-                "prediction": pred,
-                "truth": rec["truth"],
-                "fold": fold_idx,
-            })
-
-        print("    Fold %d complete in %.0fs" % (fold_idx, time.time() - t0))
+        all_tier_params.append(tier_params)
 
     return all_predictions, fold_metrics, all_tier_params
 
@@ -907,20 +986,35 @@ def main():
                         help="Random seed for fold assignment")
     parser.add_argument("--pool-only", action="store_true",
                         help="Only use pool companies (skip extra EEO-1 loading)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Parallel fold processes (default: min(folds, CPUs); 1 = sequential)")
+    parser.add_argument("--feature-store", action="store_true",
+                        help="Read companies and loader inputs from feature_store/ (no DB)")
     args = parser.parse_args()
+    jobs = args.jobs or min(args.folds, os.cpu_count() or 1)
 
     t0 = time.time()
     print("V11 DEMOGRAPHICS: SHRINKAGE + PER-TIER DAMPENING + K-FOLD CV")
     print("=" * 80)
-    print("  kappa=%g  folds=%d  seed=%d" % (args.kappa, args.folds, args.seed))
-
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+    print("  kappa=%g  folds=%d  seed=%d  jobs=%d" % (args.kappa, args.folds, args.seed, jobs))
+
+    conn = cur = None
+    if args.feature_store:
+        from feature_store import open_store
+        print("\n--- LOADING FEATURE STORE ---")
+        store = open_store()
+        cl = store.loaders()
+        companies = store.companies("v11_pool" if args.pool_only else "v11_all")
+        rec_lookup = store.rec_lookup()
+        print("  Total unique companies: %d" % len(companies))
+    else:
+        conn = get_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cl = CachedLoadersV6(cur)
 
-    # --- Load all companies ---
-    print("\n--- LOADING ALL EEO-1 COMPANIES ---")
-    companies, rec_lookup = load_all_companies(cl, cur, pool_only=args.pool_only)
+        # --- Load all companies ---
+        print("\n--- LOADING ALL EEO-1 COMPANIES ---")
+        companies, rec_lookup = load_all_companies(cl, cur, pool_only=args.pool_only)
 
     # --- Build records ---
     print("\n--- BUILDING RECORDS ---")
@@ -972,7 +1066,7 @@ def main():
     print("V11 %d-FOLD CROSS-VALIDATION (out-of-sample)" % args.folds)
     print("=" * 80)
     predictions, fold_metrics, tier_params = run_kfold(
-        records, k=args.folds, kappa=args.kappa, seed=args.seed)
+        records, k=args.folds, kappa=args.kappa, seed=args.seed, jobs=jobs)
 
     # --- Aggregate results ---
     m_v11 = compute_aggregate_metrics(predictions)
@@ -1123,8 +1217,9 @@ def main():
     print("\n  Predictions saved to: %s" % out_path)
     print("  (%d companies)" % len(serializable))
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        cur.close()
+        conn.close()
     print("\nTotal runtime: %.0fs" % (time.time() - t0))
 
 
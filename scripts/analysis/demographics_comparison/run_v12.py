@@ -21,6 +21,7 @@ for the first time in model history.
 
 Usage:
     py scripts/analysis/demographics_comparison/run_v12.py [--phase 0c|final]
+    py scripts/analysis/demographics_comparison/run_v12.py --feature-store   # no DB
 """
 import os
 import sys
@@ -187,6 +188,8 @@ def main():
     parser = argparse.ArgumentParser(description='V12 Production Model')
     parser.add_argument('--phase', default='final', choices=['0c', 'final'],
                         help='Phase: 0c=baseline reproduction, final=full evaluation')
+    parser.add_argument('--feature-store', action='store_true',
+                        help='Read checkpoint records and loader inputs from feature_store/ (no DB)')
     args = parser.parse_args()
 
     t0 = time.time()
@@ -198,12 +201,19 @@ def main():
 
     # Load data splits
     splits = build_v10_splits()
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
+    conn = cur = None
+    if args.feature_store:
+        from feature_store import open_store
+        store = open_store()
+        rec_lookup = store.rec_lookup()
+        cl = store.loaders()
+    else:
+        cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
+        rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
 
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
+        conn = get_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cl = CachedLoadersV6(cur)
 
     print("\nBuilding records...")
     all_companies = (splits["train_companies"]
@@ -324,8 +334,9 @@ def main():
     save_json(os.path.join(SCRIPT_DIR, "v12_production_results.json"), results)
     print("\nResults saved to v12_production_results.json")
 
-    cur.close()
-    conn.close()
+    if conn is not None:
+        cur.close()
+        conn.close()
     print("\nTotal runtime: %.0fs" % (time.time() - t0))
 
 
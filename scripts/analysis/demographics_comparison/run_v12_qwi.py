@@ -47,22 +47,35 @@ GENDER_CATS = ["Male", "Female"]
 # QWI CACHE LOADER
 # ================================================================
 class QWICache:
-    """Loads and provides lookups into the QWI county x NAICS4 cache."""
+    """Loads and provides lookups into the QWI county x NAICS4 cache.
+
+    Reads the memory-mapped binary cache (qwi_binary.py) when it is present
+    and current, otherwise the JSON. Both expose the five cascade levels as
+    mappings of key -> cell dict, so the lookups below are format-agnostic.
+    """
 
     def __init__(self, cache_path=None):
-        if cache_path is None:
-            cache_path = os.path.join(SCRIPT_DIR, 'qwi_county_naics4_cache.json')
+        from qwi_binary import load as load_binary, resolve_cache_path
+        cache_path = resolve_cache_path(cache_path)
 
         print("Loading QWI cache from %s..." % cache_path)
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        self.metadata = data['metadata']
-        self.primary = data['primary']       # county:naics4 -> {race, hispanic, gender, emp}
-        self.county_n2 = data['fallbacks']['county_n2']    # county:naics2
-        self.county_all = data['fallbacks']['county_all']  # county
-        self.state_n4 = data['fallbacks']['state_n4']      # state_fips:naics4
-        self.state_n2 = data['fallbacks']['state_n2']      # state_fips:naics2
+        if cache_path.endswith('.npy'):
+            self.metadata, levels = load_binary(cache_path)
+            self.primary = levels['primary']
+            self.county_n2 = levels['county_n2']
+            self.county_all = levels['county_all']
+            self.state_n4 = levels['state_n4']
+            self.state_n2 = levels['state_n2']
+        else:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            self.metadata = data['metadata']
+            self.primary = data['primary']       # county:naics4 -> {race, hispanic, gender, emp}
+            self.county_n2 = data['fallbacks']['county_n2']    # county:naics2
+            self.county_all = data['fallbacks']['county_all']  # county
+            self.state_n4 = data['fallbacks']['state_n4']      # state_fips:naics4
+            self.state_n2 = data['fallbacks']['state_n2']      # state_fips:naics2
 
         n = self.metadata['n_primary_cells']
         cov = self.metadata['coverage']
@@ -8,6 +8,10 @@ Three changes tested sequentially:
   Step 1: Retrain V9.1 on larger training set (~10,725 vs 10,000)
   Step 2: Add county diversity tier to calibration hierarchy
   Step 3: Adaptive Black estimator (grid-searched per-industry signal blending)
+
+Usage:
+    py scripts/analysis/demographics_comparison/run_v9_2.py
+    py scripts/analysis/demographics_comparison/run_v9_2.py --feature-store   # no DB
 """
 import json
 import os
@@ -73,6 +77,23 @@ def build_splits():
     }
 
 
+def load_inputs(feature_store=False):
+    """Checkpoint records and loaders as (rec_lookup, cl, conn).
+
+    With feature_store=True both come from feature_store/ (see
+    feature_store.py) and conn is None: no database connection is opened.
+    """
+    if feature_store:
+        from feature_store import open_store
+        store = open_store()
+        return store.rec_lookup(), store.loaders(), None
+    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
+    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
+    conn = get_connection()
+    cl = CachedLoadersV6(conn.cursor(cursor_factory=RealDictCursor))
+    return rec_lookup, cl, conn
+
+
 # ================================================================
 # METRIC HELPERS
 # ================================================================
@@ -909,6 +930,12 @@ def grid_search_black_weights(train_records, target_naics_groups=None):
 # MAIN
 # ================================================================
 def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="V9.2 Demographics Model")
+    parser.add_argument("--feature-store", action="store_true",
+                        help="Read checkpoint records and loader inputs from feature_store/ (no DB)")
+    args = parser.parse_args()
+
     t0 = time.time()
     print("V9.2: TRAINING EXPANSION + COUNTY DIVERSITY CALIBRATION + ADAPTIVE BLACK")
     print("=" * 100)
@@ -935,16 +962,10 @@ def main():
     assert len(overlap_dev_perm) == 0
     assert len(overlap_train_dev) == 0
 
-    # --- Load prediction checkpoint ---
-    cp = load_json(os.path.join(SCRIPT_DIR, "v9_best_of_ipf_prediction_checkpoint.json"))
-    rec_lookup = {r["company_code"]: r for r in cp["all_records"]}
+    # --- Load prediction checkpoint, connect to DB (or read the feature store) ---
+    rec_lookup, cl, conn = load_inputs(args.feature_store)
     print("Expert prediction checkpoint: %d records" % len(rec_lookup))
 
-    # --- Connect to DB ---
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cl = CachedLoadersV6(cur)
-
     # --- Build records ---
     print("\nBuilding records with county diversity and Black signals...")
     all_companies = splits["train_companies"] + splits["dev_companies"] + list(splits["perm_companies"])
@@ -1605,6 +1626,8 @@ def main():
 
     save_json(os.path.join(SCRIPT_DIR, "v9_2_results.json"), output)
     print("\nResults saved: v9_2_results.json")
+    if conn is not None:
+        conn.close()
     print("Runtime: %.0fs" % (time.time() - t0))
 
 
@@ -4,8 +4,13 @@ Uses Gemini text-embedding-004 to generate embeddings, then classifies
 "other" articles by cosine similarity to labeled articles. Pure numpy
 classification -- no generative LLM calls.
 
+Vectors are also kept in the shared response store (llm_response_store.py),
+keyed on the exact text embedded, so re-embedding after a table rebuild or
+for a re-extracted contract only calls the API for text it has not seen.
+
 Subcommands:
     py scripts/cba/12_embed_classify.py embed --all
+    py scripts/cba/12_embed_classify.py embed --all --no-store   # bypass response store
     py scripts/cba/12_embed_classify.py classify --dry-run
     py scripts/cba/12_embed_classify.py classify --auto-assign --threshold 0.85
     py scripts/cba/12_embed_classify.py cluster
@@ -34,11 +39,14 @@ if _env_path.exists():
             os.environ.setdefault(key.strip(), val.strip())
 
 from db_config import get_connection
+from llm_response_store import ResponseStore, payload_hash
 
 BATCH_SIZE = 100  # Gemini embed API limit
 MAX_TEXT_CHARS = 8000  # text-embedding-004 handles ~8192 tokens
 MODEL_NAME = "gemini-embedding-001"
 DIMENSIONS = 3072
+TASK_TYPE = "CLASSIFICATION"
+EMBED_VERSION = "embed-v1"  # bump when _build_embedding_text changes
 
 
 def _get_genai_client():
@@ -140,17 +148,19 @@ def _insert_embedding(cur, object_type, object_id, values):
         raise ValueError(f"Unknown object_type: {object_type}")
 
 
-def _embed_batch(client, object_type, rows):
-    """Embed a single batch of rows and upsert. Returns count embedded."""
-    from google.genai import types
+def _embedding_hash(text: str) -> str:
+    return payload_hash({"text": text, "task_type": TASK_TYPE, "dimensions": DIMENSIONS})
 
-    texts = [_build_embedding_text(title or "", body or "") for _, title, body in rows]
+
+def _call_embed_api(client, texts):
+    """Embedding vectors for texts, or None after a failed retry."""
+    from google.genai import types
 
     try:
         result = client.models.embed_content(
             model=MODEL_NAME,
             contents=texts,
-            config=types.EmbedContentConfig(task_type="CLASSIFICATION"),
+            config=types.EmbedContentConfig(task_type=TASK_TYPE),
         )
     except Exception as exc:
         if "429" in str(exc) or "RESOURCE_EXHAUSTED" in str(exc):
@@ -160,20 +170,42 @@ def _embed_batch(client, object_type, rows):
                 result = client.models.embed_content(
                     model=MODEL_NAME,
                     contents=texts,
-                    config=types.EmbedContentConfig(task_type="CLASSIFICATION"),
+                    config=types.EmbedContentConfig(task_type=TASK_TYPE),
                 )
             except Exception as exc2:
                 print(f"  Retry failed: {exc2}")
-                return 0
+                return None
         else:
             print(f"  API error: {exc}")
             time.sleep(2)
+            return None
+    return [list(emb.values) for emb in result.embeddings]
+
+
+def _embed_batch(client, object_type, rows, store=None):
+    """Embed a single batch of rows and upsert. Returns count embedded.
+
+    With a store, only texts it has no vector for go to the API.
+    """
+    texts = [_build_embedding_text(title or "", body or "") for _, title, body in rows]
+    digests = [_embedding_hash(t) for t in texts]
+    known = store.get_many(MODEL_NAME, EMBED_VERSION, digests) if store else {}
+
+    # Identical texts within a batch are embedded once.
+    todo = {d: t for d, t in zip(digests, texts) if d not in known}
+    if todo:
+        vectors = _call_embed_api(client, list(todo.values()))
+        if vectors is None:
             return 0
+        fresh = dict(zip(todo, vectors))
+        if store:
+            store.put_many(MODEL_NAME, EMBED_VERSION, fresh.items())
+        known = {**known, **fresh}
 
     with get_connection() as conn:
         with conn.cursor() as cur:
-            for i, emb in enumerate(result.embeddings):
-                _insert_embedding(cur, object_type, rows[i][0], emb.values)
+            for row, digest in zip(rows, digests):
+                _insert_embedding(cur, object_type, row[0], known[digest])
         conn.commit()
 
     return len(rows)
@@ -183,6 +215,7 @@ def cmd_embed(args):
     """Generate embeddings for articles, provisions, or both via Gemini API."""
     obj_types = ["article", "provision"] if args.type == "all" else [args.type]
     client = _get_genai_client()
+    store = None if args.no_store else ResponseStore()
 
     for object_type in obj_types:
         with get_connection() as conn:
@@ -204,7 +237,7 @@ def cmd_embed(args):
         for batch_start in range(0, len(rows), BATCH_SIZE):
             batch = rows[batch_start:batch_start + BATCH_SIZE]
             batch_num = batch_start // BATCH_SIZE + 1
-            n = _embed_batch(client, object_type, batch)
+            n = _embed_batch(client, object_type, batch, store)
             total_embedded += n
             print(f"  Batch {batch_num}/{total_batches}: embedded {n} (total: {total_embedded}/{len(rows)})")
             if batch_start + BATCH_SIZE < len(rows):
@@ -212,6 +245,10 @@ def cmd_embed(args):
 
         print(f"\nDone: {total_embedded} {object_type}s embedded")
 
+    if store:
+        print(store.summary("texts"))
+        store.close()
+
 
 # ── classify subcommand ─────────────────────────────────────────────
 
@@ -527,6 +564,8 @@ def main():
     g = p_embed.add_mutually_exclusive_group()
     g.add_argument("--all", action="store_true", help="All of the selected type")
     g.add_argument("--cba-id", type=int, help="Single contract")
+    p_embed.add_argument("--no-store", action="store_true",
+                         help="Call the API for every text, ignoring the response store")
 
     # classify
     p_cls = sub.add_parser("classify", help="Classify 'other' articles by kNN")
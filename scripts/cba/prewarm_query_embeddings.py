@@ -0,0 +1,133 @@
+"""Seed the CBA semantic-search query embedding cache.
+
+/api/cba/semantic-search serves query embeddings from an in-process LRU and
+the cba_query_embeddings table (api/services/query_embedding_cache.py). This
+script fills the table ahead of time so the first user to type a common
+query does not wait on Gemini:
+
+  * the category and category-group names of the CBA search UI,
+  * queries from --file (one per line, e.g. exported from the search logs),
+  * --top N re-embeds the N most-hit stored queries (after a model change).
+
+Queries already stored for the current model are skipped, and the rest go to
+Gemini 100 per call. Existing hit counts are kept. New rows start at
+hit_count 0, so they only rank above other rows once users actually search
+for them.
+
+Usage:
+    py scripts/cba/prewarm_query_embeddings.py
+    py scripts/cba/prewarm_query_embeddings.py --file common_queries.txt
+    py scripts/cba/prewarm_query_embeddings.py --no-categories --file q.txt --dry-run
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# Load .env for GOOGLE_API_KEY
+_env_path = Path(__file__).resolve().parents[2] / ".env"
+if _env_path.exists():
+    for line in _env_path.read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#") and "=" in line:
+            key, _, val = line.partition("=")
+            os.environ.setdefault(key.strip(), val.strip())
+
+from psycopg2.extras import execute_values
+
+from db_config import get_connection
+from api.routers.cba import CATEGORY_GROUPS, _GEMINI_EMBED_MODEL, _QUERY_TASK_TYPE
+from api.services.query_embedding_cache import TABLE_DDL, normalize_query
+
+BATCH_SIZE = 100  # Gemini embed API limit
+
+
+def category_queries() -> list[str]:
+    """Group names and category labels as a user would type them."""
+    queries = list(CATEGORY_GROUPS)
+    for cats in CATEGORY_GROUPS.values():
+        queries.extend(c.replace("_", " ") for c in cats)
+    return queries
+
+
+def _embed(client, texts):
+    from google.genai import types
+
+    result = client.models.embed_content(
+        model=_GEMINI_EMBED_MODEL,
+        contents=texts,
+        config=types.EmbedContentConfig(task_type=_QUERY_TASK_TYPE),
+    )
+    return [list(e.values) for e in result.embeddings]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prewarm the CBA query embedding cache")
+    parser.add_argument("--file", action="append", default=[],
+                        help="Text file with one query per line (repeatable)")
+    parser.add_argument("--no-categories", action="store_true",
+                        help="Skip the built-in category / group names")
+    parser.add_argument("--top", type=int, default=0,
+                        help="Also re-embed the N most-hit stored queries")
+    parser.add_argument("--dry-run", action="store_true", help="Count only, no API calls")
+    args = parser.parse_args()
+
+    queries = [] if args.no_categories else category_queries()
+    for path in args.file:
+        queries.extend(Path(path).read_text(encoding="utf-8").splitlines())
+
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(TABLE_DDL)
+    conn.commit()
+
+    refresh = []
+    if args.top:
+        cur.execute("""
+            SELECT query_norm FROM cba_query_embeddings
+            ORDER BY hit_count DESC, last_used_at DESC LIMIT %s
+        """, [args.top])
+        refresh = [r[0] for r in cur.fetchall()]
+
+    wanted = list(dict.fromkeys(q for q in map(normalize_query, queries) if len(q) >= 2))
+    cur.execute("""
+        SELECT query_norm FROM cba_query_embeddings
+        WHERE model = %s AND task_type = %s AND query_norm = ANY(%s)
+    """, [_GEMINI_EMBED_MODEL, _QUERY_TASK_TYPE, wanted])
+    stored = {r[0] for r in cur.fetchall()}
+    todo = list(dict.fromkeys([q for q in wanted if q not in stored] + refresh))
+    print(f"{len(wanted)} candidate queries, {len(stored)} already stored, "
+          f"{len(refresh)} to refresh -> {len(todo)} to embed")
+    if args.dry_run or not todo:
+        conn.close()
+        return
+
+    from api.routers.cba import _get_gemini_embed_client
+    client = _get_gemini_embed_client()
+    done = 0
+    for start in range(0, len(todo), BATCH_SIZE):
+        batch = todo[start:start + BATCH_SIZE]
+        vectors = _embed(client, batch)
+        execute_values(cur, """
+            INSERT INTO cba_query_embeddings (model, task_type, query_norm, embedding)
+            VALUES %s
+            ON CONFLICT (model, task_type, query_norm) DO UPDATE
+            SET embedding = EXCLUDED.embedding
+        """, [(_GEMINI_EMBED_MODEL, _QUERY_TASK_TYPE, q, v) for q, v in zip(batch, vectors)])
+        conn.commit()
+        done += len(batch)
+        print(f"  embedded {done}/{len(todo)}")
+        if start + BATCH_SIZE < len(todo):
+            time.sleep(0.5)
+
+    conn.close()
+    print(f"Done: {done} query embeddings stored")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,16 +11,22 @@ Useful for:
 
 Data source: BLS QCEW annual CSV files
 URL pattern: https://data.bls.gov/cew/data/files/{year}/csv/{year}_annual_singlefile.zip
+
+Downloads go through scripts/etl/source_cache.py (conditional GET on the
+previous ETag/Last-Modified). A year whose file is unchanged since its last
+successful load is skipped entirely; pass --force to reload anyway.
 """
 import os
 import csv
 import io
+import sys
 import time
 import zipfile
 import requests
 from psycopg2.extras import execute_values
 
 from db_config import get_connection
+from source_cache import SourceCache, is_unchanged, record_consumption
 DOWNLOAD_DIR = r"C:\Users\jakew\Downloads"
 
 DB_CONFIG = {
@@ -62,34 +68,22 @@ def create_table(conn):
     print("  qcew_annual table ready")
 
 
-def download_qcew_year(year):
-    """Download QCEW annual singlefile for a year."""
+def download_qcew_year(year, cache=None):
+    """Download QCEW annual singlefile for a year via the source cache.
+
+    Returns the cache Artifact; its path is materialized at the usual
+    DOWNLOAD_DIR location so existing tooling still finds it there.
+    """
+    cache = cache or SourceCache()
     url = f"https://data.bls.gov/cew/data/files/{year}/csv/{year}_annual_singlefile.zip"
     local_path = os.path.join(DOWNLOAD_DIR, f"qcew_{year}_annual.zip")
 
-    if os.path.exists(local_path):
-        size_mb = os.path.getsize(local_path) / (1024*1024)
-        print(f"  Using existing file: {local_path} ({size_mb:.1f} MB)")
-        return local_path
-
-    print(f"  Downloading: {url}")
-    resp = requests.get(url, stream=True, timeout=300)
-    resp.raise_for_status()
-
-    total = int(resp.headers.get('content-length', 0))
-    downloaded = 0
-
-    with open(local_path, 'wb') as f:
-        for chunk in resp.iter_content(chunk_size=8192*16):
-            f.write(chunk)
-            downloaded += len(chunk)
-            if total > 0 and downloaded % (10 * 1024 * 1024) < 8192*16:
-                pct = 100 * downloaded / total
-                print(f"    {downloaded/(1024*1024):.0f}/{total/(1024*1024):.0f} MB ({pct:.1f}%)")
-
-    size_mb = os.path.getsize(local_path) / (1024*1024)
-    print(f"  Downloaded {size_mb:.1f} MB")
-    return local_path
+    print(f"  Fetching: {url}")
+    artifact = cache.fetch(url)
+    cache.materialize(artifact, local_path)
+    size_mb = artifact.size / (1024*1024)
+    print(f"  {local_path} ({size_mb:.1f} MB{'' if artifact.changed else ', unchanged'})")
+    return artifact
 
 
 def parse_int(val):
@@ -272,12 +266,19 @@ def main():
         create_table(conn)
 
         years = [2024, 2023, 2022, 2021, 2020]
+        force = "--force" in sys.argv[1:]
+        cache = SourceCache()
 
         for year in years:
             print(f"\n=== QCEW {year} ===")
             try:
-                zip_path = download_qcew_year(year)
-                rows = load_qcew_year(conn, zip_path, year)
+                artifact = download_qcew_year(year, cache)
+                loader = f"fetch_qcew:{year}"
+                if not force and is_unchanged(conn, loader, [artifact]):
+                    print(f"  {year} unchanged since last load -- skipping")
+                    continue
+                rows = load_qcew_year(conn, artifact.path, year)
+                record_consumption(conn, loader, [artifact])
                 total_rows += rows
             except requests.HTTPError as e:
                 print(f"  Year {year} not available: {e}")
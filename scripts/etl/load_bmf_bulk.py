@@ -8,6 +8,8 @@ Features:
 - Adds required columns to irs_bmf idempotently
 - Uses COPY -> staging table -> ON CONFLICT upsert for speed
 - Computes name_normalized and is_labor_org flags
+- Downloads go through the content-addressed source cache (conditional GET);
+  a run whose input files match the last successful load is skipped
 """
 from __future__ import annotations
 
@@ -33,6 +35,7 @@ PROJECT_ROOT = SCRIPT_DIR.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from db_config import get_connection
+from scripts.etl.source_cache import SourceCache, is_unchanged, record_consumption
 
 IRS_BMF_URL = (
     "https://www.irs.gov/charities-non-profits/"
@@ -118,7 +121,18 @@ def discover_bmf_links(session: requests.Session) -> List[str]:
     return links
 
 
-def download_files(session: requests.Session, urls: List[str], download_dir: Path) -> List[Path]:
+def download_files(
+    session: requests.Session,
+    urls: List[str],
+    download_dir: Path,
+    cache: Optional[SourceCache] = None,
+) -> List[Path]:
+    """Fetch every URL through the source cache into ``download_dir``.
+
+    Each URL is a conditional GET against its previous ETag/Last-Modified, so
+    files the IRS has not republished are not re-downloaded.
+    """
+    cache = cache or SourceCache()
     download_dir.mkdir(parents=True, exist_ok=True)
     downloaded: List[Path] = []
 
@@ -126,21 +140,9 @@ def download_files(session: requests.Session, urls: List[str], download_dir: Pat
         filename = url.split("/")[-1].split("?")[0].strip()
         if not filename:
             filename = f"bmf_file_{idx}.dat"
-        target = download_dir / filename
-
-        if target.exists() and target.stat().st_size > 0:
-            print(f"[skip] {target.name} already exists")
-            downloaded.append(target)
-            continue
-
         print(f"[download] {idx}/{len(urls)} {url}")
-        with session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as r:
-            r.raise_for_status()
-            with open(target, "wb") as f:
-                for chunk in r.iter_content(chunk_size=1024 * 1024):
-                    if chunk:
-                        f.write(chunk)
-        downloaded.append(target)
+        artifact = cache.fetch(url, session=session)
+        downloaded.append(cache.materialize(artifact, download_dir / filename))
 
     return downloaded
 
@@ -700,6 +702,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Parse and summarize without inserting into DB",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Load even if the input files are unchanged since the last successful load",
+    )
     return parser.parse_args()
 
 
@@ -709,6 +716,7 @@ def main() -> int:
 
     session = requests.Session()
     session.headers.update({"User-Agent": "labor-data-project-bmf-loader/1.0"})
+    cache = SourceCache()
 
     try:
         if not args.skip_download:
@@ -718,7 +726,7 @@ def main() -> int:
                 print("ERROR: No download links found on IRS EO BMF page.")
                 return 1
             print(f"[step] Found {len(links)} file links")
-            download_files(session, links, args.download_dir)
+            download_files(session, links, args.download_dir, cache)
         else:
             args.download_dir.mkdir(parents=True, exist_ok=True)
             print("[step] Skipping download")
@@ -741,8 +749,13 @@ def main() -> int:
             print_top_counter(stats.state_counts, "Top 10 states:")
             return 0
 
+        artifacts = [cache.register_file(p) for p in files]
         conn = get_connection()
         conn.autocommit = False
+        if not args.force and args.limit is None and is_unchanged(conn, "load_bmf_bulk", artifacts):
+            print("[step] BMF input files unchanged since the last successful load -- skipping (use --force)")
+            conn.close()
+            return 0
         try:
             with conn.cursor() as cur:
                 ensure_irs_bmf_columns(cur)
@@ -756,6 +769,8 @@ def main() -> int:
                 print(f"Skipped missing EIN/org_name: {stats.skipped_missing_key:,}")
                 print(f"Upsert row operations: {stats.loaded_total:,}")
                 print_db_summary(cur)
+            if args.limit is None:
+                record_consumption(conn, "load_bmf_bulk", artifacts)
             return 0
         except Exception:
             conn.rollback()
@@ -17,8 +17,10 @@ Schema: https://www.fec.gov/campaign-finance-data/contributions-individuals-file
 
 Usage:
     py scripts/etl/load_fec.py                            # use existing zips
-    py scripts/etl/load_fec.py --redownload               # re-fetch from FEC
+    py scripts/etl/load_fec.py --redownload               # conditional re-fetch from FEC (ETag cache)
+    py scripts/etl/load_fec.py --force                    # reload even if source files are unchanged
     py scripts/etl/load_fec.py --skip-indiv               # load everything except indiv (fast pass)
+    py scripts/etl/load_fec.py --partitioned              # indiv via load_fec_indiv_partitioned (cycle 2024)
 
 Indexes deferred until after load (mirrors load_epa_echo.py pattern).
 """
@@ -28,7 +30,7 @@ import io
 import sys
 import time
 import zipfile
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -122,8 +124,8 @@ CREATE TABLE fec_candidates (
     loaded_at            TIMESTAMPTZ DEFAULT NOW()
 );
 
-DROP TABLE IF EXISTS fec_individual_contributions CASCADE;
-CREATE TABLE fec_individual_contributions (
+DROP TABLE IF EXISTS fec_committee_contributions CASCADE;
+CREATE TABLE fec_committee_contributions (
     sub_id               BIGINT PRIMARY KEY,
     cmte_id              VARCHAR(9),
     amndt_ind            CHAR(1),
@@ -141,16 +143,20 @@ CREATE TABLE fec_individual_contributions (
     transaction_dt       DATE,
     transaction_amt      NUMERIC(14,2),
     other_id             VARCHAR(9),
+    cand_id              VARCHAR(9),
     tran_id              VARCHAR(40),
     file_num             BIGINT,
     memo_cd              CHAR(1),
     memo_text            TEXT,
-    employer_norm        TEXT,
     loaded_at            TIMESTAMPTZ DEFAULT NOW()
 );
+"""
 
-DROP TABLE IF EXISTS fec_committee_contributions CASCADE;
-CREATE TABLE fec_committee_contributions (
+# Kept separate so --partitioned can leave the partitioned parent (owned by
+# load_fec_indiv_partitioned.py) alone.
+DDL_INDIV_TABLE = """
+DROP TABLE IF EXISTS fec_individual_contributions CASCADE;
+CREATE TABLE fec_individual_contributions (
     sub_id               BIGINT PRIMARY KEY,
     cmte_id              VARCHAR(9),
     amndt_ind            CHAR(1),
@@ -168,11 +174,11 @@ CREATE TABLE fec_committee_contributions (
     transaction_dt       DATE,
     transaction_amt      NUMERIC(14,2),
     other_id             VARCHAR(9),
-    cand_id              VARCHAR(9),
     tran_id              VARCHAR(40),
     file_num             BIGINT,
     memo_cd              CHAR(1),
     memo_text            TEXT,
+    employer_norm        TEXT,
     loaded_at            TIMESTAMPTZ DEFAULT NOW()
 );
 """
@@ -182,17 +188,19 @@ CREATE INDEX idx_fec_cm_connected_org_norm ON fec_committees (connected_org_norm
 CREATE INDEX idx_fec_cm_state              ON fec_committees (cmte_st);
 CREATE INDEX idx_fec_cm_type               ON fec_committees (cmte_tp);
 
-CREATE INDEX idx_fec_indiv_employer_norm   ON fec_individual_contributions (employer_norm) WHERE employer_norm IS NOT NULL;
-CREATE INDEX idx_fec_indiv_state           ON fec_individual_contributions (state);
-CREATE INDEX idx_fec_indiv_cmte            ON fec_individual_contributions (cmte_id);
-CREATE INDEX idx_fec_indiv_dt              ON fec_individual_contributions (transaction_dt);
-
 CREATE INDEX idx_fec_paccontrib_cmte       ON fec_committee_contributions (cmte_id);
 CREATE INDEX idx_fec_paccontrib_cand       ON fec_committee_contributions (cand_id);
 
 CREATE INDEX idx_fec_cn_party              ON fec_candidates (cand_pty_affiliation);
 """
 
+DDL_INDIV_INDEXES = """
+CREATE INDEX idx_fec_indiv_employer_norm   ON fec_individual_contributions (employer_norm) WHERE employer_norm IS NOT NULL;
+CREATE INDEX idx_fec_indiv_state           ON fec_individual_contributions (state);
+CREATE INDEX idx_fec_indiv_cmte            ON fec_individual_contributions (cmte_id);
+CREATE INDEX idx_fec_indiv_dt              ON fec_individual_contributions (transaction_dt);
+"""
+
 
 # ---------------------------------------------------------------------------
 # Type coercion helpers
@@ -498,18 +506,23 @@ def _update_freshness(cur, conn, indiv_count, pas2_count, cmte_count, cand_count
     conn.commit()
 
 
-def download(name: str, url: str):
-    import subprocess
-    target = FEC_DIR / name
-    target.parent.mkdir(parents=True, exist_ok=True)
-    print(f"Downloading {url} -> {target}")
-    cmd = [
-        "powershell.exe", "-NoProfile", "-Command",
-        f"[Net.ServicePointManager]::SecurityProtocol = [Net.SecurityProtocolType]::Tls12; "
-        f"Invoke-WebRequest -Uri '{url}' -OutFile '{target}' -UseBasicParsing",
-    ]
-    subprocess.run(cmd, check=True)
-    print(f"  Downloaded {target.stat().st_size / 1e6:.1f} MB")
+def download(name: str, url: str, cache=None):
+    """Fetch ``url`` through the source cache and place it at files/fec/<name>.
+
+    Conditional GET (ETag / Last-Modified): an unchanged FEC file costs one
+    round trip, not a multi-GB re-download.
+    """
+    import requests
+    from scripts.etl.source_cache import SourceCache
+
+    cache = cache or SourceCache()
+    session = requests.Session()
+    session.headers.update({"User-Agent": "labor-data-project-fec-loader/1.0"})
+    print(f"Fetching {url}")
+    art = cache.fetch(url, session=session)
+    target = cache.materialize(art, FEC_DIR / name)
+    print(f"  {target} ({target.stat().st_size / 1e6:.1f} MB{'' if art.changed else ', unchanged'})")
+    return art
 
 
 def main():
@@ -518,35 +531,64 @@ def main():
                         help="Re-fetch all 4 FEC files before loading")
     parser.add_argument("--skip-indiv", action="store_true",
                         help="Skip the (huge) individual contributions file")
+    parser.add_argument("--partitioned", action="store_true",
+                        help="Load indiv24 as a cycle partition via load_fec_indiv_partitioned.py "
+                             "(streamed COPY + ATTACH PARTITION) instead of the heap-table INSERT path")
+    parser.add_argument("--force", action="store_true",
+                        help="Reload even if the source files are unchanged since the last successful load")
     args = parser.parse_args()
 
+    from scripts.etl.source_cache import SourceCache, is_unchanged, record_consumption
+
+    cache = SourceCache()
     if args.redownload:
         for n, u in URLS.items():
-            download(n, u)
+            download(n, u, cache)
 
     for n in URLS:
         if args.skip_indiv and n == "indiv24.zip":
             continue
         if not (FEC_DIR / n).exists():
-            download(n, URLS[n])
+            download(n, URLS[n], cache)
+
+    artifacts = [
+        cache.register_file(FEC_DIR / n) for n in URLS
+        if not (args.skip_indiv and n == "indiv24.zip")
+    ]
 
     conn = get_connection()
     cur = conn.cursor()
 
+    if not args.force and is_unchanged(conn, "load_fec", artifacts):
+        print("FEC source files unchanged since the last successful load -- skipping (use --force to reload).")
+        conn.close()
+        return
+
     print("Creating FEC tables (indexes deferred)...")
     conn.autocommit = True
     cur.execute(DDL_TABLES)
+    if not args.partitioned:
+        cur.execute(DDL_INDIV_TABLE)
     conn.autocommit = False
 
     cmte_count = _load_committees(cur, conn)
     cand_count = _load_candidates(cur, conn)
     pas2_count = _load_pas2(cur, conn)
-    indiv_count = 0 if args.skip_indiv else _load_indiv(cur, conn)
+    if args.skip_indiv:
+        indiv_count = 0
+    elif args.partitioned:
+        from scripts.etl import load_fec_indiv_partitioned as fec_part
+        fec_part.ensure_parent(conn)
+        indiv_count = fec_part.load_cycle(2024)["rows"]
+    else:
+        indiv_count = _load_indiv(cur, conn)
 
     print("Creating indexes...")
     t0 = time.time()
     conn.autocommit = True
     cur.execute(DDL_INDEXES)
+    if not args.partitioned:
+        cur.execute(DDL_INDIV_INDEXES)
     conn.autocommit = False
     print(f"  Indexes created in {time.time()-t0:.0f}s")
 
@@ -572,6 +614,7 @@ def main():
     cur.execute("SELECT COUNT(DISTINCT employer_norm) FROM fec_individual_contributions WHERE employer_norm IS NOT NULL")
     print(f"\n  Distinct normalized employer strings: {cur.fetchone()[0]:,}")
 
+    record_consumption(conn, "load_fec", artifacts)
     conn.close()
 
 
@@ -15,6 +15,10 @@ Reads:
     files/fec/indiv26.zip   (2025-26 cycle, partial)
 
 Skips any cycle file that doesn't exist.
+
+Once `load_fec_indiv_partitioned.py` has converted the table into a
+cycle-partitioned parent, the ON CONFLICT (sub_id) insert no longer applies;
+this script then hands the extra cycles to that loader instead.
 """
 from __future__ import annotations
 import sys
@@ -99,6 +103,16 @@ def main():
     conn = get_connection()
     cur = conn.cursor()
 
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('fec_individual_contributions')")
+    row = cur.fetchone()
+    if row and row[0] == "p":
+        from scripts.etl import load_fec_indiv_partitioned as fec_part
+        conn.close()
+        print("fec_individual_contributions is partitioned -- loading cycles 2022/2026 as partitions")
+        for cycle in (2022, 2026):
+            fec_part.load_cycle(cycle)
+        return
+
     cur.execute("SELECT COUNT(*) FROM fec_individual_contributions")
     before = cur.fetchone()[0]
     print(f"BEFORE: {before:,} rows in fec_individual_contributions")
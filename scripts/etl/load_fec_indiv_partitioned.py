@@ -0,0 +1,414 @@
+"""
+Streaming, per-cycle partitioned loader for FEC individual contributions.
+
+`load_fec.py` loads indiv24.zip row-by-row through csv.reader +
+execute_values, and `load_fec_extra_cycles.py` re-runs the same loop for
+indiv22/indiv26 on top of the same heap table. This loader replaces both
+for the indiv file:
+
+  - reads the pipe-delimited member straight out of the zip with pandas in
+    fixed-size chunks (memory stays flat regardless of file size)
+  - normalizes EMPLOYER (and the other coerced columns) vectorized per chunk,
+    with the exact semantics of the load_fec._norm_* helpers
+  - COPYs each chunk into an unlogged raw table for the cycle, then keeps the
+    first row per sub_id with one INSERT ... SELECT DISTINCT ON into a
+    standalone staging table (no per-cycle set of sub_ids held in memory)
+  - builds the partition indexes on the staging table, then swaps it in with
+    DETACH/ATTACH PARTITION inside one short transaction -- readers see the
+    old cycle or the new one, never a half-loaded table
+
+`fec_individual_contributions` becomes a LIST-partitioned parent on a new
+`cycle` column (2022, 2024, 2026, ...). Cycles are independent, so
+`--jobs N` loads several cycles in parallel, each with its own connection.
+
+First run against a database that still has the old heap table renames it
+to `fec_individual_contributions_unpartitioned`; drop that once every cycle
+has been reloaded.
+
+Usage:
+    py scripts/etl/load_fec_indiv_partitioned.py                      # every indivYY.zip present
+    py scripts/etl/load_fec_indiv_partitioned.py --cycles 2024 2026
+    py scripts/etl/load_fec_indiv_partitioned.py --jobs 3
+    py scripts/etl/load_fec_indiv_partitioned.py --cycles 2024 --dry-run   # parse only
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from db_config import get_connection  # noqa: E402
+import scripts.etl.load_fec as fec  # noqa: E402
+
+PARENT = "fec_individual_contributions"
+LEGACY_NAME = "fec_individual_contributions_unpartitioned"
+CHUNK_ROWS = 250_000
+
+# Column order of the COPY (and of every partition)
+COPY_COLS = [
+    "sub_id", "cycle", "cmte_id", "amndt_ind", "rpt_tp", "transaction_pgi",
+    "image_num", "transaction_tp", "entity_tp", "name", "city", "state",
+    "zip_code", "employer", "occupation", "transaction_dt", "transaction_amt",
+    "other_id", "tran_id", "file_num", "memo_cd", "memo_text", "employer_norm",
+]
+
+# (source column, max length) for plain strip+truncate columns, as in _load_indiv
+_TRUNCATE_COLS = [
+    ("cmte_id", 9), ("amndt_ind", 1), ("rpt_tp", 3), ("transaction_pgi", 5),
+    ("image_num", 20), ("transaction_tp", 3), ("entity_tp", 3), ("name", 200),
+    ("city", 30), ("zip_code", 10), ("employer", 38), ("occupation", 38),
+    ("other_id", 9), ("tran_id", 40), ("memo_cd", 1), ("memo_text", 100),
+]
+
+DDL_PARENT = f"""
+CREATE TABLE {PARENT} (
+    sub_id               BIGINT NOT NULL,
+    cycle                SMALLINT NOT NULL,
+    cmte_id              VARCHAR(9),
+    amndt_ind            CHAR(1),
+    rpt_tp               VARCHAR(3),
+    transaction_pgi      VARCHAR(5),
+    image_num            VARCHAR(20),
+    transaction_tp       VARCHAR(3),
+    entity_tp            VARCHAR(3),
+    name                 TEXT,
+    city                 TEXT,
+    state                CHAR(2),
+    zip_code             VARCHAR(10),
+    employer             TEXT,
+    occupation           TEXT,
+    transaction_dt       DATE,
+    transaction_amt      NUMERIC(14,2),
+    other_id             VARCHAR(9),
+    tran_id              VARCHAR(40),
+    file_num             BIGINT,
+    memo_cd              CHAR(1),
+    memo_text            TEXT,
+    employer_norm        TEXT,
+    loaded_at            TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (sub_id, cycle)
+) PARTITION BY LIST (cycle);
+
+CREATE INDEX idx_fec_indiv_part_employer_norm ON {PARENT} (employer_norm) WHERE employer_norm IS NOT NULL;
+CREATE INDEX idx_fec_indiv_part_state         ON {PARENT} (state);
+CREATE INDEX idx_fec_indiv_part_cmte          ON {PARENT} (cmte_id);
+CREATE INDEX idx_fec_indiv_part_dt            ON {PARENT} (transaction_dt);
+"""
+
+# Same definitions as the parent's partitioned indexes, so ATTACH PARTITION
+# adopts them instead of building new ones under the swap lock.
+_STAGING_INDEXES = [
+    ("employer_norm", "(employer_norm) WHERE employer_norm IS NOT NULL"),
+    ("state", "(state)"),
+    ("cmte", "(cmte_id)"),
+    ("dt", "(transaction_dt)"),
+]
+
+_EMPLOYER_JUNK = {
+    "", "NONE", "N/A", "SELF", "SELF-EMPLOYED", "SELF EMPLOYED",
+    "RETIRED", "NOT EMPLOYED", "UNEMPLOYED", "INFORMATION REQUESTED",
+    "REQUESTED", "INFORMATION REQUESTED PER BEST EFFORTS",
+}
+# load_fec._norm_employer strips the first matching suffix; no string can end
+# in two of these at once, so a single anchored alternation is equivalent.
+_EMPLOYER_SUFFIX_RE = r"(?: LLC| L\.L\.C\.| INC| INC\.| CORPORATION| CORP| CO\.| COMPANY| LP| LTD| PLLC| PC)$"
+
+
+# ---------------------------------------------------------------------------
+# Vectorized normalization (mirrors load_fec._norm_* per value)
+# ---------------------------------------------------------------------------
+
+def normalize_employer_series(s: pd.Series) -> pd.Series:
+    """Vectorized load_fec._norm_employer."""
+    up = s.fillna("").str.upper().str.strip()
+    junk = up.isin(_EMPLOYER_JUNK)
+    out = up.str.replace(_EMPLOYER_SUFFIX_RE, "", regex=True)
+    out = out.str.replace(r"[^\w\s]", " ", regex=True)
+    out = out.str.replace(r"\s+", " ", regex=True).str.strip()
+    return out.where(~junk & (out != ""), None)
+
+
+def truncate_series(s: pd.Series, n: int) -> pd.Series:
+    """Vectorized load_fec._truncate."""
+    out = s.fillna("").str.strip().str.slice(0, n)
+    return out.where(out != "", None)
+
+
+def state_series(s: pd.Series) -> pd.Series:
+    """Vectorized load_fec._norm_state."""
+    out = s.fillna("").str.strip().str.upper().str.slice(0, 2)
+    ok = (out.str.len() == 2) & out.str.isalpha()
+    return out.where(ok, None)
+
+
+def date_series(s: pd.Series) -> pd.Series:
+    """Vectorized load_fec._norm_date (MMDDYYYY, years 1980..today+1)."""
+    raw = s.fillna("")
+    parsed = pd.to_datetime(raw.where(raw.str.len() == 8), format="%m%d%Y", errors="coerce")
+    ok = parsed.dt.year.between(1980, date.today().year + 1)
+    return parsed.where(ok).dt.strftime("%Y-%m-%d").where(ok, None)
+
+
+def int_series(s: pd.Series) -> pd.Series:
+    """Vectorized load_fec._norm_int, kept as digit strings.
+
+    sub_id values are 19 digits -- past float64 precision -- so they must
+    never round-trip through pd.to_numeric.
+    """
+    out = s.fillna("").str.strip()
+    return out.where(out.str.fullmatch(r"[+-]?\d+"), None)
+
+
+def normalize_chunk(df: pd.DataFrame, cycle: int) -> pd.DataFrame:
+    """Turn a raw INDIV_COLS chunk (all str) into COPY_COLS-shaped output."""
+    out = pd.DataFrame(index=df.index)
+    out["sub_id"] = int_series(df["sub_id"])
+    out["cycle"] = cycle
+    for col, n in _TRUNCATE_COLS:
+        out[col] = truncate_series(df[col], n)
+    out["state"] = state_series(df["state"])
+    out["transaction_dt"] = date_series(df["transaction_dt"])
+    out["transaction_amt"] = pd.to_numeric(df["transaction_amt"], errors="coerce")
+    out["file_num"] = int_series(df["file_num"])
+    out["employer_norm"] = normalize_employer_series(df["employer"])
+    return out[COPY_COLS]
+
+
+def iter_indiv_chunks(zip_path: Path, chunk_rows: int = CHUNK_ROWS):
+    """Yield raw str DataFrames read straight from the .txt inside the zip."""
+    with zipfile.ZipFile(zip_path) as z:
+        txt_name = next(n for n in z.namelist() if n.endswith(".txt"))
+        with z.open(txt_name) as raw:
+            yield from pd.read_csv(
+                raw, sep="|", header=None, names=fec.INDIV_COLS, dtype=str,
+                quoting=csv.QUOTE_NONE, keep_default_na=False, na_filter=False,
+                encoding="utf-8", encoding_errors="replace",
+                on_bad_lines="skip", chunksize=chunk_rows,
+            )
+
+
+# ---------------------------------------------------------------------------
+# Partition management
+# ---------------------------------------------------------------------------
+
+def cycle_zip(cycle: int) -> Path:
+    return fec.FEC_DIR / f"indiv{cycle % 100:02d}.zip"
+
+
+def available_cycles() -> list[int]:
+    cycles = []
+    for p in sorted(fec.FEC_DIR.glob("indiv[0-9][0-9].zip")):
+        cycles.append(2000 + int(p.stem[-2:]))
+    return cycles
+
+
+def partition_name(cycle: int) -> str:
+    return f"fec_indiv_c{cycle}"
+
+
+def ensure_parent(conn):
+    """Create the partitioned parent; move a legacy heap table out of the way."""
+    cur = conn.cursor()
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (PARENT,))
+    row = cur.fetchone()
+    if row and row[0] == "p":
+        return
+    if row:
+        print(f"  {PARENT} is a plain table -- renaming to {LEGACY_NAME}")
+        cur.execute(f"ALTER TABLE {PARENT} RENAME TO {LEGACY_NAME}")
+    cur.execute(DDL_PARENT)
+    conn.commit()
+
+
+def _copy_cycle(cur, staging: str, zip_path: Path, cycle: int, chunk_rows: int) -> dict:
+    """Stream one cycle file into ``staging`` (or just parse when cur is None).
+
+    Only rows without a sub_id and repeats within a chunk are dropped here;
+    repeats across chunks are left to _dedupe_into().
+    """
+    stats = {"rows": 0, "skipped": 0}
+    t0 = time.time()
+    for raw in iter_indiv_chunks(zip_path, chunk_rows):
+        chunk = normalize_chunk(raw, cycle)
+        before = len(chunk)
+        chunk = chunk[chunk["sub_id"].notna()]
+        chunk = chunk.drop_duplicates("sub_id")
+        stats["skipped"] += before - len(chunk)
+        stats["rows"] += len(chunk)
+
+        if cur is not None and len(chunk):
+            buf = io.StringIO()
+            chunk.to_csv(buf, header=False, index=False)
+            buf.seek(0)
+            cur.copy_expert(
+                f"COPY {staging} ({', '.join(COPY_COLS)}) FROM STDIN WITH (FORMAT csv)", buf,
+            )
+        print(f"  [{cycle}] {stats['rows']:,} rows ({time.time()-t0:.0f}s elapsed)")
+    return stats
+
+
+def _dedupe_into(cur, raw: str, staging: str) -> int:
+    """Copy the first row per sub_id (in file order) from ``raw`` into ``staging``."""
+    cols = ", ".join(COPY_COLS)
+    cur.execute(f"""
+        INSERT INTO {staging} ({cols})
+        SELECT DISTINCT ON (sub_id) {cols} FROM {raw}
+        ORDER BY sub_id, raw_seq
+        ON CONFLICT DO NOTHING
+    """)
+    return cur.rowcount
+
+
+def load_cycle(cycle: int, chunk_rows: int = CHUNK_ROWS, dry_run: bool = False) -> dict:
+    """Load one cycle into a staging table and swap it in as its partition."""
+    zip_path = cycle_zip(cycle)
+    if not zip_path.exists():
+        print(f"SKIP: {zip_path} not found")
+        return {"cycle": cycle, "rows": 0, "skipped": 0, "status": "missing"}
+
+    t0 = time.time()
+    if dry_run:
+        stats = _copy_cycle(None, "", zip_path, cycle, chunk_rows)
+        return {"cycle": cycle, **stats, "status": "dry_run", "seconds": round(time.time() - t0, 1)}
+
+    part = partition_name(cycle)
+    staging = f"{part}_{int(time.time())}"
+    raw = f"{staging}_raw"
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"CREATE UNLOGGED TABLE {raw} "
+            f"(raw_seq BIGINT GENERATED ALWAYS AS IDENTITY, LIKE {PARENT} INCLUDING DEFAULTS)"
+        )
+        cur.execute(f"CREATE TABLE {staging} (LIKE {PARENT} INCLUDING DEFAULTS)")
+        cur.execute(f"ALTER TABLE {staging} ADD CONSTRAINT {staging}_cycle_chk CHECK (cycle = {int(cycle)})")
+        cur.execute(f"ALTER TABLE {staging} ADD PRIMARY KEY (sub_id, cycle)")
+        conn.commit()
+
+        stats = _copy_cycle(cur, raw, zip_path, cycle, chunk_rows)
+        conn.commit()
+
+        print(f"  [{cycle}] dropping repeated sub_ids into {staging}...")
+        kept = _dedupe_into(cur, raw, staging)
+        stats["skipped"] += stats["rows"] - kept
+        stats["rows"] = kept
+        cur.execute(f"DROP TABLE {raw}")
+        conn.commit()
+
+        print(f"  [{cycle}] building indexes on {staging}...")
+        for suffix, spec in _STAGING_INDEXES:
+            cur.execute(f"CREATE INDEX {staging}_{suffix}_idx ON {staging} {spec}")
+        cur.execute(f"ANALYZE {staging}")
+        conn.commit()
+
+        # Swap: one short transaction, readers see old or new partition.
+        cur.execute("SET LOCAL lock_timeout = '60s'")
+        cur.execute(
+            "SELECT 1 FROM pg_inherits WHERE inhparent = to_regclass(%s) AND inhrelid = to_regclass(%s)",
+            (PARENT, part),
+        )
+        if cur.fetchone():
+            cur.execute(f"ALTER TABLE {PARENT} DETACH PARTITION {part}")
+        cur.execute(f"DROP TABLE IF EXISTS {part}")
+        cur.execute(f"ALTER TABLE {staging} RENAME TO {part}")
+        cur.execute(f"ALTER TABLE {PARENT} ATTACH PARTITION {part} FOR VALUES IN ({int(cycle)})")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        cur = conn.cursor()
+        cur.execute(f"DROP TABLE IF EXISTS {raw}")
+        cur.execute(f"DROP TABLE IF EXISTS {staging}")
+        conn.commit()
+        raise
+    finally:
+        conn.close()
+
+    elapsed = time.time() - t0
+    print(f"  [{cycle}] attached {part}: {stats['rows']:,} rows, {stats['skipped']:,} skipped, {elapsed:.0f}s")
+    return {"cycle": cycle, **stats, "status": "attached", "seconds": round(elapsed, 1)}
+
+
+def _update_freshness(conn):
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT COUNT(*), MIN(transaction_dt), MAX(transaction_dt),
+               array_agg(DISTINCT cycle ORDER BY cycle)
+        FROM {PARENT}
+    """)
+    count, dmin, dmax, cycles = cur.fetchone()
+    cur.execute("""
+        INSERT INTO data_source_freshness
+            (source_name, display_name, last_updated, record_count,
+             date_range_start, date_range_end, notes)
+        VALUES ('fec_individual_contributions', 'FEC Individual Contributions',
+                %s, %s, %s, %s, %s)
+        ON CONFLICT (source_name) DO UPDATE SET
+            last_updated = EXCLUDED.last_updated,
+            record_count = EXCLUDED.record_count,
+            date_range_start = EXCLUDED.date_range_start,
+            date_range_end = EXCLUDED.date_range_end,
+            notes = EXCLUDED.notes
+    """, (
+        datetime.now(timezone.utc), count, dmin, dmax,
+        f"FEC bulk indivYY.zip, partitioned by cycle: {', '.join(str(c) for c in cycles or [])}",
+    ))
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cycles", type=int, nargs="+",
+                        help="Cycles to load (e.g. 2022 2024). Default: every indivYY.zip present")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Load this many cycles in parallel (default: 1)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help=f"Rows per parse/COPY chunk (default: {CHUNK_ROWS:,})")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and normalize only, no DB writes")
+    args = parser.parse_args()
+
+    cycles = args.cycles or available_cycles()
+    if not cycles:
+        print(f"No indivYY.zip files found in {fec.FEC_DIR}")
+        return
+    print(f"Cycles: {', '.join(str(c) for c in cycles)}  (jobs={args.jobs})")
+
+    if not args.dry_run:
+        conn = get_connection()
+        ensure_parent(conn)
+        conn.close()
+
+    t0 = time.time()
+    results = []
+    if args.jobs > 1 and len(cycles) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(cycles))) as pool:
+            futures = {pool.submit(load_cycle, c, args.chunk_rows, args.dry_run): c for c in cycles}
+            for fut in as_completed(futures):
+                results.append(fut.result())
+    else:
+        for c in cycles:
+            results.append(load_cycle(c, args.chunk_rows, args.dry_run))
+
+    if not args.dry_run and any(r["status"] == "attached" for r in results):
+        conn = get_connection()
+        _update_freshness(conn)
+        conn.close()
+
+    print(f"\nDone in {time.time()-t0:.0f}s")
+    for r in sorted(results, key=lambda r: r["cycle"]):
+        print(f"  {r['cycle']}: {r['status']:<9s} {r['rows']:>12,} rows  {r['skipped']:>10,} skipped")
+
+
+if __name__ == "__main__":
+    main()
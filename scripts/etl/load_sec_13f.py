@@ -26,6 +26,7 @@ Usage:
     py scripts/etl/load_sec_13f.py                         # load every ZIP in files/sec_13f/
     py scripts/etl/load_sec_13f.py --zip-path PATH         # load a single ZIP
     py scripts/etl/load_sec_13f.py --dry-run               # roll back at end
+    py scripts/etl/load_sec_13f.py --force                 # reload even if the ZIP set is unchanged
 
 Run time: roughly 90 seconds per quarterly ZIP on COPY path (8M holdings/quarter).
 
@@ -380,12 +381,21 @@ def load_one_zip(zip_path: Path, conn) -> Tuple[int, int]:
     return len(submissions), n_holdings
 
 
-def load(dir_path: Path, dry_run: bool = False) -> None:
+def load(dir_path: Path, dry_run: bool = False, force: bool = False) -> None:
+    from scripts.etl.source_cache import SourceCache, is_unchanged, record_consumption
+
     zips = sorted(dir_path.glob("*_form13f.zip"))
     if not zips:
         raise FileNotFoundError(f"No *_form13f.zip files found in {dir_path}")
 
+    cache = SourceCache()
+    artifacts = [cache.register_file(zp) for zp in zips]
+
     conn = get_connection()
+    if not dry_run and not force and is_unchanged(conn, "load_sec_13f", artifacts):
+        print("13F ZIP set unchanged since the last successful load -- skipping (use --force to reload).")
+        conn.close()
+        return
     try:
         # CREATE EXTENSION is idempotent and external to our schema; it
         # can stay in autocommit. But the table DROP/CREATE must NOT be
@@ -442,6 +452,7 @@ def load(dir_path: Path, dry_run: bool = False) -> None:
                 (datetime.now(timezone.utc), total_holdings),
             )
             conn.commit()
+            record_consumption(conn, "load_sec_13f", artifacts)
 
         print()
         print(f"TOTAL: {total_subs:,} submissions, {total_holdings:,} holdings")
@@ -463,8 +474,10 @@ def main():
         help="Directory holding *_form13f.zip files",
     )
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--force", action="store_true",
+                        help="Reload even if the ZIP set is unchanged since the last successful load")
     args = parser.parse_args()
-    load(Path(args.zip_dir), dry_run=args.dry_run)
+    load(Path(args.zip_dir), dry_run=args.dry_run, force=args.force)
 
 
 if __name__ == "__main__":
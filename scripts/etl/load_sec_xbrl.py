@@ -13,6 +13,17 @@ Usage:
     py scripts/etl/load_sec_xbrl.py --limit 100       # test with 100 companies
     py scripts/etl/load_sec_xbrl.py --dry-run          # parse only, no DB write
     py scripts/etl/load_sec_xbrl.py --cleanup-only     # delete bad dates from existing table
+    py scripts/etl/load_sec_xbrl.py --workers 8        # parallel parse, streamed COPY
+
+Parallel mode (--workers N, N > 1): each worker process opens the zip
+independently and parses a slice of members. Workers hand back pre-formatted
+COPY rows plus per-slice counters, and the parent streams those rows into a
+single COPY as they arrive, so peak memory stays flat regardless of archive
+size. That COPY fills a session temp table; sec_xbrl_financials is only
+truncated and refilled from it once the parse is done, so readers are not
+locked out for the length of the parse.
+
+Both modes decode JSON with orjson when installed (falls back to json).
 """
 
 import sys
@@ -22,8 +33,15 @@ import io
 import time
 import zipfile
 import argparse
+import multiprocessing
 from datetime import date
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -84,6 +102,23 @@ TAG_MAP = {
 ANNUAL_FORMS = {'10-K', '10-K/A', '20-F', '20-F/A', '40-F', '40-F/A'}
 
 
+# Column order for the COPY into sec_xbrl_financials
+COPY_COLUMNS = [
+    'cik', 'fiscal_year_end', 'form_type', 'filed_date',
+    'revenue', 'revenue_tag', 'net_income', 'net_income_tag',
+    'total_assets', 'total_assets_tag', 'total_liabilities', 'total_liabilities_tag',
+    'cash', 'cash_tag', 'long_term_debt', 'long_term_debt_tag',
+    'employee_count', 'employee_count_tag', 'currency',
+]
+
+# Members handed to a worker per task in --workers mode. Small enough that
+# progress is reported often, large enough that IPC overhead is negligible.
+DEFAULT_CHUNK_SIZE = 250
+
+# Session temp table the parallel parse streams into before the swap
+STAGING_TABLE = 'sec_xbrl_financials_load'
+
+
 CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS sec_xbrl_financials (
     id SERIAL PRIMARY KEY,
@@ -244,6 +279,134 @@ def extract_annual_facts(company_data, date_reject_counter=None):
     return records
 
 
+def _loads(raw):
+    """Decode a companyfacts JSON member (orjson when available)."""
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def format_copy_row(record):
+    """Format one extracted record as a tab-separated COPY line."""
+    vals = []
+    for col in COPY_COLUMNS:
+        if col == 'currency':
+            vals.append('USD')
+        elif col == 'employee_count' and record.get(col) is not None:
+            vals.append(str(int(record[col])))
+        else:
+            v = record.get(col)
+            if v is None:
+                vals.append('\\N')
+            else:
+                vals.append(str(v))
+    return '\t'.join(vals) + '\n'
+
+
+# --- Parallel parse (--workers) ---
+
+_worker_zip = None
+
+
+def _init_worker(zip_path):
+    """Pool initializer: each worker holds its own handle on the zip."""
+    global _worker_zip
+    _worker_zip = zipfile.ZipFile(zip_path)
+
+
+def _parse_member_slice(names):
+    """Parse a slice of zip members inside a worker process.
+
+    Returns (copy_block, stats) where copy_block is the concatenated COPY
+    lines for every record in the slice and stats holds the counters the
+    parent aggregates for reporting.
+    """
+    lines = []
+    stats = {
+        'files': len(names),
+        'companies_with_data': 0,
+        'records': 0,
+        'parse_errors': 0,
+        'error_samples': [],
+        'date_rejects': {},
+        'concept_counts': {c: 0 for c in TAG_MAP},
+    }
+    for fname in names:
+        try:
+            records = extract_annual_facts(_loads(_worker_zip.read(fname)),
+                                           date_reject_counter=stats['date_rejects'])
+        except Exception as e:
+            stats['parse_errors'] += 1
+            if len(stats['error_samples']) < 5:
+                stats['error_samples'].append(f"{fname}: {e}")
+            continue
+        if not records:
+            continue
+        stats['companies_with_data'] += 1
+        stats['records'] += len(records)
+        for r in records:
+            for c in TAG_MAP:
+                if r.get(c) is not None:
+                    stats['concept_counts'][c] += 1
+            lines.append(format_copy_row(r))
+    return ''.join(lines), stats
+
+
+def iter_parallel_blocks(filenames, workers, totals, chunk_size=DEFAULT_CHUNK_SIZE,
+                         zip_path=None):
+    """Yield COPY blocks from a worker pool, folding counters into ``totals``.
+
+    Blocks arrive in completion order (imap_unordered); row order does not
+    matter for the load since the table is keyed on (cik, fiscal_year_end).
+    """
+    zip_path = zip_path or COMPANYFACTS_PATH
+    slices = [filenames[i:i + chunk_size] for i in range(0, len(filenames), chunk_size)]
+    start = time.time()
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(zip_path,)) as pool:
+        for block, stats in pool.imap_unordered(_parse_member_slice, slices):
+            totals['files'] += stats['files']
+            totals['companies_with_data'] += stats['companies_with_data']
+            totals['records'] += stats['records']
+            totals['parse_errors'] += stats['parse_errors']
+            for msg in stats['error_samples']:
+                if len(totals['error_samples']) < 5:
+                    totals['error_samples'].append(msg)
+                    print(f"  Parse error on {msg}")
+            for d, cnt in stats['date_rejects'].items():
+                totals['date_rejects'][d] = totals['date_rejects'].get(d, 0) + cnt
+            for c, cnt in stats['concept_counts'].items():
+                totals['concept_counts'][c] += cnt
+
+            done = totals['files']
+            if done // 2000 != (done - stats['files']) // 2000:
+                rate = done / max(time.time() - start, 1e-6)
+                print(f"  Parsed {done:,}/{len(filenames):,} files "
+                      f"({totals['companies_with_data']:,} with data, {totals['records']:,} records) "
+                      f"[{rate:.0f} files/sec]")
+            if block:
+                yield block
+
+
+class _BlockStream:
+    """Minimal file-like wrapper so COPY can read from a block generator."""
+
+    def __init__(self, blocks):
+        self._blocks = iter(blocks)
+        self._buf = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) < size:
+            try:
+                self._buf += next(self._blocks)
+            except StopIteration:
+                break
+        if size < 0:
+            out, self._buf = self._buf, ''
+        else:
+            out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+
 def cleanup_bad_dates():
     """P1-3: Delete rows with fiscal_year_end outside the plausible range.
 
@@ -292,10 +455,12 @@ def cleanup_bad_dates():
     return deleted
 
 
-def load_xbrl(limit=None, dry_run=False, cleanup_only=False):
+def load_xbrl(limit=None, dry_run=False, cleanup_only=False, workers=1,
+              chunk_size=DEFAULT_CHUNK_SIZE):
     """Main ETL: parse companyfacts.zip and load into sec_xbrl_financials.
 
-    If cleanup_only=True, only run the bad-date cleanup (no reload)."""
+    If cleanup_only=True, only run the bad-date cleanup (no reload).
+    workers > 1 switches to the parallel parse + streamed COPY path."""
 
     # P1-3: Always clean up existing bad dates before a full reload
     if cleanup_only:
@@ -318,6 +483,11 @@ def load_xbrl(limit=None, dry_run=False, cleanup_only=False):
         filenames = filenames[:limit]
         print(f"Limited to {limit} files")
 
+    if workers > 1:
+        z.close()
+        _load_xbrl_parallel(filenames, workers, chunk_size, dry_run, start)
+        return
+
     # Parse all companies
     all_records = []
     companies_with_data = 0
@@ -329,7 +499,7 @@ def load_xbrl(limit=None, dry_run=False, cleanup_only=False):
 
     for i, fname in enumerate(filenames):
         try:
-            data = json.loads(z.read(fname))
+            data = _loads(z.read(fname))
             records = extract_annual_facts(data, date_reject_counter=date_rejects)
             if records:
                 all_records.extend(records)
@@ -395,34 +565,20 @@ def load_xbrl(limit=None, dry_run=False, cleanup_only=False):
     # First truncate existing data
     cur.execute("TRUNCATE sec_xbrl_financials RESTART IDENTITY")
 
-    columns = [
-        'cik', 'fiscal_year_end', 'form_type', 'filed_date',
-        'revenue', 'revenue_tag', 'net_income', 'net_income_tag',
-        'total_assets', 'total_assets_tag', 'total_liabilities', 'total_liabilities_tag',
-        'cash', 'cash_tag', 'long_term_debt', 'long_term_debt_tag',
-        'employee_count', 'employee_count_tag', 'currency',
-    ]
-
     buf = io.StringIO()
     for r in all_records:
-        vals = []
-        for col in columns:
-            if col == 'currency':
-                vals.append('USD')
-            elif col == 'employee_count' and r.get(col) is not None:
-                vals.append(str(int(r[col])))
-            else:
-                v = r.get(col)
-                if v is None:
-                    vals.append('\\N')
-                else:
-                    vals.append(str(v))
-        buf.write('\t'.join(vals) + '\n')
+        buf.write(format_copy_row(r))
 
     buf.seek(0)
-    cur.copy_from(buf, 'sec_xbrl_financials', columns=columns, null='\\N')
+    cur.copy_from(buf, 'sec_xbrl_financials', columns=COPY_COLUMNS, null='\\N')
     conn.commit()
 
+    _verify_and_report(conn, start)
+
+
+def _verify_and_report(conn, start):
+    """Post-load verification, ETL log entry and summary printout."""
+    cur = conn.cursor()
     # Verify
     cur.execute("SELECT COUNT(*) FROM sec_xbrl_financials")
     row_count = cur.fetchone()[0]
@@ -488,12 +644,94 @@ def load_xbrl(limit=None, dry_run=False, cleanup_only=False):
     print(f"    Via crosswalk: {linked_xwalk:,}")
 
 
+def _load_xbrl_parallel(filenames, workers, chunk_size, dry_run, start):
+    """--workers path: parse in a process pool and stream rows into COPY.
+
+    Rows are COPYed into a temp table while the pool runs. The TRUNCATE
+    (ACCESS EXCLUSIVE) and the INSERT from the temp table then run in one
+    short transaction, so a failed load keeps the previous contents and
+    readers only wait for the copy, not the parse.
+    """
+    totals = {
+        'files': 0,
+        'companies_with_data': 0,
+        'records': 0,
+        'parse_errors': 0,
+        'error_samples': [],
+        'date_rejects': {},
+        'concept_counts': {c: 0 for c in TAG_MAP},
+    }
+    print(f"  Parallel parse: {workers} workers, {chunk_size} files/task, "
+          f"JSON decoder: {'orjson' if HAS_ORJSON else 'json'}")
+    print(f"  Date validation: accepting fiscal_year_end in "
+          f"{FISCAL_YEAR_MIN}-01-01 .. {FISCAL_YEAR_MAX}-12-31")
+
+    blocks = iter_parallel_blocks(filenames, workers, totals, chunk_size=chunk_size)
+
+    conn = None
+    if dry_run:
+        for _ in blocks:
+            pass
+    else:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(CREATE_TABLE_SQL)
+        cur.execute(f"""
+            CREATE TEMP TABLE {STAGING_TABLE} AS
+            SELECT {', '.join(COPY_COLUMNS)} FROM sec_xbrl_financials WITH NO DATA
+        """)
+        conn.commit()
+        cur.copy_expert(
+            f"COPY {STAGING_TABLE} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (NULL '\\N')",
+            _BlockStream(blocks),
+        )
+        conn.commit()
+
+    print(f"\nParsing complete in {time.time() - start:.1f}s")
+    print(f"  Companies with data: {totals['companies_with_data']:,} / {len(filenames):,}")
+    print(f"  Total annual records: {totals['records']:,}")
+    print(f"  Parse errors: {totals['parse_errors']:,}")
+    total_date_rejects = sum(totals['date_rejects'].values())
+    print(f"  Date-rejected entries: {total_date_rejects:,}")
+    for bad_date, cnt in sorted(totals['date_rejects'].items(), key=lambda x: -x[1])[:10]:
+        print(f"    {bad_date}: {cnt:,} entries rejected")
+
+    if totals['records']:
+        print(f"\n  Coverage across {totals['records']:,} annual records:")
+        for concept, count in totals['concept_counts'].items():
+            print(f"    {concept:20s}: {count:8,} ({100*count/totals['records']:5.1f}%)")
+
+    if dry_run:
+        print("\n--dry-run: skipping database load")
+        return
+
+    if not totals['records']:
+        conn.close()
+        print("No records to load.")
+        return
+
+    print(f"\nSwapping {totals['records']:,} rows into sec_xbrl_financials...")
+    cur.execute("TRUNCATE sec_xbrl_financials RESTART IDENTITY")
+    cur.execute(f"""
+        INSERT INTO sec_xbrl_financials ({', '.join(COPY_COLUMNS)})
+        SELECT {', '.join(COPY_COLUMNS)} FROM {STAGING_TABLE}
+    """)
+    cur.execute(f"DROP TABLE {STAGING_TABLE}")
+    conn.commit()
+    _verify_and_report(conn, start)
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Load SEC XBRL financials from companyfacts.zip')
     parser.add_argument('--limit', type=int, help='Limit to N companies (for testing)')
     parser.add_argument('--dry-run', action='store_true', help='Parse only, no DB write')
     parser.add_argument('--cleanup-only', action='store_true',
                         help='Only delete rows with out-of-range fiscal_year_end (no reload)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parse with N worker processes and stream into COPY (default: 1, serial)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Zip members per worker task (default: {DEFAULT_CHUNK_SIZE})')
     args = parser.parse_args()
 
-    load_xbrl(limit=args.limit, dry_run=args.dry_run, cleanup_only=args.cleanup_only)
+    load_xbrl(limit=args.limit, dry_run=args.dry_run, cleanup_only=args.cleanup_only,
+              workers=args.workers, chunk_size=args.chunk_size)
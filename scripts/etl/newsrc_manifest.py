@@ -17,9 +17,15 @@ from pathlib import Path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 from newsrc_common import DEFAULT_SOURCE_ROOT
+from source_cache import SourceCache
 
 
 def sha256_head(path: Path, max_mb: int = 32) -> str:
+    """Hash of the first ``max_mb`` MB only.
+
+    Kept for comparing against old manifests; change detection now uses the
+    full-content hash from source_cache (--include-hash).
+    """
     h = hashlib.sha256()
     remaining = max_mb * 1024 * 1024
     with open(path, "rb") as f:
@@ -48,13 +54,16 @@ def classify(name: str) -> str:
         return "qcew"
     if n.startswith("usa_00001"):
         return "ipums_acs"
+    if n.startswith("abs_") and n.endswith(".csv"):
+        return "abs"
     return "other"
 
 
 def parse_args():
     ap = argparse.ArgumentParser(description="Create manifest for new data sources folder")
     ap.add_argument("--source-root", default=str(DEFAULT_SOURCE_ROOT))
-    ap.add_argument("--include-hash", action="store_true")
+    ap.add_argument("--include-hash", action="store_true",
+                    help="Record full-content sha256 (memoized on size+mtime by source_cache)")
     return ap.parse_args()
 
 
@@ -63,6 +72,7 @@ def main():
     root = Path(args.source_root)
     files = sorted([p for p in root.rglob("*") if p.is_file()])
 
+    cache = SourceCache() if args.include_hash else None
     rows = []
     coverage = {}
     for p in files:
@@ -75,8 +85,8 @@ def main():
             "source": source,
             "modified_at": datetime.fromtimestamp(p.stat().st_mtime).isoformat(),
         }
-        if args.include_hash:
-            row["sha256_head_32mb"] = sha256_head(p)
+        if cache is not None:
+            row["sha256"] = cache.file_sha256(p)
         rows.append(row)
 
     manifest = {
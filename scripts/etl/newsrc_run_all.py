@@ -11,8 +11,13 @@ Runs:
 7) abs
 8) (optional) acs profiles
 
+Each loader step is skipped when its source files (classified by
+newsrc_manifest.classify, hashed in full by source_cache) match the set its
+last successful run consumed. --truncate or --force always reloads.
+
 Usage:
   python scripts/etl/newsrc_run_all.py
+  python scripts/etl/newsrc_run_all.py --force
   python scripts/etl/newsrc_run_all.py --truncate
   python scripts/etl/newsrc_run_all.py --skip-lodes
   python scripts/etl/newsrc_run_all.py --with-acs-profiles
@@ -26,14 +31,78 @@ from pathlib import Path
 
 
 SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+sys.path.insert(0, str(SCRIPT_DIR.parent.parent))
+
+from newsrc_common import DEFAULT_SOURCE_ROOT  # noqa: E402
+from newsrc_manifest import classify  # noqa: E402
+
+# Loader script -> newsrc_manifest.classify() source it consumes
+STEP_SOURCES = {
+    "newsrc_load_cbp.py": "cbp",
+    "newsrc_load_ppp.py": "ppp",
+    "newsrc_load_form5500.py": "form5500",
+    "newsrc_load_lodes.py": "lodes",
+    "newsrc_load_usaspending.py": "usaspending",
+    "newsrc_load_abs.py": "abs",
+}
+
+
+class ChangeTracker:
+    """Skip-unchanged bookkeeping for the loader steps (source_cache backed)."""
+
+    def __init__(self, source_root: Path, force: bool):
+        from source_cache import SourceCache
+
+        self.force = force
+        self.cache = SourceCache()
+        self._by_source: dict[str, list[Path]] = {}
+        if source_root.is_dir():
+            for p in sorted(source_root.rglob("*")):
+                if p.is_file() and not p.name.startswith("manifest_new_sources_"):
+                    self._by_source.setdefault(classify(p.name), []).append(p)
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            from db_config import get_connection
+            self._conn = get_connection()
+        return self._conn
 
+    def artifacts(self, script_name: str):
+        source = STEP_SOURCES.get(script_name)
+        return [self.cache.register_file(p) for p in self._by_source.get(source, [])]
 
-def run_step(script_name: str, extra_args: list[str]) -> None:
+    def should_skip(self, script_name: str, artifacts) -> bool:
+        from source_cache import is_unchanged
+
+        if self.force or not artifacts:
+            return False
+        return is_unchanged(self._db(), f"newsrc:{script_name}", artifacts)
+
+    def record(self, script_name: str, artifacts) -> None:
+        from source_cache import record_consumption
+
+        if artifacts:
+            record_consumption(self._db(), f"newsrc:{script_name}", artifacts)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+
+
+def run_step(script_name: str, extra_args: list[str], tracker: ChangeTracker | None = None) -> None:
     script_path = SCRIPT_DIR / script_name
     cmd = [sys.executable, str(script_path), *extra_args]
     print(f"\n=== {script_name} ===")
+    artifacts = tracker.artifacts(script_name) if tracker and script_name in STEP_SOURCES else []
+    if tracker and tracker.should_skip(script_name, artifacts):
+        print(f"  {len(artifacts)} source files unchanged since last successful load -- skipped")
+        return
     print(" ".join(cmd))
     subprocess.run(cmd, check=True)
+    if tracker:
+        tracker.record(script_name, artifacts)
 
 
 def parse_args():
@@ -44,6 +113,7 @@ def parse_args():
     ap.add_argument("--skip-usaspending", action="store_true")
     ap.add_argument("--skip-abs", action="store_true")
     ap.add_argument("--with-acs-profiles", action="store_true", help="Also build ACS occupation-demo profiles (slow)")
+    ap.add_argument("--force", action="store_true", help="Run every loader even if its source files are unchanged")
     return ap.parse_args()
 
 
@@ -53,22 +123,29 @@ def main():
     if args.source_root:
         common.extend(["--source-root", args.source_root])
 
-    run_step("newsrc_manifest.py", common)
-    run_step("newsrc_load_cbp.py", [*common, *(["--truncate"] if args.truncate else [])])
-    run_step("newsrc_load_ppp.py", [*common, *(["--truncate"] if args.truncate else [])])
-    run_step("newsrc_load_form5500.py", [*common, *(["--truncate"] if args.truncate else [])])
+    source_root = Path(args.source_root) if args.source_root else DEFAULT_SOURCE_ROOT
+    tracker = ChangeTracker(source_root, force=args.force or args.truncate)
+    trunc = ["--truncate"] if args.truncate else []
+
+    try:
+        run_step("newsrc_manifest.py", [*common, "--include-hash"])
+        run_step("newsrc_load_cbp.py", [*common, *trunc], tracker)
+        run_step("newsrc_load_ppp.py", [*common, *trunc], tracker)
+        run_step("newsrc_load_form5500.py", [*common, *trunc], tracker)
 
-    if not args.skip_lodes:
-        run_step("newsrc_load_lodes.py", [*common, *(["--truncate"] if args.truncate else [])])
+        if not args.skip_lodes:
+            run_step("newsrc_load_lodes.py", [*common, *trunc], tracker)
 
-    if not args.skip_usaspending:
-        run_step("newsrc_load_usaspending.py", [*common, *(["--truncate"] if args.truncate else [])])
+        if not args.skip_usaspending:
+            run_step("newsrc_load_usaspending.py", [*common, *trunc], tracker)
 
-    if not args.skip_abs:
-        run_step("newsrc_load_abs.py", [*common, *(["--truncate"] if args.truncate else [])])
+        if not args.skip_abs:
+            run_step("newsrc_load_abs.py", [*common, *trunc], tracker)
 
-    if args.with_acs_profiles:
-        run_step("newsrc_build_acs_profiles.py", common)
+        if args.with_acs_profiles:
+            run_step("newsrc_build_acs_profiles.py", common)
+    finally:
+        tracker.close()
 
     print("\nAll requested loaders completed.")
 
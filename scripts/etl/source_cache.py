@@ -0,0 +1,351 @@
+"""
+Content-addressed download cache + skip-unchanged detection for ETL sources.
+
+Two pieces, used together by the bulk loaders (load_fec, load_bmf_bulk,
+load_sec_13f, fetch_qcew, newsrc_run_all):
+
+1. SourceCache -- fetch-and-cache layer on local disk.
+   Artifacts are stored once under data/source_cache/objects/<sha[:2]>/<sha>
+   keyed on the full SHA-256 of their content. Each URL remembers the
+   ETag / Last-Modified the server sent, so a refresh issues a conditional
+   GET and a 304 costs one round trip instead of a multi-GB download.
+   Local files (manually downloaded bundles) are registered by full-content
+   hash too; hashes are memoized on (size, mtime) so re-hashing a 10GB file
+   only happens when it actually changes.
+
+2. Consumption log -- Postgres table etl_source_consumption.
+   Every successful loader run records the artifact versions it read. Before
+   loading, a loader asks is_unchanged(); when the current artifact set
+   matches the last successful run it skips the load entirely.
+
+Usage (inside a loader):
+    cache = SourceCache()
+    art = cache.fetch(url)                      # conditional GET
+    art = cache.register_file(path)             # already on disk
+    conn = get_connection()
+    if not force and is_unchanged(conn, "fec", [art, ...]):
+        print("unchanged -- skipping"); return
+    ... load ...
+    record_consumption(conn, "fec", [art, ...])
+
+CLI:
+    py scripts/etl/source_cache.py status              # last run per loader
+    py scripts/etl/source_cache.py hash PATH [PATH...] # full sha256 of files
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_CACHE_ROOT = PROJECT_ROOT / "data" / "source_cache"
+REQUEST_TIMEOUT = 300
+_CHUNK = 1024 * 1024
+
+DDL_CONSUMPTION = """
+CREATE TABLE IF NOT EXISTS etl_source_consumption (
+    id            SERIAL PRIMARY KEY,
+    loader        TEXT NOT NULL,
+    fingerprint   TEXT NOT NULL,
+    artifacts     JSONB NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'success',
+    consumed_at   TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_etl_source_consumption_loader
+    ON etl_source_consumption (loader, consumed_at DESC);
+"""
+
+
+@dataclass
+class Artifact:
+    """One version of one source file."""
+    source: str                    # URL, or absolute path for local files
+    sha256: str
+    path: str                      # where the content lives on disk
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: Optional[str] = None
+    changed: bool = True           # False when this fetch returned a version we already had
+
+    def as_record(self) -> dict:
+        return {k: v for k, v in asdict(self).items() if k not in ("path", "changed")}
+
+
+def _utcnow() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def sha256_file(path: Path) -> str:
+    """Full-content SHA-256 of a file."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class SourceCache:
+    """Content-addressed artifact store with a JSON index on local disk."""
+
+    def __init__(self, root: Path = DEFAULT_CACHE_ROOT):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.index_path = self.root / "index.json"
+        self._index = None
+
+    # ---- index ----
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            if self.index_path.exists():
+                with open(self.index_path, encoding="utf-8") as f:
+                    self._index = json.load(f)
+            else:
+                self._index = {}
+            self._index.setdefault("urls", {})
+            self._index.setdefault("files", {})
+        return self._index
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".index.", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._load_index(), f, indent=2, sort_keys=True)
+        os.replace(tmp, self.index_path)
+
+    def object_path(self, sha256: str) -> Path:
+        return self.objects / sha256[:2] / sha256
+
+    # ---- local files ----
+
+    def file_sha256(self, path: Path) -> str:
+        """Full-content hash, memoized on (size, mtime_ns) in the index."""
+        path = Path(path).resolve()
+        st = path.stat()
+        files = self._load_index()["files"]
+        memo = files.get(str(path))
+        if memo and memo["size"] == st.st_size and memo["mtime_ns"] == st.st_mtime_ns:
+            return memo["sha256"]
+        digest = sha256_file(path)
+        files[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        self._save_index()
+        return digest
+
+    def register_file(self, path: Path) -> Artifact:
+        """Describe a file that is already on disk (no copy into the store)."""
+        path = Path(path).resolve()
+        return Artifact(
+            source=str(path),
+            sha256=self.file_sha256(path),
+            path=str(path),
+            size=path.stat().st_size,
+        )
+
+    # ---- remote fetch ----
+
+    def fetch(self, url: str, session=None, force: bool = False) -> Artifact:
+        """Conditional GET of ``url`` into the store.
+
+        Sends If-None-Match / If-Modified-Since from the previous fetch. On
+        304 (or a 200 whose content hashes to what we already hold) the
+        returned Artifact has changed=False.
+        """
+        if session is None:
+            import requests
+            session = requests.Session()
+
+        entry = self._load_index()["urls"].get(url)
+        have_object = bool(entry) and self.object_path(entry["sha256"]).exists()
+        headers = {}
+        if have_object and not force:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as resp:
+            if resp.status_code == 304 and have_object:
+                print(f"  [cache] {url} not modified")
+                return self._artifact(url, entry, changed=False)
+            resp.raise_for_status()
+
+            self.objects.mkdir(parents=True, exist_ok=True)
+            h = hashlib.sha256()
+            size = 0
+            fd, tmp = tempfile.mkstemp(dir=self.objects, prefix=".part.")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=_CHUNK):
+                        if chunk:
+                            f.write(chunk)
+                            h.update(chunk)
+                            size += len(chunk)
+                digest = h.hexdigest()
+                target = self.object_path(digest)
+                if target.exists():
+                    os.remove(tmp)
+                else:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(tmp, target)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+
+            new_entry = {
+                "sha256": digest,
+                "size": size,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "fetched_at": _utcnow(),
+            }
+
+        changed = not (entry and entry["sha256"] == digest)
+        self._load_index()["urls"][url] = new_entry
+        self._save_index()
+        print(f"  [cache] {url} -> {digest[:12]} ({size / 1e6:.1f} MB, {'new' if changed else 'unchanged'})")
+        return self._artifact(url, new_entry, changed=changed)
+
+    def _artifact(self, url: str, entry: dict, changed: bool) -> Artifact:
+        return Artifact(
+            source=url,
+            sha256=entry["sha256"],
+            path=str(self.object_path(entry["sha256"])),
+            size=entry["size"],
+            etag=entry.get("etag"),
+            last_modified=entry.get("last_modified"),
+            fetched_at=entry.get("fetched_at"),
+            changed=changed,
+        )
+
+    def materialize(self, artifact: Artifact, target: Path) -> Path:
+        """Place the artifact at ``target`` (hardlink when possible, else copy).
+
+        Loaders that read from a fixed directory (files/fec/, data/bmf_bulk/)
+        keep working unchanged. A target that already holds the same content
+        is left alone.
+        """
+        target = Path(target)
+        src = Path(artifact.path)
+        if target.exists():
+            if os.path.samefile(src, target) or (
+                target.stat().st_size == artifact.size and self.file_sha256(target) == artifact.sha256
+            ):
+                return target
+            target.unlink()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(src, target)
+        except OSError:
+            shutil.copyfile(src, target)
+        return target
+
+
+# ---------------------------------------------------------------------------
+# Consumption log (Postgres)
+# ---------------------------------------------------------------------------
+
+def fingerprint(artifacts: Iterable[Artifact]) -> str:
+    """Order-independent digest of a set of artifact versions."""
+    digests = sorted(a.sha256 for a in artifacts)
+    return hashlib.sha256("\n".join(digests).encode()).hexdigest()
+
+
+def ensure_table(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(DDL_CONSUMPTION)
+    conn.commit()
+
+
+def last_fingerprint(conn, loader: str) -> Optional[str]:
+    """Fingerprint of the last successful run of ``loader`` (None if never)."""
+    ensure_table(conn)
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT fingerprint FROM etl_source_consumption
+            WHERE loader = %s AND status = 'success'
+            ORDER BY consumed_at DESC, id DESC
+            LIMIT 1
+            """,
+            (loader,),
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def is_unchanged(conn, loader: str, artifacts: list[Artifact]) -> bool:
+    """True when ``loader`` already loaded exactly this set of artifacts."""
+    if not artifacts:
+        return False
+    return last_fingerprint(conn, loader) == fingerprint(artifacts)
+
+
+def record_consumption(conn, loader: str, artifacts: list[Artifact], status: str = "success") -> None:
+    """Record which artifact versions a loader run consumed."""
+    ensure_table(conn)
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO etl_source_consumption (loader, fingerprint, artifacts, status)
+            VALUES (%s, %s, %s::jsonb, %s)
+            """,
+            (loader, fingerprint(artifacts), json.dumps([a.as_record() for a in artifacts]), status),
+        )
+    conn.commit()
+
+
+def _print_status() -> None:
+    from db_config import get_connection
+
+    conn = get_connection()
+    try:
+        ensure_table(conn)
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT DISTINCT ON (loader) loader, consumed_at, jsonb_array_length(artifacts), fingerprint
+                FROM etl_source_consumption
+                WHERE status = 'success'
+                ORDER BY loader, consumed_at DESC, id DESC
+                """
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        print("No loader runs recorded yet.")
+    for loader, at, n, fp in rows:
+        print(f"  {loader:<28s} {at:%Y-%m-%d %H:%M}  {n:>4} artifacts  {fp[:12]}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ETL source cache utilities")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("status", help="Show the last successful run per loader")
+    p_hash = sub.add_parser("hash", help="Full-content sha256 of files (memoized)")
+    p_hash.add_argument("paths", nargs="+")
+    args = ap.parse_args()
+
+    if args.cmd == "status":
+        _print_status()
+    else:
+        cache = SourceCache()
+        for p in args.paths:
+            print(f"{cache.file_sha256(Path(p))}  {p}")
+
+
+if __name__ == "__main__":
+    main()
@@ -153,48 +153,69 @@ def token_overlap(a: str, b: str) -> float:
     return inter / smaller if smaller else 0.0
 
 
+def record_features(r: dict) -> dict:
+    """Per-record inputs to the pair scores, so each name is normalized once."""
+    cn = r["canonical_name"]
+    aggressive = normalize_aggressive(cn)
+    return {
+        "canonical_name": cn,
+        "standard": normalize_standard(cn),
+        "aggressive": aggressive,
+        "sorted_tokens": " ".join(sorted(aggressive.split())),
+        "bigrams": name_bigrams(cn),
+        "tokens": set(aggressive.split()),
+        "ein": r.get("ein"),
+        "zip": r.get("zip") or "",
+        "city": (r.get("city") or "").lower().strip(),
+        "naics": r.get("naics") or "",
+        "source_origin": r.get("source_origin"),
+        "employee_count": r.get("employee_count"),
+    }
+
+
 def score_pair(r1: dict, r2: dict) -> dict:
     """Compute similarity scores for a candidate pair."""
-    cn1, cn2 = r1["canonical_name"], r2["canonical_name"]
+    return score_features(record_features(r1), record_features(r2))
+
+
+def score_features(f1: dict, f2: dict, sim=string_sim) -> dict:
+    """score_pair() on precomputed record_features(); sim scores two strings 0-1."""
+    cn1, cn2 = f1["canonical_name"], f2["canonical_name"]
 
     scores = {}
 
     # Name similarities
     scores["name_exact"] = 1.0 if cn1 == cn2 else 0.0
-    scores["name_standard_sim"] = string_sim(
-        normalize_standard(cn1), normalize_standard(cn2)
-    )
-    scores["name_aggressive_sim"] = string_sim(
-        normalize_aggressive(cn1), normalize_aggressive(cn2)
-    )
-    scores["name_sorted_token_sim"] = string_sim(
-        sorted_tokens(cn1), sorted_tokens(cn2)
-    )
-    scores["name_bigram_jaccard"] = jaccard_sim(name_bigrams(cn1), name_bigrams(cn2))
-    scores["name_token_overlap"] = token_overlap(cn1, cn2)
+    scores["name_standard_sim"] = sim(f1["standard"], f2["standard"])
+    scores["name_aggressive_sim"] = sim(f1["aggressive"], f2["aggressive"])
+    scores["name_sorted_token_sim"] = sim(f1["sorted_tokens"], f2["sorted_tokens"])
+    scores["name_bigram_jaccard"] = jaccard_sim(f1["bigrams"], f2["bigrams"])
+    ta, tb = f1["tokens"], f2["tokens"]
+    smaller = min(len(ta), len(tb))
+    scores["name_token_overlap"] = len(ta & tb) / smaller if smaller else 0.0
 
     # EIN
-    e1, e2 = r1.get("ein"), r2.get("ein")
+    e1, e2 = f1["ein"], f2["ein"]
     scores["ein_match"] = 1.0 if (e1 and e2 and e1 == e2) else 0.0
     scores["ein_conflict"] = 1.0 if (e1 and e2 and e1 != e2) else 0.0
 
     # Location
-    z1, z2 = (r1.get("zip") or ""), (r2.get("zip") or "")
-    c1, c2 = (r1.get("city") or "").lower().strip(), (r2.get("city") or "").lower().strip()
+    z1, z2 = f1["zip"], f2["zip"]
+    c1, c2 = f1["city"], f2["city"]
     scores["zip_exact"] = 1.0 if (z1 and z2 and z1 == z2) else 0.0
     scores["zip5_match"] = 1.0 if (z1[:5] == z2[:5] and len(z1) >= 5 and len(z2) >= 5) else 0.0
     scores["city_match"] = 1.0 if (c1 and c2 and c1 == c2) else 0.0
 
     # NAICS
-    n1, n2 = (r1.get("naics") or ""), (r2.get("naics") or "")
+    n1, n2 = f1["naics"], f2["naics"]
     scores["naics_exact"] = 1.0 if (n1 and n2 and n1 == n2) else 0.0
     scores["naics_2digit"] = 1.0 if (n1[:2] == n2[:2] and len(n1) >= 2 and len(n2) >= 2) else 0.0
 
     # Source
-    scores["same_source"] = 1.0 if r1.get("source_origin") == r2.get("source_origin") else 0.0
+    scores["same_source"] = 1.0 if f1["source_origin"] == f2["source_origin"] else 0.0
 
     # Employee count similarity
-    ec1, ec2 = r1.get("employee_count"), r2.get("employee_count")
+    ec1, ec2 = f1["employee_count"], f2["employee_count"]
     if ec1 and ec2 and ec1 > 0 and ec2 > 0:
         ratio = min(ec1, ec2) / max(ec1, ec2)
         scores["employee_ratio"] = ratio
@@ -237,83 +258,92 @@ def _pairs_from_group(ids: list, method: str, candidates: dict):
         candidates.setdefault(key, set()).add(method)
 
 
-def block_ein(records: list) -> dict:
-    """Strategy 1: Group by exact EIN."""
+def _block(records: list, method: str, key_fn) -> dict:
+    """Group records by key_fn (None = not blocked) and pair each group."""
     groups = defaultdict(list)
     for r in records:
-        if r.get("ein"):
-            groups[r["ein"]].append(r["master_id"])
+        key = key_fn(r)
+        if key is not None:
+            groups[key].append(r["master_id"])
     cands = {}
     for ids in groups.values():
-        _pairs_from_group(ids, "ein_exact", cands)
+        _pairs_from_group(ids, method, cands)
     return cands
 
 
+def key_ein(r: dict):
+    return r.get("ein") or None
+
+
+def key_exact_name(r: dict):
+    return r["canonical_name"]
+
+
+def key_normalized_name(r: dict):
+    return normalize_standard(r["canonical_name"]) or None
+
+
+def key_sorted_tokens(r: dict):
+    return sorted_tokens(r["canonical_name"]) or None
+
+
+def key_zip_name_prefix(r: dict):
+    z = r.get("zip")
+    if z and r["canonical_name"]:
+        pf = name_prefix(r["canonical_name"], 5)
+        if pf:
+            return f"{z}|{pf}"
+    return None
+
+
+def key_city_name_prefix(r: dict):
+    city = (r.get("city") or "").lower().strip()
+    if city and r["canonical_name"]:
+        pf = name_prefix(r["canonical_name"], 5)
+        if pf:
+            return f"{city}|{pf}"
+    return None
+
+
+# (blocking_method, key function), in strategy order
+BLOCKING_KEYS = [
+    ("ein_exact", key_ein),
+    ("exact_name", key_exact_name),
+    ("normalized_name", key_normalized_name),
+    ("sorted_tokens", key_sorted_tokens),
+    ("zip_name_prefix", key_zip_name_prefix),
+    ("city_name_prefix", key_city_name_prefix),
+]
+
+
+def block_ein(records: list) -> dict:
+    """Strategy 1: Group by exact EIN."""
+    return _block(records, "ein_exact", key_ein)
+
+
 def block_exact_name(records: list) -> dict:
     """Strategy 2: Group by exact canonical_name."""
-    groups = defaultdict(list)
-    for r in records:
-        groups[r["canonical_name"]].append(r["master_id"])
-    cands = {}
-    for ids in groups.values():
-        _pairs_from_group(ids, "exact_name", cands)
-    return cands
+    return _block(records, "exact_name", key_exact_name)
 
 
 def block_normalized_name(records: list) -> dict:
     """Strategy 3: Group by standard-normalized name."""
-    groups = defaultdict(list)
-    for r in records:
-        nn = normalize_standard(r["canonical_name"])
-        if nn:
-            groups[nn].append(r["master_id"])
-    cands = {}
-    for ids in groups.values():
-        _pairs_from_group(ids, "normalized_name", cands)
-    return cands
+    return _block(records, "normalized_name", key_normalized_name)
 
 
 def block_sorted_tokens(records: list) -> dict:
     """Strategy 4: Group by sorted token representation."""
-    groups = defaultdict(list)
-    for r in records:
-        st = sorted_tokens(r["canonical_name"])
-        if st:
-            groups[st].append(r["master_id"])
-    cands = {}
-    for ids in groups.values():
-        _pairs_from_group(ids, "sorted_tokens", cands)
-    return cands
+    return _block(records, "sorted_tokens", key_sorted_tokens)
 
 
 def block_zip_name_prefix(records: list) -> dict:
     """Strategy 5: Group by ZIP + first 5 chars of normalized name."""
-    groups = defaultdict(list)
-    for r in records:
-        z = r.get("zip")
-        if z and r["canonical_name"]:
-            pf = name_prefix(r["canonical_name"], 5)
-            if pf:
-                groups[f"{z}|{pf}"].append(r["master_id"])
-    cands = {}
-    for ids in groups.values():
-        _pairs_from_group(ids, "zip_name_prefix", cands)
-    return cands
+    return _block(records, "zip_name_prefix", key_zip_name_prefix)
 
 
 def block_city_name_prefix(records: list) -> dict:
     """Strategy 6: Group by city + first 5 chars of normalized name."""
-    groups = defaultdict(list)
-    for r in records:
-        city = (r.get("city") or "").lower().strip()
-        if city and r["canonical_name"]:
-            pf = name_prefix(r["canonical_name"], 5)
-            if pf:
-                groups[f"{city}|{pf}"].append(r["master_id"])
-    cands = {}
-    for ids in groups.values():
-        _pairs_from_group(ids, "city_name_prefix", cands)
-    return cands
+    return _block(records, "city_name_prefix", key_city_name_prefix)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,214 @@
+"""
+Streaming blocking engine for state / national dedup runs.
+
+01_blocking.py builds one in-memory dict of every candidate pair, pairs every
+member of every block with itertools.combinations, and scores each pair with
+difflib after re-normalizing both names. That is fine for the 20K NY sample;
+on a full state, one popular block (a common ZIP + name prefix, a franchise
+EIN) yields millions of pairs and the dict holds them all. This engine keeps
+the same six blocking keys and the same score formula, but:
+
+  * blocks up to max_block members are paired exhaustively (as before);
+    larger blocks, which 01_blocking.py dropped, are paired with a
+    sorted-neighborhood window: members are sorted by sorted-token name and
+    each is paired with the next `window` members. Blocks over
+    max_window_block members are treated as degenerate and skipped.
+  * pairs are spilled to disk in partitions (by record index), so merging the
+    blocking methods of a pair only ever holds one partition in memory.
+  * names are normalized once per record (record_features) and compared with
+    RapidFuzz's ratio, the same normalized Indel similarity difflib
+    approximates. It can score a little higher than SequenceMatcher on
+    strings where difflib's greedy block matching misses the longest common
+    subsequence; pass sim=blocking.string_sim for difflib scores.
+
+Usage:
+    from blocking_engine import iter_scored_pairs
+    for cand in iter_scored_pairs(records):
+        ...   # same dict shape national_dry_run.py always produced
+"""
+import importlib.util
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+from itertools import combinations
+
+from rapidfuzz import fuzz
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Load the blocking module (filename has leading digit -> can't import normally)
+spec = importlib.util.spec_from_file_location('blocking', os.path.join(DIR, '01_blocking.py'))
+blocking = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(blocking)
+
+MAX_BLOCK = blocking.MAX_GROUP      # exhaustive pairing up to this block size
+WINDOW = 10                         # sorted-neighborhood window above it
+MAX_WINDOW_BLOCK = 50000            # blocks larger than this are skipped
+PARTITIONS = 64
+SPILL_BUFFER = 200000               # buffered pairs before writing to disk
+
+
+def rapidfuzz_sim(a: str, b: str) -> float:
+    """Normalized Indel similarity (0-1); drop-in for blocking.string_sim."""
+    if not a or not b:
+        return 0.0
+    return fuzz.ratio(a, b) / 100.0
+
+
+def block_pairs(members, sort_key, max_block=MAX_BLOCK, window=WINDOW,
+                max_window_block=MAX_WINDOW_BLOCK):
+    """Yield the (a, b) pairs for one block (a < b).
+
+    Exhaustive for small blocks; sorted-neighborhood for oversized ones.
+    window=0 reproduces 01_blocking.py, which skips oversized blocks.
+    """
+    n = len(members)
+    if n < 2 or n > max_window_block:
+        return
+    if n <= max_block:
+        yield from combinations(sorted(members), 2)
+        return
+    order = sorted(members, key=sort_key)
+    for i, a in enumerate(order):
+        for b in order[i + 1:i + 1 + window]:
+            yield (a, b) if a < b else (b, a)
+
+
+class PairSpill:
+    """Candidate pairs (record index pairs + method bit) partitioned on disk.
+
+    add() buffers pairs and appends them to one file per partition;
+    partitions() reads the files back one at a time and merges duplicate
+    pairs into {(a, b): method_bitmask}.
+    """
+
+    def __init__(self, directory=None, partitions=PARTITIONS, buffer_size=SPILL_BUFFER):
+        self.path = tempfile.mkdtemp(prefix='blocking_spill_', dir=directory)
+        self.n_partitions = partitions
+        self.buffer_size = buffer_size
+        self._buffers = [[] for _ in range(partitions)]
+        self._buffered = 0
+        self.added = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _file(self, part):
+        return os.path.join(self.path, 'part_%03d.tsv' % part)
+
+    def add(self, a, b, method_bit):
+        self._buffers[a % self.n_partitions].append('%d\t%d\t%d\n' % (a, b, method_bit))
+        self._buffered += 1
+        self.added += 1
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        for part, buf in enumerate(self._buffers):
+            if buf:
+                with open(self._file(part), 'a', encoding='ascii') as f:
+                    f.writelines(buf)
+                buf.clear()
+        self._buffered = 0
+
+    def partitions(self):
+        self.flush()
+        for part in range(self.n_partitions):
+            path = self._file(part)
+            if not os.path.exists(path):
+                continue
+            merged = defaultdict(int)
+            with open(path, 'r', encoding='ascii') as f:
+                for line in f:
+                    a, b, bit = line.split('\t')
+                    merged[(int(a), int(b))] |= int(bit)
+            os.remove(path)
+            yield merged
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def iter_candidates(records, strategies=None, max_block=MAX_BLOCK, window=WINDOW,
+                    max_window_block=MAX_WINDOW_BLOCK, spill_dir=None,
+                    partitions=PARTITIONS, features=None, stats=None):
+    """Yield (i, j, methods) once per candidate pair of records[i], records[j].
+
+    strategies: [(method, key_fn)], default blocking.BLOCKING_KEYS.
+    features:   record_features() per record (computed if not given).
+    stats:      optional dict, filled with per-method pair/block counts.
+    Pairs come out partition by partition, sorted within a partition.
+    """
+    strategies = strategies or blocking.BLOCKING_KEYS
+    if features is None:
+        features = [blocking.record_features(r) for r in records]
+    ids = [r['master_id'] for r in records]
+
+    def sort_key(i):
+        return (features[i]['sorted_tokens'], ids[i])
+
+    with PairSpill(spill_dir, partitions) as spill:
+        for bit, (method, key_fn) in enumerate(strategies):
+            groups = defaultdict(list)
+            for i, r in enumerate(records):
+                key = key_fn(r)
+                if key is not None:
+                    groups[key].append(i)
+            n_pairs = n_windowed = n_skipped = 0
+            before = spill.added
+            for members in groups.values():
+                if len(members) > max_window_block:
+                    n_skipped += 1
+                    continue
+                if len(members) > max_block:
+                    n_windowed += 1
+                for a, b in block_pairs(members, sort_key, max_block, window, max_window_block):
+                    spill.add(a, b, 1 << bit)
+            n_pairs = spill.added - before
+            if stats is not None:
+                stats[method] = {'pairs': n_pairs, 'blocks': len(groups),
+                                 'windowed_blocks': n_windowed, 'skipped_blocks': n_skipped}
+            del groups
+
+        names = [m for m, _ in strategies]
+        for part in spill.partitions():
+            for (a, b), mask in sorted(part.items()):
+                yield a, b, [names[k] for k in range(len(names)) if mask >> k & 1]
+
+
+def candidate_dict(r1, r2, methods, scores):
+    """Pair dict in the shape rule_engine.pair_from_candidate expects."""
+    return {
+        'id1': r1['master_id'], 'id2': r2['master_id'],
+        'display_name_1': r1['display_name'], 'display_name_2': r2['display_name'],
+        'canonical_name_1': r1['canonical_name'], 'canonical_name_2': r2['canonical_name'],
+        'city_1': r1.get('city'), 'city_2': r2.get('city'),
+        'zip_1': r1.get('zip'), 'zip_2': r2.get('zip'),
+        'ein_1': r1.get('ein'), 'ein_2': r2.get('ein'),
+        'naics_1': r1.get('naics'), 'naics_2': r2.get('naics'),
+        'source_1': r1.get('source_origin'), 'source_2': r2.get('source_origin'),
+        'employee_count_1': r1.get('employee_count'), 'employee_count_2': r2.get('employee_count'),
+        'is_public_1': r1.get('is_public'), 'is_public_2': r2.get('is_public'),
+        'is_nonprofit_1': r1.get('is_nonprofit'), 'is_nonprofit_2': r2.get('is_nonprofit'),
+        'industry_1': r1.get('industry_text'), 'industry_2': r2.get('industry_text'),
+        'blocking_methods': sorted(methods),
+        'scores': scores,
+        'classification': blocking.classify_pair(scores),  # heuristic baseline
+    }
+
+
+def iter_scored_pairs(records, sim=rapidfuzz_sim, **kwargs):
+    """Yield a scored candidate dict per pair; id1 < id2 as in 01_blocking.py.
+
+    kwargs go to iter_candidates (max_block, window, spill_dir, stats, ...).
+    """
+    features = [blocking.record_features(r) for r in records]
+    for a, b, methods in iter_candidates(records, features=features, **kwargs):
+        if records[b]['master_id'] < records[a]['master_id']:
+            a, b = b, a
+        scores = blocking.score_features(features[a], features[b], sim)
+        yield candidate_dict(records[a], records[b], methods, scores)
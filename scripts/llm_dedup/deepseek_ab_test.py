@@ -26,6 +26,7 @@ Usage
   py scripts/llm_dedup/deepseek_ab_test.py --model deepseek-v4-flash --n 200
   py scripts/llm_dedup/deepseek_ab_test.py --model deepseek-v4-pro --n 200
   py scripts/llm_dedup/deepseek_ab_test.py --smoke   # 1 pair only
+  py scripts/llm_dedup/deepseek_ab_test.py --no-store --n 200   # force fresh calls
 
 Caching note
 ------------
@@ -33,6 +34,12 @@ DeepSeek caching is AUTOMATIC on prefix match (no cache_control flag needed).
 The system prompt is ~3,945 tokens which exceeds the cache unit, so once the
 first request writes it, all subsequent requests in the same call session
 should hit the cache. Verify via `usage.prompt_cache_hit_tokens` field.
+
+Pairs already answered by the same model under the same PROMPT_VERSION come
+from the shared response store (llm_response_store.py) instead of the API.
+Their original token usage still counts toward the cost totals, so agreement
+and per-pair cost stay comparable across re-runs; the summary reports what
+this run actually spent separately.
 """
 from __future__ import annotations
 
@@ -51,10 +58,14 @@ sys.path.insert(0, DIR)
 PROJECT_ROOT = os.path.abspath(os.path.join(DIR, "..", ".."))
 
 from validation_judge_prompt import (  # noqa: E402
+    PROMPT_VERSION,
     SYSTEM_PROMPT,
     build_user_message,
 )
 
+sys.path.insert(0, PROJECT_ROOT)
+from llm_response_store import ResponseStore, payload_hash  # noqa: E402
+
 # ---------------------------------------------------------------------------
 # Pricing tables (USD per 1M tokens)
 # ---------------------------------------------------------------------------
@@ -279,11 +290,17 @@ def stratified_sample(haiku: dict, manifest: dict, sample_idx: dict, n: int,
 # DeepSeek call
 # ---------------------------------------------------------------------------
 
-def call_deepseek(client, model: str, pair_data: dict, max_tokens: int = 3000):
+def call_deepseek(client, model: str, pair_data: dict, max_tokens: int = 3000,
+                  store: ResponseStore | None = None):
     # NB: DeepSeek V4 has thinking-mode enabled by default; reasoning tokens
     # consume the completion budget BEFORE the final JSON. Smoke testing showed
     # 60-300 reasoning tokens per call. 3000 leaves ample headroom.
     user_msg = build_user_message(pair_data)
+    digest = payload_hash({"user": user_msg, "max_tokens": max_tokens})
+    if store is not None:
+        hit = store.get(model, PROMPT_VERSION, digest)
+        if hit is not None:
+            return dict(hit, from_store=True)
     t0 = time.time()
     resp = client.chat.completions.create(
         model=model,
@@ -314,7 +331,7 @@ def call_deepseek(client, model: str, pair_data: dict, max_tokens: int = 3000):
         cache_miss_safe = max(usage.prompt_tokens - cache_hit_safe, 0)
     else:
         cache_miss_safe = cache_miss
-    return {
+    result = {
         "text": text,
         "prompt_tokens": usage.prompt_tokens,
         "completion_tokens": usage.completion_tokens,
@@ -322,6 +339,9 @@ def call_deepseek(client, model: str, pair_data: dict, max_tokens: int = 3000):
         "cache_miss_tokens": cache_miss_safe,
         "elapsed_s": elapsed,
     }
+    if store is not None and parse_haiku_label(text):
+        store.put(model, PROMPT_VERSION, digest, result)
+    return dict(result, from_store=False)
 
 # ---------------------------------------------------------------------------
 # Cost calc
@@ -407,6 +427,8 @@ def main():
                     help="Run a single pair to verify auth + schema, then exit.")
     ap.add_argument("--sleep", type=float, default=0.0,
                     help="Seconds to sleep between requests (avoid rate limits)")
+    ap.add_argument("--no-store", action="store_true",
+                    help="Call the API for every pair, ignoring the response store")
     args = ap.parse_args()
 
     print("[load] Haiku ground truth...")
@@ -444,7 +466,9 @@ def main():
     results_path = os.path.join(DIR, f"deepseek_ab_results_{ts}.jsonl")
     summary_path = os.path.join(DIR, f"deepseek_ab_summary_{ts}.json")
 
+    store = None if args.no_store else ResponseStore()
     rows = []
+    spent_cost = 0.0
     total_cache_hit = 0
     total_cache_miss = 0
     total_output = 0
@@ -456,7 +480,7 @@ def main():
         for i, item in enumerate(chosen):
             cid = item["custom_id"]
             try:
-                ds = call_deepseek(client, args.model, item["pair_data"])
+                ds = call_deepseek(client, args.model, item["pair_data"], store=store)
             except Exception as e:
                 print(f"  [{i+1:3d}/{len(chosen)}] {cid}  ERROR: {e}")
                 row = {
@@ -491,6 +515,8 @@ def main():
             total_output += ds["completion_tokens"]
             total_cost += cost
             total_elapsed += ds["elapsed_s"]
+            if not ds["from_store"]:
+                spent_cost += cost
 
             agree = "MATCH" if ds_label == item["haiku"]["label"] else "DIFF"
             print(f"  [{i+1:3d}/{len(chosen)}] {cid:30s} "
@@ -498,7 +524,8 @@ def main():
                   f"ds={str(ds_label):13s} {agree}  "
                   f"in={ds['prompt_tokens']:>5} (hit={ds['cache_hit_tokens']:>5}) "
                   f"out={ds['completion_tokens']:>3}  "
-                  f"${cost:.5f}  {ds['elapsed_s']:.1f}s")
+                  f"${cost:.5f}  {ds['elapsed_s']:.1f}s"
+                  f"{'  (stored)' if ds['from_store'] else ''}")
 
             row = {
                 "custom_id": cid,
@@ -516,11 +543,12 @@ def main():
                 "cache_miss_tokens": ds["cache_miss_tokens"],
                 "elapsed_s": ds["elapsed_s"],
                 "cost_usd": cost,
+                "from_store": ds["from_store"],
             }
             rows.append(row)
             fout.write(json.dumps(row, ensure_ascii=False) + "\n")
             fout.flush()
-            if args.sleep > 0:
+            if args.sleep > 0 and not ds["from_store"]:
                 time.sleep(args.sleep)
 
     # Analyze
@@ -546,6 +574,8 @@ def main():
             "total_cache_miss_tokens": total_cache_miss,
             "total_output_tokens": total_output,
             "cache_hit_pct": round(cache_hit_pct, 2),
+            "spent_this_run_usd": round(spent_cost, 6),
+            "from_response_store": sum(1 for r in rows if r.get("from_store")),
         },
         "latency": {
             "total_s": round(total_elapsed, 2),
@@ -589,6 +619,10 @@ def main():
     print(f"Output tokens    : {total_output:,}")
     print(f"Total cost       : ${total_cost:.4f}")
     print(f"Per-pair cost    : ${total_cost/max(1,len(rows)):.6f}")
+    if store is not None:
+        print(f"Spent this run   : ${spent_cost:.4f}  "
+              f"({summary['cost']['from_response_store']} pairs from the response store)")
+        store.close()
     print(f"Wall time        : {total_elapsed:.1f}s "
           f"({total_elapsed/max(1,len(rows)):.2f}s/pair)")
     print()
@@ -8,14 +8,19 @@ No API calls, no DB writes. Pure analysis.
 Usage:
   py scripts/llm_dedup/national_dry_run.py --state NY
   py scripts/llm_dedup/national_dry_run.py --state NY --limit 50000    # test
+  py scripts/llm_dedup/national_dry_run.py --state NY,NJ,CT --jobs 3
+  py scripts/llm_dedup/national_dry_run.py --state ALL                  # national
 """
 import argparse
 import csv
-import importlib.util
+import contextlib
+import io
 import os
+import random
 import sys
 import time
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from decimal import Decimal
 
 sys.path.insert(0, r"C:\Users\jakew\.local\bin\Labor Data Project_real")
@@ -25,11 +30,9 @@ DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, DIR)
 
 from rule_engine import classify_pair_v2, pair_from_candidate  # noqa: E402
+import blocking_engine  # noqa: E402
 
-# Load the blocking module (filename has leading digit -> can't import normally)
-spec = importlib.util.spec_from_file_location('blocking', os.path.join(DIR, '01_blocking.py'))
-blocking = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(blocking)
+TIER_D_SAMPLE = 5000
 
 
 def pull_state_singletons(state, limit=None):
@@ -64,72 +67,48 @@ def pull_state_singletons(state, limit=None):
     return records
 
 
-def run_blocking(records):
-    """Re-use the blocking functions from 01_blocking.py on an in-memory list."""
-    all_candidates = {}
-    strategies = [
-        ('ein_exact', blocking.block_ein),
-        ('exact_name', blocking.block_exact_name),
-        ('normalized_name', blocking.block_normalized_name),
-        ('sorted_tokens', blocking.block_sorted_tokens),
-        ('zip_name_prefix', blocking.block_zip_name_prefix),
-        ('city_name_prefix', blocking.block_city_name_prefix),
-    ]
-    for label, func in strategies:
-        t0 = time.time()
-        cands = func(records)
-        for key, methods in cands.items():
-            all_candidates.setdefault(key, set()).update(methods)
-        print(f'  {label:20s} {len(cands):>8,} new pairs  ({time.time()-t0:.1f}s)')
-
-    # Score + shape into candidate dicts compatible with rule engine
-    by_id = {r['master_id']: r for r in records}
-    scored = []
-    for (id1, id2), methods in all_candidates.items():
-        r1 = by_id[id1]; r2 = by_id[id2]
-        scores = blocking.score_pair(r1, r2)
-        scored.append({
-            'id1': id1, 'id2': id2,
-            'display_name_1': r1['display_name'], 'display_name_2': r2['display_name'],
-            'canonical_name_1': r1['canonical_name'], 'canonical_name_2': r2['canonical_name'],
-            'city_1': r1.get('city'), 'city_2': r2.get('city'),
-            'zip_1': r1.get('zip'), 'zip_2': r2.get('zip'),
-            'ein_1': r1.get('ein'), 'ein_2': r2.get('ein'),
-            'naics_1': r1.get('naics'), 'naics_2': r2.get('naics'),
-            'source_1': r1.get('source_origin'), 'source_2': r2.get('source_origin'),
-            'employee_count_1': r1.get('employee_count'), 'employee_count_2': r2.get('employee_count'),
-            'is_public_1': r1.get('is_public'), 'is_public_2': r2.get('is_public'),
-            'is_nonprofit_1': r1.get('is_nonprofit'), 'is_nonprofit_2': r2.get('is_nonprofit'),
-            'industry_1': r1.get('industry_text'), 'industry_2': r2.get('industry_text'),
-            'blocking_methods': sorted(methods),
-            'scores': scores,
-            'classification': blocking.classify_pair(scores),  # heuristic baseline
-        })
-    return scored
+def run_blocking(records, stats=None, **engine_kw):
+    """Stream scored candidate pairs from the blocking engine.
 
+    Same pair dicts as 01_blocking.py's keys + score formula, but pairs are
+    spilled to disk instead of held in one dict (see blocking_engine.py).
+    engine_kw: max_block, window, max_window_block, spill_dir.
+    """
+    return blocking_engine.iter_scored_pairs(records, stats=stats, **engine_kw)
+
+
+def list_states():
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT DISTINCT state FROM master_employers "
+                "WHERE state IS NOT NULL AND state <> '' ORDER BY state")
+    states = [r[0] for r in cur.fetchall()]
+    cur.close()
+    conn.close()
+    return states
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument('--state', default='NY')
-    ap.add_argument('--limit', type=int, default=None)
-    args = ap.parse_args()
 
+def run_state(state, limit=None, **engine_kw):
+    """Dry run for one state: pull, block, classify, write the CSVs. Returns a summary."""
     t0 = time.time()
-    print(f'Pulling {"all" if not args.limit else args.limit} {args.state} singletons...')
-    records = pull_state_singletons(args.state, limit=args.limit)
+    print(f'Pulling {"all" if not limit else limit} {state} singletons...')
+    records = pull_state_singletons(state, limit=limit)
     print(f'  {len(records):,} records  ({time.time()-t0:.1f}s)')
+    if not records:
+        return {'state': state, 'records': 0, 'pairs': 0, 'tiers': {},
+                'h4_siblings': 0, 'h9_subsidiary': 0}
 
-    print('\\nRunning blocking...')
-    pairs = run_blocking(records)
-    print(f'  {len(pairs):,} candidate pairs generated')
-
-    print('\\nApplying rule engine...')
+    print('\\nRunning blocking + rule engine...')
+    block_stats = {}
+    pairs = run_blocking(records, stats=block_stats, **engine_kw)
+    n_pairs = 0
     tier_counts = Counter()
     rule_counts = Counter()
     tier_A_pairs = []
     tier_B_pairs = []
     tier_C_pairs = []
-    tier_D_pairs = []
+    tier_D_sample = []  # reservoir sample; tier D is most pairs
+    rng = random.Random(42)
     hierarchy_stats = {'H4_siblings': 0, 'H9_subsidiary': 0}
     series_parents = defaultdict(set)
 
@@ -143,6 +122,7 @@ def main():
 
     t1 = time.time()
     for p in pairs:
+        n_pairs += 1
         pd = pair_from_candidate(p)
         cls = classify_pair_v2(pd)
         tier_counts[cls.tier] += 1
@@ -154,7 +134,13 @@ def main():
         elif cls.tier == 'tier_C_review':
             tier_C_pairs.append((p, cls))
         elif cls.tier == 'tier_D_different':
-            tier_D_pairs.append((p, cls))
+            n_d = tier_counts[cls.tier]
+            if n_d <= TIER_D_SAMPLE:
+                tier_D_sample.append((p, cls))
+            else:
+                k = rng.randrange(n_d)
+                if k < TIER_D_SAMPLE:
+                    tier_D_sample[k] = (p, cls)
 
         # Hierarchy signals (independent of tier).
         # Same semantics as extract_hierarchy.py:
@@ -219,22 +205,26 @@ def main():
                 'zip_1': p.get('zip_1'), 'zip_2': p.get('zip_2'),
             })
 
-    print(f'  {time.time()-t1:.1f}s to classify all pairs')
+    for label, st in block_stats.items():
+        print(f'  {label:20s} {st["pairs"]:>10,} pairs  ({st["windowed_blocks"]:,} windowed, '
+              f'{st["skipped_blocks"]:,} skipped blocks)')
+    print(f'  {n_pairs:,} candidate pairs generated')
+    print(f'  {time.time()-t1:.1f}s to block + classify all pairs')
     print()
 
     # Report
     print('=' * 70)
-    print(f'DRY-RUN SUMMARY ({args.state} singletons)')
+    print(f'DRY-RUN SUMMARY ({state} singletons)')
     print('=' * 70)
     print(f'Singletons pulled:       {len(records):>10,}')
-    print(f'Candidate pairs:         {len(pairs):>10,}')
-    print(f'Pairs per record:        {len(pairs)/len(records):>10.2f}')
+    print(f'Candidate pairs:         {n_pairs:>10,}')
+    print(f'Pairs per record:        {n_pairs/len(records):>10.2f}')
     print()
     print('Tier distribution:')
     for t in ['tier_series_demoted', 'tier_A_auto_merge', 'tier_B_high_conf',
               'tier_C_review', 'tier_D_different']:
         n = tier_counts.get(t, 0)
-        print(f'  {t:25s} {n:>10,}  ({100*n/len(pairs):.2f}%)')
+        print(f'  {t:25s} {n:>10,}  ({100*n/max(n_pairs, 1):.2f}%)')
     print()
     print('Hierarchy signals:')
     print(f'  H4 sibling edges:      {hierarchy_stats["H4_siblings"]:>10,}')
@@ -256,7 +246,7 @@ def main():
             print(f'  {len(members):>3d} members  | {n}')
 
     # Export tier A merge list
-    out_csv = os.path.join(DIR, f'tier_A_dry_run_{args.state}.csv')
+    out_csv = os.path.join(DIR, f'tier_A_dry_run_{state}.csv')
     with open(out_csv, 'w', encoding='utf-8', newline='') as f:
         w = csv.writer(f, quoting=csv.QUOTE_ALL)
         w.writerow(['id1', 'id2', 'rule', 'src1', 'src2', 'name1', 'name2', 'zip1', 'zip2'])
@@ -272,7 +262,7 @@ def main():
     def _write_tier_csv(tier_label, pair_list):
         if not pair_list:
             return
-        out = os.path.join(DIR, f'tier_{tier_label}_pairs_{args.state}.csv')
+        out = os.path.join(DIR, f'tier_{tier_label}_pairs_{state}.csv')
         cols = ['id1', 'id2', 'rule', 'tier', 'confidence',
                 'src1', 'src2', 'name1', 'name2',
                 'cname1', 'cname2', 'city1', 'city2', 'zip1', 'zip2',
@@ -300,16 +290,13 @@ def main():
 
     # Cap tier_D at 5K per state (full dump would be huge, and we only need
     # samples of UNRELATED for ground truth).
-    import random
-    random.seed(42)
-    tier_D_sample = random.sample(tier_D_pairs, min(5000, len(tier_D_pairs)))
     _write_tier_csv('B', tier_B_pairs)
     _write_tier_csv('C', tier_C_pairs)
     _write_tier_csv('D', tier_D_sample)
 
     # Export hierarchy edges
     if hierarchy_edges:
-        hier_csv = os.path.join(DIR, f'hierarchy_edges_{args.state}.csv')
+        hier_csv = os.path.join(DIR, f'hierarchy_edges_{state}.csv')
         cols = ['rule', 'master_id_1', 'master_id_2', 'parent_id', 'child_id',
                 'parent_candidate_name', 'confidence',
                 'name_1', 'name_2', 'src_1', 'src_2', 'zip_1', 'zip_2']
@@ -321,6 +308,72 @@ def main():
         print(f'Hierarchy edges: {hier_csv} ({len(hierarchy_edges):,} edges)')
 
     print(f'\\nTotal elapsed: {time.time()-t0:.1f}s')
+    return {
+        'state': state,
+        'records': len(records),
+        'pairs': n_pairs,
+        'tiers': dict(tier_counts),
+        'h4_siblings': hierarchy_stats['H4_siblings'],
+        'h9_subsidiary': hierarchy_stats['H9_subsidiary'],
+    }
+
+
+def _state_worker(state, limit, engine_kw):
+    """run_state in a worker process; output is captured so states don't interleave."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        summary = run_state(state, limit=limit, **engine_kw)
+    return buf.getvalue(), summary
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--state', default='NY',
+                    help='State, comma-separated states, or ALL')
+    ap.add_argument('--limit', type=int, default=None)
+    ap.add_argument('--jobs', type=int, default=None,
+                    help='States processed in parallel (default: min(states, CPUs))')
+    ap.add_argument('--max-block', type=int, default=blocking_engine.MAX_BLOCK,
+                    help='Pair blocks exhaustively up to this size')
+    ap.add_argument('--window', type=int, default=blocking_engine.WINDOW,
+                    help='Sorted-neighborhood window for larger blocks (0 = skip them)')
+    ap.add_argument('--max-window-block', type=int, default=blocking_engine.MAX_WINDOW_BLOCK,
+                    help='Skip blocks larger than this entirely')
+    ap.add_argument('--spill-dir', default=None,
+                    help='Directory for temporary pair partitions (default: system temp)')
+    args = ap.parse_args()
+
+    states = list_states() if args.state.upper() == 'ALL' else [
+        s.strip().upper() for s in args.state.split(',') if s.strip()]
+    engine_kw = {'max_block': args.max_block, 'window': args.window,
+                 'max_window_block': args.max_window_block, 'spill_dir': args.spill_dir}
+    if len(states) == 1:
+        run_state(states[0], limit=args.limit, **engine_kw)
+        return
+
+    t0 = time.time()
+    jobs = args.jobs or min(len(states), os.cpu_count() or 1)
+    print(f'{len(states)} states, {jobs} parallel jobs')
+    summaries = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_state_worker, st, args.limit, engine_kw): st for st in states}
+        for fut in as_completed(futures):
+            output, summary = fut.result()
+            print(output)
+            summaries.append(summary)
+
+    print('=' * 70)
+    print(f'NATIONAL SUMMARY ({len(summaries)} states, {time.time()-t0:.1f}s)')
+    print('=' * 70)
+    print(f'{"state":6s} {"records":>10s} {"pairs":>12s} {"tier A":>9s} {"tier B":>9s} {"tier C":>9s}')
+    totals = Counter()
+    for sm in sorted(summaries, key=lambda x: x['state']):
+        row = (sm['records'], sm['pairs'], sm['tiers'].get('tier_A_auto_merge', 0),
+               sm['tiers'].get('tier_B_high_conf', 0), sm['tiers'].get('tier_C_review', 0))
+        totals.update(dict(zip(('records', 'pairs', 'A', 'B', 'C'), row)))
+        print(f'{sm["state"]:6s} {row[0]:>10,} {row[1]:>12,} {row[2]:>9,} {row[3]:>9,} {row[4]:>9,}')
+    print(f'{"TOTAL":6s} {totals["records"]:>10,} {totals["pairs"]:>12,} '
+          f'{totals["A"]:>9,} {totals["B"]:>9,} {totals["C"]:>9,}')
 
 
 if __name__ == '__main__':
@@ -9,6 +9,11 @@ Usage:
   py scripts/llm_dedup/prep_anthropic_batch.py
   py scripts/llm_dedup/prep_anthropic_batch.py --limit 5000      # subset
   py scripts/llm_dedup/prep_anthropic_batch.py --classes ambiguous,auto_duplicate
+  py scripts/llm_dedup/prep_anthropic_batch.py --no-store                # re-judge everything
+
+Pairs already judged under the same model + PROMPT_VERSION (see
+llm_response_store.py) are not written to the batch; their stored responses go
+into the manifest and submit_anthropic_batch.py fetch merges them back in.
 """
 import argparse
 import json
@@ -17,6 +22,9 @@ import sys
 
 DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, DIR)
+sys.path.insert(0, os.path.abspath(os.path.join(DIR, '..', '..')))
+
+from llm_response_store import ResponseStore, payload_hash  # noqa: E402
 
 from dedup_judge_prompt import (
     SYSTEM_PROMPT, JUDGE_MODEL, MAX_OUTPUT_TOKENS, PROMPT_VERSION,
@@ -31,6 +39,14 @@ MANIFEST_PATH   = os.path.join(DIR, 'anthropic_batch_manifest.json')
 MAX_REQUESTS_PER_BATCH = 100_000
 MAX_BYTES_PER_BATCH    = 256 * 1024 * 1024  # 256 MB
 
+PER_PAIR_LIVE  = 0.00065   # ballpark: ~$20 for 31K pairs with caching
+PER_PAIR_BATCH = PER_PAIR_LIVE / 2
+
+
+def judge_payload_hash(messages):
+    """Response-store key for one judge request (model + version keyed separately)."""
+    return payload_hash({'messages': messages, 'max_tokens': MAX_OUTPUT_TOKENS})
+
 
 def main():
     ap = argparse.ArgumentParser()
@@ -38,6 +54,8 @@ def main():
                     help='cap total requests (for smaller pilot)')
     ap.add_argument('--classes', default='auto_duplicate,ambiguous,auto_different',
                     help='comma-separated heuristic classes to include')
+    ap.add_argument('--no-store', action='store_true',
+                    help='ignore the response store and submit every pair')
     args = ap.parse_args()
 
     keep_classes = {c.strip() for c in args.classes.split(',') if c.strip()}
@@ -56,8 +74,11 @@ def main():
         print(f'WARNING: {len(selected):,} > {MAX_REQUESTS_PER_BATCH:,} batch limit. '
               'You will need to split across multiple batches.')
 
-    # Write JSONL
+    # Write JSONL (skipping pairs the response store already answered)
+    store = None if args.no_store else ResponseStore()
     seen_ids = set()
+    digests = {}
+    cached = {}
     bytes_written = 0
     with open(BATCH_PATH, 'w', encoding='utf-8') as out:
         for p in selected:
@@ -65,6 +86,13 @@ def main():
             if cid in seen_ids:
                 continue
             seen_ids.add(cid)
+            messages = build_request_messages(p)
+            digests[cid] = judge_payload_hash(messages)
+            if store is not None:
+                hit = store.get(JUDGE_MODEL, PROMPT_VERSION, digests[cid])
+                if hit is not None:
+                    cached[cid] = hit
+                    continue
             req = {
                 'custom_id': cid,
                 'params': {
@@ -75,14 +103,18 @@ def main():
                         'text': SYSTEM_PROMPT,
                         'cache_control': {'type': 'ephemeral'},
                     }],
-                    'messages': build_request_messages(p),
+                    'messages': messages,
                 },
             }
             line = json.dumps(req, ensure_ascii=False) + '\n'
             bytes_written += len(line.encode('utf-8'))
             out.write(line)
 
-    print(f'\nWrote {len(seen_ids):,} requests -> {BATCH_PATH}')
+    n_requests = len(seen_ids) - len(cached)
+    if store is not None:
+        print(store.summary('pairs', cost_per_call=PER_PAIR_BATCH))
+        store.close()
+    print(f'\nWrote {n_requests:,} requests -> {BATCH_PATH}')
     print(f'File size: {bytes_written/1024/1024:.1f} MB '
           f'({100*bytes_written/MAX_BYTES_PER_BATCH:.1f}% of 256 MB cap)')
 
@@ -91,8 +123,10 @@ def main():
         'prompt_version': PROMPT_VERSION,
         'model': JUDGE_MODEL,
         'classes_included': sorted(keep_classes),
-        'request_count': len(seen_ids),
+        'request_count': n_requests,
+        'cached_count': len(cached),
         'bytes': bytes_written,
+        'cached': cached,  # custom_id -> stored response text
         'pair_lookup': {  # custom_id -> minimal pair info for joining results
             f'pair_{p["id1"]}_{p["id2"]}': {
                 'id1': p['id1'], 'id2': p['id2'],
@@ -102,6 +136,7 @@ def main():
                 'name2': p.get('display_name_2'),
                 'src1': p.get('source_1'),
                 'src2': p.get('source_2'),
+                'payload_hash': digests[f'pair_{p["id1"]}_{p["id2"]}'],
             }
             for p in selected
         },
@@ -111,11 +146,9 @@ def main():
     print(f'Manifest: {MANIFEST_PATH}')
 
     # Cost estimate based on calibration prior
-    PER_PAIR_LIVE  = 0.00065   # ballpark: ~$20 for 31K pairs with caching
-    PER_PAIR_BATCH = PER_PAIR_LIVE / 2
     print('\nCost estimate (rough, refine with calibration script):')
-    print(f'  Live API : ${len(seen_ids) * PER_PAIR_LIVE:.2f}')
-    print(f'  Batch API: ${len(seen_ids) * PER_PAIR_BATCH:.2f}')
+    print(f'  Live API : ${n_requests * PER_PAIR_LIVE:.2f}')
+    print(f'  Batch API: ${n_requests * PER_PAIR_BATCH:.2f}')
 
 
 if __name__ == '__main__':
@@ -10,6 +10,11 @@ Usage:
   py scripts/llm_dedup/prep_validation_batch.py
   py scripts/llm_dedup/prep_validation_batch.py --limit 500     # for calibration
   py scripts/llm_dedup/prep_validation_batch.py --limit 500 --out anthropic_batch_calibration.jsonl
+  py scripts/llm_dedup/prep_validation_batch.py --no-store      # re-judge everything
+
+Pairs already judged under the same model + PROMPT_VERSION (see
+llm_response_store.py) are left out of the batch; submit_validation_batch.py
+fetch merges their stored responses back in.
 """
 import argparse
 import json
@@ -18,6 +23,9 @@ import sys
 
 DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, DIR)
+sys.path.insert(0, os.path.abspath(os.path.join(DIR, "..", "..")))
+
+from llm_response_store import ResponseStore, payload_hash  # noqa: E402
 
 from validation_judge_prompt import (  # noqa: E402
     SYSTEM_PROMPT, JUDGE_MODEL, MAX_OUTPUT_TOKENS, PROMPT_VERSION,
@@ -33,6 +41,11 @@ MAX_REQUESTS_PER_BATCH = 100_000
 MAX_BYTES_PER_BATCH = 256 * 1024 * 1024
 
 
+def judge_payload_hash(messages):
+    """Response-store key for one judge request (model + version keyed separately)."""
+    return payload_hash({"messages": messages, "max_tokens": MAX_OUTPUT_TOKENS})
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--sample", default=SAMPLE_PATH,
@@ -41,6 +54,8 @@ def main():
                     help="Output JSONL path")
     ap.add_argument("--limit", type=int, default=None,
                     help="Cap total requests (e.g., for calibration)")
+    ap.add_argument("--no-store", action="store_true",
+                    help="Ignore the response store and submit every pair")
     args = ap.parse_args()
 
     with open(args.sample, "r", encoding="utf-8") as f:
@@ -56,6 +71,7 @@ def main():
         print(f"WARNING: {len(pairs):,} > {MAX_REQUESTS_PER_BATCH:,} batch cap; "
               "you will need to split across batches.")
 
+    store = None if args.no_store else ResponseStore()
     seen_ids = set()
     bytes_written = 0
     manifest = {
@@ -63,6 +79,7 @@ def main():
         "model": JUDGE_MODEL,
         "max_output_tokens": MAX_OUTPUT_TOKENS,
         "pair_lookup": {},
+        "cached": {},  # custom_id -> stored response text
     }
 
     with open(args.out, "w", encoding="utf-8") as out:
@@ -73,6 +90,9 @@ def main():
             if cid in seen_ids:
                 continue
             seen_ids.add(cid)
+            messages = build_request_messages(p)
+            digest = judge_payload_hash(messages)
+            hit = store.get(JUDGE_MODEL, PROMPT_VERSION, digest) if store else None
 
             req = {
                 "custom_id": cid,
@@ -84,12 +104,15 @@ def main():
                         "text": SYSTEM_PROMPT,
                         "cache_control": {"type": "ephemeral"},
                     }],
-                    "messages": build_request_messages(p),
+                    "messages": messages,
                 },
             }
-            line = json.dumps(req, ensure_ascii=False) + "\n"
-            bytes_written += len(line.encode("utf-8"))
-            out.write(line)
+            if hit is not None:
+                manifest["cached"][cid] = hit
+            else:
+                line = json.dumps(req, ensure_ascii=False) + "\n"
+                bytes_written += len(line.encode("utf-8"))
+                out.write(line)
 
             # Keep minimal pair info in manifest for joining results later
             manifest["pair_lookup"][cid] = {
@@ -107,12 +130,18 @@ def main():
                 "name2": p.get("display_name_2"),
                 "src1": p.get("source_1"),
                 "src2": p.get("source_2"),
+                "payload_hash": digest,
             }
 
-    manifest["request_count"] = len(seen_ids)
+    n = len(seen_ids) - len(manifest["cached"])
+    manifest["request_count"] = n
+    manifest["cached_count"] = len(manifest["cached"])
     manifest["bytes"] = bytes_written
 
-    print(f"\nWrote {len(seen_ids):,} requests -> {args.out}")
+    if store is not None:
+        print(store.summary("pairs"))
+        store.close()
+    print(f"\nWrote {n:,} requests -> {args.out}")
     print(f"File size: {bytes_written/1024/1024:.1f} MB "
           f"({100*bytes_written/MAX_BYTES_PER_BATCH:.1f}% of 256 MB cap)")
 
@@ -133,12 +162,11 @@ def main():
     # Assume user message averages 300 tokens, output averages 200 tokens
     user_avg = 300
     output_avg = 200
-    n = len(seen_ids)
 
     # Cache write (1 request) + cache reads (n-1)
     input_cost = (
         system_tokens * INPUT_CACHE_WRITE / 1_000_000 +
-        system_tokens * (n - 1) * INPUT_CACHE_READ / 1_000_000 +
+        system_tokens * max(n - 1, 0) * INPUT_CACHE_READ / 1_000_000 +
         user_avg * n * INPUT_BASE / 1_000_000
     ) * BATCH_DISCOUNT
 
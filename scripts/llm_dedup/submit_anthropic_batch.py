@@ -24,6 +24,7 @@ from collections import Counter
 
 DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, DIR)
+sys.path.insert(0, os.path.abspath(os.path.join(DIR, '..', '..')))
 
 try:
     from dotenv import load_dotenv
@@ -33,6 +34,8 @@ except ImportError:
 
 import anthropic
 
+from llm_response_store import ResponseStore, batch_result_entry  # noqa: E402
+
 BATCH_INPUT    = os.path.join(DIR, 'anthropic_batch_input.jsonl')
 MANIFEST_PATH  = os.path.join(DIR, 'anthropic_batch_manifest.json')
 STATE_PATH     = os.path.join(DIR, 'anthropic_batch_state.json')
@@ -65,6 +68,12 @@ def cmd_submit(args):
     n = sum(1 for _ in open(BATCH_INPUT, 'r', encoding='utf-8'))
     size_mb = os.path.getsize(BATCH_INPUT) / 1024 / 1024
     print(f'Batch input: {n:,} requests, {size_mb:.1f} MB')
+    if n == 0:
+        # Clear earlier batch ids so fetch only merges the stored responses.
+        save_state({'batch_ids': [], 'submitted_at': time.time(), 'request_count': 0})
+        print('Nothing to submit: every pair was answered from the response store.')
+        print('Next: py scripts/llm_dedup/submit_anthropic_batch.py fetch')
+        return 0
 
     if not args.yes:
         print('\nThis will submit a billable batch to Anthropic.')
@@ -211,7 +220,15 @@ def cmd_status(args):
 def cmd_fetch(args):
     state = load_state()
     batch_ids = state.get('batch_ids') or ([state['batch_id']] if state.get('batch_id') else [])
-    if not batch_ids:
+
+    # Load manifest for join keys + responses prep took from the response store
+    manifest_data = {}
+    if os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH) as f:
+            manifest_data = json.load(f)
+    manifest = manifest_data.get('pair_lookup', {})
+    cached = manifest_data.get('cached', {})
+    if not batch_ids and not cached:
         print('No batch_ids in state. Run submit first.')
         return 1
 
@@ -230,17 +247,40 @@ def cmd_fetch(args):
     verdict_counts = Counter()
     confidence_counts = Counter()
 
-    # Load manifest for join keys
-    manifest = {}
-    if os.path.exists(MANIFEST_PATH):
-        with open(MANIFEST_PATH) as f:
-            manifest = json.load(f).get('pair_lookup', {})
+    store = ResponseStore()
+    fresh = []  # (payload_hash, response text) to add to the store
 
     with open(RESULTS_JSONL, 'w', encoding='utf-8') as out_jsonl, \
          open(RESULTS_CSV, 'w', encoding='utf-8') as out_csv:
         out_csv.write('custom_id,id1,id2,classification,composite,src1,src2,'
                       'name1,name2,verdict,confidence,reason\n')
 
+        def write_verdict(custom_id, verdict_obj):
+            # v1.0 prompt returns 'verdict' + 'reason'; v2.0 returns 'label' + 'reasoning'.
+            # Accept either so this fetcher works against both prompt schemas.
+            v = verdict_obj.get('label') or verdict_obj.get('verdict', 'UNKNOWN')
+            c = verdict_obj.get('confidence', 'UNKNOWN')
+            reason_text = verdict_obj.get('reasoning') or verdict_obj.get('reason', '')
+            verdict_counts[v] += 1
+            confidence_counts[c] += 1
+
+            meta = manifest.get(custom_id, {})
+            def _csv(s):
+                if s is None:
+                    return ''
+                s = str(s).replace('"', "'").replace('\n', ' ').replace(',', ';')
+                return f'"{s}"'
+
+            out_csv.write(','.join([
+                custom_id,
+                str(meta.get('id1', '')), str(meta.get('id2', '')),
+                meta.get('classification', ''),
+                f'{meta.get("composite", 0):.4f}' if meta.get('composite') is not None else '',
+                _csv(meta.get('src1')), _csv(meta.get('src2')),
+                _csv(meta.get('name1')), _csv(meta.get('name2')),
+                v, c, _csv(reason_text),
+            ]) + '\n')
+
         all_entries = []
         for bid in batch_ids:
             for entry in client.messages.batches.results(bid):
@@ -277,35 +317,32 @@ def cmd_fetch(args):
                 parse_fail += 1
                 continue
 
-            # v1.0 prompt returns 'verdict' + 'reason'; v2.0 returns 'label' + 'reasoning'.
-            # Accept either so this fetcher works against both prompt schemas.
-            v = verdict_obj.get('label') or verdict_obj.get('verdict', 'UNKNOWN')
-            c = verdict_obj.get('confidence', 'UNKNOWN')
-            reason_text = verdict_obj.get('reasoning') or verdict_obj.get('reason', '')
-            verdict_counts[v] += 1
-            confidence_counts[c] += 1
-
             meta = manifest.get(custom_id, {})
-            def _csv(s):
-                if s is None:
-                    return ''
-                s = str(s).replace('"', "'").replace('\n', ' ').replace(',', ';')
-                return f'"{s}"'
+            if meta.get('payload_hash'):
+                fresh.append((meta['payload_hash'], text))
+            write_verdict(custom_id, verdict_obj)
 
-            out_csv.write(','.join([
-                custom_id,
-                str(meta.get('id1', '')), str(meta.get('id2', '')),
-                meta.get('classification', ''),
-                f'{meta.get("composite", 0):.4f}' if meta.get('composite') is not None else '',
-                _csv(meta.get('src1')), _csv(meta.get('src2')),
-                _csv(meta.get('name1')), _csv(meta.get('name2')),
-                v, c, _csv(reason_text),
-            ]) + '\n')
+        # Pairs prep answered from the response store
+        for custom_id, text in cached.items():
+            n += 1
+            entry = batch_result_entry(custom_id, text, manifest_data.get('model'))
+            out_jsonl.write(json.dumps(entry) + '\n')
+            try:
+                verdict_obj = json.loads(text)
+            except Exception:
+                parse_fail += 1
+                continue
+            write_verdict(custom_id, verdict_obj)
 
     print(f'\nFetched {n:,} entries')
     print(f'  succeeded: {succeeded:,}')
     print(f'  errored:   {errored:,}')
     print(f'  parse_fail (succeeded but bad JSON): {parse_fail:,}')
+    print(f'  from response store: {len(cached):,}')
+    if fresh:
+        store.put_many(manifest_data.get('model'), manifest_data.get('prompt_version'), fresh)
+        print(f'  stored {len(fresh):,} new responses (next prep skips them)')
+    store.close()
     print('\nVerdict distribution:')
     for k, v in verdict_counts.most_common():
         print(f'  {k:12s} {v:>6,}')
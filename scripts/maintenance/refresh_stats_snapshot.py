@@ -0,0 +1,51 @@
+"""
+Recompute the dashboard stats snapshot (platform_stats_snapshot).
+
+The summary / stats / data-coverage endpoints read precomputed metrics
+(api/services/stats_snapshot.py). refresh_all.py and etl_log.log_etl_run()
+refresh them automatically; run this after loads that bypass both.
+
+Usage:
+    py scripts/maintenance/refresh_stats_snapshot.py                      # every metric
+    py scripts/maintenance/refresh_stats_snapshot.py --tables nlrb_elections
+    py scripts/maintenance/refresh_stats_snapshot.py --metrics summary data_coverage
+    py scripts/maintenance/refresh_stats_snapshot.py --list
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from db_config import get_connection
+from api.services.stats_snapshot import METRICS, metrics_for_tables, refresh_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute the dashboard stats snapshot")
+    parser.add_argument('--metrics', nargs='+', choices=sorted(METRICS),
+                        help='Metrics to recompute (default: all)')
+    parser.add_argument('--tables', nargs='+', metavar='TABLE',
+                        help='Recompute the metrics that read these tables')
+    parser.add_argument('--list', action='store_true', help='List metrics and their input tables')
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, inputs) in METRICS.items():
+            print(f"  {name:<16s} {', '.join(inputs)}")
+        return
+
+    metrics = args.metrics or metrics_for_tables(args.tables)
+    conn = get_connection()
+    try:
+        done = refresh_snapshot(conn, metrics)
+    finally:
+        conn.close()
+    for name in metrics:
+        status = f"{done[name]} ms" if name in done else "FAILED (previous value kept)"
+        print(f"  {name:<16s} {status}")
+    if len(done) < len(metrics):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
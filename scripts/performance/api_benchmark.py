@@ -0,0 +1,397 @@
+"""API latency benchmark with JSON baselines and a regression gate.
+
+Drives the real FastAPI app through a weighted mix of the heavy read
+endpoints and reports, per scenario:
+
+  p50 / p95 / p99 latency (ms)
+  queries per request (mean / max, from the Server-Timing header that
+  api/middleware/pipeline.py adds -- see api/query_stats.py)
+  error count (non-2xx)
+
+Scenarios (weight):
+  unified_search    /api/employers/unified-search?name=..&state=..     (5)
+  employer_profile  /api/profile/employers/{f7 id}                     (4)
+  target_scorecard  /api/targets/scorecard?state=..                    (3)
+  organizing_scorecard /api/organizing/scorecard?state=..              (2)
+  cba_search        /api/cba/provisions/search, /api/cba/articles/search (2)
+  density           /api/density/by-state, /api/density/by-county/{fips} (2)
+  director_network  /api/employers/master/{id}/director-network        (1)
+
+Parameters (employer ids, master ids with interlocks, states, county FIPS,
+search names) are sampled from the database pointed at by db_config
+(DB_NAME etc.; use a seeded local copy, not production). --seed fixes both
+the fixture sample and the request order, so two runs against the same
+database issue the same requests.
+
+Modes (same as scripts/maintenance/audit_union_layer2.py):
+  --mode asgi   default; in-process TestClient, no uvicorn needed
+  --mode http   live API on --base-url
+
+Baselines:
+  --save-baseline   write the results to --baseline
+  otherwise, if --baseline exists, compare against it and exit 1 when a
+  scenario's p95 grows by more than --tolerance (and more than --min-delta-ms),
+  or its mean queries per request grows by more than --tolerance.
+
+Usage:
+  py scripts/performance/api_benchmark.py --requests 500 --save-baseline
+  py scripts/performance/api_benchmark.py --requests 500
+  py scripts/performance/api_benchmark.py --scenarios unified_search,density --tolerance 0.3
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from db_config import get_connection
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "api_benchmark.json"
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_MS = 5.0
+FIXTURE_SIZE = 25
+
+SEARCH_NAMES = ["hospital", "kaiser", "amazon", "school", "transit", "hotel",
+                "university", "walmart", "nursing", "construction"]
+CBA_TERMS = ["sick leave", "overtime", "seniority", "grievance", "health insurance",
+             "holiday", "layoff", "wage increase"]
+
+_QUERIES_RE = re.compile(r'desc="(\d+) quer')
+
+
+# ============================================================
+# Clients (asgi / http)
+# ============================================================
+
+class ASGIClient:
+    def __init__(self):
+        os.environ.setdefault("DISABLE_AUTH", "true")
+        # Must be set before importing api.main (read into a module constant).
+        os.environ["RATE_LIMIT_REQUESTS"] = "0"
+        from fastapi.testclient import TestClient
+        from api.main import app
+        self.client = TestClient(app)
+
+    def get(self, path: str) -> tuple[int, dict]:
+        r = self.client.get(path)
+        return r.status_code, r.headers
+
+
+class HTTPClient:
+    def __init__(self, base_url: str):
+        import requests
+        self.session = requests.Session()
+        self.base_url = base_url.rstrip("/")
+
+    def get(self, path: str) -> tuple[int, dict]:
+        try:
+            r = self.session.get(f"{self.base_url}{path}", timeout=60)
+            return r.status_code, r.headers
+        except Exception:
+            return 0, {}
+
+
+def get_client(mode: str, base_url: str):
+    if mode == "asgi":
+        return ASGIClient()
+    if mode == "http":
+        return HTTPClient(base_url)
+    raise ValueError(f"unknown mode: {mode}")
+
+
+# ============================================================
+# Fixture sampling
+# ============================================================
+
+FIXTURE_SQL = {
+    "f7_ids": """
+        SELECT employer_id::text FROM f7_employers_deduped
+        WHERE latest_unit_size IS NOT NULL
+        ORDER BY latest_unit_size DESC LIMIT %s
+    """,
+    "director_master_ids": """
+        SELECT master_id_a FROM director_interlocks
+        GROUP BY master_id_a ORDER BY COUNT(*) DESC LIMIT %s
+    """,
+    "states": """
+        SELECT state FROM f7_employers_deduped
+        WHERE state IS NOT NULL
+        GROUP BY state ORDER BY COUNT(*) DESC LIMIT %s
+    """,
+    "county_fips": """
+        SELECT fips FROM county_union_density_estimates
+        WHERE fips IS NOT NULL
+        ORDER BY estimated_total_density DESC NULLS LAST LIMIT %s
+    """,
+}
+
+
+def select_fixture(cur, seed: int, size: int = FIXTURE_SIZE) -> dict[str, list]:
+    """Sample endpoint parameters from the database, deterministically per seed.
+
+    Each query takes a stable candidate pool (4x size); the seed picks from it.
+    A missing table leaves that list empty and its scenarios are skipped.
+    """
+    rng = random.Random(seed)
+    fixture: dict[str, list] = {}
+    for key, sql in FIXTURE_SQL.items():
+        try:
+            cur.execute(sql, [size * 4])
+            pool = [r[0] for r in cur.fetchall()]
+        except Exception as exc:
+            cur.connection.rollback()
+            print(f"  fixture {key}: unavailable ({exc.__class__.__name__})")
+            pool = []
+        fixture[key] = rng.sample(pool, min(size, len(pool)))
+    return fixture
+
+
+# ============================================================
+# Scenarios
+# ============================================================
+
+def _path(base: str, **params) -> str:
+    params = {k: v for k, v in params.items() if v is not None}
+    return f"{base}?{urlencode(params)}" if params else base
+
+
+def _unified_search(fx, rng):
+    state = rng.choice(fx["states"]) if fx["states"] and rng.random() < 0.5 else None
+    return _path("/api/employers/unified-search", name=rng.choice(SEARCH_NAMES), state=state)
+
+
+def _employer_profile(fx, rng):
+    return f"/api/profile/employers/{rng.choice(fx['f7_ids'])}"
+
+
+def _target_scorecard(fx, rng):
+    return _path("/api/targets/scorecard", state=rng.choice(fx["states"]), limit=50)
+
+
+def _organizing_scorecard(fx, rng):
+    return _path("/api/organizing/scorecard", state=rng.choice(fx["states"]), limit=100)
+
+
+def _cba_search(fx, rng):
+    base = rng.choice(["/api/cba/provisions/search", "/api/cba/articles/search"])
+    return _path(base, q=rng.choice(CBA_TERMS), limit=25)
+
+
+def _density(fx, rng):
+    if fx["county_fips"] and rng.random() < 0.5:
+        return f"/api/density/by-county/{rng.choice(fx['county_fips'])}"
+    return "/api/density/by-state"
+
+
+def _director_network(fx, rng):
+    return f"/api/employers/master/{rng.choice(fx['director_master_ids'])}/director-network"
+
+
+# name -> (weight, fixture lists it needs, path builder)
+SCENARIOS: dict[str, tuple[int, tuple[str, ...], Callable]] = {
+    "unified_search": (5, (), _unified_search),
+    "employer_profile": (4, ("f7_ids",), _employer_profile),
+    "target_scorecard": (3, ("states",), _target_scorecard),
+    "organizing_scorecard": (2, ("states",), _organizing_scorecard),
+    "cba_search": (2, (), _cba_search),
+    "density": (2, (), _density),
+    "director_network": (1, ("director_master_ids",), _director_network),
+}
+
+
+def build_plan(fixture: dict[str, list], names: list[str], n_requests: int,
+               seed: int) -> list[tuple[str, str]]:
+    """Weighted, seeded list of (scenario, path) to issue."""
+    rng = random.Random(seed)
+    usable = [n for n in names if all(fixture.get(k) for k in SCENARIOS[n][1])]
+    skipped = sorted(set(names) - set(usable))
+    if skipped:
+        print(f"  skipping scenarios without fixture data: {', '.join(skipped)}")
+    if not usable:
+        return []
+    weights = [SCENARIOS[n][0] for n in usable]
+    plan = []
+    for _ in range(n_requests):
+        name = rng.choices(usable, weights)[0]
+        plan.append((name, SCENARIOS[name][2](fixture, rng)))
+    return plan
+
+
+# ============================================================
+# Measurement
+# ============================================================
+
+def parse_query_count(server_timing: str | None) -> int | None:
+    """Queries-per-request from the Server-Timing header."""
+    if not server_timing:
+        return None
+    m = _QUERIES_RE.search(server_timing)
+    return int(m.group(1)) if m else None
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, int(-(-pct * len(ordered) // 100)))
+    return ordered[rank - 1]
+
+
+def run_plan(client, plan: list[tuple[str, str]]) -> list[dict]:
+    samples = []
+    for name, path in plan:
+        t0 = time.perf_counter()
+        status, headers = client.get(path)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        samples.append({
+            "scenario": name,
+            "path": path,
+            "status": status,
+            "ms": elapsed_ms,
+            "queries": parse_query_count(headers.get("server-timing")),
+        })
+    return samples
+
+
+def summarize(samples: list[dict]) -> dict[str, dict]:
+    by_scenario: dict[str, list[dict]] = {}
+    for s in samples:
+        by_scenario.setdefault(s["scenario"], []).append(s)
+    out = {}
+    for name, rows in sorted(by_scenario.items()):
+        ms = [r["ms"] for r in rows]
+        queries = [r["queries"] for r in rows if r["queries"] is not None]
+        out[name] = {
+            "requests": len(rows),
+            "errors": sum(1 for r in rows if not 200 <= r["status"] < 300),
+            "p50_ms": round(percentile(ms, 50), 1),
+            "p95_ms": round(percentile(ms, 95), 1),
+            "p99_ms": round(percentile(ms, 99), 1),
+            "mean_queries": round(sum(queries) / len(queries), 2) if queries else None,
+            "max_queries": max(queries) if queries else None,
+        }
+    return out
+
+
+def compare(current: dict[str, dict], baseline: dict[str, dict], tolerance: float,
+            min_delta_ms: float) -> list[str]:
+    """Regression messages for scenarios worse than the baseline."""
+    problems = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        limit = base["p95_ms"] * (1 + tolerance)
+        if cur["p95_ms"] > limit and cur["p95_ms"] - base["p95_ms"] > min_delta_ms:
+            problems.append(f"{name}: p95 {cur['p95_ms']:.1f}ms > baseline "
+                            f"{base['p95_ms']:.1f}ms +{tolerance:.0%}")
+        if cur["mean_queries"] is not None and base.get("mean_queries") is not None:
+            if cur["mean_queries"] > base["mean_queries"] * (1 + tolerance):
+                problems.append(f"{name}: {cur['mean_queries']} queries/request > baseline "
+                                f"{base['mean_queries']} +{tolerance:.0%}")
+        if cur["errors"] > base.get("errors", 0):
+            problems.append(f"{name}: {cur['errors']} errors (baseline {base.get('errors', 0)})")
+    return problems
+
+
+def print_table(summary: dict[str, dict]) -> None:
+    print(f"\n{'scenario':<22s} {'n':>5s} {'err':>4s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'q/req':>6s} {'qmax':>5s}")
+    for name, s in summary.items():
+        mq = "-" if s["mean_queries"] is None else f"{s['mean_queries']:.1f}"
+        xq = "-" if s["max_queries"] is None else str(s["max_queries"])
+        print(f"{name:<22s} {s['requests']:>5d} {s['errors']:>4d} {s['p50_ms']:>8.1f} "
+              f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {mq:>6s} {xq:>5s}")
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mode", choices=["asgi", "http"], default="asgi")
+    ap.add_argument("--base-url", default="http://localhost:8001")
+    ap.add_argument("--requests", type=int, default=300, help="Measured requests (default 300)")
+    ap.add_argument("--warmup", type=int, default=30, help="Unmeasured requests first (default 30)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS),
+                    help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help="Allowed relative growth in p95 and queries/request (default 0.25)")
+    ap.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                    help="Ignore p95 growth smaller than this (default 5ms)")
+    ap.add_argument("--output", type=Path, default=None, help="Also write this run's JSON here")
+    args = ap.parse_args()
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        ap.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # Per-request INFO lines would dominate the run's own timing.
+    logging.getLogger("labor_api").setLevel(logging.WARNING)
+
+    print(f"Mode: {args.mode}  seed: {args.seed}  requests: {args.requests} (+{args.warmup} warmup)")
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            fixture = select_fixture(cur, args.seed)
+    plan = build_plan(fixture, names, args.warmup + args.requests, args.seed)
+    if not plan:
+        print("ERROR: no runnable scenarios")
+        return 2
+
+    client = get_client(args.mode, args.base_url)
+    run_plan(client, plan[:args.warmup])
+    started = time.perf_counter()
+    samples = run_plan(client, plan[args.warmup:])
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(samples)
+    print_table(summary)
+    print(f"\n{len(samples)} requests in {elapsed:.1f}s")
+
+    result = {
+        "ran_at": dt.datetime.now().isoformat(timespec="seconds"),
+        "mode": args.mode,
+        "seed": args.seed,
+        "requests": len(samples),
+        "scenarios": summary,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"Baseline written: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    problems = compare(summary, baseline["scenarios"], args.tolerance, args.min_delta_ms)
+    if problems:
+        print(f"\nREGRESSIONS vs {args.baseline.name} ({baseline.get('ran_at')}):")
+        for p in problems:
+            print(f"  {p}")
+        return 1
+    print(f"\nNo regressions vs {args.baseline.name} ({baseline.get('ran_at')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Requests/second of the request middleware: BaseHTTPMiddleware stack vs pure ASGI.
+
+Builds two copies of a small app, one per middleware setup, and drives each
+in-process over httpx.ASGITransport (no sockets, no database):
+
+  legacy  three BaseHTTPMiddleware layers (logging -> rate limit -> auth),
+          doing the same work as the pre-fusion api/middleware classes
+  fused   api.middleware.pipeline.RequestPipelineMiddleware
+
+Routes:
+  /ping    trivial JSON
+  /stream  StreamingResponse of --chunks small CSV lines (like the exports)
+
+Auth is enabled with a throwaway secret and every request carries the same
+bearer token, so the fused run also shows the verified-token cache. The rate
+limit is set high enough never to trigger. Request logging is raised to
+WARNING so stderr I/O does not dominate.
+
+Usage:
+  py scripts/performance/middleware_benchmark.py
+  py scripts/performance/middleware_benchmark.py --requests 3000 --concurrency 32
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import httpx
+import jwt
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from api import query_stats
+from api.middleware import auth, rate_limit
+from api.middleware.logging import log_request
+from api.middleware.pipeline import RequestPipelineMiddleware, client_ip
+
+SECRET = "middleware-benchmark-secret-0123456789"
+
+
+# ============================================================
+# Pre-fusion stack (for comparison only)
+# ============================================================
+
+class _LegacyAuth(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        header = request.headers.get("Authorization", "")
+        try:
+            payload = jwt.decode(header[7:], auth.JWT_SECRET, algorithms=[auth.JWT_ALGORITHM])
+            request.state.user = payload.get("sub")
+            request.state.role = payload.get("role")
+        except Exception:
+            return JSONResponse(status_code=401, content={"detail": "Invalid or expired token"})
+        return await call_next(request)
+
+
+class _LegacyRateLimit(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        rejection = rate_limit.check(request.method, request.url.path,
+                                     client_ip(request.scope, request.headers))
+        return rejection or await call_next(request)
+
+
+class _LegacyLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start = time.perf_counter()
+        stats, token = query_stats.start_request(request.url.path)
+        try:
+            response = await call_next(request)
+        finally:
+            query_stats.end_request(token)
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        response.headers["Server-Timing"] = stats.server_timing(duration_ms)
+        log_request(request.method, request.url.path, response.status_code, duration_ms,
+                    stats.log_fields(), client_ip(request.scope, request.headers))
+        return response
+
+
+def build_app(stack: str, chunks: int) -> FastAPI:
+    app = FastAPI()
+    if stack == "legacy":
+        app.add_middleware(_LegacyAuth)
+        app.add_middleware(_LegacyRateLimit)
+        app.add_middleware(_LegacyLogging)
+    else:
+        app.add_middleware(RequestPipelineMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        rows = (f"{i},employer {i},NY,{i * 7}\n" for i in range(chunks))
+        return StreamingResponse(rows, media_type="text/csv")
+
+    return app
+
+
+# ============================================================
+# Driver
+# ============================================================
+
+async def measure(app: FastAPI, path: str, n_requests: int, concurrency: int,
+                  headers: dict) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(50, n_requests)):
+            await client.get(path, headers=headers)
+        remaining = n_requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                r = await client.get(path, headers=headers)
+                if r.status_code != 200:
+                    raise RuntimeError(f"{path}: HTTP {r.status_code}")
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return n_requests / (time.perf_counter() - t0)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--chunks", type=int, default=200, help="Lines per /stream response")
+    args = ap.parse_args()
+
+    logging.getLogger("labor_api").setLevel(logging.WARNING)
+    auth.JWT_SECRET = SECRET
+    rate_limit.RATE_LIMIT_REQUESTS = 10 ** 9
+    now = int(time.time())
+    token = jwt.encode({"sub": "bench", "role": "read", "iat": now, "exp": now + 3600},
+                       SECRET, algorithm=auth.JWT_ALGORITHM)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print(f"{args.requests} requests/route, concurrency {args.concurrency}, "
+          f"{args.chunks} lines per stream\n")
+    print(f"{'route':<8s} {'legacy rps':>11s} {'fused rps':>10s} {'speedup':>8s}")
+    for path in ("/ping", "/stream"):
+        rps = {}
+        for stack in ("legacy", "fused"):
+            app = build_app(stack, args.chunks)
+            rps[stack] = asyncio.run(measure(app, path, args.requests, args.concurrency, headers))
+        print(f"{path:<8s} {rps['legacy']:>11.0f} {rps['fused']:>10.0f} "
+              f"{rps['fused'] / rps['legacy']:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
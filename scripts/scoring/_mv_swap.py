@@ -0,0 +1,252 @@
+"""
+Build-then-swap helpers for materialized views the API reads.
+
+DROP + CREATE leaves the MV missing for the whole build (the API 503s) and
+a plain REFRESH holds an ACCESS EXCLUSIVE lock while it runs. Instead:
+
+  1. build the new MV under a shadow name (<mv>__new) with its indexes,
+  2. ANALYZE it,
+  3. in one short transaction rename live -> <mv>__old_<ts> and
+     shadow -> live (index names follow), then run any post-swap DDL
+     (e.g. recreate wrapper views against the new relation),
+  4. drop retired copies that nothing depends on any more.
+
+Readers only ever wait for step 3, which is a catalog update. A retired
+copy that another MV still reads (mv_employer_search reads
+mv_unified_scorecard) is kept until that dependent is rebuilt; the
+dependent keeps serving the previous data in the meantime.
+
+Usage:
+    from scripts.scoring._mv_swap import swap_build, refresh_concurrently
+
+    swap_build(conn, 'mv_unified_scorecard', MV_SQL, INDEX_SQL)
+    refresh_concurrently(conn, 'mv_unified_scorecard')
+"""
+import re
+import time
+
+SHADOW_SUFFIX = "__new"
+RETIRED_MARK = "__old_"
+SWAP_LOCK_TIMEOUT = "5s"
+SWAP_ATTEMPTS = 5
+
+_PG_NAME_MAX = 63
+
+
+def shadow_name(name):
+    return name + SHADOW_SUFFIX
+
+
+def _shadow_mv_sql(name, mv_sql):
+    pattern = re.compile(
+        r"(CREATE\s+MATERIALIZED\s+VIEW\s+(?:IF\s+NOT\s+EXISTS\s+)?)" + re.escape(name) + r"\b",
+        re.IGNORECASE,
+    )
+    sql, n = pattern.subn(r"\g<1>" + shadow_name(name), mv_sql, count=1)
+    if n != 1:
+        raise ValueError(f"MV SQL does not create {name}")
+    return sql
+
+
+def _shadow_index_sql(name, stmt):
+    """Retarget one CREATE INDEX statement at the shadow MV.
+
+    Returns (sql, final_index_name); the index is created as <idx>__new.
+    """
+    m = re.match(
+        r"\s*(CREATE\s+(?:UNIQUE\s+)?INDEX\s+)(?:IF\s+NOT\s+EXISTS\s+)?(\w+)(\s+ON\s+)"
+        + re.escape(name) + r"\b",
+        stmt, re.IGNORECASE,
+    )
+    if not m:
+        raise ValueError(f"Cannot retarget index statement for {name}: {stmt.strip()[:80]}")
+    idx = m.group(2)
+    sql = (m.group(1) + idx + SHADOW_SUFFIX + m.group(3) + shadow_name(name)
+           + stmt[m.end():])
+    return sql, idx
+
+
+def _retired_name(name, stamp):
+    suffix = f"{RETIRED_MARK}{stamp}"
+    return name[:_PG_NAME_MAX - len(suffix)] + suffix
+
+
+def _set_autocommit(conn, value):
+    """Switch autocommit, first committing any open transaction.
+
+    psycopg2 refuses to change autocommit inside a transaction, and callers
+    usually have one open (pipeline_lock's SELECT, pre-build checks).
+    """
+    if conn.autocommit != value:
+        if not conn.autocommit:
+            conn.commit()
+        conn.autocommit = value
+
+
+def _mv_exists(cur, name):
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    return cur.fetchone()[0]
+
+
+def _index_names(cur, relname):
+    cur.execute(
+        """
+        SELECT i.relname
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = to_regclass(%s)
+        """,
+        [relname],
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+def has_unique_index(cur, name):
+    """True when REFRESH ... CONCURRENTLY is possible (valid, non-partial unique index)."""
+    cur.execute(
+        """
+        SELECT EXISTS (
+            SELECT 1 FROM pg_index
+            WHERE indrelid = to_regclass(%s)
+              AND indisunique AND indisvalid AND indpred IS NULL
+        )
+        """,
+        [name],
+    )
+    return cur.fetchone()[0]
+
+
+def build_shadow(conn, name, mv_sql, index_sql):
+    """Create <name>__new with its indexes; returns the final index names."""
+    shadow = shadow_name(name)
+    prev_autocommit = conn.autocommit
+    _set_autocommit(conn, False)
+    cur = conn.cursor()
+    try:
+        cur.execute(f"DROP MATERIALIZED VIEW IF EXISTS {shadow} CASCADE")
+        conn.commit()
+
+        print(f"Building shadow {shadow}...")
+        t0 = time.time()
+        cur.execute(_shadow_mv_sql(name, mv_sql))
+        conn.commit()
+        print(f"  Built in {time.time() - t0:.1f}s")
+
+        print("Creating indexes on shadow...")
+        final_names = []
+        for stmt in index_sql:
+            sql, idx = _shadow_index_sql(name, stmt)
+            cur.execute(f"DROP INDEX IF EXISTS {idx}{SHADOW_SUFFIX}")
+            cur.execute(sql)
+            final_names.append(idx)
+        conn.commit()
+        cur.execute(f"ANALYZE {shadow}")
+        conn.commit()
+        print("  Done.")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _set_autocommit(conn, prev_autocommit)
+    return final_names
+
+
+def swap_in(conn, name, index_names, post_swap_sql=()):
+    """Atomically replace the live MV with its shadow.
+
+    Retries on lock_timeout so a long-running reader of the old MV delays
+    the swap instead of queueing every new reader behind it.
+    """
+    shadow = shadow_name(name)
+    prev_autocommit = conn.autocommit
+    _set_autocommit(conn, False)
+    cur = conn.cursor()
+    try:
+        for attempt in range(1, SWAP_ATTEMPTS + 1):
+            stamp = int(time.time())
+            try:
+                cur.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+                if _mv_exists(cur, name):
+                    retired = _retired_name(name, stamp)
+                    for idx in _index_names(cur, name):
+                        cur.execute(
+                            f"ALTER INDEX {idx} RENAME TO {_retired_name(idx, stamp)}"
+                        )
+                    cur.execute(f"ALTER MATERIALIZED VIEW {name} RENAME TO {retired}")
+                cur.execute(f"ALTER MATERIALIZED VIEW {shadow} RENAME TO {name}")
+                for idx in index_names:
+                    cur.execute(f"ALTER INDEX {idx}{SHADOW_SUFFIX} RENAME TO {idx}")
+                for stmt in post_swap_sql:
+                    cur.execute(stmt)
+                conn.commit()
+                print(f"  Swapped {shadow} -> {name}")
+                break
+            except Exception as exc:
+                conn.rollback()
+                if getattr(exc, "pgcode", None) != "55P03" or attempt == SWAP_ATTEMPTS:
+                    raise
+                print(f"  Swap waiting on readers of {name} (attempt {attempt}/{SWAP_ATTEMPTS})...")
+                time.sleep(2 * attempt)
+        drop_retired(conn)
+    finally:
+        _set_autocommit(conn, prev_autocommit)
+
+
+def drop_retired(conn):
+    """Drop retired MV copies that no other object depends on.
+
+    Repeats until a pass drops nothing, so a copy whose only dependent is
+    another retired copy (unified <- search) goes once that one is gone.
+    """
+    prev_autocommit = conn.autocommit
+    _set_autocommit(conn, True)
+    cur = conn.cursor()
+    try:
+        dropped = True
+        while dropped:
+            dropped = False
+            cur.execute(
+                "SELECT matviewname FROM pg_matviews WHERE schemaname = 'public' "
+                "AND position(%s in matviewname) > 0",
+                [RETIRED_MARK],
+            )
+            kept = []
+            for (retired,) in cur.fetchall():
+                try:
+                    cur.execute(f"DROP MATERIALIZED VIEW {retired}")
+                    print(f"  Dropped retired {retired}")
+                    dropped = True
+                except Exception as exc:
+                    if getattr(exc, "pgcode", None) != "2BP01":  # dependent_objects_still_exist
+                        raise
+                    kept.append(retired)
+        for retired in kept:
+            print(f"  Keeping {retired} until its dependents are rebuilt")
+    finally:
+        _set_autocommit(conn, prev_autocommit)
+
+
+def swap_build(conn, name, mv_sql, index_sql, post_swap_sql=()):
+    """Build <name> under a shadow name and swap it in."""
+    index_names = build_shadow(conn, name, mv_sql, index_sql)
+    swap_in(conn, name, index_names, post_swap_sql)
+
+
+def refresh_concurrently(conn, name):
+    """REFRESH MATERIALIZED VIEW CONCURRENTLY (readers are never blocked)."""
+    prev_autocommit = conn.autocommit
+    # REFRESH CONCURRENTLY cannot run inside a transaction block
+    _set_autocommit(conn, True)
+    cur = conn.cursor()
+    try:
+        if not has_unique_index(cur, name):
+            raise RuntimeError(
+                f"{name} has no valid unique index; REFRESH CONCURRENTLY is not possible. "
+                f"Rebuild it (build-then-swap) first."
+            )
+        print(f"Refreshing {name} CONCURRENTLY...")
+        t0 = time.time()
+        cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}")
+        print(f"  Refreshed in {time.time() - t0:.1f}s")
+    finally:
+        _set_autocommit(conn, prev_autocommit)
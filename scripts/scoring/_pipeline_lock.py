@@ -25,6 +25,7 @@ LOCK_IDS = {
     'scorecard_mv': 800007,
     'employer_groups': 800008,
     'nlrb_patterns': 800009,
+    'family_index': 800010,
 }
 
 
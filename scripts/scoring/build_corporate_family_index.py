@@ -0,0 +1,209 @@
+"""
+Build corporate_family_members, the name index behind the family rollups.
+
+/api/employers/master/{id}/family-rollup and /api/employers/f7/{id}/family-rollup
+(api/services/corporate_family_rollup.py) find a family's rows with
+`ILIKE ANY('%stem%')` over master_employers, nlrb_participants,
+osha_establishments, whd_cases and f7_employers_deduped -- without an index,
+a sequential scan of each wide table per request. This script copies every
+source name into one narrow table, one row per (source, member_key,
+member_name), with a pg_trgm GIN index on member_name:
+
+    source   member_key                 member_name(s)
+    master   master_id                  display_name
+    nlrb     participant_name           participant_name
+    osha     establishment_id           estab_name
+    whd      id                         legal_name, trade_name
+    f7       employer_id                name_standard
+    parent   ultimate_parent_name       entity_name (corporate_ultimate_parents,
+                                        for the secondary-stem expansion)
+
+The rollup runs the same `member_name ILIKE ANY('%stem%')` against it, so a
+family has exactly the members the scans found (a name only has to contain
+the stem), answered from the trigram index.
+
+The table is built under a shadow name and swapped in, so the API keeps
+reading the previous build until the new one is complete.
+
+Run:     py scripts/scoring/build_corporate_family_index.py
+Stats:   py scripts/scoring/build_corporate_family_index.py --stats
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from psycopg2.extras import execute_values
+
+from db_config import get_connection
+from api.services.corporate_family_rollup import FAMILY_INDEX_TABLE
+from scripts.scoring._mv_swap import SWAP_ATTEMPTS, SWAP_LOCK_TIMEOUT
+from scripts.scoring._pipeline_lock import pipeline_lock
+
+SHADOW = FAMILY_INDEX_TABLE + "__new"
+RETIRED = FAMILY_INDEX_TABLE + "__old"
+FETCH_SIZE = 20000
+PAGE_SIZE = 5000
+NAME_INDEX = "_name_trgm"
+
+# source -> query returning (member_key, name, [name, ...])
+SOURCES = {
+    "master": """
+        SELECT master_id::text, display_name FROM master_employers
+        WHERE display_name IS NOT NULL
+    """,
+    "nlrb": """
+        SELECT DISTINCT participant_name, participant_name FROM nlrb_participants
+        WHERE participant_name IS NOT NULL
+    """,
+    "osha": """
+        SELECT establishment_id::text, estab_name FROM osha_establishments
+        WHERE estab_name IS NOT NULL
+    """,
+    "whd": """
+        SELECT id::text, legal_name, trade_name FROM whd_cases
+        WHERE legal_name IS NOT NULL OR trade_name IS NOT NULL
+    """,
+    "f7": """
+        SELECT employer_id::text, name_standard FROM f7_employers_deduped
+        WHERE name_standard IS NOT NULL
+    """,
+    "parent": """
+        SELECT DISTINCT ultimate_parent_name, entity_name FROM corporate_ultimate_parents
+        WHERE ultimate_parent_name IS NOT NULL AND entity_name IS NOT NULL
+          AND ultimate_parent_name != entity_name
+    """,
+}
+
+TABLE_SQL = f"""
+CREATE TABLE {SHADOW} (
+    source       TEXT NOT NULL,
+    member_key   TEXT NOT NULL,
+    member_name  TEXT NOT NULL
+)
+"""
+
+# Serves `member_name ILIKE ANY('%stem%')`; the source filter is applied to
+# the bitmap heap rows.
+INDEX_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX {SHADOW}{NAME_INDEX} ON {SHADOW} USING gin (member_name gin_trgm_ops)",
+]
+
+
+def member_rows(source, rows):
+    """(source, member_key, member_name) for each distinct non-blank name of each row."""
+    for key, *names in rows:
+        for name in {n for n in names if n and n.strip()}:
+            yield (source, key, name)
+
+
+def _load_source(conn, source, sql):
+    read = conn.cursor(name=f"family_{source}")
+    read.itersize = FETCH_SIZE
+    read.execute(sql)
+    write = conn.cursor()
+    total = 0
+    t0 = time.time()
+    while True:
+        rows = read.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        batch = list(member_rows(source, rows))
+        if batch:
+            execute_values(write, f"INSERT INTO {SHADOW} VALUES %s", batch, page_size=PAGE_SIZE)
+        total += len(batch)
+    read.close()
+    print(f"  {source:<7s} {total:>10,d} members in {time.time() - t0:.1f}s")
+    return total
+
+
+def build_shadow(conn, sources=SOURCES):
+    cur = conn.cursor()
+    cur.execute(f"DROP TABLE IF EXISTS {SHADOW}")
+    cur.execute(TABLE_SQL)
+    conn.commit()
+
+    print(f"Building {SHADOW}...")
+    for source, sql in sources.items():
+        _load_source(conn, source, sql)
+    conn.commit()
+
+    print("Creating indexes...")
+    for sql in INDEX_SQL:
+        cur.execute(sql)
+    conn.commit()
+    cur.execute(f"ANALYZE {SHADOW}")
+    conn.commit()
+
+
+def swap_in(conn):
+    """Replace the live table with the shadow in one short transaction.
+
+    Retries on lock_timeout, like _mv_swap.swap_in, so a long-running reader
+    of the live table delays the swap instead of failing the build.
+    """
+    cur = conn.cursor()
+    for attempt in range(1, SWAP_ATTEMPTS + 1):
+        try:
+            cur.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+            cur.execute(f"DROP TABLE IF EXISTS {RETIRED}")
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", [FAMILY_INDEX_TABLE])
+            if cur.fetchone()[0]:
+                cur.execute(f"ALTER TABLE {FAMILY_INDEX_TABLE} RENAME TO {RETIRED}")
+                cur.execute(f"ALTER INDEX IF EXISTS {FAMILY_INDEX_TABLE}{NAME_INDEX} "
+                            f"RENAME TO {RETIRED}{NAME_INDEX}")
+            cur.execute(f"ALTER TABLE {SHADOW} RENAME TO {FAMILY_INDEX_TABLE}")
+            cur.execute(f"ALTER INDEX {SHADOW}{NAME_INDEX} RENAME TO {FAMILY_INDEX_TABLE}{NAME_INDEX}")
+            conn.commit()
+            break
+        except Exception as exc:
+            conn.rollback()
+            if getattr(exc, "pgcode", None) != "55P03" or attempt == SWAP_ATTEMPTS:
+                raise
+            print(f"  Swap waiting on readers of {FAMILY_INDEX_TABLE} (attempt {attempt}/{SWAP_ATTEMPTS})...")
+            time.sleep(2 * attempt)
+    cur.execute(f"DROP TABLE IF EXISTS {RETIRED}")
+    conn.commit()
+    print(f"  Swapped {SHADOW} -> {FAMILY_INDEX_TABLE}")
+
+
+def _print_stats(cur):
+    cur.execute(f"""
+        SELECT source, COUNT(DISTINCT member_key) AS members, COUNT(*) AS names
+        FROM {FAMILY_INDEX_TABLE}
+        GROUP BY source ORDER BY source
+    """)
+    for source, members, names in cur.fetchall():
+        print(f"  {source:<7s} {members:>10,d} members  {names:>10,d} names")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the corporate family stem index")
+    parser.add_argument("--stats", action="store_true", help="Print member counts and exit")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    conn.autocommit = False
+
+    try:
+        if args.stats:
+            _print_stats(conn.cursor())
+            return
+        with pipeline_lock(conn, 'family_index'):
+            t0 = time.time()
+            build_shadow(conn)
+            swap_in(conn)
+            print(f"Built in {time.time() - t0:.1f}s\n\nVerification:")
+            _print_stats(conn.cursor())
+    except Exception as e:
+        conn.rollback()
+        print(f"ERROR: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 """
 Build materialized view mv_unified_scorecard with 8-factor weighted scoring.
 
-Run:     py scripts/scoring/build_unified_scorecard.py
-Refresh: py scripts/scoring/build_unified_scorecard.py --refresh
+Run:     py scripts/scoring/build_unified_scorecard.py                 # build-then-swap
+Refresh: py scripts/scoring/build_unified_scorecard.py --refresh       # REFRESH CONCURRENTLY
+Legacy:  py scripts/scoring/build_unified_scorecard.py --drop-recreate # MV offline during build
 """
 import argparse
 import os
@@ -12,6 +13,7 @@ import time
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 from db_config import get_connection
 from scripts.scoring._pipeline_lock import pipeline_lock
+from scripts.scoring._mv_swap import refresh_concurrently, swap_build
 
 
 MV_SQL = """
@@ -938,26 +940,31 @@ def _check_contract_data(conn):
         )
 
 
-def create_mv(conn):
+def create_mv(conn, swap=True):
     cur = conn.cursor()
     print("Pre-build checks...")
     _check_contract_data(conn)
 
-    print("Dropping old MV if exists...")
-    cur.execute("DROP MATERIALIZED VIEW IF EXISTS mv_unified_scorecard CASCADE")
-    conn.commit()
-
-    print("Creating mv_unified_scorecard...")
-    t0 = time.time()
-    cur.execute(MV_SQL)
-    conn.commit()
-    print(f"  Created in {time.time() - t0:.1f}s")
-
-    print("Creating indexes...")
-    for stmt in INDEX_SQL:
-        cur.execute(stmt)
-    conn.commit()
-    print("  Done.")
+    if swap:
+        # Build under a shadow name and rename into place; the live MV keeps
+        # serving until the swap commits.
+        swap_build(conn, "mv_unified_scorecard", MV_SQL, INDEX_SQL)
+    else:
+        print("Dropping old MV if exists...")
+        cur.execute("DROP MATERIALIZED VIEW IF EXISTS mv_unified_scorecard CASCADE")
+        conn.commit()
+
+        print("Creating mv_unified_scorecard...")
+        t0 = time.time()
+        cur.execute(MV_SQL)
+        conn.commit()
+        print(f"  Created in {time.time() - t0:.1f}s")
+
+        print("Creating indexes...")
+        for stmt in INDEX_SQL:
+            cur.execute(stmt)
+        conn.commit()
+        print("  Done.")
 
     print("\nVerification:")
     _print_stats(cur)
@@ -967,12 +974,9 @@ def refresh_mv(conn):
     print("Pre-build checks...")
     _check_contract_data(conn)
 
+    refresh_concurrently(conn, "mv_unified_scorecard")
     conn.autocommit = True
     cur = conn.cursor()
-    print("Refreshing mv_unified_scorecard CONCURRENTLY...")
-    t0 = time.time()
-    cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_unified_scorecard")
-    print(f"  Refreshed in {time.time() - t0:.1f}s")
     print("\nVerification:")
     _print_stats(cur)
 
@@ -980,6 +984,8 @@ def refresh_mv(conn):
 def main():
     parser = argparse.ArgumentParser(description="Create/refresh unified scorecard MV")
     parser.add_argument("--refresh", action="store_true", help="Refresh existing MV instead of recreating")
+    parser.add_argument("--drop-recreate", action="store_true",
+                        help="Drop and rebuild in place (MV unavailable during the build; no extra disk)")
     args = parser.parse_args()
 
     conn = get_connection()
@@ -989,7 +995,7 @@ def main():
             if args.refresh:
                 refresh_mv(conn)
             else:
-                create_mv(conn)
+                create_mv(conn, swap=not args.drop_recreate)
     except Exception as exc:
         conn.rollback()
         print(f"ERROR: {exc}")
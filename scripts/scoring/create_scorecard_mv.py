@@ -4,8 +4,9 @@ Create materialized view mv_organizing_scorecard.
 Pre-computes all 9 scoring factors for every OSHA establishment,
 eliminating the LIMIT 500 pre-filter bug and per-request computation.
 
-Run: py scripts/scoring/create_scorecard_mv.py
-Refresh: py scripts/scoring/create_scorecard_mv.py --refresh
+Run: py scripts/scoring/create_scorecard_mv.py                  (build-then-swap)
+Refresh: py scripts/scoring/create_scorecard_mv.py --refresh    (REFRESH CONCURRENTLY)
+Legacy: py scripts/scoring/create_scorecard_mv.py --drop-recreate  (MV offline during build)
 """
 import sys
 import os
@@ -14,6 +15,7 @@ import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 from db_config import get_connection
 from scripts.scoring._pipeline_lock import pipeline_lock
+from scripts.scoring._mv_swap import refresh_concurrently, swap_build
 
 
 # ── Score versioning ──────────────────────────────────────────────────
@@ -531,14 +533,40 @@ def _record_version(cur, description, row_count):
     return vid, created, score_stats
 
 
-def create_mv(conn):
-    """Drop and recreate the materialized view."""
+def create_mv(conn, swap=True):
+    """Rebuild the materialized view (shadow build + swap unless swap=False)."""
     cur = conn.cursor()
 
     print("Ensuring score_versions table...")
     _ensure_score_versions_table(cur)
     conn.commit()
 
+    if swap:
+        print("Creating/updating v_osha_organizing_targets...")
+        cur.execute(VIEW_SQL)
+        conn.commit()
+
+        # The wrapper view is repointed at the new MV inside the swap
+        # transaction, so v_organizing_scorecard never disappears.
+        swap_build(conn, "mv_organizing_scorecard", MV_SQL, INDEX_SQL, post_swap_sql=[
+            "DROP VIEW IF EXISTS v_organizing_scorecard CASCADE",
+            TOTAL_SCORE_SQL,
+        ])
+        cur.execute("SELECT COUNT(*) FROM mv_organizing_scorecard")
+        count = cur.fetchone()[0]
+        print(f"  Rows: {count:,}")
+    else:
+        count = _drop_and_create(conn, cur)
+
+    # Record version
+    vid, created, stats = _record_version(cur, "MV full rebuild", count)
+    conn.commit()
+    print(f"  Score version: v{vid} ({created})")
+    print(f"  Scores: min={stats['min_score']}, avg={stats['avg_score']}, max={stats['max_score']}")
+
+
+def _drop_and_create(conn, cur):
+    """Legacy in-place rebuild: the MV is unavailable until it finishes."""
     print("Dropping old MV if exists...")
     cur.execute("DROP VIEW IF EXISTS v_organizing_scorecard CASCADE")
     cur.execute("DROP MATERIALIZED VIEW IF EXISTS mv_organizing_scorecard CASCADE")
@@ -568,12 +596,7 @@ def create_mv(conn):
         cur.execute(sql)
     conn.commit()
     print("  Done.")
-
-    # Record version
-    vid, created, stats = _record_version(cur, "MV full rebuild", count)
-    conn.commit()
-    print(f"  Score version: v{vid} ({created})")
-    print(f"  Scores: min={stats['min_score']}, avg={stats['avg_score']}, max={stats['max_score']}")
+    return count
 
 
 def refresh_mv(conn):
@@ -584,14 +607,11 @@ def refresh_mv(conn):
 
     _ensure_score_versions_table(cur)
 
-    print("Refreshing mv_organizing_scorecard CONCURRENTLY...")
-    t0 = time.time()
-    cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_organizing_scorecard")
-    elapsed = time.time() - t0
+    refresh_concurrently(conn, "mv_organizing_scorecard")
 
     cur.execute("SELECT COUNT(*) FROM mv_organizing_scorecard")
     count = cur.fetchone()[0]
-    print(f"  Refreshed in {elapsed:.1f}s ({count:,} rows)")
+    print(f"  {count:,} rows")
 
     vid, created, stats = _record_version(cur, "MV concurrent refresh", count)
     print(f"  Score version: v{vid} ({created})")
@@ -602,6 +622,8 @@ def main():
     import argparse
     parser = argparse.ArgumentParser(description="Create/refresh scorecard materialized view")
     parser.add_argument("--refresh", action="store_true", help="Refresh existing MV instead of recreating")
+    parser.add_argument("--drop-recreate", action="store_true",
+                        help="Drop and rebuild in place (MV unavailable during the build; no extra disk)")
     args = parser.parse_args()
 
     conn = get_connection()
@@ -612,7 +634,7 @@ def main():
             if args.refresh:
                 refresh_mv(conn)
             else:
-                create_mv(conn)
+                create_mv(conn, swap=not args.drop_recreate)
     except Exception as e:
         conn.rollback()
         print(f"ERROR: {e}")
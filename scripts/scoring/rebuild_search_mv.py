@@ -11,66 +11,21 @@ Changes from original (archive/old_scripts/etl_archive/setup_unified_search.py):
     already present via F7 link.  Adds ~330K rows so major employers
     like Walmart, Amazon, Starbucks are searchable.
 
-Usage: py scripts/scoring/rebuild_search_mv.py
+Usage: py scripts/scoring/rebuild_search_mv.py                  (build-then-swap)
+       py scripts/scoring/rebuild_search_mv.py --refresh        (REFRESH CONCURRENTLY)
+       py scripts/scoring/rebuild_search_mv.py --drop-recreate  (MV offline during build)
 """
+import argparse
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 from db_config import get_connection
 from scripts.scoring._pipeline_lock import pipeline_lock
+from scripts.scoring._mv_swap import refresh_concurrently, swap_build
 
 
-def main():
-    conn = get_connection()
-    conn.autocommit = True
-    cur = conn.cursor()
-
-    with pipeline_lock(conn, 'search_mv'):
-        _run(conn, cur)
-
-    conn.close()
-
-
-def _run(conn, cur):
-    # ── Before counts ───────────────────────────────────────────────────
-    print("Getting before counts...")
-    before_total = 0
-    try:
-        cur.execute("""
-            SELECT source_type, COUNT(*)
-            FROM mv_employer_search
-            GROUP BY source_type ORDER BY COUNT(*) DESC
-        """)
-        before_counts = cur.fetchall()
-        cur.execute("SELECT COUNT(*) FROM mv_employer_search")
-        before_total = cur.fetchone()[0]
-        print(f"  Before: {before_total:,} total rows")
-        for r in before_counts:
-            print(f"    {r[0]}: {r[1]:,}")
-    except Exception:
-        print("  (mv_employer_search does not exist yet)")
-
-    # ── Drop old MV ─────────────────────────────────────────────────────
-    print("\nDropping old mv_employer_search...")
-    cur.execute("DROP MATERIALIZED VIEW IF EXISTS mv_employer_search CASCADE")
-
-    # ── Ensure review-flags table exists ────────────────────────────────
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS employer_review_flags (
-            id SERIAL PRIMARY KEY,
-            source_type VARCHAR(20) NOT NULL,
-            source_id TEXT NOT NULL,
-            flag_type VARCHAR(50) NOT NULL,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT NOW(),
-            UNIQUE(source_type, source_id, flag_type)
-        )
-    """)
-
-    # ── Create new MV with dedup ────────────────────────────────────────
-    print("Creating mv_employer_search with dedup + historical filter...")
-    cur.execute("""
+MV_SQL = """
         CREATE MATERIALIZED VIEW mv_employer_search AS
 
         -- Source 1: F7 employers
@@ -294,36 +249,104 @@ def _run(conn, cur):
           )
           AND me.canonical_name IS NOT NULL
           AND LENGTH(TRIM(me.canonical_name)) > 2
-    """)
+    """
 
-    # ── Indexes ─────────────────────────────────────────────────────────
-    print("Creating indexes...")
-    cur.execute("""
+INDEX_SQL = [
+    """
         CREATE INDEX idx_mv_search_trgm
         ON mv_employer_search USING GIN (search_name gin_trgm_ops)
-    """)
-    cur.execute("""
+    """,
+    """
         CREATE INDEX idx_mv_search_state
         ON mv_employer_search (state)
-    """)
-    cur.execute("""
+    """,
+    """
         CREATE INDEX idx_mv_search_city
         ON mv_employer_search (UPPER(city))
-    """)
-    cur.execute("""
+    """,
+    """
         CREATE UNIQUE INDEX idx_mv_search_canonical_id
         ON mv_employer_search (canonical_id)
-    """)
-    cur.execute("""
+    """,
+    """
         CREATE INDEX idx_mv_search_source
         ON mv_employer_search (source_type)
-    """)
-    cur.execute("""
+    """,
+    """
         CREATE INDEX idx_mv_search_group
         ON mv_employer_search (canonical_group_id)
         WHERE canonical_group_id IS NOT NULL
+    """,
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild mv_employer_search")
+    parser.add_argument("--refresh", action="store_true",
+                        help="REFRESH CONCURRENTLY instead of rebuilding")
+    parser.add_argument("--drop-recreate", action="store_true",
+                        help="Drop and rebuild in place (MV unavailable during the build; no extra disk)")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    with pipeline_lock(conn, 'search_mv'):
+        _run(conn, cur, refresh=args.refresh, swap=not args.drop_recreate)
+
+    conn.close()
+
+
+def _run(conn, cur, refresh=False, swap=True):
+    # ── Before counts ───────────────────────────────────────────────────
+    print("Getting before counts...")
+    before_total = 0
+    try:
+        cur.execute("""
+            SELECT source_type, COUNT(*)
+            FROM mv_employer_search
+            GROUP BY source_type ORDER BY COUNT(*) DESC
+        """)
+        before_counts = cur.fetchall()
+        cur.execute("SELECT COUNT(*) FROM mv_employer_search")
+        before_total = cur.fetchone()[0]
+        print(f"  Before: {before_total:,} total rows")
+        for r in before_counts:
+            print(f"    {r[0]}: {r[1]:,}")
+    except Exception:
+        print("  (mv_employer_search does not exist yet)")
+
+    # ── Ensure review-flags table exists ────────────────────────────────
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS employer_review_flags (
+            id SERIAL PRIMARY KEY,
+            source_type VARCHAR(20) NOT NULL,
+            source_id TEXT NOT NULL,
+            flag_type VARCHAR(50) NOT NULL,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT NOW(),
+            UNIQUE(source_type, source_id, flag_type)
+        )
     """)
 
+    # ── Build new MV ────────────────────────────────────────────────────
+    if refresh:
+        refresh_concurrently(conn, "mv_employer_search")
+    elif swap:
+        # Shadow build + rename: the live MV keeps serving search until the
+        # swap commits.
+        print("Building mv_employer_search with dedup + historical filter...")
+        swap_build(conn, "mv_employer_search", MV_SQL, INDEX_SQL)
+    else:
+        print("\nDropping old mv_employer_search...")
+        cur.execute("DROP MATERIALIZED VIEW IF EXISTS mv_employer_search CASCADE")
+        print("Creating mv_employer_search with dedup + historical filter...")
+        cur.execute(MV_SQL)
+        print("Creating indexes...")
+        for stmt in INDEX_SQL:
+            cur.execute(stmt)
+
     # ── Verify ──────────────────────────────────────────────────────────
     print("\nVerifying...")
     cur.execute("""
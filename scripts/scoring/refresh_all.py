@@ -1,16 +1,37 @@
 """
-Orchestrate full MV rebuild chain in dependency order.
+Orchestrate the MV rebuild chain as a dependency DAG.
+
+Each node is a script with declared upstream nodes and the base tables it
+reads. Independent nodes run concurrently, bounded by a DB-load budget
+(each node has a cost; the sum of running costs never exceeds --max-load).
+Every node run is timed into refresh_node_runs. The dashboard stats snapshot
+(platform_stats_snapshot) is recomputed at the end.
+
+A node is skipped when nothing it reads has changed since its last
+successful build: no upstream node rebuilt in this run and the input
+signature of its base tables (pg_stat_user_tables write counters +
+relfilenode) matches the one recorded at that build. --force disables this.
 
 Usage:
-    py scripts/scoring/refresh_all.py              # full rebuild
-    py scripts/scoring/refresh_all.py --skip-gower # skip Gower (faster)
-    py scripts/scoring/refresh_all.py --with-report # include score change report
+    py scripts/scoring/refresh_all.py                            # incremental rebuild
+    py scripts/scoring/refresh_all.py --force                    # rebuild every node
+    py scripts/scoring/refresh_all.py --skip-gower               # skip Gower (faster)
+    py scripts/scoring/refresh_all.py --with-report              # include score change report
+    py scripts/scoring/refresh_all.py --from build_unified_scorecard   # node + everything downstream
+    py scripts/scoring/refresh_all.py --only build_target_scorecard    # just these nodes
+    py scripts/scoring/refresh_all.py --max-load 2               # tighter DB budget
+    py scripts/scoring/refresh_all.py --list                     # print the DAG and exit
 """
 import argparse
+import hashlib
+import json
 import os
 import subprocess
 import sys
+import threading
 import time
+import uuid
+from dataclasses import dataclass, field
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 from db_config import get_connection
@@ -18,17 +39,219 @@ from db_config import get_connection
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
 
-# Ordered dependency chain
-STEPS = [
-    ("create_scorecard_mv",        "create_scorecard_mv.py"),
-    ("compute_gower_similarity",   "compute_gower_similarity.py"),
-    ("build_employer_data_sources", "build_employer_data_sources.py"),
-    ("build_unified_scorecard",    "build_unified_scorecard.py"),
-    ("build_target_data_sources",  "build_target_data_sources.py"),
-    ("build_target_scorecard",     "build_target_scorecard.py"),
-    ("rebuild_search_mv",          "rebuild_search_mv.py"),
+DEFAULT_MAX_LOAD = 4
+
+
+@dataclass
+class Node:
+    name: str
+    script: str
+    deps: tuple = ()
+    inputs: tuple = ()       # base tables read (for the change signature)
+    cost: int = 1            # share of the DB-load budget while running
+    args: tuple = ()
+    allow_fail: bool = False  # failure does not block downstream / the run
+    always_run: bool = False  # never skipped as unchanged (reports)
+    extra: dict = field(default_factory=dict)
+
+
+# Declared dependency DAG. deps = nodes that must finish first; inputs = base
+# tables whose changes force a rebuild.
+NODES = [
+    Node("create_scorecard_mv", "create_scorecard_mv.py", cost=2, inputs=(
+        "bls_industry_projections", "corporate_identifier_crosswalk", "epi_state_benchmarks",
+        "estimated_state_industry_density", "industry_density", "mergent_employers",
+        "osha_accidents", "osha_establishments", "osha_f7_matches", "osha_violation_summary",
+        "ref_nlrb_industry_win_rates", "ref_nlrb_state_win_rates", "ref_osha_industry_averages",
+        "ref_rtw_states", "state_industry_density",
+    )),
+    Node("compute_gower_similarity", "compute_gower_similarity.py", cost=3, inputs=(
+        "bls_industry_projections", "industry_occupation_overlap", "master_employer_source_ids",
+        "master_employers", "mergent_employers", "naics_to_bls_industry",
+        "osha_violations_detail", "qcew_annual", "state_fips_map", "whd_cases",
+    )),
+    Node("build_employer_data_sources", "build_employer_data_sources.py", cost=2, inputs=(
+        "corporate_identifier_crosswalk", "f7_employers_deduped", "master_employer_source_ids",
+        "national_990_f7_matches", "nlrb_elections", "nlrb_participants", "osha_f7_matches",
+        "sam_f7_matches", "unified_match_log", "whd_f7_matches",
+    )),
+    Node("build_unified_scorecard", "build_unified_scorecard.py", cost=3,
+         deps=("build_employer_data_sources", "compute_gower_similarity"), inputs=(
+        "bls_industry_projections", "census_rpe_ratios", "corporate_identifier_crosswalk",
+        "cur_form5500_sponsor_rollup", "cur_ppp_employer_rollup", "employer_canonical_groups",
+        "f7_employers_deduped", "master_employer_source_ids", "mergent_employers",
+        "national_990_f7_matches", "national_990_filers", "nlrb_cases", "nlrb_elections",
+        "nlrb_participants", "osha_establishments", "osha_f7_matches", "osha_violation_summary",
+        "ref_osha_industry_averages", "research_score_enhancements", "sec_xbrl_financials",
+        "whd_cases", "whd_f7_matches",
+    )),
+    Node("build_target_data_sources", "build_target_data_sources.py", cost=1, inputs=(
+        "master_employer_source_ids", "master_employers", "state_local_contracts_master_matches",
+    )),
+    Node("build_target_scorecard", "build_target_scorecard.py", cost=3,
+         deps=("build_target_data_sources", "compute_gower_similarity"), inputs=(
+        "bls_industry_projections", "bls_national_industry_density", "bls_state_density",
+        "census_rpe_ratios", "cur_form5500_sponsor_rollup", "cur_ppp_employer_rollup",
+        "f7_employers_deduped", "industry_density", "master_employer_source_ids",
+        "national_990_filers", "nlrb_cases", "nlrb_elections", "nlrb_participants",
+        "osha_establishments", "osha_violation_summary", "ref_osha_industry_averages",
+        "research_score_enhancements", "whd_cases", "zip_county_crosswalk",
+    )),
+    Node("build_corporate_family_index", "build_corporate_family_index.py", cost=2, inputs=(
+        "corporate_ultimate_parents", "f7_employers_deduped", "master_employers",
+        "nlrb_participants", "osha_establishments", "whd_cases",
+    )),
+    Node("rebuild_search_mv", "rebuild_search_mv.py", cost=2,
+         deps=("build_unified_scorecard",), inputs=(
+        "employer_canonical_groups", "f7_employers_deduped", "manual_employers",
+        "master_employer_source_ids", "master_employers", "nlrb_elections",
+        "nlrb_participants", "nlrb_tallies", "nlrb_voluntary_recognition",
+    )),
 ]
 
+# Backward-compatible flat order (topological), for callers that read STEPS.
+STEPS = [(n.name, n.script) for n in NODES]
+
+DDL_RUNS = """
+CREATE TABLE IF NOT EXISTS refresh_node_runs (
+    id                SERIAL PRIMARY KEY,
+    run_id            TEXT NOT NULL,
+    node              TEXT NOT NULL,
+    status            TEXT NOT NULL,
+    return_code       INTEGER,
+    started_at        TIMESTAMPTZ,
+    finished_at       TIMESTAMPTZ,
+    duration_seconds  NUMERIC(10,2),
+    input_signature   TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_refresh_node_runs_node
+    ON refresh_node_runs (node, finished_at DESC);
+"""
+
+
+def report_nodes():
+    """score_change_report snapshot/compare around build_unified_scorecard."""
+    return [
+        Node("score_change_report_snapshot", "score_change_report.py", args=("snapshot",),
+             allow_fail=True, always_run=True),
+        Node("score_change_report_compare", "score_change_report.py", args=("compare",),
+             deps=("build_unified_scorecard",), allow_fail=True, always_run=True),
+    ]
+
+
+def build_dag(with_report=False):
+    nodes = {n.name: Node(**{**n.__dict__}) for n in NODES}
+    if with_report:
+        for n in report_nodes():
+            nodes[n.name] = n
+        unified = nodes["build_unified_scorecard"]
+        unified.deps = tuple(unified.deps) + ("score_change_report_snapshot",)
+    _check_acyclic(nodes)
+    return nodes
+
+
+def _check_acyclic(nodes):
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Cycle in refresh DAG: {' -> '.join(path + [name])}")
+        if name not in nodes:
+            raise ValueError(f"Unknown dependency {name!r} in {path[-1] if path else '?'}")
+        state[name] = "visiting"
+        for d in nodes[name].deps:
+            visit(d, path + [name])
+        state[name] = "done"
+
+    for name in nodes:
+        visit(name, [])
+
+
+def descendants(nodes, roots):
+    """roots plus every node downstream of them."""
+    out = set(roots)
+    changed = True
+    while changed:
+        changed = False
+        for n in nodes.values():
+            if n.name not in out and any(d in out for d in n.deps):
+                out.add(n.name)
+                changed = True
+    return out
+
+
+def select_nodes(nodes, only=None, start_from=None, skip=()):
+    """Names to run this time (others are treated as already satisfied)."""
+    if only:
+        selected = set(only)
+    elif start_from:
+        selected = descendants(nodes, start_from)
+    else:
+        selected = set(nodes)
+    unknown = (set(only or ()) | set(start_from or ())) - set(nodes)
+    if unknown:
+        raise ValueError(f"Unknown node(s): {', '.join(sorted(unknown))}")
+    return selected - set(skip)
+
+
+# ---------------------------------------------------------------------------
+# Change detection
+# ---------------------------------------------------------------------------
+
+def input_signature(conn, tables):
+    """Digest of write counters + relfilenode for each input table."""
+    if not tables:
+        return None
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT c.relname, c.relfilenode,
+               COALESCE(s.n_tup_ins, 0), COALESCE(s.n_tup_upd, 0), COALESCE(s.n_tup_del, 0)
+        FROM pg_class c
+        LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+        WHERE c.relname = ANY(%s) AND c.relkind IN ('r', 'm', 'p')
+          AND c.relnamespace = 'public'::regnamespace
+        ORDER BY c.relname
+        """,
+        [list(tables)],
+    )
+    rows = [list(r) for r in cur.fetchall()]
+    return hashlib.sha256(json.dumps(rows).encode()).hexdigest()
+
+
+def last_success(conn, node):
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT finished_at, input_signature FROM refresh_node_runs
+        WHERE node = %s AND status = 'ok'
+        ORDER BY finished_at DESC LIMIT 1
+        """,
+        [node],
+    )
+    return cur.fetchone()
+
+
+def record_run(conn, run_id, node, status, rc, started, finished, signature):
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO refresh_node_runs
+            (run_id, node, status, return_code, started_at, finished_at,
+             duration_seconds, input_signature)
+        VALUES (%s, %s, %s, %s, to_timestamp(%s), to_timestamp(%s), %s, %s)
+        """,
+        [run_id, node, status, rc, started, finished,
+         round(finished - started, 2) if started and finished else None, signature],
+    )
+    conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
 
 def run_pre_checks():
     """Run pre-build checks before starting the chain."""
@@ -36,7 +259,7 @@ def run_pre_checks():
     conn = get_connection()
     try:
         # Import and call _check_contract_data from build_unified_scorecard
-        # Skip if mv_employer_data_sources doesn't exist yet (it's built by step 3)
+        # Skip if mv_employer_data_sources doesn't exist yet (it's built by build_employer_data_sources)
         cur = conn.cursor()
         cur.execute("""
             SELECT EXISTS (
@@ -48,88 +271,203 @@ def run_pre_checks():
             _check_contract_data(conn)
             print("  Pre-build checks passed.")
         else:
-            print("  mv_employer_data_sources not yet built -- skipping pre-check (will be created in step 3).")
+            print("  mv_employer_data_sources not yet built -- skipping pre-check.")
     finally:
         conn.close()
 
 
-def run_step(name, script_file):
+def run_step(name, script_file, args=()):
     """Run a single script and return (duration, return_code)."""
     script_path = os.path.join(SCRIPT_DIR, script_file)
     if not os.path.isfile(script_path):
         print(f"  WARNING: {script_path} not found, skipping.")
         return 0.0, -1
 
-    print(f"\n{'=' * 60}")
-    print(f"  Step: {name}")
-    print(f"  Script: {script_file}")
-    print(f"{'=' * 60}")
+    print(f"\n  [start] {name} ({script_file} {' '.join(args)})".rstrip())
 
     t0 = time.time()
     result = subprocess.run(
-        [sys.executable, script_path],
+        [sys.executable, script_path, *args],
         cwd=PROJECT_ROOT,
     )
     duration = time.time() - t0
 
     status = "OK" if result.returncode == 0 else f"FAILED (rc={result.returncode})"
-    print(f"  --> {status} in {duration:.1f}s")
+    print(f"  [done]  {name} --> {status} in {duration:.1f}s")
 
     return duration, result.returncode
 
 
-def run_report_step(subcommand):
-    """Run score_change_report.py with the given subcommand."""
-    script_path = os.path.join(SCRIPT_DIR, "score_change_report.py")
-    if not os.path.isfile(script_path):
-        print("  WARNING: score_change_report.py not found, skipping report.")
-        return 0.0, -1
-
-    print(f"\n{'=' * 60}")
-    print(f"  Report: score_change_report.py {subcommand}")
-    print(f"{'=' * 60}")
-
-    t0 = time.time()
-    result = subprocess.run(
-        [sys.executable, script_path, subcommand],
-        cwd=PROJECT_ROOT,
-    )
-    duration = time.time() - t0
-
-    status = "OK" if result.returncode == 0 else f"FAILED (rc={result.returncode})"
-    print(f"  --> {status} in {duration:.1f}s")
-
-    return duration, result.returncode
+class DagRunner:
+    """Run selected DAG nodes concurrently within a DB-load budget."""
+
+    def __init__(self, nodes, selected, max_load=DEFAULT_MAX_LOAD, force=False,
+                 conn=None, step_fn=run_step):
+        self.nodes = nodes
+        self.selected = selected
+        self.max_load = max(1, max_load)
+        self.force = force
+        self.conn = conn
+        self.step_fn = step_fn
+        self.run_id = uuid.uuid4().hex[:12]
+        self.results = {}   # name -> (status, duration)
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+
+    # -- skip logic --
+
+    def _upstream_rebuilt(self, node):
+        return any(self.results.get(d, ("",))[0] == "ok" and not self.nodes[d].always_run
+                   for d in node.deps)
+
+    def _unchanged(self, node, signature):
+        if self.force or node.always_run or self.conn is None:
+            return False
+        if self._upstream_rebuilt(node):
+            return False
+        prev = last_success(self.conn, node.name)
+        if not prev:
+            return False
+        prev_finished, prev_sig = prev
+        if node.inputs and prev_sig != signature:
+            return False
+        # An upstream built outside this run after our last success also counts.
+        for d in node.deps:
+            up = last_success(self.conn, d)
+            if up and up[0] and prev_finished and up[0] > prev_finished:
+                return False
+        return True
+
+    # -- scheduling --
+
+    def _ready(self, name, running, pending):
+        node = self.nodes[name]
+        for d in node.deps:
+            if d in pending or d in running:
+                return False
+        return True
+
+    def _blocked(self, name):
+        for d in self.nodes[name].deps:
+            status = self.results.get(d, ("",))[0]
+            if status in ("failed", "blocked") and not self.nodes[d].allow_fail:
+                return True
+        return False
+
+    def run(self):
+        pending = [n for n in self.nodes if n in self.selected]
+        running = {}
+        load = 0
+
+        while pending or running:
+            launched = False
+            for name in list(pending):
+                if not self._ready(name, running, pending):
+                    continue
+                node = self.nodes[name]
+                if self._blocked(name):
+                    pending.remove(name)
+                    self.results[name] = ("blocked", 0.0)
+                    print(f"\n  [block] {name} (upstream failed)")
+                    launched = True
+                    continue
+                with self._lock:
+                    signature = input_signature(self.conn, node.inputs) if self.conn else None
+                    unchanged = self._unchanged(node, signature)
+                if unchanged:
+                    pending.remove(name)
+                    self.results[name] = ("unchanged", 0.0)
+                    print(f"\n  [skip]  {name} (inputs unchanged since last build)")
+                    launched = True
+                    continue
+                if running and load + node.cost > self.max_load:
+                    continue
+                pending.remove(name)
+                load += node.cost
+                t = threading.Thread(target=self._run_node, args=(node, signature), daemon=True)
+                running[name] = (t, node.cost)
+                t.start()
+                launched = True
+
+            if launched:
+                continue
+            with self._done:
+                finished = [n for n in running if n in self.results]
+                while not finished:
+                    self._done.wait()
+                    finished = [n for n in running if n in self.results]
+            for n in finished:
+                load -= running.pop(n)[1]
+
+        return self.results
+
+    def _run_node(self, node, signature):
+        started = time.time()
+        duration, rc = self.step_fn(node.name, node.script, node.args)
+        finished = time.time()
+        if rc == 0:
+            status = "ok"
+        elif rc == -1:
+            status = "missing"
+        else:
+            status = "failed"
+        if self.conn is not None:
+            with self._lock:
+                try:
+                    record_run(self.conn, self.run_id, node.name, status, rc,
+                               started, finished, signature)
+                except Exception as e:
+                    print(f"  WARNING: could not record timing for {node.name}: {e}")
+        with self._done:
+            self.results[node.name] = (status, duration)
+            self._done.notify_all()
+
+
+def refresh_stats_snapshot():
+    """Recompute the dashboard stats snapshot from the rebuilt tables."""
+    print("Refreshing platform stats snapshot...")
+    try:
+        from api.services.stats_snapshot import METRICS, refresh_snapshot
+        conn = get_connection()
+        try:
+            done = refresh_snapshot(conn)
+        finally:
+            conn.close()
+        print(f"  {len(done)}/{len(METRICS)} metrics refreshed")
+    except Exception as e:
+        print(f"  WARNING: stats snapshot refresh failed: {e}")
 
 
-def print_summary(results):
-    """Print a summary table of all steps."""
+def print_summary(results, order):
+    """Print a summary table of all nodes."""
     print(f"\n{'=' * 60}")
     print("  REBUILD SUMMARY")
     print(f"{'=' * 60}")
-    print(f"  {'Step':<35s} {'Duration':>10s}  {'Status':<15s}")
+    print(f"  {'Node':<35s} {'Duration':>10s}  {'Status':<15s}")
     print(f"  {'-' * 35} {'-' * 10}  {'-' * 15}")
 
     total_time = 0.0
-    for name, duration, rc in results:
+    for name in order:
+        if name not in results:
+            continue
+        status, duration = results[name]
         total_time += duration
-        if rc == 0:
-            status = "OK"
-        elif rc == -1:
-            status = "SKIPPED"
-        else:
-            status = f"FAILED (rc={rc})"
-        dur_str = f"{duration:.1f}s"
-        print(f"  {name:<35s} {dur_str:>10s}  {status:<15s}")
+        print(f"  {name:<35s} {duration:>9.1f}s  {status.upper():<15s}")
 
     print(f"  {'-' * 35} {'-' * 10}  {'-' * 15}")
-    print(f"  {'TOTAL':<35s} {total_time:.1f}s")
+    print(f"  {'TOTAL (node time)':<35s} {total_time:.1f}s")
     print()
 
 
+def print_dag(nodes):
+    for n in nodes.values():
+        deps = ", ".join(n.deps) or "-"
+        print(f"  {n.name:<32s} cost={n.cost}  deps: {deps}")
+
+
 def main():
     parser = argparse.ArgumentParser(
-        description="Orchestrate full MV rebuild chain in dependency order."
+        description="Orchestrate the MV rebuild chain as a dependency DAG."
     )
     parser.add_argument(
         '--skip-gower', action='store_true',
@@ -139,11 +477,35 @@ def main():
         '--with-report', action='store_true',
         help='Run score_change_report.py before and after build_unified_scorecard'
     )
+    parser.add_argument('--from', dest='start_from', nargs='+', metavar='NODE',
+                        help='Run these nodes and everything downstream of them')
+    parser.add_argument('--only', nargs='+', metavar='NODE',
+                        help='Run only these nodes (implies --force for them)')
+    parser.add_argument('--force', action='store_true',
+                        help='Rebuild nodes even when their inputs are unchanged')
+    parser.add_argument('--max-load', type=int, default=DEFAULT_MAX_LOAD,
+                        help=f'DB-load budget: max summed node cost running at once (default: {DEFAULT_MAX_LOAD})')
+    parser.add_argument('--list', action='store_true', help='Print the DAG and exit')
     args = parser.parse_args()
 
+    nodes = build_dag(with_report=args.with_report)
+    if args.list:
+        print_dag(nodes)
+        return
+
+    try:
+        selected = select_nodes(
+            nodes, only=args.only, start_from=args.start_from,
+            skip=("compute_gower_similarity",) if args.skip_gower else (),
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
     print("=" * 60)
-    print("  MV REBUILD CHAIN -- Full Refresh")
+    print("  MV REBUILD DAG")
     print("=" * 60)
+    print(f"  Nodes: {', '.join(n for n in nodes if n in selected)}")
+    print(f"  Max load: {args.max_load}")
 
     # Pre-build checks
     try:
@@ -153,42 +515,28 @@ def main():
         print("  Aborting rebuild.")
         sys.exit(1)
 
-    results = []
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(DDL_RUNS)
+        conn.commit()
+        runner = DagRunner(nodes, selected, max_load=args.max_load,
+                           force=args.force or bool(args.only), conn=conn)
+        results = runner.run()
+    finally:
+        conn.close()
 
-    for name, script_file in STEPS:
-        # Skip Gower if requested
-        if name == "compute_gower_similarity" and args.skip_gower:
-            print(f"\n  Skipping {name} (--skip-gower)")
-            results.append((name, 0.0, -1))
-            continue
+    if args.skip_gower:
+        results["compute_gower_similarity"] = ("skipped", 0.0)
+    print_summary(results, list(nodes))
+    refresh_stats_snapshot()
 
-        # Run snapshot before build_unified_scorecard
-        if name == "build_unified_scorecard" and args.with_report:
-            dur, rc = run_report_step("snapshot")
-            results.append(("score_change_report snapshot", dur, rc))
-            if rc != 0 and rc != -1:
-                print(f"\n  Score snapshot failed (rc={rc}), continuing anyway...")
-
-        # Run the step
-        duration, rc = run_step(name, script_file)
-        results.append((name, duration, rc))
-
-        # Stop on failure
-        if rc != 0 and rc != -1:
-            print(f"\n  STEP FAILED: {name} returned {rc}")
-            print("  Stopping rebuild chain.")
-            print_summary(results)
-            sys.exit(1)
-
-        # Run compare after build_unified_scorecard
-        if name == "build_unified_scorecard" and args.with_report:
-            dur, rc = run_report_step("compare")
-            results.append(("score_change_report compare", dur, rc))
-            if rc != 0 and rc != -1:
-                print(f"\n  Score comparison failed (rc={rc}), continuing anyway...")
-
-    print_summary(results)
-    print("  Rebuild chain completed successfully.")
+    hard_failures = [n for n, (status, _) in results.items()
+                     if status in ("failed", "blocked") and not nodes[n].allow_fail]
+    if hard_failures:
+        print(f"  Rebuild FAILED: {', '.join(hard_failures)}")
+        sys.exit(1)
+    print("  Rebuild completed successfully.")
 
 
 if __name__ == '__main__':
@@ -7,6 +7,12 @@ Usage:
     py -u scripts/scraper/fetch_union_sites.py             # fetch all PENDING
     py -u scripts/scraper/fetch_union_sites.py --limit 5   # fetch first 5 (test run)
     py -u scripts/scraper/fetch_union_sites.py --id 42     # fetch specific profile
+    py -u scripts/scraper/fetch_union_sites.py --concurrency 16 --max-domains 32
+
+Profiles are crawled one domain queue at a time per worker, many domains in
+parallel (crawl_scheduler.py). Politeness is per domain: one request in
+flight and RATE_LIMIT_SECS between requests to the same host. All workers
+share one browser, and results are written to the DB in batches.
 """
 import sys
 import os
@@ -18,6 +24,13 @@ from urllib.parse import urljoin, urlparse
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 from db_config import get_connection
+from psycopg2.extras import execute_batch, execute_values
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from crawl_scheduler import (
+    GLOBAL_CONCURRENCY, MAX_ACTIVE_DOMAINS, WRITE_BATCH_SIZE,
+    BatchWriter, DomainThrottle, run_domain_queues,
+)
 
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
 
@@ -27,7 +40,6 @@ from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
 USER_AGENT = "LaborResearchPlatform/1.0 (Academic Research; contact: jakewartel@gmail.com)"
 PAGE_TIMEOUT_MS = 30000
 RATE_LIMIT_SECS = 1.0        # between requests to same domain
-DOMAIN_COOLDOWN_SECS = 2.0   # between switching domains
 MAX_RETRIES = 3
 RETRY_BACKOFF = [2, 4, 8]    # seconds
 
@@ -61,11 +73,19 @@ def get_domain(url):
     return urlparse(url).netloc.lower()
 
 
-async def fetch_page(crawler, url, run_config, retries=MAX_RETRIES):
+async def _arun(crawler, url, run_config, throttle):
+    """One crawler request, spaced per domain when a throttle is given."""
+    if throttle is None:
+        return await crawler.arun(url=url, config=run_config)
+    async with throttle.request(get_domain(url)):
+        return await crawler.arun(url=url, config=run_config)
+
+
+async def fetch_page(crawler, url, run_config, retries=MAX_RETRIES, throttle=None):
     """Fetch a single page with retries. Returns (markdown_text, success, error, final_url)."""
     for attempt in range(retries):
         try:
-            result = await crawler.arun(url=url, config=run_config)
+            result = await _arun(crawler, url, run_config, throttle)
             if result.success:
                 text = ''
                 if result.markdown:
@@ -79,7 +99,7 @@ async def fetch_page(crawler, url, run_config, retries=MAX_RETRIES):
                 error = result.error_message or 'Unknown error'
                 if attempt < retries - 1:
                     wait = RETRY_BACKOFF[min(attempt, len(RETRY_BACKOFF) - 1)]
-                    print(f"    Retry {attempt + 1}/{retries} in {wait}s: {error}")
+                    print(f"    Retry {attempt + 1}/{retries} in {wait}s: {url}: {error}")
                     await asyncio.sleep(wait)
                 else:
                     return '', False, error, url
@@ -87,18 +107,18 @@ async def fetch_page(crawler, url, run_config, retries=MAX_RETRIES):
             error = str(e)
             if attempt < retries - 1:
                 wait = RETRY_BACKOFF[min(attempt, len(RETRY_BACKOFF) - 1)]
-                print(f"    Retry {attempt + 1}/{retries} in {wait}s: {error[:80]}")
+                print(f"    Retry {attempt + 1}/{retries} in {wait}s: {url}: {error[:80]}")
                 await asyncio.sleep(wait)
             else:
                 return '', False, error, url
     return '', False, 'Max retries exceeded', url
 
 
-async def check_wordpress(crawler, base_url, run_config):
+async def check_wordpress(crawler, base_url, run_config, throttle=None):
     """Check if site is WordPress by hitting /wp-json/wp/v2/."""
     wp_url = base_url.rstrip('/') + WP_API_PATH
     try:
-        result = await crawler.arun(url=wp_url, config=run_config)
+        result = await _arun(crawler, wp_url, run_config, throttle)
         if result.success:
             text = ''
             if result.markdown:
@@ -110,111 +130,106 @@ async def check_wordpress(crawler, base_url, run_config):
     return None
 
 
-async def discover_subpages(crawler, base_url, run_config):
-    """Try common subpage paths and return {page_type: markdown_text}."""
+def page_type_for(path):
+    """Categorize a subpage path as about / contracts / news / other."""
+    path_lower = path.lower()
+    if 'about' in path_lower:
+        return 'about'
+    if 'contract' in path_lower or 'bargaining' in path_lower:
+        return 'contracts'
+    if 'news' in path_lower or 'blog' in path_lower:
+        return 'news'
+    return 'other'
+
+
+async def discover_subpages(crawler, base_url, run_config, throttle=None):
+    """Try common subpage paths and return {page_type: markdown_text}.
+
+    Paths are tried in order (the throttle spaces them); a page type that
+    already matched is not requested again.
+    """
     found = {}
-    page_urls = []
 
     for path in SUBPAGE_PATHS:
+        page_type = page_type_for(path)
+        # Only keep first match per type
+        if page_type in found:
+            continue
         sub_url = base_url.rstrip('/') + path
-        page_urls.append((path, sub_url))
-
-    for path, sub_url in page_urls:
-        await asyncio.sleep(RATE_LIMIT_SECS)
-        text, success, error, _ = await fetch_page(crawler, sub_url, run_config, retries=1)
+        text, success, error, _ = await fetch_page(crawler, sub_url, run_config,
+                                                   retries=1, throttle=throttle)
 
         if success and text and len(text.strip()) > 200:
-            # Categorize the page
-            path_lower = path.lower()
-            if 'about' in path_lower:
-                page_type = 'about'
-            elif 'contract' in path_lower or 'bargaining' in path_lower:
-                page_type = 'contracts'
-            elif 'news' in path_lower or 'blog' in path_lower:
-                page_type = 'news'
-            else:
-                page_type = 'other'
-
-            # Only keep first match per type
-            if page_type not in found:
-                found[page_type] = text
-                print(f"    Found /{path.strip('/')}: {len(text):,} chars")
+            found[page_type] = text
 
     return found
 
 
 # ── Main Fetch Logic ──────────────────────────────────────────────────────
 
-async def fetch_profile(crawler, run_config, profile, conn):
-    """Fetch all pages for a single union profile."""
+async def crawl_profile(crawler, run_config, profile, throttle=None):
+    """Fetch all pages for a single union profile.
+
+    Returns a result dict for save_results(), or None if the profile has
+    no usable URL. Makes no DB writes itself.
+    """
     pid, name, url, state = profile
     url = normalize_url(url)
     if not url:
-        return False
-
-    print(f"\n[{pid}] {name} ({state})")
-    print(f"  URL: {url}")
+        return None
 
     started_at = datetime.now()
-    cur = conn.cursor()
-
-    # Create scrape job
-    cur.execute("""
-        INSERT INTO scrape_jobs (target_url, target_entity_type, web_profile_id, status, started_at)
-        VALUES (%s, 'UNION_LOCAL', %s, 'IN_PROGRESS', %s)
-        RETURNING id
-    """, (url, pid, started_at))
-    job_id = cur.fetchone()[0]
-    conn.commit()
-
-    pages_scraped = 0
-    pages_found = []
-    error_msg = None
+    result = {
+        'id': pid, 'url': url, 'started_at': started_at,
+        'status': 'FAILED', 'error': None, 'platform': None,
+        'homepage': None, 'subpages': {}, 'pages_found': [],
+    }
 
     try:
         # 1. Fetch homepage
-        print(f"  Fetching homepage...")
-        homepage_text, success, error, final_url = await fetch_page(crawler, url, run_config)
-
+        homepage_text, success, error, final_url = await fetch_page(
+            crawler, url, run_config, throttle=throttle)
         if not success:
-            error_msg = f"Homepage failed: {error}"
-            print(f"  FAILED: {error}")
-            cur.execute("""
-                UPDATE web_union_profiles
-                SET scrape_status = 'FAILED', last_scraped = NOW()
-                WHERE id = %s
-            """, (pid,))
-            cur.execute("""
-                UPDATE scrape_jobs
-                SET status = 'FAILED', error_message = %s, completed_at = NOW(),
-                    duration_seconds = EXTRACT(EPOCH FROM NOW() - started_at)
-                WHERE id = %s
-            """, (error_msg, job_id))
-            conn.commit()
-            return False
-
-        pages_scraped += 1
-        pages_found.append(url)
-        print(f"  Homepage: {len(homepage_text):,} chars")
-
-        # 2. Check WordPress
-        await asyncio.sleep(RATE_LIMIT_SECS)
-        platform = await check_wordpress(crawler, url, run_config)
-        if platform:
-            print(f"  Platform: {platform}")
-
-        # 3. Discover subpages
-        subpages = await discover_subpages(crawler, url, run_config)
-        pages_scraped += len(subpages)
-        for ptype in subpages:
-            pages_found.append(f"{url}/{ptype}")
-
-        # 4. Save to database
-        about_text = subpages.get('about')
-        contracts_text = subpages.get('contracts')
-        news_text = subpages.get('news')
+            result['error'] = f"Homepage failed: {error}"
+        else:
+            result['homepage'] = homepage_text
+            result['pages_found'].append(url)
+
+            # 2. Check WordPress
+            result['platform'] = await check_wordpress(crawler, url, run_config, throttle)
+
+            # 3. Discover subpages
+            subpages = await discover_subpages(crawler, url, run_config, throttle)
+            result['subpages'] = subpages
+            for ptype in subpages:
+                result['pages_found'].append(f"{url}/{ptype}")
+            result['status'] = 'FETCHED'
+    except Exception as e:
+        result['error'] = str(e)[:500]
+
+    result['duration'] = (datetime.now() - started_at).total_seconds()
+    if result['status'] == 'FETCHED':
+        chars = len(result['homepage']) + sum(len(v) for v in result['subpages'].values())
+        found = ', '.join(sorted(result['subpages'])) or 'no subpages'
+        print(f"[{pid}] {name} ({state}) OK: {len(result['pages_found'])} pages "
+              f"({found}), {chars:,} chars, "
+              f"{result['platform'] or 'unknown platform'}, {result['duration']:.1f}s")
+    else:
+        print(f"[{pid}] {name} ({state}) FAILED: {result['error']}")
+    return result
 
-        cur.execute("""
+
+def save_results(conn, results):
+    """Write a batch of crawl_profile() results in one transaction.
+
+    Each result updates its web_union_profiles row and adds a finished
+    scrape_jobs row (COMPLETED or FAILED).
+    """
+    fetched = [r for r in results if r['status'] == 'FETCHED']
+    failed = [r for r in results if r['status'] != 'FETCHED']
+    cur = conn.cursor()
+    if fetched:
+        execute_batch(cur, """
             UPDATE web_union_profiles
             SET raw_text = %s,
                 raw_text_about = %s,
@@ -224,40 +239,28 @@ async def fetch_profile(crawler, run_config, profile, conn):
                 scrape_status = 'FETCHED',
                 last_scraped = NOW()
             WHERE id = %s
-        """, (homepage_text, about_text, contracts_text, news_text, platform, pid))
-
-        # 5. Update scrape job
-        duration = (datetime.now() - started_at).total_seconds()
-        cur.execute("""
-            UPDATE scrape_jobs
-            SET status = 'COMPLETED', pages_scraped = %s, pages_found = %s,
-                completed_at = NOW(), duration_seconds = %s
-            WHERE id = %s
-        """, (pages_scraped, pages_found, duration, job_id))
-
-        conn.commit()
-        print(f"  OK: {pages_scraped} pages, {len(homepage_text) + sum(len(v) for v in subpages.values()):,} total chars, {duration:.1f}s")
-        return True
-
-    except Exception as e:
-        error_msg = str(e)[:500]
-        print(f"  ERROR: {error_msg}")
-        cur.execute("""
+        """, [(r['homepage'], r['subpages'].get('about'), r['subpages'].get('contracts'),
+               r['subpages'].get('news'), r['platform'], r['id']) for r in fetched])
+    if failed:
+        execute_batch(cur, """
             UPDATE web_union_profiles
             SET scrape_status = 'FAILED', last_scraped = NOW()
             WHERE id = %s
-        """, (pid,))
-        cur.execute("""
-            UPDATE scrape_jobs
-            SET status = 'FAILED', error_message = %s, completed_at = NOW(),
-                duration_seconds = EXTRACT(EPOCH FROM NOW() - started_at)
-            WHERE id = %s
-        """, (error_msg, job_id))
-        conn.commit()
-        return False
+        """, [(r['id'],) for r in failed])
+    execute_values(cur, """
+        INSERT INTO scrape_jobs (target_url, target_entity_type, web_profile_id, status,
+                                 error_message, pages_scraped, pages_found,
+                                 started_at, completed_at, duration_seconds)
+        VALUES %s
+    """, [(r['url'], 'UNION_LOCAL', r['id'],
+           'COMPLETED' if r['status'] == 'FETCHED' else 'FAILED',
+           r['error'], len(r['pages_found']), r['pages_found'],
+           r['started_at'], datetime.now(), r['duration']) for r in results])
+    conn.commit()
 
 
-async def main(limit=None, profile_id=None):
+async def main(limit=None, profile_id=None, concurrency=GLOBAL_CONCURRENCY,
+               max_domains=MAX_ACTIVE_DOMAINS, batch_size=WRITE_BATCH_SIZE):
     """Main entry point."""
     conn = get_connection()
     cur = conn.cursor()
@@ -280,8 +283,9 @@ async def main(limit=None, profile_id=None):
             query += f" LIMIT {int(limit)}"
         cur.execute(query)
 
-    profiles = cur.fetchall()
-    print(f"Found {len(profiles)} profiles to fetch")
+    profiles = [p for p in cur.fetchall() if normalize_url(p[2])]
+    domains = {get_domain(normalize_url(p[2])) for p in profiles}
+    print(f"Found {len(profiles)} profiles to fetch across {len(domains)} domains")
 
     if not profiles:
         print("Nothing to fetch!")
@@ -302,39 +306,49 @@ async def main(limit=None, profile_id=None):
         verbose=False,
     )
 
-    # Process profiles
-    success_count = 0
-    fail_count = 0
-    last_domain = None
-
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        for profile in profiles:
-            pid, name, url, state = profile
-            url = normalize_url(url)
-            if not url:
-                continue
-
-            # Domain cooldown
-            domain = get_domain(url)
-            if last_domain and domain != last_domain:
-                await asyncio.sleep(DOMAIN_COOLDOWN_SECS)
-            elif last_domain == domain:
-                await asyncio.sleep(RATE_LIMIT_SECS)
-            last_domain = domain
-
-            ok = await fetch_profile(crawler, run_config, profile, conn)
-            if ok:
-                success_count += 1
-            else:
-                fail_count += 1
+    # Process profiles: one queue per domain, RATE_LIMIT_SECS between requests
+    # to the same domain, `concurrency` requests in flight overall.
+    counts = {'FETCHED': 0, 'FAILED': 0}
+    throttle = DomainThrottle(concurrency=concurrency, interval=RATE_LIMIT_SECS)
+    writer = BatchWriter(lambda batch: save_results(conn, batch), batch_size=batch_size)
+
+    def on_result(profile, result):
+        if isinstance(result, Exception):
+            # crawl_profile catches page errors; this is a bug, not a bad site
+            print(f"[{profile[0]}] ERROR: {result}")
+            result = {
+                'id': profile[0], 'url': normalize_url(profile[2]),
+                'started_at': datetime.now(), 'status': 'FAILED',
+                'error': str(result)[:500], 'platform': None, 'homepage': None,
+                'subpages': {}, 'pages_found': [], 'duration': 0.0,
+            }
+        counts[result['status']] += 1
+        writer.add(result)
+
+    t0 = time.time()
+    try:
+        async with AsyncWebCrawler(config=browser_config) as crawler:
+            await run_domain_queues(
+                profiles,
+                lambda p: crawl_profile(crawler, run_config, p, throttle),
+                key=lambda p: get_domain(normalize_url(p[2])),
+                max_domains=max_domains,
+                on_result=on_result,
+            )
+    finally:
+        writer.close()
+    elapsed = time.time() - t0
 
     # Summary
+    success_count, fail_count = counts['FETCHED'], counts['FAILED']
     print(f"\n{'=' * 60}")
     print(f"FETCH COMPLETE")
     print(f"{'=' * 60}")
     print(f"  Success: {success_count}")
     print(f"  Failed:  {fail_count}")
     print(f"  Total:   {success_count + fail_count}")
+    print(f"  Pages:   {sum(throttle.requests.values()):,} requests in {elapsed:.0f}s "
+          f"({writer.flushes} DB batches)")
 
     # Show saved text stats
     cur.execute("""
@@ -367,6 +381,13 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Fetch AFSCME union websites')
     parser.add_argument('--limit', type=int, help='Max profiles to fetch')
     parser.add_argument('--id', type=int, help='Fetch specific profile ID')
+    parser.add_argument('--concurrency', type=int, default=GLOBAL_CONCURRENCY,
+                        help=f'Page requests in flight across all domains (default {GLOBAL_CONCURRENCY})')
+    parser.add_argument('--max-domains', type=int, default=MAX_ACTIVE_DOMAINS,
+                        help=f'Domains crawled at once (default {MAX_ACTIVE_DOMAINS})')
+    parser.add_argument('--batch-size', type=int, default=WRITE_BATCH_SIZE,
+                        help=f'Profiles per DB write (default {WRITE_BATCH_SIZE})')
     args = parser.parse_args()
 
-    asyncio.run(main(limit=args.limit, profile_id=args.id))
+    asyncio.run(main(limit=args.limit, profile_id=args.id, concurrency=args.concurrency,
+                     max_domains=args.max_domains, batch_size=args.batch_size))
@@ -0,0 +1,122 @@
+-- CBA filtered-ANN migration (2026-10-18)
+--
+-- Semantic search filters on contract (cba_id) and category, which live on
+-- cba_sections / cba_provisions. With one HNSW index over both object types
+-- the filters could only be applied after the index returned its ef_search
+-- nearest rows, so filtered queries came back short or fell through to an
+-- exact scan of every embedding. This migration:
+--
+--   * copies cba_id and category onto cba_embeddings, kept in sync by
+--     triggers (section category is attributes->>'category'),
+--   * replaces the global HNSW index with one partial index per object_type,
+--   * adds btree indexes for the per-contract exact path.
+--
+-- api/routers/cba.py detects the new columns at startup and keeps filtering
+-- through the joined tables until this migration has been run.
+--
+-- Run with:
+--   psql -h localhost -U postgres -d olms_multiyear -f sql/schema/cba_embeddings_filter_migration.sql
+-- Building the HNSW indexes takes a few minutes on the full corpus.
+
+BEGIN;
+
+-- 1) Denormalized filter columns
+ALTER TABLE cba_embeddings
+    ADD COLUMN IF NOT EXISTS cba_id integer,
+    ADD COLUMN IF NOT EXISTS category text;
+
+UPDATE cba_embeddings e
+    SET cba_id = s.cba_id, category = s.attributes->>'category'
+    FROM cba_sections s
+    WHERE e.object_type = 'article' AND s.section_id = e.section_id;
+
+UPDATE cba_embeddings e
+    SET cba_id = p.cba_id, category = p.category
+    FROM cba_provisions p
+    WHERE e.object_type = 'provision' AND p.provision_id = e.provision_id;
+
+-- 2) Fill them on insert (12_embed_classify.py only writes ids and vectors)
+CREATE OR REPLACE FUNCTION cba_embeddings_fill_filters() RETURNS trigger AS $$
+BEGIN
+    IF NEW.object_type = 'article' THEN
+        SELECT s.cba_id, s.attributes->>'category' INTO NEW.cba_id, NEW.category
+        FROM cba_sections s WHERE s.section_id = NEW.section_id;
+    ELSE
+        SELECT p.cba_id, p.category INTO NEW.cba_id, NEW.category
+        FROM cba_provisions p WHERE p.provision_id = NEW.provision_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS cba_embeddings_fill_filters ON cba_embeddings;
+CREATE TRIGGER cba_embeddings_fill_filters
+    BEFORE INSERT OR UPDATE OF section_id, provision_id, object_type ON cba_embeddings
+    FOR EACH ROW EXECUTE FUNCTION cba_embeddings_fill_filters();
+
+-- 3) Follow reclassification of the source rows
+CREATE OR REPLACE FUNCTION cba_sections_sync_embedding_filters() RETURNS trigger AS $$
+BEGIN
+    UPDATE cba_embeddings
+        SET cba_id = NEW.cba_id, category = NEW.attributes->>'category'
+        WHERE object_type = 'article' AND section_id = NEW.section_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS cba_sections_sync_embedding_filters ON cba_sections;
+CREATE TRIGGER cba_sections_sync_embedding_filters
+    AFTER UPDATE OF cba_id, attributes ON cba_sections
+    FOR EACH ROW
+    WHEN (OLD.cba_id IS DISTINCT FROM NEW.cba_id
+          OR OLD.attributes->>'category' IS DISTINCT FROM NEW.attributes->>'category')
+    EXECUTE FUNCTION cba_sections_sync_embedding_filters();
+
+CREATE OR REPLACE FUNCTION cba_provisions_sync_embedding_filters() RETURNS trigger AS $$
+BEGIN
+    UPDATE cba_embeddings
+        SET cba_id = NEW.cba_id, category = NEW.category
+        WHERE object_type = 'provision' AND provision_id = NEW.provision_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS cba_provisions_sync_embedding_filters ON cba_provisions;
+CREATE TRIGGER cba_provisions_sync_embedding_filters
+    AFTER UPDATE OF cba_id, category ON cba_provisions
+    FOR EACH ROW
+    WHEN (OLD.cba_id IS DISTINCT FROM NEW.cba_id OR OLD.category IS DISTINCT FROM NEW.category)
+    EXECUTE FUNCTION cba_provisions_sync_embedding_filters();
+
+-- 4) One HNSW graph per object type: a search for articles no longer walks
+--    (and discards) provision neighbours, and each graph stays smaller
+CREATE INDEX IF NOT EXISTS cba_embeddings_article_hnsw
+    ON cba_embeddings
+    USING hnsw (embedding_halfvec halfvec_cosine_ops)
+    WITH (m = 16, ef_construction = 64)
+    WHERE object_type = 'article';
+
+CREATE INDEX IF NOT EXISTS cba_embeddings_provision_hnsw
+    ON cba_embeddings
+    USING hnsw (embedding_halfvec halfvec_cosine_ops)
+    WITH (m = 16, ef_construction = 64)
+    WHERE object_type = 'provision';
+
+DROP INDEX IF EXISTS cba_embeddings_halfvec_hnsw;
+
+-- 5) Per-contract (exact) and category lookups
+CREATE INDEX IF NOT EXISTS cba_embeddings_type_cba_idx
+    ON cba_embeddings (object_type, cba_id);
+
+CREATE INDEX IF NOT EXISTS cba_embeddings_type_category_idx
+    ON cba_embeddings (object_type, category);
+
+COMMIT;
+
+ANALYZE cba_embeddings;
+
+-- Post-migration check (run separately)
+--
+-- SELECT object_type, COUNT(*), COUNT(cba_id) AS with_cba_id, COUNT(category) AS with_category
+-- FROM cba_embeddings GROUP BY object_type;
+-- SELECT extversion FROM pg_extension WHERE extname = 'vector';  -- >= 0.8 enables iterative scans
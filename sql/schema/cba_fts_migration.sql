@@ -0,0 +1,56 @@
+-- CBA full-text search migration (2026-10-18)
+--
+-- Persists the tsvectors the CBA search endpoints used to compute per row
+-- at query time (to_tsvector over every provision / article body, on every
+-- search) as STORED generated columns with GIN indexes:
+--
+--   cba_provisions.provision_tsv  -- provision_text
+--   cba_sections.section_tsv      -- section_text (article / section body)
+--
+-- Generated columns are recomputed by PostgreSQL whenever the pipeline
+-- inserts or rewrites the source text (06_split_sections.py,
+-- extract_articles.py, the provision extractors), so no pipeline step has
+-- to remember to refresh them.
+--
+-- api/routers/cba.py detects the columns at startup and falls back to the
+-- old expressions until this migration has been run.
+--
+-- Run with:
+--   psql -h localhost -U postgres -d olms_multiyear -f sql/schema/cba_fts_migration.sql
+-- Adding a STORED column rewrites the table; expect a few minutes on the
+-- full provision corpus.
+
+BEGIN;
+
+-- 1) Provisions
+ALTER TABLE cba_provisions
+    ADD COLUMN IF NOT EXISTS provision_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', COALESCE(provision_text, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_cba_provisions_tsv
+    ON cba_provisions USING gin (provision_tsv);
+
+-- The expression index is superseded by idx_cba_provisions_tsv
+DROP INDEX IF EXISTS idx_cba_provisions_fts;
+
+-- 2) Sections / articles
+ALTER TABLE cba_sections
+    ADD COLUMN IF NOT EXISTS section_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', COALESCE(section_text, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_cba_sections_tsv
+    ON cba_sections USING gin (section_tsv);
+
+COMMIT;
+
+ANALYZE cba_provisions;
+ANALYZE cba_sections;
+
+-- Post-migration check (run separately)
+--
+-- SELECT COUNT(*) FILTER (WHERE provision_tsv IS NOT NULL) AS with_tsv, COUNT(*)
+-- FROM cba_provisions;
+-- EXPLAIN ANALYZE
+-- SELECT provision_id FROM cba_provisions
+-- WHERE provision_tsv @@ plainto_tsquery('english', 'overtime')
+-- ORDER BY ts_rank(provision_tsv, plainto_tsquery('english', 'overtime')) DESC LIMIT 25;
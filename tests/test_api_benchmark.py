@@ -0,0 +1,63 @@
+"""Tests for the benchmark helpers in scripts/performance/api_benchmark.py (no DB)."""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from scripts.performance import api_benchmark as bench  # noqa: E402
+
+FIXTURE = {
+    "f7_ids": ["F1", "F2"],
+    "director_master_ids": [],
+    "states": ["CA", "NY"],
+    "county_fips": ["36061"],
+}
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert bench.percentile(values, 50) == 50
+    assert bench.percentile(values, 95) == 95
+    assert bench.percentile(values, 99) == 99
+    assert bench.percentile([7.0], 99) == 7.0
+
+
+def test_parse_query_count():
+    header = 'app;dur=12.0, db;dur=10.5;desc="3 queries", db-slowest;dur=7.5'
+    assert bench.parse_query_count(header) == 3
+    assert bench.parse_query_count('app;dur=1.0, db;dur=0.0;desc="1 query"') == 1
+    assert bench.parse_query_count(None) is None
+
+
+def test_plan_is_seeded_and_skips_scenarios_without_fixture():
+    plan = bench.build_plan(FIXTURE, list(bench.SCENARIOS), 200, seed=1)
+    assert plan == bench.build_plan(FIXTURE, list(bench.SCENARIOS), 200, seed=1)
+    names = {name for name, _ in plan}
+    assert "director_network" not in names
+    assert {"unified_search", "employer_profile", "density"} <= names
+
+
+def test_compare_flags_latency_and_query_regressions():
+    base = {"p50_ms": 10, "p95_ms": 40.0, "p99_ms": 50, "mean_queries": 4.0, "errors": 0}
+    ok = dict(base, p95_ms=44.0, mean_queries=4.5)
+    assert bench.compare({"a": ok}, {"a": base}, 0.25, 5.0) == []
+    slow = dict(base, p95_ms=60.0)
+    assert bench.compare({"a": slow}, {"a": base}, 0.25, 5.0)[0].startswith("a: p95")
+    chatty = dict(base, mean_queries=9.0)
+    assert "queries/request" in bench.compare({"a": chatty}, {"a": base}, 0.25, 5.0)[0]
+    # Tiny absolute changes on fast routes are noise
+    fast = dict(base, p95_ms=2.0)
+    assert bench.compare({"a": dict(fast, p95_ms=4.0)}, {"a": fast}, 0.25, 5.0) == []
+    # New scenarios have nothing to compare against
+    assert bench.compare({"b": slow}, {"a": base}, 0.25, 5.0) == []
+
+
+def test_summarize():
+    samples = [
+        {"scenario": "a", "status": 200, "ms": float(i), "queries": 2} for i in range(1, 21)
+    ] + [{"scenario": "a", "status": 500, "ms": 100.0, "queries": None}]
+    s = bench.summarize(samples)["a"]
+    assert s["requests"] == 21 and s["errors"] == 1
+    assert s["p50_ms"] == 11.0 and s["p99_ms"] == 100.0
+    assert s["mean_queries"] == 2 and s["max_queries"] == 2
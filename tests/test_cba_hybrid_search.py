@@ -0,0 +1,99 @@
+"""Tests for the CBA semantic-search SQL builders in api/routers/cba.py (no DB)."""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api.routers import cba  # noqa: E402
+
+VEC = "[0.1,0.2]"
+FILTERS = dict(
+    doc_filters=["d.employer_name_raw ILIKE %s"],
+    doc_params=["%Kaiser%"],
+    cba_id=None,
+    category_sets=[["leave"]],
+)
+
+FILTERS_FOR_STRATEGY = dict(doc_filters=FILTERS["doc_filters"], cba_id=None,
+                            category_sets=FILTERS["category_sets"])
+
+
+@pytest.fixture(autouse=True)
+def _schema(monkeypatch):
+    """Pretend the filter migration has run on pgvector 0.8."""
+    monkeypatch.setattr(cba, "_has_embedding_filter_cols", True)
+    monkeypatch.setattr(cba, "_pgvector_version", (0, 8, 0))
+
+
+@pytest.mark.parametrize("types", [{"article"}, {"provision"}, {"article", "provision"}])
+@pytest.mark.parametrize("stored", [True, False])
+def test_hybrid_placeholders_match_params(monkeypatch, types, stored):
+    monkeypatch.setattr(cba, "_has_fts_cols", stored)
+    sql, params = cba._hybrid_search_sql(types, VEC, "sick leave", 0.8, 10, "index", **FILTERS)
+    assert sql.count("%s") == len(params)
+    assert params[0] == "sick leave"
+    assert params[-4:] == [cba.RRF_K, 10, VEC, VEC]
+    # Each signal takes top_k * HYBRID_CANDIDATES (at least 50) candidates per type
+    assert params.count(50) == 2 * len(types)
+    tsv = {"article": "s.section_tsv", "provision": "p.provision_tsv"}
+    for t in ("article", "provision"):
+        assert (tsv[t] in sql) == (stored and t in types)
+    if not stored:
+        assert "to_tsvector('english'" in sql
+
+
+def test_vector_sql_unchanged_shape(monkeypatch):
+    sql, params = cba._vector_search_sql({"article", "provision"}, VEC, 1.0, 25, "index", **FILTERS)
+    assert sql.count("%s") == len(params)
+    assert sql.rstrip().endswith("LIMIT %s") and params[-2:] == [1.0, 25]
+    assert "rrf_score" not in sql
+
+
+@pytest.mark.parametrize("strategy,denorm", [
+    ("index", True), ("index", False), ("exact", True), ("overfetch", True), ("overfetch", False)])
+def test_ann_strategies_placeholders(monkeypatch, strategy, denorm):
+    monkeypatch.setattr(cba, "_has_embedding_filter_cols", denorm)
+    filters = dict(FILTERS, cba_id=7)
+    sql, params = cba._ann_subquery("provision", "e.provision_id AS object_id", VEC, 10, strategy, **filters)
+    assert sql.count("%s") == len(params)
+    assert params[-1] == 10 and 7 in params
+    assert ("e.category = %s" in sql) == denorm
+    assert ("p.category = %s" in sql) == (not denorm)
+    if strategy == "exact":
+        assert "e.cba_id = %s" in sql and "OFFSET 0" in sql
+    if strategy == "overfetch":
+        assert 10 * cba.ANN_OVERFETCH in params
+    # The distance cut is never inside the ordered scan
+    assert "<= %s" not in sql
+
+
+def test_strategy_choice(monkeypatch):
+    no_filters = dict(doc_filters=[], cba_id=None, category_sets=[])
+    assert cba._ann_strategy(**dict(FILTERS_FOR_STRATEGY, cba_id=3)) == "exact"
+    assert cba._ann_strategy(**FILTERS_FOR_STRATEGY) == "index"
+    monkeypatch.setattr(cba, "_pgvector_version", (0, 7, 4))
+    assert cba._ann_strategy(**FILTERS_FOR_STRATEGY) == "overfetch"
+    assert cba._ann_strategy(**no_filters) == "index"
+    monkeypatch.setattr(cba, "_has_embedding_filter_cols", False)
+    assert cba._ann_strategy(**dict(FILTERS_FOR_STRATEGY, cba_id=3)) == "overfetch"
+
+
+def test_session_settings(monkeypatch):
+    assert cba._ann_session_sql("index", 25) == [
+        "SET LOCAL hnsw.ef_search = 100", "SET LOCAL hnsw.iterative_scan = relaxed_order"]
+    assert cba._ann_session_sql("overfetch", 50) == ["SET LOCAL hnsw.ef_search = 500"]
+    assert cba._ann_session_sql("overfetch", 400) == ["SET LOCAL hnsw.ef_search = 1000"]
+    monkeypatch.setattr(cba, "_pgvector_version", (0, 7, 0))
+    assert cba._ann_session_sql("index", 25) == ["SET LOCAL hnsw.ef_search = 100"]
+
+
+def test_fts_expressions_fall_back(monkeypatch):
+    monkeypatch.setattr(cba, "_has_fts_cols", False)
+    assert cba._provision_tsv() == "to_tsvector('english', p.provision_text)"
+    assert cba._section_tsv() == "to_tsvector('english', COALESCE(s.section_text, ''))"
+    monkeypatch.setattr(cba, "_has_fts_cols", True)
+    assert cba._provision_tsv() == "p.provision_tsv"
+    assert cba._section_tsv() == "s.section_tsv"
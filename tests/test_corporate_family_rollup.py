@@ -117,3 +117,147 @@ def test_starbucks_all_40_variants_collapse_to_one_stem():
     # All 13 distinct names reduce to the single stem "starbucks" -- meaning
     # ILIKE '%starbucks%' picks them all up.
     assert stems == {"starbucks"}
+
+
+# ---- Family stem index ----
+
+def test_family_match_uses_index_or_ilike():
+    from api.services.corporate_family_rollup import _family_match
+
+    sql, params = _family_match("master", "m", ["lowes home", "lowes companies"], True)
+    assert sql.startswith("m.master_id IN (SELECT member_key::bigint FROM corporate_family_members")
+    assert "source = 'master'" in sql and "member_name ILIKE ANY(%s)" in sql
+    assert params == [["%lowes home%", "%lowes companies%"]]
+
+    sql, params = _family_match("whd", "", ["starbucks"], False)
+    assert sql == "(legal_name ILIKE ANY(%s) OR trade_name ILIKE ANY(%s))"
+    assert params == [["%starbucks%"], ["%starbucks%"]]
+    assert sql.count("%s") == len(params)
+
+
+def test_index_members_keep_every_name():
+    from scripts.scoring.build_corporate_family_index import member_rows
+
+    rows = [
+        ("17", "Starbucks Corporation, Easton Store #9534", "STARBUCKS COFFEE CO #5252"),
+        ("18", "Schultz, Howard\nStarbucks Corporation", None),
+        ("19", "   ", None),
+        ("20", "DOLLAR TREE, INC.", "DOLLAR TREE, INC."),
+    ]
+    assert sorted(member_rows("whd", rows)) == [
+        ("whd", "17", "STARBUCKS COFFEE CO #5252"),
+        ("whd", "17", "Starbucks Corporation, Easton Store #9534"),
+        ("whd", "18", "Schultz, Howard\nStarbucks Corporation"),
+        ("whd", "20", "DOLLAR TREE, INC."),
+    ]
+
+
+def _ilike(value, patterns):
+    """Python stand-in for `value ILIKE ANY(patterns)` with '%stem%' patterns."""
+    return value is not None and any(p.strip("%").lower() in value.lower() for p in patterns)
+
+
+# source -> rows as the index build reads them: (member_key, name, [name, ...])
+_PARITY_ROWS = {
+    "master": [
+        ("1", "TARGET CORPORATION"), ("2", "Target Stores Inc #1234"),
+        ("3", "The Kroger Company"), ("4", "Kroger Limited Partnership I"),
+        ("5", "KROGER CO"), ("6", "Apple Inc."), ("7", "Apple Retail Stores"),
+        ("8", "Amazon.com Services LLC"), ("9", "Amazon Logistics Inc"),
+        ("10", "Pineapple Express LLC"), ("11", None),
+    ],
+    "whd": [
+        ("17", "Starbucks Corporation, Easton Store #9534", "STARBUCKS COFFEE CO #5252"),
+        ("18", "Schultz, Howard\nStarbucks Corporation", None),
+        ("19", "ACME HOLDINGS", "The Kroger Co. #512"),
+        ("20", None, "Target Stores"),
+    ],
+}
+
+
+@pytest.mark.parametrize("family", [
+    "TARGET CORPORATION", "KROGER CO", "Apple Inc.", "AMAZON INC", "STARBUCKS CORP",
+])
+def test_family_index_matches_the_ilike_path(family):
+    from api.services.corporate_family_rollup import _family_match, _FAMILY_SOURCES
+    from scripts.scoring.build_corporate_family_index import member_rows
+
+    stems = [_extract_root_name(family)]
+    for source, rows in _PARITY_ROWS.items():
+        name_cols = _FAMILY_SOURCES[source][2]
+        _, scan_params = _family_match(source, "", stems, False)
+        by_scan = {key for key, *names in rows
+                   if any(_ilike(n, p) for n, p in zip(names, scan_params))}
+        assert len(name_cols) == len(scan_params)
+
+        _, (index_patterns,) = _family_match(source, "", stems, True)
+        by_index = {key for _, key, name in member_rows(source, rows)
+                    if _ilike(name, index_patterns)}
+
+        assert index_patterns == scan_params[0]
+        assert by_index == by_scan
+
+
+def test_family_index_keeps_substring_members():
+    from api.services.corporate_family_rollup import _family_match
+    from scripts.scoring.build_corporate_family_index import member_rows
+
+    def members(family):
+        _, (patterns,) = _family_match("master", "", [_extract_root_name(family)], True)
+        return {key for _, key, name in member_rows("master", _PARITY_ROWS["master"])
+                if _ilike(name, patterns)}
+
+    assert members("TARGET CORPORATION") == {"1", "2"}
+    assert members("KROGER CO") == {"3", "4", "5"}
+    assert members("Apple Inc.") == {"6", "7", "10"}
+    assert members("AMAZON INC") == {"8", "9"}
+
+
+class _LockTimeout(Exception):
+    pgcode = "55P03"
+
+
+class _SwapCursor:
+    def __init__(self, timeouts):
+        self.timeouts = timeouts
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+        if sql.startswith("ALTER TABLE") and self.timeouts:
+            self.timeouts -= 1
+            raise _LockTimeout("canceling statement due to lock timeout")
+
+    def fetchone(self):
+        return (True,)
+
+
+class _SwapConn:
+    def __init__(self, timeouts):
+        self.cur = _SwapCursor(timeouts)
+        self.commits = self.rollbacks = 0
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_family_index_swap_retries_on_lock_timeout(monkeypatch):
+    from scripts.scoring import build_corporate_family_index as fam
+
+    monkeypatch.setattr(fam.time, "sleep", lambda s: None)
+    conn = _SwapConn(timeouts=2)
+    fam.swap_in(conn)
+    assert conn.rollbacks == 2 and conn.commits == 2
+    renames = [s for s in conn.cur.statements if s.startswith("ALTER TABLE")]
+    assert renames[-1] == f"ALTER TABLE {fam.SHADOW} RENAME TO {fam.FAMILY_INDEX_TABLE}"
+
+    conn = _SwapConn(timeouts=fam.SWAP_ATTEMPTS)
+    with pytest.raises(_LockTimeout):
+        fam.swap_in(conn)
+    assert conn.rollbacks == fam.SWAP_ATTEMPTS and conn.commits == 0
@@ -0,0 +1,171 @@
+"""Tests for the per-domain crawl scheduler (scripts/scraper/crawl_scheduler.py).
+
+Two local HTTP servers on different ports stand in for two union sites
+(the port is part of the domain).
+"""
+import asyncio
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRAPER_DIR = ROOT / "scripts" / "scraper"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(SCRAPER_DIR))
+
+from crawl_scheduler import BatchWriter, DomainThrottle, run_domain_queues  # noqa: E402
+
+INTERVAL = 0.15
+PAGES = {
+    "/": "Local 1 home page. " * 20,
+    "/about": "About our local union and its history. " * 20,
+    "/contracts/": "Our collective bargaining agreements. " * 20,
+    "/wp-json/wp/v2/": '{"namespace": "wp/v2", "routes": {}}',
+}
+
+
+def _server():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append((time.monotonic(), self.path))
+            time.sleep(0.02)
+            body = PAGES.get(self.path)
+            self.send_response(200 if body else 404)
+            self.end_headers()
+            self.wfile.write((body or "not found").encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
+
+
+@pytest.fixture
+def sites():
+    servers = [_server() for _ in range(2)]
+    yield [(f"http://127.0.0.1:{s.server_address[1]}", hits) for s, hits in servers]
+    for s, _ in servers:
+        s.shutdown()
+        s.server_close()
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            return resp.read().decode()
+    except urllib.error.HTTPError:
+        return None
+
+
+class UrllibCrawler:
+    """Stands in for AsyncWebCrawler: arun() returns a Crawl4AI-shaped result."""
+
+    async def arun(self, url, config=None):
+        text = await asyncio.to_thread(_get, url)
+        return SimpleNamespace(success=text is not None, markdown=text, url=url,
+                               error_message=None if text else "404")
+
+
+def _min_gap(times):
+    times = sorted(times)
+    return min(b - a for a, b in zip(times, times[1:]))
+
+
+def test_throttle_spaces_each_domain_and_runs_domains_together(sites):
+    urls = [base + path for base, _ in sites for path in ("/", "/about", "/contracts/")]
+
+    async def crawl():
+        throttle = DomainThrottle(concurrency=4, interval=INTERVAL)
+        crawler = UrllibCrawler()
+
+        async def handler(url):
+            async with throttle.request(url.split("/")[2]):
+                return (await crawler.arun(url)).success
+
+        results = {}
+        n = await run_domain_queues(urls, handler, key=lambda u: u.split("/")[2],
+                                    on_result=results.__setitem__)
+        return n, results
+
+    t0 = time.monotonic()
+    n, results = asyncio.run(crawl())
+    elapsed = time.monotonic() - t0
+
+    assert n == 6 and all(results.values())
+    for _, hits in sites:
+        assert len(hits) == 3
+        assert _min_gap([t for t, _ in hits]) >= INTERVAL * 0.95
+    # Serial would take >= 5 intervals; two domains in parallel take about 2.
+    assert elapsed < 4 * INTERVAL
+
+
+def test_global_cap_and_error_isolation():
+    throttle = DomainThrottle(concurrency=3, interval=0)
+    active = peak = 0
+
+    async def handler(item):
+        nonlocal active, peak
+        if item == "bad":
+            raise RuntimeError("boom")
+        async with throttle.request(item):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+        return item
+
+    results = []
+    asyncio.run(run_domain_queues([f"d{i}" for i in range(10)] + ["bad"], handler,
+                                  key=lambda d: d, max_domains=8,
+                                  on_result=lambda item, r: results.append(r)))
+    assert peak == 3
+    assert len(results) == 11
+    assert sum(isinstance(r, RuntimeError) for r in results) == 1
+
+
+def test_batch_writer_flushes_in_batches():
+    batches = []
+    writer = BatchWriter(batches.append, batch_size=3)
+    for i in range(7):
+        writer.add(i)
+    writer.close()
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert writer.flushes == 3
+
+
+def test_crawl_profile_against_fixture_sites(sites):
+    pytest.importorskip("crawl4ai")
+    import fetch_union_sites as fus
+
+    profiles = [(i, f"Local {i}", base, "NY") for i, (base, _) in enumerate(sites)]
+
+    async def crawl():
+        throttle = DomainThrottle(concurrency=4, interval=0.01)
+        results = []
+        await run_domain_queues(
+            profiles, lambda p: fus.crawl_profile(UrllibCrawler(), None, p, throttle),
+            key=lambda p: fus.get_domain(p[2]),
+            on_result=lambda p, r: results.append(r))
+        return results
+
+    results = asyncio.run(crawl())
+    assert [r["status"] for r in results] == ["FETCHED", "FETCHED"]
+    for r in results:
+        assert r["platform"] == "WordPress"
+        assert set(r["subpages"]) == {"about", "contracts"}
+        assert r["homepage"] == PAGES["/"]
+    # First match per page type wins; later paths of the same type are skipped.
+    _, hits = sites[0]
+    paths = [p for _, p in hits]
+    assert "/about-us" not in paths and "/collective-bargaining" not in paths
@@ -0,0 +1,118 @@
+"""Vectorized dampening search must pick the same params as the scalar loop (no DB)."""
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+DEMO_DIR = ROOT / "scripts" / "analysis" / "demographics_comparison"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(DEMO_DIR))
+
+import dampening_grid  # noqa: E402
+import run_v11_kfold as v11  # noqa: E402
+from methodologies_v5 import RACE_CATS  # noqa: E402
+
+TIERS = ["Low", "Med-Low", "Med-High", "High"]
+REGIONS = ["South", "West"]
+GROUPS = ["Healthcare/Social (62)", "Retail Trade (44-45)"]
+
+
+def _split(rng, n):
+    w = [rng.random() + 0.05 for _ in range(n)]
+    t = sum(w)
+    return [x * 100 / t for x in w]
+
+
+def _records(seed, n=400):
+    rng = random.Random(seed)
+    recs = []
+    for i in range(n):
+        race = dict(zip(RACE_CATS, _split(rng, 6)))
+        truth_race = {c: max(0.0, v + rng.gauss(-1.5, 3)) for c, v in race.items()}
+        if i % 9 == 0:
+            truth_race.pop("NHOPI")
+        hisp = rng.uniform(0, 60)
+        fem = rng.uniform(10, 90)
+        base = {
+            "race": race if i % 17 else None,
+            "hispanic": {"Hispanic": hisp, "Not Hispanic": 100 - hisp} if i % 13 else None,
+            "gender": {"Male": 100 - fem, "Female": fem},
+        }
+        h_truth = min(100.0, max(0.0, hisp + rng.gauss(-4, 6)))
+        f_truth = min(100.0, max(0.0, fem + rng.gauss(3, 5)))
+        recs.append({
+            "company_code": "c%d" % i,
+            "diversity_tier": TIERS[i % 4],
+            "region": REGIONS[i % 2],
+            "naics_group": GROUPS[(i // 2) % 2],
+            "signals": {"county_hisp_pct": rng.choice([None, 5, 15, 30, 70])},
+            "truth": {
+                "race": truth_race,
+                "hispanic": {"Hispanic": h_truth, "Not Hispanic": 100 - h_truth},
+                "gender": {"Male": 100 - f_truth, "Female": f_truth} if i % 11 else None,
+            },
+            "_base": base,
+        })
+    return recs
+
+
+def _offsets(seed):
+    rng = random.Random(seed + 1)
+    cal, hisp_cal = {}, {}
+    for c in RACE_CATS:
+        cal[("race", c, "global")] = (rng.uniform(-2, 2), 100)
+        for t in TIERS[:3]:
+            cal[("race", c, "dt_ind", t, GROUPS[0])] = (rng.uniform(-4, 4), 30)
+    cal[("gender", "Female", "global")] = (rng.uniform(-5, 5), 100)
+    hisp_cal[("hisp", "Hispanic", "ind", GROUPS[1])] = (rng.uniform(-8, 8), 40)
+    hisp_cal[("hisp", "Hispanic", "ht_ind", "med_hisp", GROUPS[0])] = (rng.uniform(-8, 8), 25)
+    return cal, hisp_cal
+
+
+@pytest.fixture(autouse=True)
+def _fake_scenario(monkeypatch):
+    monkeypatch.setattr(v11, "scenario_v92_full", lambda rec: rec["_base"])
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_vectorized_matches_scalar(seed):
+    recs = _records(seed)
+    cal, hisp_cal = _offsets(seed)
+    inputs = v11.dampening_inputs(recs, cal, hisp_cal)
+    for tier in [None] + TIERS:
+        want = v11.search_dampening_scalar(recs, cal, hisp_cal, tier=tier)
+        got = v11.search_dampening(recs, cal, hisp_cal, tier=tier, inputs=inputs)
+        assert got == want, tier
+
+
+def test_per_dimension_metrics_match_evaluate():
+    from run_v9_2 import evaluate
+
+    recs = _records(7)
+    cal, hisp_cal = _offsets(7)
+    inputs = v11.dampening_inputs(recs, cal, hisp_cal)
+    race = dampening_grid.race_metrics(inputs)
+    hisp = dampening_grid.hisp_metrics(inputs)
+    gender = dampening_grid.gender_metrics(inputs)
+    for i, dr in enumerate(dampening_grid.D_RACE_GRID):
+        dh = dampening_grid.D_HISP_GRID[i]
+        dg = dampening_grid.D_GENDER_GRID[i % 4]
+        m = evaluate(recs, lambda rec: v11.apply_shrunk_calibration(
+            rec["_base"], rec, cal, hisp_cal, dr, dh, dg))
+        assert race[i] == (m["race"], m["p30"])
+        assert hisp[i] == m["hisp"]
+        assert gender[i % 4] == m["gender"]
+
+
+def test_round4_matches_python_round():
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.uniform(0, 100, 20000), np.arange(0, 1, 0.00005)])
+    assert dampening_grid._round4(x).tolist() == [round(v, 4) for v in x.tolist()]
+
+
+def test_small_tier_returns_defaults():
+    inputs = v11.dampening_inputs(_records(1, n=30), *_offsets(1))
+    assert dampening_grid.search_grid(inputs, tier="High") == dampening_grid.DEFAULT_PARAMS
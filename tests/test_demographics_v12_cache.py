@@ -0,0 +1,108 @@
+"""Tests for the V12 cell cache in api/services/demographics_v12.py (no DB)."""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api.services import demographics_v12 as v12  # noqa: E402
+
+RESULT = {"race": {"White": 70.0, "Black": 30.0}, "metadata": {"model": "v12_qwi"}}
+
+
+class _FakeCursor:
+    """Answers the to_regclass probe and the cell lookup from a dict."""
+
+    def __init__(self, table=None):
+        self.table = table
+        self.executed = []
+        self._row = None
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        if "to_regclass" in sql:
+            self._row = {"ok": self.table is not None}
+        else:
+            key = tuple(params[:4])
+            fp = params[4]
+            stored = (self.table or {}).get(key)
+            self._row = {"result": stored[1]} if stored and stored[0] == fp else None
+
+    def fetchone(self):
+        return self._row
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    files = [tmp_path / "cal.json", tmp_path / "hw.json", tmp_path / "qwi.json"]
+    for f in files:
+        f.write_text("{}")
+    monkeypatch.setattr(v12, "_fingerprint_files", lambda: [str(f) for f in files])
+    monkeypatch.setattr(v12, "_fingerprint", None)
+    monkeypatch.setattr(v12, "_cell_table_state", None)
+    monkeypatch.setattr(v12, "FINGERPRINT_RECHECK_SECONDS", 0)
+    v12._cell_cache.clear()
+    return files
+
+
+def test_cell_key_normalizes():
+    assert v12.cell_key(" 622110 ", "36", "36061", "10001-1234") == ("6221", "36", "36061", "10001")
+
+
+def test_fingerprint_changes_with_calibration(artifacts, monkeypatch):
+    monkeypatch.setattr(v12, "_models_loaded", True)
+    fp1 = v12.model_fingerprint()
+    assert v12.model_fingerprint() == fp1
+    v12._cell_cache.set("k", (RESULT,))
+
+    artifacts[0].write_text('{"offsets": {"x": 1}}')
+    fp2 = v12.model_fingerprint()
+    assert fp2 != fp1
+    assert v12._cell_cache.get("k") is None
+    assert v12._models_loaded is False
+
+
+def test_cached_lookup_order(artifacts, monkeypatch):
+    calls = []
+
+    def live(cur, naics, state_fips, zipcode, county_fips, **kw):
+        calls.append(naics)
+        return RESULT
+
+    monkeypatch.setattr(v12, "estimate_demographics_v12", live)
+    fp = v12.model_fingerprint()
+    key = ("6221", "36", "36061", "10001")
+    cur = _FakeCursor({key: (fp, {"race": {"White": 50.0}})})
+
+    # Table hit, then served from memory without touching the cursor.
+    out = v12.estimate_demographics_v12_cached(cur, "622110", "36", "10001", "36061")
+    assert out == {"race": {"White": 50.0}}
+    n = len(cur.executed)
+    assert v12.estimate_demographics_v12_cached(cur, "6221", "36", "10001", "36061") == out
+    assert len(cur.executed) == n
+    assert calls == []
+
+    # Miss in the table -> live compute.
+    out = v12.estimate_demographics_v12_cached(cur, "4451", "36", "10001", "36061")
+    assert out == RESULT and calls == ["4451"]
+
+
+def test_stale_fingerprint_and_stored_none(artifacts, monkeypatch):
+    monkeypatch.setattr(v12, "estimate_demographics_v12", lambda *a, **kw: RESULT)
+    fp = v12.model_fingerprint()
+    stale = ("6221", "36", "36061", "10001")
+    empty = ("4451", "36", "36061", "10001")
+    cur = _FakeCursor({stale: ("old-fingerprint", {"race": {}}), empty: (fp, None)})
+
+    assert v12.estimate_demographics_v12_cached(cur, "6221", "36", "10001", "36061") == RESULT
+    assert v12.estimate_demographics_v12_cached(cur, "4451", "36", "10001", "36061") is None
+
+
+def test_no_table_falls_back_to_live(artifacts, monkeypatch):
+    monkeypatch.setattr(v12, "estimate_demographics_v12", lambda *a, **kw: None)
+    cur = _FakeCursor(None)
+    assert v12.estimate_demographics_v12_cached(cur, "6221", "36", "10001", "36061") is None
+    assert v12.estimate_demographics_v12_cached(cur, "6221", "36", "10001", "36061") is None
+    assert sum("to_regclass" in s for s in cur.executed) == 1
@@ -0,0 +1,92 @@
+"""Tests for the streaming export encoders in api/services/export_stream.py (no DB)."""
+import asyncio
+import csv
+import gzip
+import io
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api.services import export_stream  # noqa: E402
+
+COLUMNS = ["id", "name", "score", "flag"]
+
+
+def _fake_stream(batches, closed):
+    def stream_rows(sql, params=None, batch_size=5000):
+        try:
+            for b in batches:
+                yield [dict(r) for r in b]
+        finally:
+            closed.append(True)
+    return stream_rows
+
+
+def _body(resp):
+    async def collect():
+        return b"".join([chunk async for chunk in resp.body_iterator])
+    return asyncio.run(collect())
+
+
+@pytest.fixture
+def batches():
+    return [
+        [{"id": 1, "name": "Acme", "score": Decimal("7.5"), "flag": True},
+         {"id": 2, "name": None, "score": None, "flag": False}],
+        [{"id": 3, "name": "Zed, Inc", "score": Decimal("1.25"), "flag": None}],
+    ]
+
+
+def test_csv_streams_all_batches(monkeypatch, batches):
+    closed = []
+    monkeypatch.setattr(export_stream, "stream_rows", _fake_stream(batches, closed))
+    seen = []
+    resp = export_stream.export_response("SQL", [], COLUMNS, fmt="csv",
+                                         row_hook=lambda r: seen.append(r["id"]))
+    rows = list(csv.reader(io.StringIO(_body(resp).decode())))
+    assert rows[0] == COLUMNS
+    assert rows[1] == ["1", "Acme", "7.5", "True"]
+    assert rows[2] == ["2", "", "", "False"]
+    assert rows[3] == ["3", "Zed, Inc", "1.25", ""]
+    assert seen == [1, 2, 3]
+    assert closed == [True]
+    assert resp.media_type == "text/csv"
+
+
+def test_gzip_round_trip(monkeypatch, batches):
+    monkeypatch.setattr(export_stream, "stream_rows", _fake_stream(batches, []))
+    resp = export_stream.export_response("SQL", [], COLUMNS, fmt="csv.gz")
+    text = gzip.decompress(_body(resp)).decode()
+    assert text.splitlines()[0] == ",".join(COLUMNS)
+    assert len(text.splitlines()) == 4
+
+
+def test_empty_result_still_has_header(monkeypatch):
+    monkeypatch.setattr(export_stream, "stream_rows", _fake_stream([], []))
+    resp = export_stream.export_response("SQL", [], COLUMNS, fmt="csv")
+    assert _body(resp).decode().strip() == ",".join(COLUMNS)
+
+
+@pytest.mark.skipif(not export_stream.HAS_PYARROW, reason="pyarrow not installed")
+def test_parquet_round_trip(monkeypatch, batches):
+    import pyarrow.parquet as pq
+
+    monkeypatch.setattr(export_stream, "stream_rows", _fake_stream(batches, []))
+    resp = export_stream.export_response("SQL", [], COLUMNS, fmt="parquet")
+    table = pq.read_table(io.BytesIO(_body(resp)))
+    assert table.column_names == COLUMNS
+    assert table.num_rows == 3
+    assert table.column("score").to_pylist() == [7.5, None, 1.25]
+    assert table.column("flag").to_pylist() == [True, False, None]
+
+
+def test_bad_format_rejected():
+    with pytest.raises(HTTPException) as exc:
+        export_stream.export_response("SQL", [], COLUMNS, fmt="xlsx")
+    assert exc.value.status_code == 400
@@ -0,0 +1,87 @@
+"""Tests for the demographics feature store (scripts/analysis/demographics_comparison/feature_store.py)."""
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+DEMO_DIR = ROOT / "scripts" / "analysis" / "demographics_comparison"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(DEMO_DIR))
+
+import feature_store  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not feature_store.HAS_PYARROW, reason="pyarrow not installed")
+
+CACHE = {
+    ("acs_race", "6221", "36"): {"White": 61.2, "Black": 20.4, "Asian": 18.4},
+    ("lodes_race", "36061"): {"White": 48.0, "Black": 30.0},
+    ("county_cbsa", "99999"): None,
+    ("occupation_mix", "6221"): [("29-1141", 30.5), ("31-1131", 12.25)],
+    ("occ_weighted", (("29-1141", 30.5), ("31-1131", 12.25)), "36", "race"): {"White": 55.0},
+    ("qcew_lq", "36061", "6221"): Decimal("1.25"),
+}
+REC_LOOKUP = {
+    "C1": {"company_code": "C1", "truth": {"race": {"White": 70.0}},
+           "expert_preds": {"D": {"race": None}, "F": {"gender": {"Female": 75.0}}}},
+}
+COMPANIES = [
+    {"company_code": "C2", "naics": "445110", "classifications": {"region": "Northeast"}},
+    {"company_code": "C1", "naics": "622110", "classifications": {"region": "Northeast"}},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    manifest = feature_store.write_store(str(tmp_path), CACHE, REC_LOOKUP, {"v11_pool": COMPANIES})
+    assert manifest["loader_entries"] == len(CACHE)
+    assert manifest["namespaces"]["acs_race"] == 1
+    return feature_store.FeatureStore(str(tmp_path))
+
+
+def test_round_trip(store):
+    cache = store.loader_cache()
+    assert set(cache) == set(CACHE)
+    # Tuples inside values survive too (occ_weighted keys are built from them).
+    assert cache[("occupation_mix", "6221")] == CACHE[("occupation_mix", "6221")]
+    assert cache[("qcew_lq", "36061", "6221")] == 1.25
+    assert cache[("county_cbsa", "99999")] is None
+    assert store.rec_lookup() == REC_LOOKUP
+    assert store.companies("v11_pool") == COMPANIES
+
+
+def test_offline_loaders(store):
+    cl = store.loaders()
+    assert cl.get_acs_race("6221", "36") == CACHE[("acs_race", "6221", "36")]
+    assert cl.get_county_cbsa("99999") is None
+    assert cl.hits == 2 and cl.misses == 0
+    with pytest.raises(feature_store.FeatureStoreMiss):
+        cl.get_lodes_race("06037")
+    with pytest.raises(feature_store.FeatureStoreMiss):
+        cl.get_transit_score("10001")
+    with pytest.raises(feature_store.FeatureStoreMiss):
+        store.companies("v11_all")
+
+
+def test_stale_sources(store, monkeypatch):
+    assert store.stale_sources() == []
+    current = dict(store.manifest["sources"], **{"new.json": {"size": 1, "mtime": 0}})
+    monkeypatch.setattr(feature_store, "_source_stats", lambda: current)
+    assert store.stale_sources() == ["new.json"]
+
+
+def test_run_scripts_load_inputs_from_store(store, monkeypatch):
+    import run_v9_2
+    import run_v10
+
+    def no_db():
+        raise AssertionError("--feature-store must not connect")
+
+    monkeypatch.setattr(run_v9_2, "get_connection", no_db)
+    monkeypatch.setattr(feature_store, "open_store", lambda: store)
+    assert run_v10.load_inputs is run_v9_2.load_inputs
+    rec_lookup, cl, conn = run_v9_2.load_inputs(feature_store=True)
+    assert conn is None and rec_lookup == REC_LOOKUP
+    assert isinstance(cl, feature_store.FeatureStoreLoaders)
+    assert cl.get_lodes_race("36061") == {"White": 48.0, "Black": 30.0}
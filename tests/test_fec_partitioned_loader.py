@@ -0,0 +1,144 @@
+"""Tests for scripts/etl/load_fec_indiv_partitioned.py (no DB needed).
+
+The vectorized normalizers must produce exactly what the per-row
+load_fec._norm_* helpers produce, so a cycle loaded through the partitioned
+path joins to master_employers the same way the heap-table path did.
+"""
+import sys
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import scripts.etl.load_fec as fec  # noqa: E402
+import scripts.etl.load_fec_indiv_partitioned as part  # noqa: E402
+
+
+EMPLOYERS = [
+    "Walmart Inc.", "WALMART INC", "  Smith & Jones, L.L.C.  ", "Acme Corp",
+    "ACME CORPORATION", "Self-Employed", "RETIRED", "N/A", "", "Big Co.",
+    "Foo Company", "Bar LP", "Baz, Ltd", "Law PLLC", "Doc PC", "O'Neil & Sons",
+    "INFORMATION REQUESTED PER BEST EFFORTS", "...", "Café Nouveau LLC",
+]
+
+
+def test_employer_norm_matches_scalar_helper():
+    got = part.normalize_employer_series(pd.Series(EMPLOYERS)).tolist()
+    assert got == [fec._norm_employer(e) for e in EMPLOYERS]
+
+
+def test_state_and_truncate_match_scalar_helpers():
+    states = ["ny", " CA ", "C1", "", "TEXAS", "x"]
+    assert part.state_series(pd.Series(states)).tolist() == [fec._norm_state(s) for s in states]
+    vals = ["  abc  ", "", "   ", "abcdefghijk"]
+    assert part.truncate_series(pd.Series(vals), 5).tolist() == [fec._truncate(v, 5) for v in vals]
+
+
+def test_date_series_rejects_out_of_range_years():
+    raw = ["01152024", "13452024", "01152199", "0115202", "", "06301979"]
+    got = part.date_series(pd.Series(raw)).tolist()
+    expected = [d.isoformat() if d else None for d in (fec._norm_date(v) for v in raw)]
+    assert got == expected
+
+
+def test_int_series_keeps_19_digit_sub_ids_exact():
+    got = part.int_series(pd.Series(["4123120231234567891", " 42 ", "x1", ""])).tolist()
+    assert got == ["4123120231234567891", "42", None, None]
+
+
+def test_chunks_stream_from_zip(tmp_path):
+    rows = [
+        "C001|N|Q1|P|123|15|IND|DOE, JOHN|NYC|ny|10001|Walmart Inc.|CLERK|01152024|250.50||T1|1234|||4123120231234567890",
+        "C002|A|Q2|G|124|15|IND|ROE \"JANE\"|LA|CA|90001|RETIRED|X|02012024|10||T2||X|memo|4123120231234567891",
+        "C003|N|Q1|P|125|15|IND|A|B|CA|9|Acme|Y|01152024|5||T3|7|||4123120231234567892",
+    ]
+    zpath = tmp_path / "indiv24.zip"
+    with zipfile.ZipFile(zpath, "w") as z:
+        z.writestr("itcont.txt", "\n".join(rows) + "\n")
+
+    chunks = list(part.iter_indiv_chunks(zpath, chunk_rows=2))
+    assert [len(c) for c in chunks] == [2, 1]
+
+    out = part.normalize_chunk(pd.concat(chunks), 2024)
+    assert list(out.columns) == part.COPY_COLS
+    assert out["cycle"].unique().tolist() == [2024]
+    assert out["sub_id"].tolist()[0] == "4123120231234567890"
+    assert out["employer_norm"].tolist() == ["WALMART", None, "ACME"]
+    assert out["name"].tolist()[1] == 'ROE "JANE"'
+
+
+def test_cycle_zip_naming():
+    assert part.cycle_zip(2024).name == "indiv24.zip"
+    assert part.partition_name(2022) == "fec_indiv_c2022"
+
+
+class _FakeCursor:
+    def __init__(self, statements, kept):
+        self.statements = statements
+        self.kept = kept
+        self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.statements.append(sql)
+        if sql.startswith("INSERT INTO"):
+            self.rowcount = self.kept
+
+    def copy_expert(self, sql, buf):
+        self.statements.append(sql)
+        self.copied = buf.read()
+
+    def fetchone(self):
+        return None
+
+
+class _FakeConn:
+    def __init__(self, kept):
+        self.statements = []
+        self.cur = _FakeCursor(self.statements, kept)
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        self.statements.append("COMMIT")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_cycle_dedupes_sub_ids_in_sql(tmp_path, monkeypatch):
+    row = "C00{n}|N|Q1|P|1|15|IND|A|B|CA|9|Acme|Y|01152024|5||T|7|||41231202312345678{sub}"
+    rows = [row.format(n=n, sub=sub) for n, sub in enumerate(["90", "91", "90", "92", "91"])]
+    zpath = tmp_path / "indiv24.zip"
+    with zipfile.ZipFile(zpath, "w") as z:
+        z.writestr("itcont.txt", "\n".join(rows) + "\n")
+    monkeypatch.setattr(part, "cycle_zip", lambda cycle: zpath)
+    conn = _FakeConn(kept=3)
+    monkeypatch.setattr(part, "get_connection", lambda: conn)
+
+    result = part.load_cycle(2024, chunk_rows=2)
+
+    # Chunks of 2 hold no repeats, so every parsed row reaches the raw table
+    copies = [s for s in conn.statements if s.startswith("COPY")]
+    assert len(copies) == 3
+    raw = copies[0].split()[1]
+    assert raw.endswith("_raw") and raw.startswith("fec_indiv_c2024_")
+    create = next(s for s in conn.statements if s.startswith(f"CREATE UNLOGGED TABLE {raw}"))
+    assert "raw_seq BIGINT GENERATED ALWAYS AS IDENTITY" in create
+
+    staging = raw[:-len("_raw")]
+    insert = next(s for s in conn.statements if s.startswith("INSERT INTO"))
+    assert insert.startswith(f"INSERT INTO {staging} (")
+    assert f"SELECT DISTINCT ON (sub_id) {', '.join(part.COPY_COLS)} FROM {raw}" in insert
+    assert insert.endswith("ORDER BY sub_id, raw_seq ON CONFLICT DO NOTHING")
+    assert conn.statements.index(f"ALTER TABLE {staging} ADD PRIMARY KEY (sub_id, cycle)") < \
+        conn.statements.index(insert)
+    assert f"DROP TABLE {raw}" in conn.statements
+    assert (result["rows"], result["skipped"], result["status"]) == (3, 2, "attached")
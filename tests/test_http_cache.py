@@ -0,0 +1,125 @@
+"""Tests for ETag / conditional GET (api/http_cache.py) and FastJSONResponse (no DB)."""
+import inspect
+import re
+import sys
+from pathlib import Path
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api import http_cache  # noqa: E402
+from api.middleware.compression import CompressionMiddleware  # noqa: E402
+from api.responses import FastJSONResponse  # noqa: E402
+from api.routers import profile  # noqa: E402
+from api.services import entity_context  # noqa: E402
+
+
+def _app(calls):
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/rows")
+    def rows(version=Depends(http_cache.etag_for("big_table"))):
+        calls.append(version)
+        return {"rows": [{"id": i, "name": f"row {i}"} for i in range(500)]}
+
+    @app.get("/export/{media}")
+    def export(media: str):
+        media_type = {"gz": "application/gzip", "parquet": "application/vnd.apache.parquet",
+                      "csv": "text/csv"}[media]
+        return StreamingResponse(iter([b"x" * 4096, b"y" * 4096]), media_type=media_type)
+
+    return app
+
+
+def test_matching_etag_returns_304_without_running_endpoint(monkeypatch):
+    versions = iter(["v1", "v1", "v2"])
+    monkeypatch.setattr(http_cache, "data_version", lambda tables: next(versions))
+    calls = []
+    client = TestClient(_app(calls))
+
+    r = client.get("/rows")
+    etag = r.headers["ETag"]
+    assert r.status_code == 200 and r.headers["Cache-Control"] == "no-cache"
+    assert etag.startswith('W/"')
+    assert calls == ["v1"]
+
+    r = client.get("/rows", headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.content == b"" and r.headers["ETag"] == etag
+    assert calls == ["v1"]
+
+    # New data version: full response with a new tag
+    r = client.get("/rows", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["ETag"] != etag
+    assert calls == ["v1", "v2"]
+
+
+def test_no_etag_when_version_unknown(monkeypatch):
+    monkeypatch.setattr(http_cache, "data_version", lambda tables: None)
+    calls = []
+    r = TestClient(_app(calls)).get("/rows", headers={"If-None-Match": "*"})
+    assert r.status_code == 200 and "ETag" not in r.headers
+    assert calls == [None]
+
+
+def test_large_payload_is_gzipped(monkeypatch):
+    monkeypatch.setattr(http_cache, "data_version", lambda tables: "v1")
+    r = TestClient(_app([])).get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert len(r.json()["rows"]) == 500
+
+
+def test_precompressed_exports_are_not_gzipped_again():
+    client = TestClient(_app([]))
+    for media in ("gz", "parquet"):
+        r = client.get(f"/export/{media}", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in r.headers
+        assert r.content == b"x" * 4096 + b"y" * 4096
+    r = client.get("/export/csv", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+
+
+def test_if_none_match_parsing():
+    etag = 'W/"abc123"'
+    assert http_cache._matches('W/"abc123"', etag)
+    assert http_cache._matches('"abc123"', etag)
+    assert http_cache._matches('"zzz", W/"abc123"', etag)
+    assert http_cache._matches("*", etag)
+    assert not http_cache._matches('"abc123-gzip"', etag)
+    assert not http_cache._matches('W/"abc1234"', etag)
+
+
+def test_fast_json_response():
+    body = FastJSONResponse({"a": [1, 2.5, None], 3: "x", "nan": float("nan")}).body
+    assert body == b'{"a":[1,2.5,null],"3":"x","nan":null}'
+    # Values orjson rejects fall back to the stdlib encoder
+    assert FastJSONResponse({"big": 2 ** 70}).body == b'{"big":1180591620717411303424}'
+
+
+def _reachable_functions(fn, modules, seen):
+    """Functions in `modules` reachable from `fn` by direct calls."""
+    if fn.__name__ in seen:
+        return seen
+    seen[fn.__name__] = fn
+    for name in set(re.findall(r"\b([A-Za-z_]\w*)\(", inspect.getsource(fn))):
+        for module in modules:
+            callee = getattr(module, name, None)
+            if inspect.isfunction(callee) and callee.__module__ == module.__name__:
+                _reachable_functions(callee, modules, seen)
+    return seen
+
+
+def test_profile_etag_covers_every_table_the_route_reads():
+    funcs = _reachable_functions(inspect.unwrap(profile.get_employer_profile),
+                                 (profile, entity_context), {})
+    assert "build_entity_context_for_f7" in funcs
+    read = set()
+    for fn in funcs.values():
+        src = inspect.getsource(fn)
+        ctes = set(re.findall(r"\b([a-z_]\w*)\s+AS\s*\(", src, re.IGNORECASE))
+        read |= set(re.findall(r"\b(?:FROM|JOIN)\s+([a-z_][a-z0-9_]*)\b", src)) - ctes
+    assert read - set(profile._PROFILE_TABLES) == set()
@@ -0,0 +1,108 @@
+"""Tests for keyset pagination / count helpers in api/helpers.py (no DB)."""
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api import helpers  # noqa: E402
+from api.helpers import (  # noqa: E402
+    SortKey, count_total, decode_cursor, encode_cursor, keyset_order_by,
+    keyset_page, keyset_select, keyset_where,
+)
+
+KEYS = [
+    SortKey("score", desc=True, nullable=False),
+    SortKey("penalties", desc=True),
+    SortKey("id", nullable=False),
+]
+
+
+def test_order_by_and_select():
+    assert keyset_order_by(KEYS) == "score DESC, penalties DESC NULLS LAST, id ASC"
+    assert keyset_select(KEYS) == ", score AS _k0, penalties AS _k1, id AS _k2"
+
+
+def test_cursor_round_trip_and_tamper():
+    cur = encode_cursor(KEYS, [Decimal("12.50"), None, "abc"])
+    assert decode_cursor(KEYS, cur) == ["12.50", None, "abc"]
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(KEYS[:2], cur)
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException):
+        decode_cursor(KEYS, "not-a-cursor")
+
+
+def test_no_cursor_is_true():
+    assert keyset_where(KEYS, None) == ("TRUE", [])
+
+
+def test_mixed_direction_predicate():
+    sql, params = keyset_where(KEYS, encode_cursor(KEYS, [50, 100, "x"]))
+    assert sql == ("((score < %s) OR (score = %s AND (penalties < %s OR penalties IS NULL))"
+                   " OR (score = %s AND penalties = %s AND id > %s))")
+    assert params == [50, 50, 100, 50, 100, "x"]
+
+
+def test_null_cursor_value_skips_after_term():
+    sql, params = keyset_where(KEYS, encode_cursor(KEYS, [50, None, "x"]))
+    assert sql == "((score < %s) OR (score = %s AND penalties IS NULL AND id > %s))"
+    assert params == [50, 50, "x"]
+
+
+def test_uniform_non_null_uses_row_comparison():
+    keys = [SortKey("density", desc=True, nullable=False), SortKey("fips", desc=True, nullable=False)]
+    sql, params = keyset_where(keys, encode_cursor(keys, [0.5, "36001"]))
+    assert sql == "((density, fips) < (%s, %s))"
+    assert params == [0.5, "36001"]
+
+
+def test_keyset_page_strips_keys_and_sets_cursor():
+    rows = [{"id": i, "_k0": 10 - i, "_k1": None, "_k2": i} for i in range(3)]
+    out, nxt = keyset_page(rows, KEYS, limit=3)
+    assert all("_k0" not in r for r in out)
+    assert decode_cursor(KEYS, nxt) == [8, None, 2]
+
+    out, nxt = keyset_page([{"id": 1, "_k0": 1, "_k1": 1, "_k2": 1}], KEYS, limit=3)
+    assert nxt is None
+
+
+class _FakeCursor:
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+
+    def fetchone(self):
+        return self.row
+
+
+def test_count_total_modes():
+    helpers._count_cache.clear()
+    cur = _FakeCursor({"cnt": 42})
+    assert count_total(cur, "FROM t WHERE a = %s", [1]) == (42, False)
+    assert count_total(cur, "FROM t WHERE a = %s", [1]) == (42, False)
+    assert len(cur.executed) == 1  # second call served from cache
+
+    cur = _FakeCursor({"QUERY PLAN": [{"Plan": {"Plan Rows": 1234}}]})
+    assert count_total(cur, "FROM t", [], "estimate") == (1234, True)
+    assert cur.executed[0].startswith("EXPLAIN")
+
+    assert count_total(_FakeCursor(None), "FROM t", [], "none") == (None, False)
+    with pytest.raises(HTTPException):
+        count_total(_FakeCursor(None), "FROM t", [], "bogus")
+
+
+def test_ttlcache_max_entries():
+    cache = helpers.TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2 and cache.get("c") == 3
@@ -0,0 +1,90 @@
+"""Tests for the streaming blocking engine (scripts/llm_dedup/blocking_engine.py)."""
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEDUP_DIR = ROOT / "scripts" / "llm_dedup"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(DEDUP_DIR))
+
+import blocking_engine  # noqa: E402
+
+blocking = blocking_engine.blocking
+
+WORDS = ["Acme", "Hospital", "St Marys", "Mgmt", "Group", "Health", "Bldg", "Corp", "Services", "12"]
+
+
+def _records(n, seed=7):
+    rng = random.Random(seed)
+    recs = []
+    for i in range(n):
+        name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).lower()
+        recs.append({
+            "master_id": 1000 + (i * 7919) % n, "canonical_name": name, "display_name": name.title(),
+            "ein": rng.choice([None, "11", "22"]), "zip": rng.choice([None, "10001", "11201"]),
+            "city": rng.choice([None, "Albany", "Buffalo"]), "naics": rng.choice([None, "6221", "4451"]),
+            "source_origin": rng.choice(["f7", "osha"]), "employee_count": rng.choice([None, 10, 250]),
+        })
+    return recs
+
+
+def _old_candidates(records):
+    merged = {}
+    for fn in (blocking.block_ein, blocking.block_exact_name, blocking.block_normalized_name,
+               blocking.block_sorted_tokens, blocking.block_zip_name_prefix,
+               blocking.block_city_name_prefix):
+        for key, methods in fn(records).items():
+            merged.setdefault(key, set()).update(methods)
+    return merged
+
+
+def test_matches_in_memory_blocking_without_windows(tmp_path):
+    records = _records(600)
+    by_id = {r["master_id"]: r for r in records}
+    expected = _old_candidates(records)
+
+    got = {}
+    for cand in blocking_engine.iter_scored_pairs(
+            records, sim=blocking.string_sim, window=0, spill_dir=str(tmp_path), partitions=5):
+        key = (cand["id1"], cand["id2"])
+        assert key not in got
+        got[key] = cand
+    assert set(got) == set(expected)
+    for (id1, id2), cand in got.items():
+        assert id1 < id2
+        assert cand["blocking_methods"] == sorted(expected[(id1, id2)])
+        assert cand["scores"] == blocking.score_pair(by_id[id1], by_id[id2])
+    assert list(tmp_path.iterdir()) == []  # spill cleaned up
+
+
+def test_oversized_blocks_use_sorted_neighborhood():
+    members = list(range(50))
+    sort_key = lambda i: -i  # noqa: E731
+    pairs = list(blocking_engine.block_pairs(members, sort_key, max_block=10, window=3))
+    assert len(pairs) == 3 * 50 - (1 + 2 + 3)
+    assert all(a < b and b - a <= 3 for a, b in pairs)
+    assert list(blocking_engine.block_pairs(members, sort_key, max_block=10, window=0)) == []
+    assert list(blocking_engine.block_pairs(members, sort_key, max_block=10,
+                                            max_window_block=40)) == []
+    assert len(list(blocking_engine.block_pairs(members[:10], sort_key, max_block=10))) == 45
+
+
+def test_stats_and_spill_merge():
+    records = [{"master_id": i, "canonical_name": "acme", "ein": "11"} for i in range(30)]
+    stats = {}
+    cands = list(blocking_engine.iter_candidates(
+        records, max_block=5, window=2, partitions=3, stats=stats))
+    # Every strategy that fires puts the same windowed pairs in one block.
+    assert len(cands) == 2 * 30 - 3
+    assert {tuple(m) for _, _, m in cands} == {
+        ("ein_exact", "exact_name", "normalized_name", "sorted_tokens")}
+    assert stats["ein_exact"] == {"pairs": 57, "blocks": 1, "windowed_blocks": 1, "skipped_blocks": 0}
+    assert stats["zip_name_prefix"]["pairs"] == 0
+
+
+def test_rapidfuzz_sim_bounds():
+    assert blocking_engine.rapidfuzz_sim("", "acme") == 0.0
+    assert blocking_engine.rapidfuzz_sim("acme", "acme") == 1.0
+    assert blocking_engine.rapidfuzz_sim("acme health", "acme hospital") >= \
+        blocking.string_sim("acme health", "acme hospital") - 1e-9
@@ -0,0 +1,57 @@
+"""Tests for the shared LLM response store (llm_response_store.py)."""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from llm_response_store import ResponseStore, payload_hash  # noqa: E402
+
+
+def test_payload_hash_ignores_key_order():
+    a = {"messages": [{"role": "user", "content": "A vs B"}], "max_tokens": 400}
+    b = {"max_tokens": 400, "messages": [{"content": "A vs B", "role": "user"}]}
+    assert payload_hash(a) == payload_hash(b)
+    assert payload_hash(a) != payload_hash(dict(a, max_tokens=401))
+
+
+def test_get_put_and_counters(tmp_path):
+    with ResponseStore(str(tmp_path / "store.sqlite")) as store:
+        assert store.get("haiku", "v1", "h1") is None
+        store.put("haiku", "v1", "h1", '{"label": "DUPLICATE"}')
+        store.put_many("haiku", "v1", [("h2", [0.1, 0.2]), ("h3", {"text": "x"})])
+        assert store.get("haiku", "v1", "h1") == '{"label": "DUPLICATE"}'
+        found = store.get_many("haiku", "v1", ["h2", "h3", "h4", "h2"])
+        assert found == {"h2": [0.1, 0.2], "h3": {"text": "x"}}
+        assert (store.hits, store.misses, store.stored) == (3, 2, 3)
+        assert store.count() == 3
+        assert store.summary("pairs", cost_per_call=0.5) == (
+            "Response store: 3 of 5 pairs already answered (60.0%), 2 to call, ~$1.50 saved")
+
+
+def test_model_and_prompt_version_isolate_entries(tmp_path):
+    path = str(tmp_path / "store.sqlite")
+    with ResponseStore(path) as store:
+        store.put("haiku", "v1", "h1", "old")
+    with ResponseStore(path) as store:
+        assert store.get("haiku", "v1", "h1") == "old"
+        assert store.get("haiku", "v2", "h1") is None
+        assert store.get("sonnet", "v1", "h1") is None
+        assert store.count(prompt_version="v2") == 0
+
+
+def test_batch_result_entry_reads_like_an_api_result(tmp_path):
+    import json
+
+    from llm_response_store import batch_result_entry
+    from scripts.llm_dedup.analyze_validation_results import load_results
+
+    text = '{"label": "DUPLICATE", "confidence": "HIGH", "reasoning": "same EIN"}'
+    results = tmp_path / "results.jsonl"
+    results.write_text(json.dumps(batch_result_entry("pair-1", text, "haiku")) + "\n")
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"pair_lookup": {"pair-1": {"id1": 1, "id2": 2}}}))
+
+    (row,) = load_results(str(results), str(manifest))
+    assert row["custom_id"] == "pair-1" and (row["id1"], row["id2"]) == (1, 2)
+    assert row["label"] == "DUPLICATE" and row["confidence"] == "HIGH"
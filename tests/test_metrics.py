@@ -0,0 +1,119 @@
+"""Tests for the Prometheus instruments in api/metrics.py (no DB)."""
+import sys
+import types
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+pytest.importorskip("prometheus_client")
+
+from api import metrics  # noqa: E402
+from api.helpers import TTLCache  # noqa: E402
+from api.middleware.pipeline import RequestPipelineMiddleware  # noqa: E402
+
+
+def _sample(name, **labels):
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_request_latency_is_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(RequestPipelineMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    labels = dict(method="GET", route="/items/{item_id}", status="200")
+    before = _sample("api_request_duration_seconds_count", **labels)
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/no-such-path")
+    assert _sample("api_request_duration_seconds_count", **labels) == before + 2
+    assert _sample("api_request_duration_seconds_count",
+                   method="GET", route="<unmatched>", status="404") >= 1
+    assert _sample("api_requests_in_flight") == 0
+
+    body, content_type = metrics.render()
+    assert content_type.startswith("text/plain")
+    assert b'route="/items/{item_id}"' in body
+
+
+def test_ttl_cache_counts_hits_and_misses(monkeypatch):
+    cache = TTLCache(ttl_seconds=60, name="test_cache")
+    cache.get("a")
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    monkeypatch.setattr("api.helpers.time.time", lambda: 10**12)
+    assert cache.get("a") is None  # expired
+    assert _sample("cache_requests_total", cache="test_cache", result="hit") == 1
+    assert _sample("cache_requests_total", cache="test_cache", result="miss") == 2
+
+
+def test_research_gauge_returns_to_zero_after_success_and_failure(monkeypatch):
+    from api.routers import research
+
+    def run_research(run_id):
+        assert _sample("research_runs_active") == 1
+        if run_id == 2:
+            raise RuntimeError("agent crashed")
+
+    agent = types.ModuleType("scripts.research.agent")
+    agent.run_research = run_research
+    monkeypatch.setitem(sys.modules, "scripts.research.agent", agent)
+    conn = MagicMock()
+
+    @contextmanager
+    def fake_db():
+        yield conn
+
+    monkeypatch.setattr(research, "get_db", fake_db)
+    completed = _sample("research_runs_total", outcome="completed")
+    failed = _sample("research_runs_total", outcome="failed")
+
+    research._run_research_background(1)
+    assert _sample("research_runs_active") == 0
+    research._run_research_background(2)
+    assert _sample("research_runs_active") == 0
+    assert _sample("research_runs_total", outcome="completed") == completed + 1
+    assert _sample("research_runs_total", outcome="failed") == failed + 1
+    assert conn.cursor.return_value.__enter__.return_value.execute.called
+
+    # Even when marking the run failed raises, the gauge is released
+    monkeypatch.setattr(research, "get_db", MagicMock(side_effect=RuntimeError("db down")))
+    with pytest.raises(RuntimeError, match="db down"):
+        research._run_research_background(2)
+    assert _sample("research_runs_active") == 0
+
+
+def _metrics_client(monkeypatch, jwt_secret, token):
+    from api.routers import system
+    monkeypatch.setattr(system, "JWT_SECRET", jwt_secret)
+    monkeypatch.setattr(system, "METRICS_TOKEN", token)
+    app = FastAPI()
+    app.include_router(system.router)
+    return TestClient(app)
+
+
+def test_metrics_endpoint_requires_token_when_auth_enabled(monkeypatch):
+    client = _metrics_client(monkeypatch, "x" * 32, "")
+    assert client.get("/metrics").status_code == 503
+
+    client = _metrics_client(monkeypatch, "x" * 32, "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    r = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert r.status_code == 200 and b"api_requests_in_flight" in r.content
+
+
+def test_metrics_endpoint_open_when_auth_disabled(monkeypatch):
+    assert _metrics_client(monkeypatch, "", "").get("/metrics").status_code == 200
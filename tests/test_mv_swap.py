@@ -0,0 +1,161 @@
+"""Tests for build-then-swap SQL rewriting in scripts/scoring/_mv_swap.py (no DB)."""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from scripts.scoring import _mv_swap  # noqa: E402
+from scripts.scoring._mv_swap import (  # noqa: E402
+    _retired_name, _shadow_index_sql, _shadow_mv_sql,
+)
+from scripts.scoring._pipeline_lock import pipeline_lock  # noqa: E402
+
+
+def test_shadow_mv_sql_renames_only_the_target():
+    sql = "\nCREATE MATERIALIZED VIEW mv_unified_scorecard AS\nSELECT * FROM mv_unified_scorecard_src"
+    out = _shadow_mv_sql("mv_unified_scorecard", sql)
+    assert "CREATE MATERIALIZED VIEW mv_unified_scorecard__new AS" in out
+    assert "FROM mv_unified_scorecard_src" in out
+
+
+def test_shadow_mv_sql_rejects_other_view():
+    with pytest.raises(ValueError):
+        _shadow_mv_sql("mv_target_scorecard", "CREATE MATERIALIZED VIEW mv_other AS SELECT 1")
+
+
+def test_shadow_index_sql():
+    sql, idx = _shadow_index_sql(
+        "mv_unified_scorecard",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_us_employer_id ON mv_unified_scorecard (employer_id)",
+    )
+    assert idx == "idx_mv_us_employer_id"
+    assert sql == "CREATE UNIQUE INDEX idx_mv_us_employer_id__new ON mv_unified_scorecard__new (employer_id)"
+
+    sql, idx = _shadow_index_sql(
+        "mv_employer_search",
+        """
+        CREATE INDEX idx_mv_search_trgm
+        ON mv_employer_search USING GIN (search_name gin_trgm_ops)
+    """,
+    )
+    assert idx == "idx_mv_search_trgm"
+    assert "ON mv_employer_search__new USING GIN" in sql
+
+
+def test_scoring_index_sql_is_retargetable():
+    from scripts.scoring import build_target_scorecard, build_unified_scorecard, rebuild_search_mv
+    for mod, name in [
+        (build_unified_scorecard, "mv_unified_scorecard"),
+        (build_target_scorecard, "mv_target_scorecard"),
+        (rebuild_search_mv, "mv_employer_search"),
+    ]:
+        _shadow_mv_sql(name, mod.MV_SQL)
+        for stmt in mod.INDEX_SQL:
+            _shadow_index_sql(name, stmt)
+
+
+def test_retired_name_fits_identifier_limit():
+    name = _retired_name("idx_mv_us_strategic_delta_with_a_very_long_suffix_name", 1760000000)
+    assert len(name) <= 63
+    assert name.endswith("__old_1760000000")
+
+
+class _PgError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._result = []
+
+    def execute(self, sql, params=None):
+        conn = self.conn
+        if not conn.autocommit:
+            conn.in_transaction = True
+        conn.statements.append(sql)
+        if sql.startswith("DROP MATERIALIZED VIEW ") and _mv_swap.RETIRED_MARK in sql:
+            name = sql.split()[-1]
+            if any(dep in conn.retired for dep in conn.dependents.get(name, ())):
+                raise _PgError("2BP01")
+            conn.retired.remove(name)
+        if "pg_matviews" in sql:
+            self._result = [(name,) for name in conn.retired if _mv_swap.RETIRED_MARK in name]
+        elif "pg_index x" in sql:
+            self._result = []
+        else:
+            self._result = [(True,)]
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return list(self._result)
+
+
+class _FakeConn:
+    """psycopg2-like connection that refuses autocommit changes mid-transaction."""
+
+    closed = 0
+
+    def __init__(self, retired=(), dependents=None):
+        self._autocommit = False
+        self.in_transaction = False
+        self.statements = []
+        self.retired = list(retired)
+        self.dependents = dependents or {}
+
+    @property
+    def autocommit(self):
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        if self.in_transaction:
+            raise RuntimeError("set_session cannot be used inside a transaction")
+        self._autocommit = value
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def commit(self):
+        self.in_transaction = False
+
+    def rollback(self):
+        self.in_transaction = False
+
+
+def test_swap_build_and_refresh_inside_an_open_transaction():
+    conn = _FakeConn()
+    with pipeline_lock(conn, "unified_scorecard"):
+        assert conn.in_transaction
+        _mv_swap.swap_build(
+            conn, "mv_unified_scorecard",
+            "CREATE MATERIALIZED VIEW mv_unified_scorecard AS SELECT 1 AS employer_id",
+            ["CREATE UNIQUE INDEX idx_mv_us_employer_id ON mv_unified_scorecard (employer_id)"],
+        )
+        assert conn.autocommit is False
+        conn.cursor().execute("SELECT 1")
+        _mv_swap.refresh_concurrently(conn, "mv_unified_scorecard")
+        assert conn.autocommit is False
+    assert "ALTER MATERIALIZED VIEW mv_unified_scorecard__new RENAME TO mv_unified_scorecard" \
+        in conn.statements
+    assert "REFRESH MATERIALIZED VIEW CONCURRENTLY mv_unified_scorecard" in conn.statements
+
+
+def test_drop_retired_repeats_until_dependents_are_gone():
+    unified, search = "mv_unified_scorecard__old_1", "mv_employer_search__old_1"
+    conn = _FakeConn(retired=[unified, search], dependents={unified: [search]})
+    _mv_swap.drop_retired(conn)
+    assert conn.retired == []
+
+    # A retired copy a live MV still reads is kept (the live MV is never listed)
+    conn = _FakeConn(retired=[unified, "mv_employer_search"],
+                     dependents={unified: ["mv_employer_search"]})
+    _mv_swap.drop_retired(conn)
+    assert conn.retired == [unified, "mv_employer_search"]
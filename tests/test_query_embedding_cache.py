@@ -0,0 +1,140 @@
+"""Tests for the semantic-search query embedding cache (api/services/query_embedding_cache.py, no DB)."""
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api.services import query_embedding_cache as qec  # noqa: E402
+
+MODEL, TASK = "gemini-embedding-001", "RETRIEVAL_QUERY"
+
+
+class _FakeTable:
+    """Just enough of cba_query_embeddings for the cache's statements."""
+
+    def __init__(self, rows=None, broken=False):
+        self.rows = dict(rows or {})   # key -> [embedding, hit_count]
+        self.broken = broken
+        self.statements = []
+
+    @contextmanager
+    def get_db(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield _FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+
+class _FakeCursor:
+    def __init__(self, table):
+        self.table = table
+        self.connection = table
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.table.statements.append(" ".join(sql.split())[:30])
+        if self.table.broken:
+            raise RuntimeError("permission denied")
+        if "CREATE TABLE" in sql:
+            return
+        if sql.lstrip().startswith("SELECT"):
+            ranked = sorted(self.table.rows.items(), key=lambda kv: -kv[1][1])[:params[0]]
+            self._result = [{"model": k[0], "task_type": k[1], "query_norm": k[2], "embedding": v[0]}
+                            for k, v in ranked]
+        elif "RETURNING" in sql:
+            row = self.table.rows.get(tuple(params))
+            if row:
+                row[1] += 1
+            self._result = [{"embedding": row[0]}] if row else []
+        elif sql.lstrip().startswith("INSERT"):
+            self.table.rows[tuple(params[:3])] = [params[3], 1]
+        else:  # hit count flush
+            self.table.rows[tuple(params[1:])][1] += params[0]
+
+    def executemany(self, sql, seq):
+        for params in seq:
+            self.execute(sql, params)
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture
+def table(monkeypatch):
+    fake = _FakeTable()
+    monkeypatch.setattr(qec, "get_db", fake.get_db)
+    qec.clear_cache()
+    yield fake
+    qec.clear_cache()
+
+
+def _embedder(calls):
+    def embed(text):
+        calls.append(text)
+        return [float(len(text)), 0.5]
+    return embed
+
+
+def test_normalize_query():
+    assert qec.normalize_query("  Sick\tLEAVE \n policy ") == "sick leave policy"
+    assert qec.normalize_query("ＳＥＮＩＯＲＩＴＹ") == "seniority"
+
+
+def test_lookup_order_and_sources(table):
+    calls = []
+    embed = _embedder(calls)
+
+    vec, source = qec.get_query_embedding("Sick Leave", MODEL, TASK, embed)
+    assert source == "api" and calls == ["sick leave"]
+    assert table.rows[(MODEL, TASK, "sick leave")] == [vec, 1]
+
+    assert qec.get_query_embedding("sick  leave", MODEL, TASK, embed) == (vec, "memory")
+
+    # A new process (empty LRU) is served from the table without calling the API.
+    qec.clear_cache()
+    assert qec.get_query_embedding("SICK LEAVE", MODEL, TASK, embed) == (vec, "table")
+    assert calls == ["sick leave"]
+    # Task type is part of the key.
+    assert qec.get_query_embedding("sick leave", MODEL, "CLASSIFICATION", embed)[1] == "api"
+
+
+def test_prewarm_and_hit_counts(table, monkeypatch):
+    table.rows = {(MODEL, TASK, "overtime"): [[1.0], 9], (MODEL, TASK, "seniority"): [[2.0], 3]}
+    monkeypatch.setattr(qec, "HIT_FLUSH_EVERY", 3)
+    calls = []
+
+    assert qec.get_query_embedding("pensions", MODEL, TASK, _embedder(calls))[1] == "api"
+    # The first table lookup loaded the most-hit rows into the LRU.
+    assert qec.get_query_embedding("Overtime", MODEL, TASK, _embedder(calls)) == ([1.0], "memory")
+    for _ in range(2):
+        qec.get_query_embedding("seniority", MODEL, TASK, _embedder(calls))
+    assert table.rows[(MODEL, TASK, "overtime")][1] == 10
+    assert table.rows[(MODEL, TASK, "seniority")][1] == 5
+
+
+def test_table_errors_fall_back_to_api(table):
+    table.broken = True
+    calls = []
+    vec, source = qec.get_query_embedding("layoffs", MODEL, TASK, _embedder(calls))
+    assert source == "api" and calls == ["layoffs"]
+    assert qec.get_query_embedding("layoffs", MODEL, TASK, _embedder(calls)) == (vec, "memory")
+
+
+def test_lru_evicts_least_recently_used():
+    lru = qec.LRUCache(2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+    assert lru.get("b") is None and lru.get("a") == 1 and len(lru) == 2
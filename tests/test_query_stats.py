@@ -0,0 +1,80 @@
+"""Tests for per-request SQL instrumentation (api/query_stats.py, no DB)."""
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api import query_stats  # noqa: E402
+from api.middleware.pipeline import RequestPipelineMiddleware  # noqa: E402
+
+
+def test_stats_track_count_total_and_slowest():
+    stats = query_stats.RequestQueryStats("/x")
+    stats.record("SELECT 1", 2.0)
+    stats.record("SELECT  *\n FROM big", 7.5)
+    stats.record("SELECT 2", 1.0)
+    assert (stats.count, stats.total_ms, stats.slowest_ms) == (3, 10.5, 7.5)
+    assert stats.server_timing(12.0) == 'app;dur=12.0, db;dur=10.5;desc="3 queries", db-slowest;dur=7.5'
+    assert stats.log_fields()["db_slowest_sql"] == "SELECT * FROM big"
+
+
+def test_middleware_scopes_stats_to_sync_endpoints():
+    app = FastAPI()
+    app.add_middleware(RequestPipelineMiddleware)
+
+    @app.get("/q")
+    def endpoint():
+        stats = query_stats.current_stats()
+        stats.record("SELECT 1", 4.0)
+        stats.record("SELECT 2", 1.0)
+        return {"path": stats.path}
+
+    r = TestClient(app).get("/q")
+    assert r.json() == {"path": "/q"}
+    timing = r.headers["Server-Timing"]
+    assert 'db;dur=5.0;desc="2 queries"' in timing and "db-slowest;dur=4.0" in timing
+    assert query_stats.current_stats() is None
+
+
+class _FakeCursor:
+    def mogrify(self, sql, vars):
+        return (sql % tuple(repr(v) for v in vars)).encode()
+
+
+def test_sampler_only_queues_read_only_statements_once_per_cooldown(monkeypatch):
+    sampler = query_stats.ExplainSampler(sample_rate=1.0, cooldown=600)
+    monkeypatch.setattr(sampler, "_ensure_worker", lambda: None)
+    cur = _FakeCursor()
+
+    assert not sampler.offer(cur, "UPDATE t SET a = %s", [1], 900, "/x")
+    assert not sampler.offer(cur, "SELECT * FROM t FOR UPDATE", None, 900, "/x")
+    assert sampler.offer(cur, "SELECT * FROM t WHERE id = %s", [7], 900, "/x")
+    assert not sampler.offer(cur, "SELECT *  FROM t WHERE id = %s", [8], 900, "/x")
+
+    job = sampler._queue.get_nowait()
+    assert job["statement"] == "SELECT * FROM t WHERE id = 7"
+    assert job["duration_ms"] == 900 and job["path"] == "/x"
+    assert sampler._queue.empty()
+
+
+def test_sampler_forgets_expired_and_excess_fingerprints(monkeypatch):
+    sampler = query_stats.ExplainSampler(sample_rate=1.0, cooldown=600)
+    monkeypatch.setattr(sampler, "_ensure_worker", lambda: None)
+    monkeypatch.setattr(query_stats, "MAX_TRACKED_FINGERPRINTS", 3)
+    clock = [1000.0]
+    monkeypatch.setattr(query_stats.time, "monotonic", lambda: clock[0])
+    cur = _FakeCursor()
+
+    for table in ("a", "b", "c", "d"):
+        sampler.offer(cur, f"SELECT * FROM {table}", None, 900, "/x")
+        clock[0] += 1
+    tracked = {query_stats.fingerprint(f"SELECT * FROM {t}") for t in ("b", "c", "d")}
+    assert set(sampler._last_sampled) == tracked
+
+    clock[0] += 600
+    sampler.offer(cur, "SELECT * FROM e", None, 900, "/x")
+    assert list(sampler._last_sampled) == [query_stats.fingerprint("SELECT * FROM e")]
@@ -0,0 +1,102 @@
+"""Tests for the memory-mapped QWI cache (scripts/analysis/demographics_comparison/qwi_binary.py)."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+DEMO_DIR = ROOT / "scripts" / "analysis" / "demographics_comparison"
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(DEMO_DIR))
+
+import qwi_binary  # noqa: E402
+
+CACHE = {
+    "metadata": {"n_primary_cells": 3, "coverage": {"race": 2, "hispanic": 2, "gender": 2}},
+    "primary": {
+        "36061:6221": {
+            "county": "36061", "naics4": "6221", "emp": 5123.4,
+            "race": {"White": 55.1234, "Black": 30.0, "AIAN": 0.5, "Asian": 14.3766},
+            "hispanic": {"Hispanic": 22.5, "Not Hispanic": 77.5},
+            "gender": {"Male": 25.0, "Female": 75.0},
+        },
+        "36061:4451": {
+            "county": "36061", "naics4": "4451", "emp": 812.0,
+            "gender": {"Male": 48.25, "Female": 51.75},
+        },
+        "06037:6221": {
+            "county": "06037", "naics4": "6221", "emp": 15.0,
+            "race": {"White": 60.0, "Asian": 40.0},
+            "hispanic": {"Hispanic": 41.0, "Not Hispanic": 59.0},
+        },
+    },
+    "fallbacks": {
+        "county_n2": {"36061:44": {"race": {"White": 70.0, "Black": 20.0, "Asian": 10.0}}},
+        "county_all": {"36061": {"race": {"White": 65.0, "Black": 35.0},
+                                 "hispanic": {"Hispanic": 20.0, "Not Hispanic": 80.0}}},
+        "state_n4": {"36:4451": {"hispanic": {"Hispanic": 18.0, "Not Hispanic": 82.0}}},
+        "state_n2": {"06:62": {"gender": {"Male": 30.0, "Female": 70.0}}},
+    },
+}
+
+QUERIES = [
+    ("36061", "6221"), ("36061", "4451"), ("36061", "4452"), ("06037", "6221"),
+    ("06037", "6222"), ("36047", "4451"), ("99999", "1111"), ("", ""),
+]
+
+
+@pytest.fixture
+def caches(tmp_path):
+    from run_v12_qwi import QWICache
+
+    json_path = tmp_path / "qwi.json"
+    json_path.write_text(json.dumps(CACHE))
+    bin_path = tmp_path / "qwi.npy"
+    assert qwi_binary.convert(str(json_path), str(bin_path)) == 7
+    return QWICache(str(json_path)), QWICache(str(bin_path))
+
+
+def test_cascade_matches_json(caches):
+    from_json, from_bin = caches
+    for county, naics4 in QUERIES:
+        for fn in ("get_race", "get_hispanic", "get_gender", "get_race_exact", "get_emp"):
+            want = getattr(from_json, fn)(county, naics4)
+            got = getattr(from_bin, fn)(county, naics4)
+            assert got == want, (fn, county, naics4)
+            if isinstance(want, dict):
+                assert list(got) == list(want)
+
+
+def test_levels_behave_like_dicts(caches):
+    _, from_bin = caches
+    assert from_bin.metadata["n_primary_cells"] == 3
+    assert len(from_bin.primary) == 3
+    assert "36061:6221" in from_bin.primary
+    assert "36061:9999" not in from_bin.primary
+    assert from_bin.primary["36061:6221"] == CACHE["primary"]["36061:6221"]
+    assert from_bin.county_all.get("00000") is None
+    with pytest.raises(KeyError):
+        from_bin.state_n2["36:62"]
+
+
+def test_inconsistent_category_order_rejected(tmp_path):
+    bad = json.loads(json.dumps(CACHE))
+    bad["fallbacks"]["county_n2"]["36061:62"] = {"race": {"Asian": 50.0, "White": 50.0}}
+    json_path = tmp_path / "bad.json"
+    json_path.write_text(json.dumps(bad))
+    with pytest.raises(ValueError):
+        qwi_binary.convert(str(json_path), str(tmp_path / "bad.npy"))
+
+
+def test_resolve_prefers_current_binary(tmp_path, monkeypatch):
+    json_path = tmp_path / "qwi.json"
+    bin_path = tmp_path / "qwi.npy"
+    json_path.write_text(json.dumps(CACHE))
+    monkeypatch.setattr(qwi_binary, "JSON_PATH", str(json_path))
+    monkeypatch.setattr(qwi_binary, "BIN_PATH", str(bin_path))
+    assert qwi_binary.resolve_cache_path() == str(json_path)
+
+    qwi_binary.convert(str(json_path), str(bin_path), verify=False)
+    assert qwi_binary.resolve_cache_path() == str(bin_path)
+    assert qwi_binary.cache_files() == [str(bin_path), str(tmp_path / "qwi.meta.json")]
@@ -0,0 +1,101 @@
+"""Tests for the sliding-window-counter rate limiter (api/middleware/rate_limit.py)."""
+import sys
+import threading
+from pathlib import Path
+
+import anyio
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api.middleware import rate_limit as rl  # noqa: E402
+
+LIMIT, WINDOW = 10, 60
+T0 = 6000.0  # start of a window
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def counters(request, tmp_path):
+    if request.param == "memory":
+        return rl.MemoryCounters()
+    return rl.SQLiteCounters(str(tmp_path / "rl.sqlite"))
+
+
+def test_limit_within_window(counters):
+    for i in range(LIMIT):
+        assert counters.hit("ip", 1, LIMIT, WINDOW, T0 + i) == 0
+    wait = counters.hit("ip", 1, LIMIT, WINDOW, T0 + 10)
+    # Nothing slides out until the next window, then 1/10 of it per 6s
+    assert wait == pytest.approx(50 + 6)
+    assert counters.hit("other", 1, LIMIT, WINDOW, T0 + 10) == 0
+
+
+def test_previous_window_slides_out(counters):
+    for i in range(LIMIT):
+        counters.hit("ip", 1, LIMIT, WINDOW, T0 + i)
+    # Halfway through the next window half of the previous 10 still count
+    now = T0 + WINDOW + 30
+    for _ in range(5):
+        assert counters.hit("ip", 1, LIMIT, WINDOW, now) == 0
+    assert counters.hit("ip", 1, LIMIT, WINDOW, now) > 0
+    # Two windows later everything has expired
+    assert counters.hit("ip", 1, LIMIT, WINDOW, T0 + 3 * WINDOW) == 0
+
+
+def test_route_costs_consume_budget(counters):
+    assert rl.request_cost("POST", "/api/research/run") > 1
+    assert rl.request_cost("GET", "/api/research/run") == 1
+    assert rl.request_cost("GET", "/api/targets/scorecard/export") > 1
+    assert counters.hit("ip", 8, LIMIT, WINDOW, T0) == 0
+    assert counters.hit("ip", 3, LIMIT, WINDOW, T0 + 1) > 0
+    assert counters.hit("ip", 2, LIMIT, WINDOW, T0 + 1) == 0
+
+
+def test_idle_keys_are_evicted():
+    counters = rl.MemoryCounters()
+    for i in range(100):
+        counters.hit(f"10.0.0.{i}", 1, LIMIT, WINDOW, T0)
+    assert len(counters) == 100
+    counters.hit("late", 1, LIMIT, WINDOW, T0 + 3 * WINDOW)
+    assert len(counters) == 1
+
+
+def test_shared_sqlite_store(tmp_path):
+    path = str(tmp_path / "rl.sqlite")
+    worker_a, worker_b = rl.SQLiteCounters(path), rl.SQLiteCounters(path)
+    for i in range(LIMIT):
+        (worker_a if i % 2 else worker_b).hit("ip", 1, LIMIT, WINDOW, T0)
+    assert worker_a.hit("ip", 1, LIMIT, WINDOW, T0) > 0
+    assert worker_b.hit("ip", 1, LIMIT, WINDOW, T0) > 0
+
+
+def test_sqlite_checks_run_off_the_event_loop(tmp_path, monkeypatch):
+    store = rl.SQLiteCounters(str(tmp_path / "rl.sqlite"))
+    threads = []
+    hit = store.hit
+
+    def recording_hit(*args):
+        threads.append(threading.current_thread())
+        return hit(*args)
+
+    monkeypatch.setattr(store, "hit", recording_hit)
+    monkeypatch.setattr(rl, "_counters", store)
+    monkeypatch.setattr(rl, "RATE_LIMIT_REQUESTS", 5)
+
+    async def burst():
+        results = []
+
+        async def one():
+            results.append(await rl.check_async("GET", "/api/x", "ip"))
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(8):
+                tg.start_soon(one)
+        return results
+
+    results = anyio.run(burst)
+    assert len(threads) == 8 and threading.main_thread() not in threads
+    # Concurrent threads share one connection; the lock keeps the count exact
+    assert sum(r is None for r in results) == 5
+    assert {r.status_code for r in results if r is not None} == {429}
@@ -0,0 +1,102 @@
+"""Tests for the MV refresh DAG in scripts/scoring/refresh_all.py (no DB)."""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from scripts.scoring.refresh_all import (  # noqa: E402
+    DagRunner, Node, build_dag, select_nodes, _check_acyclic,
+)
+
+
+def test_dag_is_acyclic_and_ordered():
+    nodes = build_dag(with_report=True)
+    names = list(nodes)
+    for n in nodes.values():
+        for d in n.deps:
+            assert d in nodes
+    # Report snapshot must precede unified; compare must follow it.
+    assert "score_change_report_snapshot" in nodes["build_unified_scorecard"].deps
+    assert "build_unified_scorecard" in nodes["score_change_report_compare"].deps
+    assert names.index("build_unified_scorecard") < names.index("rebuild_search_mv")
+
+
+def test_cycle_detected():
+    nodes = {
+        "a": Node("a", "a.py", deps=("b",)),
+        "b": Node("b", "b.py", deps=("a",)),
+    }
+    with pytest.raises(ValueError, match="Cycle"):
+        _check_acyclic(nodes)
+
+
+def test_select_from_includes_descendants():
+    nodes = build_dag()
+    sel = select_nodes(nodes, start_from=["build_employer_data_sources"])
+    assert sel == {"build_employer_data_sources", "build_unified_scorecard", "rebuild_search_mv"}
+
+    sel = select_nodes(nodes, only=["build_target_scorecard"])
+    assert sel == {"build_target_scorecard"}
+
+    sel = select_nodes(nodes, skip=("compute_gower_similarity",))
+    assert "compute_gower_similarity" not in sel
+
+    with pytest.raises(ValueError):
+        select_nodes(nodes, only=["nope"])
+
+
+def _fake_step(log, fail=(), delay=0.05):
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def step(name, script, args=()):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            log.append(("start", name))
+        time.sleep(delay)
+        with lock:
+            state["running"] -= 1
+            log.append(("end", name))
+        return delay, (1 if name in fail else 0)
+
+    return step, state
+
+
+def test_runner_respects_dependencies_and_runs_in_parallel():
+    nodes = build_dag()
+    log = []
+    step, state = _fake_step(log)
+    results = DagRunner(nodes, set(nodes), max_load=100, step_fn=step).run()
+
+    assert all(status == "ok" for status, _ in results.values())
+    order = [(kind, name) for kind, name in log]
+    for n in nodes.values():
+        for d in n.deps:
+            assert order.index(("end", d)) < order.index(("start", n.name))
+    assert state["peak"] > 1
+
+
+def test_runner_load_budget_serializes():
+    nodes = build_dag()
+    log = []
+    step, state = _fake_step(log, delay=0.01)
+    DagRunner(nodes, set(nodes), max_load=1, step_fn=step).run()
+    assert state["peak"] == 1
+
+
+def test_failure_blocks_only_dependents():
+    nodes = build_dag()
+    log = []
+    step, _ = _fake_step(log, fail={"build_employer_data_sources"})
+    results = DagRunner(nodes, set(nodes), max_load=100, step_fn=step).run()
+
+    assert results["build_employer_data_sources"][0] == "failed"
+    assert results["build_unified_scorecard"][0] == "blocked"
+    assert results["rebuild_search_mv"][0] == "blocked"
+    assert results["build_target_scorecard"][0] == "ok"
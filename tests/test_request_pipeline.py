@@ -0,0 +1,85 @@
+"""Tests for the pure-ASGI request middleware (api/middleware/pipeline.py, no DB)."""
+import sys
+import time
+from pathlib import Path
+
+import jwt
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api.middleware import auth, rate_limit  # noqa: E402
+from api.middleware.pipeline import RequestPipelineMiddleware  # noqa: E402
+
+SECRET = "test-secret-for-pipeline-tests-only!"
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(RequestPipelineMiddleware)
+
+    @app.get("/whoami")
+    def whoami(request: Request):
+        return {"user": getattr(request.state, "user", None),
+                "role": getattr(request.state, "role", None)}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"{i}\n" for i in range(1000)), media_type="text/csv")
+
+    return app
+
+
+def _token(**claims):
+    now = int(time.time())
+    return jwt.encode({"sub": "alice", "role": "read", "iat": now, "exp": now + 60, **claims},
+                      SECRET, algorithm="HS256")
+
+
+@pytest.fixture
+def auth_enabled(monkeypatch):
+    monkeypatch.setattr(auth, "JWT_SECRET", SECRET)
+    monkeypatch.setattr(auth, "_token_cache", {})
+
+
+def test_streaming_body_passes_through():
+    r = TestClient(_app()).get("/stream")
+    assert r.status_code == 200
+    assert r.text.splitlines() == [str(i) for i in range(1000)]
+    assert r.headers["Server-Timing"].startswith("app;dur=")
+
+
+def test_auth_sets_state_and_caches_token(auth_enabled, monkeypatch):
+    client = TestClient(_app())
+    assert client.get("/whoami").status_code == 401
+    headers = {"Authorization": f"Bearer {_token(role='admin')}"}
+    assert client.get("/whoami", headers=headers).json() == {"user": "alice", "role": "admin"}
+
+    def _no_decode(*args, **kwargs):
+        raise AssertionError("cached token was decoded again")
+
+    monkeypatch.setattr(jwt, "decode", _no_decode)
+    assert client.get("/whoami", headers=headers).json()["user"] == "alice"
+
+
+def test_expired_and_foreign_tokens_rejected(auth_enabled, monkeypatch):
+    client = TestClient(_app())
+    expired = _token(exp=int(time.time()) - 5)
+    assert client.get("/whoami", headers={"Authorization": f"Bearer {expired}"}).status_code == 401
+    good = _token()
+    assert client.get("/whoami", headers={"Authorization": f"Bearer {good}"}).status_code == 200
+    # A secret rotation invalidates cached verifications
+    monkeypatch.setattr(auth, "JWT_SECRET", SECRET + "-rotated")
+    assert client.get("/whoami", headers={"Authorization": f"Bearer {good}"}).status_code == 401
+
+
+def test_rate_limit_rejects_before_auth(auth_enabled, monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_REQUESTS", 2)
+    monkeypatch.setattr(rate_limit, "_counters", rate_limit.MemoryCounters())
+    client = TestClient(_app())
+    assert [client.get("/whoami").status_code for _ in range(3)] == [401, 401, 429]
+    assert int(client.get("/whoami").headers["Retry-After"]) >= 1
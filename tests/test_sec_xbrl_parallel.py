@@ -0,0 +1,170 @@
+"""Tests for scripts/etl/load_sec_xbrl.py's --workers path (no DB needed).
+
+The serial and parallel parses must COPY the same rows for the same
+companyfacts archive; only their order may differ.
+"""
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import scripts.etl.load_sec_xbrl as xbrl  # noqa: E402
+
+
+def _fact(val, end, form="10-K", fp="FY", filed="2021-02-01"):
+    return {"val": val, "end": end, "form": form, "fp": fp, "filed": filed}
+
+
+def _company(cik):
+    return {
+        "cik": cik,
+        "facts": {
+            "us-gaap": {
+                "Revenues": {"units": {"USD": [
+                    _fact(1000 * cik, "2019-12-31"),
+                    _fact(1100 * cik, "2020-12-31"),
+                    _fact(1200 * cik, "2020-12-31", form="10-K/A", filed="2021-06-01"),
+                    _fact(5, "2020-06-30", form="10-Q", fp="Q2"),
+                ]}},
+                "Assets": {"units": {"USD": [
+                    _fact(9000 * cik, "2020-12-31"),
+                    _fact(1, "2201-12-31"),  # rejected by the date bounds
+                ]}},
+            },
+            "dei": {
+                "EntityNumberOfEmployees": {"units": {"pure": [_fact(40 + cik, "2020-12-31")]}},
+            },
+        },
+    }
+
+
+@pytest.fixture
+def companyfacts(tmp_path, monkeypatch):
+    path = tmp_path / "companyfacts.zip"
+    with zipfile.ZipFile(path, "w") as z:
+        for cik in range(1, 8):
+            z.writestr(f"CIK{cik:010d}.json", json.dumps(_company(cik)))
+        z.writestr("CIK9999999999.json", "{not json")
+        z.writestr("CIK0000000050.json", json.dumps({"cik": 50, "facts": {}}))
+    monkeypatch.setattr(xbrl, "COMPANYFACTS_PATH", str(path))
+    return path
+
+
+class _FakeCursor:
+    def __init__(self, copied, statements):
+        self.copied = copied
+        self.statements = statements
+
+    def execute(self, sql, params=None):
+        self.statements.append(" ".join(sql.split()))
+
+    def copy_from(self, buf, table, columns, null):
+        assert columns == xbrl.COPY_COLUMNS
+        self.copied.append(buf.read())
+
+    def copy_expert(self, sql, stream):
+        # Small reads, like psycopg2's COPY buffer, to exercise _BlockStream
+        parts = []
+        while True:
+            chunk = stream.read(37)
+            if not chunk:
+                break
+            parts.append(chunk)
+        self.copied.append("".join(parts))
+        self.statements.append(sql)
+
+
+class _FakeConn:
+    def __init__(self, copied, statements=None):
+        self.copied = copied
+        self.statements = [] if statements is None else statements
+
+    def cursor(self):
+        return _FakeCursor(self.copied, self.statements)
+
+    def commit(self):
+        self.statements.append("COMMIT")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _copied_rows(monkeypatch, run):
+    copied = []
+    monkeypatch.setattr(xbrl, "get_connection", lambda: _FakeConn(copied))
+    monkeypatch.setattr(xbrl, "_verify_and_report", lambda conn, start: None)
+    run()
+    assert len(copied) == 1
+    return copied[0].splitlines(keepends=True)
+
+
+def test_parallel_load_copies_the_same_rows_as_serial(companyfacts, monkeypatch):
+    serial = _copied_rows(monkeypatch, lambda: xbrl.load_xbrl(workers=1))
+    parallel = _copied_rows(monkeypatch, lambda: xbrl.load_xbrl(workers=2, chunk_size=3))
+    assert len(serial) == 14  # 7 companies x 2 fiscal years
+    assert sorted(parallel) == sorted(serial)
+    row = dict(zip(xbrl.COPY_COLUMNS, serial[1].rstrip("\n").split("\t")))
+    assert row["revenue"] == "1200" and row["form_type"] == "10-K/A"
+    assert row["employee_count"] == "41" and row["currency"] == "USD"
+
+
+def test_member_slices_match_serial_extraction(companyfacts):
+    with zipfile.ZipFile(companyfacts) as z:
+        names = sorted(n for n in z.namelist() if n.endswith(".json"))
+        expected = []
+        for name in names:
+            try:
+                records = xbrl.extract_annual_facts(json.loads(z.read(name)))
+            except ValueError:
+                continue
+            expected.extend(xbrl.format_copy_row(r) for r in records)
+
+    xbrl._init_worker(str(companyfacts))
+    try:
+        block, stats = xbrl._parse_member_slice(names)
+    finally:
+        xbrl._worker_zip.close()
+    assert block == "".join(expected)
+    assert stats["files"] == 9 and stats["parse_errors"] == 1
+    assert stats["companies_with_data"] == 7 and stats["records"] == 14
+    assert stats["date_rejects"] == {"2201-12-31": 7}
+
+    totals = {"files": 0, "companies_with_data": 0, "records": 0, "parse_errors": 0,
+              "error_samples": [], "date_rejects": {},
+              "concept_counts": {c: 0 for c in xbrl.TAG_MAP}}
+    blocks = list(xbrl.iter_parallel_blocks(names, 2, totals, chunk_size=2,
+                                            zip_path=str(companyfacts)))
+    assert sorted("".join(blocks).splitlines()) == sorted(block.splitlines())
+    assert totals["records"] == 14 and totals["concept_counts"] == stats["concept_counts"]
+
+
+def test_block_stream_reads_across_block_boundaries():
+    stream = xbrl._BlockStream(iter(["abc", "", "defg", "h"]))
+    assert stream.read(2) == "ab"
+    assert stream.read(4) == "cdef"
+    assert stream.read() == "gh"
+    assert stream.read(5) == ""
+
+
+def test_parallel_load_truncates_only_after_the_parse(companyfacts, monkeypatch):
+    statements = []
+    monkeypatch.setattr(xbrl, "get_connection", lambda: _FakeConn([], statements))
+    monkeypatch.setattr(xbrl, "_verify_and_report", lambda conn, start: None)
+    xbrl.load_xbrl(workers=2, chunk_size=3)
+
+    copy = next(i for i, s in enumerate(statements) if s.startswith("COPY"))
+    truncate = statements.index("TRUNCATE sec_xbrl_financials RESTART IDENTITY")
+    assert statements[copy].startswith(f"COPY {xbrl.STAGING_TABLE} (")
+    # The parse-long COPY is committed before the target is locked, and the
+    # TRUNCATE commits together with the refill
+    assert statements[copy + 1] == "COMMIT" and copy < truncate
+    assert statements[truncate + 1].startswith("INSERT INTO sec_xbrl_financials")
+    assert statements[truncate + 1:].index("COMMIT") == 2
@@ -0,0 +1,108 @@
+"""Tests for scripts/etl/source_cache.py (no network, no DB)."""
+import hashlib
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts" / "etl"))
+
+from source_cache import Artifact, SourceCache, fingerprint  # noqa: E402
+
+
+class _FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self._body), 4):
+            yield self._body[i:i + 4]
+
+
+class _FakeSession:
+    """Serves ``body`` with an ETag; honors If-None-Match."""
+
+    def __init__(self, body, etag='"v1"'):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False, timeout=None):
+        headers = headers or {}
+        self.requests.append(headers)
+        if headers.get("If-None-Match") == self.etag:
+            return _FakeResponse(304)
+        return _FakeResponse(200, self.body, {"ETag": self.etag, "Last-Modified": "Mon, 01 Jan 2026 00:00:00 GMT"})
+
+
+def test_fetch_stores_by_content_hash(tmp_path):
+    cache = SourceCache(tmp_path)
+    art = cache.fetch("https://example.test/a.zip", session=_FakeSession(b"hello world"))
+    assert art.sha256 == hashlib.sha256(b"hello world").hexdigest()
+    assert Path(art.path) == cache.object_path(art.sha256)
+    assert Path(art.path).read_bytes() == b"hello world"
+    assert art.etag == '"v1"'
+    assert art.changed is True
+
+
+def test_refetch_sends_validators_and_reuses_object_on_304(tmp_path):
+    session = _FakeSession(b"payload")
+    first = SourceCache(tmp_path).fetch("https://example.test/a.zip", session=session)
+
+    # Fresh instance reads the persisted index
+    second = SourceCache(tmp_path).fetch("https://example.test/a.zip", session=session)
+    assert session.requests[-1]["If-None-Match"] == '"v1"'
+    assert "If-Modified-Since" in session.requests[-1]
+    assert second.changed is False
+    assert second.sha256 == first.sha256
+
+
+def test_new_etag_with_same_bytes_is_unchanged(tmp_path):
+    cache = SourceCache(tmp_path)
+    cache.fetch("https://example.test/a.zip", session=_FakeSession(b"same", etag='"v1"'))
+    again = cache.fetch("https://example.test/a.zip", session=_FakeSession(b"same", etag='"v2"'))
+    assert again.changed is False
+    assert again.etag == '"v2"'
+
+
+def test_file_hash_is_full_content_and_memoized(tmp_path):
+    cache = SourceCache(tmp_path / "cache")
+    f = tmp_path / "big.bin"
+    f.write_bytes(b"x" * 3_000_000)
+    digest = cache.file_sha256(f)
+    assert digest == hashlib.sha256(b"x" * 3_000_000).hexdigest()
+
+    memo = cache._load_index()["files"][str(f.resolve())]
+    assert memo["sha256"] == digest
+
+    f.write_bytes(b"y" * 3_000_000)  # same size, new mtime/content
+    assert cache.file_sha256(f) != digest
+
+
+def test_materialize_links_artifact_into_place(tmp_path):
+    cache = SourceCache(tmp_path / "cache")
+    art = cache.fetch("https://example.test/a.zip", session=_FakeSession(b"abc"))
+    target = cache.materialize(art, tmp_path / "files" / "a.zip")
+    assert target.read_bytes() == b"abc"
+    # Idempotent
+    assert cache.materialize(art, target) == target
+
+
+def test_fingerprint_is_order_independent():
+    a = Artifact(source="a", sha256="1" * 64, path="a", size=1)
+    b = Artifact(source="b", sha256="2" * 64, path="b", size=1)
+    assert fingerprint([a, b]) == fingerprint([b, a])
+    assert fingerprint([a]) != fingerprint([a, b])
+    assert "path" not in a.as_record()
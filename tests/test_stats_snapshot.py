@@ -0,0 +1,92 @@
+"""Tests for the dashboard stats snapshot (api/services/stats_snapshot.py, no DB)."""
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api.services import stats_snapshot as ss  # noqa: E402
+
+STAMP = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+class _FakeDB:
+    """platform_stats_snapshot as a dict; counts metric computations."""
+
+    def __init__(self):
+        self.rows = {}
+        self.computed = 0
+
+    @contextmanager
+    def get_db(self):
+        yield self
+
+    @contextmanager
+    def cursor(self, **kwargs):
+        yield _FakeCursor(self)
+
+
+class _FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self._result = []
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        if sql.startswith("SELECT metric"):
+            self._result = [{"metric": m, "value": self.db.rows[m][0], "computed_at": self.db.rows[m][1]}
+                            for m in params[0] if m in self.db.rows]
+        elif sql.startswith("INSERT INTO platform_stats_snapshot"):
+            self.db.rows[params[0]] = (json.loads(params[1]), STAMP)
+            self._result = [{"computed_at": STAMP}]
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = _FakeDB()
+
+    def compute(cur):
+        fake.computed += 1
+        return {"total": Decimal("12"), "rate": Decimal("41.5"), "since": date(2020, 1, 2)}
+
+    monkeypatch.setattr(ss, "get_db", fake.get_db)
+    monkeypatch.setattr(ss, "METRICS", {"summary": (compute, ("nlrb_elections",)),
+                                        "data_coverage": (compute, ("mv_employer_data_sources",))})
+    return fake
+
+
+def test_values_round_trip_as_json_numbers():
+    assert ss.to_json({"n": Decimal("3"), "pct": Decimal("2.50"), "d": date(2024, 5, 1)}) == \
+        '{"n": 3, "pct": 2.5, "d": "2024-05-01"}'
+
+
+def test_missing_metric_is_computed_once_then_read(db):
+    value, computed_at = ss.get_metric("summary")
+    assert value == {"total": 12, "rate": 41.5, "since": "2020-01-02"}
+    assert computed_at == STAMP and db.computed == 1
+
+    assert ss.get_metric("summary") == (value, STAMP)
+    assert db.computed == 1
+    # live=true always recomputes
+    ss.get_metric("summary", live=True)
+    assert db.computed == 2
+
+
+def test_metrics_for_tables():
+    assert ss.metrics_for_tables(["nlrb_elections"]) == ["summary"]
+    assert ss.metrics_for_tables(["mv_employer_data_sources"]) == ["data_coverage"]
+    assert ss.metrics_for_tables(["osha_establishments"]) == ["health_counts"]
+    assert ss.metrics_for_tables(["some_unrelated_table"]) == []
+    assert ss.metrics_for_tables(["multiple"]) == list(ss.METRICS)